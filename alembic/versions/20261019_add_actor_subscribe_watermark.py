@@ -0,0 +1,57 @@
+"""演员订阅添加增量检查水位字段
+
+此迁移脚本为 actor_subscribe 表添加：
+1. watermark_date - 已检查作品的最新发布日期
+2. watermark_nums - 水位当天已检查的番号列表
+3. last_checked_at - 最近一次检查新作品的时间
+
+Revision ID: 20261019_actor_watermark
+Revises: 20261019_cached_video
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_actor_watermark'
+down_revision: Union[str, None] = '20261019_cached_video'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    ('watermark_date', sa.Date(), '已检查作品的最新发布日期'),
+    ('watermark_nums', sa.JSON(), '水位当天已检查的番号列表'),
+    ('last_checked_at', sa.DateTime(), '最近一次检查新作品的时间'),
+)
+
+
+def _columns():
+    return {column['name'] for column in inspect(op.get_bind()).get_columns('actor_subscribe')}
+
+
+def upgrade() -> None:
+    """添加水位字段（启动时 create_all 可能已经建好）"""
+
+    if 'actor_subscribe' not in inspect(op.get_bind()).get_table_names():
+        return
+    existing = _columns()
+    for name, column_type, comment in COLUMNS:
+        if name not in existing:
+            op.add_column('actor_subscribe', sa.Column(name, column_type, nullable=True, comment=comment))
+
+
+def downgrade() -> None:
+    """删除水位字段"""
+
+    if 'actor_subscribe' not in inspect(op.get_bind()).get_table_names():
+        return
+    existing = _columns()
+    with op.batch_alter_table('actor_subscribe') as batch_op:
+        for name, _, _ in reversed(COLUMNS):
+            if name in existing:
+                batch_op.drop_column(name)
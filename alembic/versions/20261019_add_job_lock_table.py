@@ -0,0 +1,63 @@
+"""添加任务租约表
+
+此迁移脚本创建 job_lock 表，多个实例共享同一个数据库时，
+Scheduler.do_job 在执行任务前需要先获取该任务的租约，保证后台任务只在一个实例上执行。
+
+Revision ID: 20261019_job_lock
+Revises: 20261019_job_run
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_job_lock'
+down_revision: Union[str, None] = '20261019_job_run'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return table_name in inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    """创建 job_lock 表（启动时 create_all 可能已经建好）"""
+
+    if _table_exists('job_lock'):
+        return
+
+    op.create_table(
+        'job_lock',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+        sa.Column('job_key', sa.String(64), nullable=False, comment='任务标识'),
+        sa.Column('owner', sa.String(128), nullable=False, comment='租约持有者（实例标识）'),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False, comment='获取时间'),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True, comment='最近续约时间'),
+        sa.Column('expires_at', sa.DateTime(), nullable=False, comment='租约到期时间'),
+        sa.Column('released_at', sa.DateTime(), nullable=True, comment='释放时间，为空表示仍在执行或实例异常退出'),
+        # Base 模型的标准审计字段
+        sa.Column('create_by', sa.Integer(), nullable=True),
+        sa.Column('create_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('update_by', sa.Integer(), nullable=True),
+        sa.Column('update_time', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        comment='任务租约表 - 多实例部署时的定时任务互斥'
+    )
+
+    op.create_index('uq_job_lock_job_key', 'job_lock', ['job_key'], unique=True)
+
+
+def downgrade() -> None:
+    """删除 job_lock 表"""
+
+    if not _table_exists('job_lock'):
+        return
+
+    op.drop_index('uq_job_lock_job_key', table_name='job_lock')
+    op.drop_table('job_lock')
@@ -0,0 +1,65 @@
+"""添加任务执行记录表
+
+此迁移脚本创建 job_run 表，用于记录定时任务每次执行的耗时、结果和错误信息。
+每个任务只保留最近若干条记录（由 scheduler.history_limit 配置）。
+
+Revision ID: 20261019_job_run
+Revises: 20260225_add_download_uniqueness
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_job_run'
+down_revision: Union[str, None] = '20260225_add_download_uniqueness'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return table_name in inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    """创建 job_run 表（启动时 create_all 可能已经建好）"""
+
+    if _table_exists('job_run'):
+        return
+
+    op.create_table(
+        'job_run',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+        sa.Column('job_key', sa.String(64), nullable=False, comment='任务标识'),
+        sa.Column('job_name', sa.String(100), nullable=True, comment='任务名称'),
+        sa.Column('start_time', sa.DateTime(), nullable=False, comment='开始时间'),
+        sa.Column('end_time', sa.DateTime(), nullable=True, comment='结束时间'),
+        sa.Column('duration', sa.Float(), nullable=True, comment='耗时(秒)'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='running', comment='执行状态: running/success/failed/skipped'),
+        sa.Column('result', sa.Text(), nullable=True, comment='执行结果摘要'),
+        sa.Column('error_message', sa.Text(), nullable=True, comment='错误信息'),
+        # Base 模型的标准审计字段
+        sa.Column('create_by', sa.Integer(), nullable=True),
+        sa.Column('create_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('update_by', sa.Integer(), nullable=True),
+        sa.Column('update_time', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        comment='任务执行记录表 - 存储定时任务的执行历史'
+    )
+
+    op.create_index('idx_job_run_key_start', 'job_run', ['job_key', 'start_time'], unique=False)
+
+
+def downgrade() -> None:
+    """删除 job_run 表"""
+
+    if not _table_exists('job_run'):
+        return
+
+    op.drop_index('idx_job_run_key_start', table_name='job_run')
+    op.drop_table('job_run')
@@ -0,0 +1,67 @@
+"""添加刮削结果表
+
+此迁移脚本创建 scraped_metadata 表，按番号保存合并后的刮削结果、各站点原始结果
+以及各字段组的抓取时间，刮削时只重新抓取已过期的部分。
+
+Revision ID: 20261019_scraped_metadata
+Revises: 20261019_actor_watermark
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_scraped_metadata'
+down_revision: Union[str, None] = '20261019_actor_watermark'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return table_name in inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    """创建 scraped_metadata 表（启动时 create_all 可能已经建好）"""
+
+    if _table_exists('scraped_metadata'):
+        return
+
+    op.create_table(
+        'scraped_metadata',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+        sa.Column('num', sa.String(50), nullable=False, comment='视频番号（大写）'),
+        sa.Column('detail', sa.JSON(), nullable=False, comment='合并后的刮削结果（VideoDetail）'),
+        sa.Column('sources', sa.JSON(), nullable=True,
+                  comment='各站点原始结果 {"站点": {"fetched_at": "...", "detail": {...}}}'),
+        sa.Column('field_fetched_at', sa.JSON(), nullable=True,
+                  comment='各字段组最近抓取时间 {"metadata": "...", "downloads": "..."}'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True, comment='最近抓取时间'),
+        # Base 模型的标准审计字段
+        sa.Column('create_by', sa.Integer(), nullable=True),
+        sa.Column('create_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('update_by', sa.Integer(), nullable=True),
+        sa.Column('update_time', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        comment='刮削结果表 - 按番号保存的多站点刮削结果'
+    )
+
+    op.create_index('uq_scraped_metadata_num', 'scraped_metadata', ['num'], unique=True)
+    op.create_index('idx_scraped_metadata_fetched_at', 'scraped_metadata', ['fetched_at'])
+
+
+def downgrade() -> None:
+    """删除 scraped_metadata 表"""
+
+    if not _table_exists('scraped_metadata'):
+        return
+
+    op.drop_index('idx_scraped_metadata_fetched_at', table_name='scraped_metadata')
+    op.drop_index('uq_scraped_metadata_num', table_name='scraped_metadata')
+    op.drop_table('scraped_metadata')
@@ -0,0 +1,151 @@
+"""添加视频缓存演员/标签关联表
+
+此迁移脚本创建 video_cache_actor 和 video_cache_tag 表，
+并根据 video_cache 中已有的 actors/tags JSON 字段回填关联行，
+VideoCacheService.query_videos 的演员/标签过滤改为通过关联表在 SQL 中完成。
+
+Revision ID: 20261019_video_cache_links
+Revises: 20261019_job_lock
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_video_cache_links'
+down_revision: Union[str, None] = '20261019_job_lock'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def _table_exists(table_name: str) -> bool:
+    return table_name in inspect(op.get_bind()).get_table_names()
+
+
+def _columns(table_name: str):
+    return {column['name'] for column in inspect(op.get_bind()).get_columns(table_name)}
+
+
+def _audit_columns():
+    # Base 模型的标准审计字段
+    return [
+        sa.Column('create_by', sa.Integer(), nullable=True),
+        sa.Column('create_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('update_by', sa.Integer(), nullable=True),
+        sa.Column('update_time', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _normalize_actor_id(actor) -> str:
+    raw_value = actor.get('id') if isinstance(actor, dict) else actor
+    return str(raw_value).strip() if raw_value is not None else ''
+
+
+def _normalize_tag_value(tag) -> str:
+    if isinstance(tag, dict):
+        raw_value = tag.get('name') or tag.get('tag') or tag.get('value') or tag.get('label')
+    else:
+        raw_value = tag
+    return str(raw_value).strip().lower() if raw_value is not None else ''
+
+
+def _load_json(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return []
+    return value or []
+
+
+def _backfill(bind):
+    """根据已有的 JSON 字段回填关联行（关联表为空时才执行）"""
+    if bind.execute(sa.text('SELECT 1 FROM video_cache_actor LIMIT 1')).first():
+        return
+    if bind.execute(sa.text('SELECT 1 FROM video_cache_tag LIMIT 1')).first():
+        return
+
+    actor_table = sa.table('video_cache_actor', sa.column('video_cache_id'), sa.column('actor_id'),
+                           sa.column('actor_name'), sa.column('create_time'))
+    tag_table = sa.table('video_cache_tag', sa.column('video_cache_id'), sa.column('tag'), sa.column('create_time'))
+    now = datetime.now()
+
+    rows = bind.execute(sa.text('SELECT id, actors, tags FROM video_cache')).fetchall()
+    for start in range(0, len(rows), BATCH_SIZE):
+        actor_rows, tag_rows = [], []
+        for video_id, actors, tags in rows[start:start + BATCH_SIZE]:
+            seen_actors = set()
+            for actor in _load_json(actors):
+                actor_id = _normalize_actor_id(actor)
+                if actor_id and actor_id not in seen_actors:
+                    seen_actors.add(actor_id)
+                    name = actor.get('name') if isinstance(actor, dict) else None
+                    actor_rows.append({'video_cache_id': video_id, 'actor_id': actor_id,
+                                       'actor_name': name, 'create_time': now})
+            for tag in dict.fromkeys(_normalize_tag_value(tag) for tag in _load_json(tags)):
+                if tag:
+                    tag_rows.append({'video_cache_id': video_id, 'tag': tag, 'create_time': now})
+        if actor_rows:
+            bind.execute(actor_table.insert(), actor_rows)
+        if tag_rows:
+            bind.execute(tag_table.insert(), tag_rows)
+
+
+def upgrade() -> None:
+    """创建关联表并回填（启动时 create_all 可能已经建好表）"""
+
+    if not _table_exists('video_cache_actor'):
+        op.create_table(
+            'video_cache_actor',
+            sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+            sa.Column('video_cache_id', sa.Integer(), nullable=False, comment='视频缓存ID'),
+            sa.Column('actor_id', sa.String(100), nullable=False, comment='演员ID（去除首尾空白）'),
+            sa.Column('actor_name', sa.String(200), nullable=True, comment='演员名称'),
+            *_audit_columns(),
+            sa.ForeignKeyConstraint(['video_cache_id'], ['video_cache.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            comment='视频缓存演员关联表'
+        )
+        op.create_index('idx_video_cache_actor_actor', 'video_cache_actor', ['actor_id', 'video_cache_id'])
+        op.create_index('idx_video_cache_actor_video', 'video_cache_actor', ['video_cache_id'])
+
+    if not _table_exists('video_cache_tag'):
+        op.create_table(
+            'video_cache_tag',
+            sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+            sa.Column('video_cache_id', sa.Integer(), nullable=False, comment='视频缓存ID'),
+            sa.Column('tag', sa.String(200), nullable=False, comment='标签（小写并去除首尾空白）'),
+            *_audit_columns(),
+            sa.ForeignKeyConstraint(['video_cache_id'], ['video_cache.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            comment='视频缓存标签关联表'
+        )
+        op.create_index('idx_video_cache_tag_tag', 'video_cache_tag', ['tag', 'video_cache_id'])
+        op.create_index('idx_video_cache_tag_video', 'video_cache_tag', ['video_cache_id'])
+
+    # 启动时 create_all 可能已按拆分后的模型（video_id 引用 cached_video）建好关联表，
+    # 此时不回填，由 20261019_cached_video 重建和回填
+    if _table_exists('video_cache') and all(
+        'video_cache_id' in _columns(name) for name in ('video_cache_actor', 'video_cache_tag')
+    ):
+        _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    """删除关联表"""
+
+    for table_name in ('video_cache_tag', 'video_cache_actor'):
+        if not _table_exists(table_name):
+            continue
+        for index in inspect(op.get_bind()).get_indexes(table_name):
+            op.drop_index(index['name'], table_name=table_name)
+        op.drop_table(table_name)
@@ -0,0 +1,60 @@
+"""视频缓存表添加榜单唯一键
+
+此迁移脚本先清理 video_cache 中 (num, source, video_type, cycle) 重复的记录（保留最新一条），
+再创建唯一索引 uq_video_cache_ranking，榜单刷新改为按该键批量 INSERT ... ON CONFLICT DO UPDATE。
+
+Revision ID: 20261019_video_cache_unique
+Revises: 20261019_video_cache_links
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_video_cache_unique'
+down_revision: Union[str, None] = '20261019_video_cache_links'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'uq_video_cache_ranking'
+DUPLICATE_IDS = (
+    'SELECT id FROM video_cache WHERE id NOT IN ('
+    'SELECT MAX(id) FROM video_cache GROUP BY num, source, video_type, cycle)'
+)
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return False
+    return any(index['name'] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade() -> None:
+    """清理重复记录并创建唯一索引（启动时 create_all 可能已经建好）"""
+
+    bind = op.get_bind()
+    if 'video_cache' not in inspect(bind).get_table_names() or _index_exists('video_cache', INDEX_NAME):
+        return
+
+    for link_table in ('video_cache_actor', 'video_cache_tag'):
+        # 按拆分后模型建好的关联表引用 cached_video，不受 video_cache 去重影响
+        if link_table in inspect(bind).get_table_names() and 'video_cache_id' in {
+            column['name'] for column in inspect(bind).get_columns(link_table)
+        }:
+            bind.execute(sa.text(f'DELETE FROM {link_table} WHERE video_cache_id IN ({DUPLICATE_IDS})'))
+    bind.execute(sa.text(f'DELETE FROM video_cache WHERE id IN ({DUPLICATE_IDS})'))
+
+    op.create_index(INDEX_NAME, 'video_cache', ['num', 'source', 'video_type', 'cycle'], unique=True)
+
+
+def downgrade() -> None:
+    """删除唯一索引"""
+
+    if _index_exists('video_cache', INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name='video_cache')
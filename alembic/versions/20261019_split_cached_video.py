@@ -0,0 +1,241 @@
+"""视频缓存拆分为按番号去重的 cached_video 和榜单成员 video_cache
+
+此迁移脚本：
+1. 创建 cached_video 表，按番号保存一份视频元数据（取该番号最新抓取的一条）；
+2. 将 video_cache 重建为轻量的榜单成员表，通过 video_id 引用 cached_video；
+3. 演员/标签关联表改为引用 cached_video，并根据 JSON 字段重新回填。
+
+Revision ID: 20261019_cached_video
+Revises: 20261019_video_cache_unique
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_cached_video'
+down_revision: Union[str, None] = '20261019_video_cache_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+VIDEO_COLUMNS = (
+    'num', 'title', 'cover', 'url', 'rating', 'comments_count', 'release_date', 'is_hd', 'is_zh',
+    'is_uncensored', 'actors', 'tags', 'magnets', 'extra_data', 'created_at', 'updated_at', 'fetched_at',
+    'create_by', 'create_time', 'update_by', 'update_time',
+)
+RANKING_COLUMNS = (
+    'num', 'source', 'video_type', 'cycle', 'rank_position', 'created_at', 'updated_at', 'fetched_at',
+    'create_by', 'create_time', 'update_by', 'update_time',
+)
+
+
+def _tables():
+    return inspect(op.get_bind()).get_table_names()
+
+
+def _columns(table_name: str):
+    return {column['name'] for column in inspect(op.get_bind()).get_columns(table_name)}
+
+
+def _audit_columns():
+    # Base 模型的标准审计字段
+    return [
+        sa.Column('create_by', sa.Integer(), nullable=True),
+        sa.Column('create_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('update_by', sa.Integer(), nullable=True),
+        sa.Column('update_time', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _normalize_actor_id(actor) -> str:
+    raw_value = actor.get('id') if isinstance(actor, dict) else actor
+    return str(raw_value).strip() if raw_value is not None else ''
+
+
+def _normalize_tag_value(tag) -> str:
+    if isinstance(tag, dict):
+        raw_value = tag.get('name') or tag.get('tag') or tag.get('value') or tag.get('label')
+    else:
+        raw_value = tag
+    return str(raw_value).strip().lower() if raw_value is not None else ''
+
+
+def _load_json(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return []
+    return value or []
+
+
+def _create_cached_video():
+    op.create_table(
+        'cached_video',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+        sa.Column('num', sa.String(50), nullable=False, comment='视频番号'),
+        sa.Column('title', sa.String(500), nullable=True, comment='视频标题'),
+        sa.Column('cover', sa.String(500), nullable=True, comment='封面图片URL'),
+        sa.Column('url', sa.String(500), nullable=True, comment='视频详情页URL'),
+        sa.Column('rating', sa.Float(), nullable=True, comment='评分 (0-5)'),
+        sa.Column('comments_count', sa.Integer(), nullable=True, comment='评论数'),
+        sa.Column('release_date', sa.String(20), nullable=True, comment='发布日期 YYYY-MM-DD'),
+        sa.Column('is_hd', sa.Boolean(), nullable=True, comment='是否高清'),
+        sa.Column('is_zh', sa.Boolean(), nullable=True, comment='是否中文字幕'),
+        sa.Column('is_uncensored', sa.Boolean(), nullable=True, comment='是否无码'),
+        sa.Column('actors', sa.JSON(), nullable=True, comment='演员列表'),
+        sa.Column('tags', sa.JSON(), nullable=True, comment='标签列表'),
+        sa.Column('magnets', sa.JSON(), nullable=True, comment='磁力链接列表'),
+        sa.Column('extra_data', sa.JSON(), nullable=True, comment='其他扩展数据'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True, comment='抓取时间'),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint('id'),
+        comment='缓存视频表 - 按番号去重的视频元数据'
+    )
+    op.create_index('uq_cached_video_num', 'cached_video', ['num'], unique=True)
+    op.create_index('idx_cached_video_rating', 'cached_video', ['rating'])
+    op.create_index('idx_cached_video_comments', 'cached_video', ['comments_count'])
+    op.create_index('idx_cached_video_release_date', 'cached_video', ['release_date'])
+
+
+def _create_ranking_table(table_name: str):
+    op.create_table(
+        table_name,
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+        sa.Column('video_id', sa.Integer(), nullable=False, comment='缓存视频ID'),
+        sa.Column('num', sa.String(50), nullable=False, comment='视频番号'),
+        sa.Column('source', sa.String(50), nullable=False, comment='数据来源'),
+        sa.Column('video_type', sa.String(20), nullable=True, comment='视频类型'),
+        sa.Column('cycle', sa.String(20), nullable=True, comment='榜单周期'),
+        sa.Column('rank_position', sa.Integer(), nullable=True, comment='在榜单中的排名位置'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True, comment='抓取时间'),
+        *_audit_columns(),
+        sa.ForeignKeyConstraint(['video_id'], ['cached_video.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='视频缓存表 - 排行榜成员'
+    )
+
+
+def _create_ranking_indexes():
+    op.create_index('idx_num', 'video_cache', ['num'])
+    op.create_index('uq_video_cache_ranking', 'video_cache', ['num', 'source', 'video_type', 'cycle'], unique=True)
+    op.create_index('idx_source_type_cycle', 'video_cache', ['source', 'video_type', 'cycle'])
+    op.create_index('idx_video_cache_video', 'video_cache', ['video_id'])
+    op.create_index('idx_fetched_at', 'video_cache', ['fetched_at'])
+
+
+def _create_link_tables():
+    op.create_table(
+        'video_cache_actor',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+        sa.Column('video_id', sa.Integer(), nullable=False, comment='缓存视频ID'),
+        sa.Column('actor_id', sa.String(100), nullable=False, comment='演员ID（去除首尾空白）'),
+        sa.Column('actor_name', sa.String(200), nullable=True, comment='演员名称'),
+        *_audit_columns(),
+        sa.ForeignKeyConstraint(['video_id'], ['cached_video.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='视频缓存演员关联表'
+    )
+    op.create_index('idx_video_cache_actor_actor', 'video_cache_actor', ['actor_id', 'video_id'])
+    op.create_index('idx_video_cache_actor_video', 'video_cache_actor', ['video_id'])
+
+    op.create_table(
+        'video_cache_tag',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True, comment='主键ID'),
+        sa.Column('video_id', sa.Integer(), nullable=False, comment='缓存视频ID'),
+        sa.Column('tag', sa.String(200), nullable=False, comment='标签（小写并去除首尾空白）'),
+        *_audit_columns(),
+        sa.ForeignKeyConstraint(['video_id'], ['cached_video.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='视频缓存标签关联表'
+    )
+    op.create_index('idx_video_cache_tag_tag', 'video_cache_tag', ['tag', 'video_id'])
+    op.create_index('idx_video_cache_tag_video', 'video_cache_tag', ['video_id'])
+
+
+def _backfill_links(bind):
+    actor_table = sa.table('video_cache_actor', sa.column('video_id'), sa.column('actor_id'),
+                           sa.column('actor_name'), sa.column('create_time'))
+    tag_table = sa.table('video_cache_tag', sa.column('video_id'), sa.column('tag'), sa.column('create_time'))
+    now = datetime.now()
+
+    rows = bind.execute(sa.text('SELECT id, actors, tags FROM cached_video')).fetchall()
+    for start in range(0, len(rows), BATCH_SIZE):
+        actor_rows, tag_rows = [], []
+        for video_id, actors, tags in rows[start:start + BATCH_SIZE]:
+            seen_actors = set()
+            for actor in _load_json(actors):
+                actor_id = _normalize_actor_id(actor)
+                if actor_id and actor_id not in seen_actors:
+                    seen_actors.add(actor_id)
+                    name = actor.get('name') if isinstance(actor, dict) else None
+                    actor_rows.append({'video_id': video_id, 'actor_id': actor_id,
+                                       'actor_name': name, 'create_time': now})
+            for tag in dict.fromkeys(_normalize_tag_value(tag) for tag in _load_json(tags)):
+                if tag:
+                    tag_rows.append({'video_id': video_id, 'tag': tag, 'create_time': now})
+        if actor_rows:
+            bind.execute(actor_table.insert(), actor_rows)
+        if tag_rows:
+            bind.execute(tag_table.insert(), tag_rows)
+
+
+def upgrade() -> None:
+    """拆分视频缓存（启动时 create_all 可能已经建好新表）"""
+
+    bind = op.get_bind()
+    if 'cached_video' not in _tables():
+        _create_cached_video()
+
+    if 'video_cache' in _tables() and 'title' in _columns('video_cache'):
+        # 每个番号取最新的一条作为元数据
+        columns = ', '.join(VIDEO_COLUMNS)
+        bind.execute(sa.text(
+            f'INSERT OR IGNORE INTO cached_video ({columns}) SELECT {columns} FROM video_cache '
+            f'WHERE id IN (SELECT MAX(id) FROM video_cache GROUP BY num)'
+        ))
+
+        _create_ranking_table('video_cache_new')
+        columns = ', '.join(RANKING_COLUMNS)
+        prefixed = ', '.join(f'v.{name}' for name in RANKING_COLUMNS)
+        bind.execute(sa.text(
+            f'INSERT INTO video_cache_new (id, video_id, {columns}) '
+            f'SELECT v.id, c.id, {prefixed} FROM video_cache v JOIN cached_video c ON c.num = v.num'
+        ))
+        op.drop_table('video_cache')
+        op.rename_table('video_cache_new', 'video_cache')
+        _create_ranking_indexes()
+    elif 'video_cache' not in _tables():
+        _create_ranking_table('video_cache')
+        _create_ranking_indexes()
+
+    # 关联表改为引用 cached_video
+    link_tables = [name for name in ('video_cache_actor', 'video_cache_tag') if name in _tables()]
+    if any('video_cache_id' in _columns(name) for name in link_tables) or len(link_tables) < 2:
+        for name in link_tables:
+            op.drop_table(name)
+        _create_link_tables()
+        _backfill_links(bind)
+    elif not any(bind.execute(sa.text(f'SELECT 1 FROM {name} LIMIT 1')).first() for name in link_tables):
+        # 关联表由启动时的 create_all 按新模型建好但还是空表
+        _backfill_links(bind)
+
+
+def downgrade() -> None:
+    """拆分后的结构无法无损还原，降级时仅清空缓存数据（下次刷新榜单时会重新抓取）"""
+
+    for name in ('video_cache_actor', 'video_cache_tag', 'video_cache', 'cached_video'):
+        if name in _tables():
+            op.execute(sa.text(f'DELETE FROM {name}'))
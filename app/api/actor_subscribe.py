@@ -13,7 +13,7 @@ from fastapi import APIRouter, Depends
 from app import schema
 from app.schema.r import R
 from app.scheduler import scheduler
-from app.service.actor_subscribe import get_actor_subscribe_service
+from app.service.actor_subscribe import get_actor_subscribe_service, actor_check_progress
 
 router = APIRouter()
 
@@ -113,3 +113,9 @@ def run_actor_subscribe():
     if not ok:
         return R.fail(message="订阅任务不存在，触发失败")
     return R.ok(message="订阅任务已触发，请稍后查看结果")
+
+
+@router.get("/progress")
+def get_actor_subscribe_progress():
+    """获取演员订阅检查进度和最近各演员的检查耗时"""
+    return R.ok(data=actor_check_progress.snapshot())
@@ -45,9 +45,14 @@ def _guess_image_media_type(url: str):
 
 
 @router.get("/cover")
-def proxy_video_cover(url: str):
+async def proxy_video_cover(url: str, request: Request, w: int | None = None):
     normalized_url = _normalize_cover_url(url)
-    response = ResourceService.proxy_cover(normalized_url)
+    response = await ResourceService.proxy_cover_async(
+        normalized_url,
+        request.headers.get("if-none-match"),
+        width=w,
+        accept=request.headers.get("accept"),
+    )
     if response.status_code >= 400:
         raise HTTPException(status_code=502, detail='封面读取失败')
     return response
@@ -1,10 +1,7 @@
-import time
 import logging
 from collections.abc import Iterable as IterableABC
-from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-import tailer
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
@@ -13,6 +10,7 @@ from app.utils import spider
 from app.dependencies.security import verify_token
 from app.db import get_db
 from app.service.video_cache import VideoCacheService
+from app.utils.log_stream import log_broadcaster
 
 router = APIRouter()
 
@@ -169,16 +167,26 @@ def get_ranking_detail(source: str, num: str, url: str):
 
 
 @router.get("/log", dependencies=[Depends(verify_token)])
-async def get_logs():
-    log_path = Path(f"{Path(__file__).cwd()}/config/app.log")
+async def get_logs(level: Optional[str] = None):
+    """
+    实时日志推送（SSE）
+
+    所有客户端共享同一个日志读取线程，level 为最低日志级别（如 WARNING）
+    """
+    subscriber, recent_lines = log_broadcaster.subscribe(level=level, history=50)
 
-    def log_generator():
-        with open(log_path, "r", encoding="utf-8") as f:
-            for line in f.readlines()[-50:]:
+    async def log_generator():
+        try:
+            for line in recent_lines:
+                yield "data: %s\n\n" % line
+            while True:
+                line = await subscriber.get(timeout=15)
+                if line is None:
+                    # 心跳，保持连接并及时发现断开的客户端
+                    yield ": ping\n\n"
+                    continue
                 yield "data: %s\n\n" % line
-        while True:
-            for t in tailer.follow(open(log_path, "r", encoding="utf-8")):
-                yield "data: %s\n\n" % (t or "")
-            time.sleep(1)
+        finally:
+            log_broadcaster.unsubscribe(subscriber)
 
     return StreamingResponse(log_generator(), media_type="text/event-stream")
@@ -1,8 +1,13 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 
 from app import schema
+from app.db import get_db
 from app.scheduler import scheduler
 from app.schema.r import R
+from app.service.job_run import JobRunService
 from app.utils.logger import logger
 
 router = APIRouter()
@@ -15,39 +20,14 @@ def get_schedules():
     result = []
     for schedule in schedules:
         try:
-            # 特殊处理actor_subscribe任务，因为它不在scheduler.jobs字典中
-            # 处理特殊的cron任务（不在scheduler.jobs字典中）
-            if schedule.id == "actor_subscribe":
-                result.append(
-                    schema.Schedule(
-                        key=schedule.id,
-                        name="演员订阅",
-                        next_run_time=schedule.next_run_time,
-                        status=False,  # 无法获取实时运行状态，默认为未运行
-                    )
-                )
-                continue
-
-            if schedule.id == "actor_works_count_update":
-                result.append(
-                    schema.Schedule(
-                        key=schedule.id,
-                        name="更新演员作品数量",
-                        next_run_time=schedule.next_run_time,
-                        status=False,
-                    )
-                )
-                continue
-
-            # 处理普通任务
             job = scheduler.jobs[schedule.id]
-            key = schedule.id
-            name = schedule.name
-            next_run_time = schedule.next_run_time
-            status = job.running > 0
             result.append(
                 schema.Schedule(
-                    key=key, name=name, next_run_time=next_run_time, status=status
+                    key=schedule.id,
+                    name=schedule.name,
+                    next_run_time=schedule.next_run_time,
+                    status=job.running > 0,
+                    executor=job.executor,
                 )
             )
         except KeyError as e:
@@ -60,13 +40,18 @@ def get_schedules():
 
 @router.get("/fire")
 def fire_schedule(key: str):
-    if key == "actor_subscribe":
-        ok = scheduler.manually(key)
-        if not ok:
-            return R.fail("手动执行演员订阅任务失败: 任务不存在")
-        return R.ok()
-
     ok = scheduler.manually(key)
     if not ok:
         return R.fail(f"手动执行任务失败: {key} 不存在")
     return R.ok()
+
+
+@router.get("/history")
+def get_schedule_history(key: Optional[str] = None, limit: int = 50, db: Session = Depends(get_db)):
+    runs = JobRunService(db).list_runs(job_key=key, limit=min(max(limit, 1), 500))
+    return R.list([schema.JobRun.model_validate(run) for run in runs])
+
+
+@router.get("/stats")
+def get_schedule_stats(key: Optional[str] = None, db: Session = Depends(get_db)):
+    return R.list([schema.JobStats(**item) for item in JobRunService(db).get_stats(job_key=key)])
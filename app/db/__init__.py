@@ -71,11 +71,13 @@ def get_db():
                     pass
 
 
-def init() -> None:
-    base_metadata: Any = getattr(Base, "metadata")
-    base_metadata.create_all(engine, checkfirst=True)
-    setting_entry_table: Any = getattr(SettingEntry, "__table__")
-    setting_entry_table.create(engine, checkfirst=True)
+def init(create_tables: bool = True) -> None:
+    """create_tables=False 用于结构指纹未变化的启动，跳过逐表存在性检查"""
+    if create_tables:
+        base_metadata: Any = getattr(Base, "metadata")
+        base_metadata.create_all(engine, checkfirst=True)
+        setting_entry_table: Any = getattr(SettingEntry, "__table__")
+        setting_entry_table.create(engine, checkfirst=True)
     with SessionFactory() as db:
         user = db.query(User).filter_by(username="admin").one_or_none()
         if not user:
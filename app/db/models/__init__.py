@@ -13,3 +13,6 @@ from .pending_torrent import PendingTorrent, PendingTorrentStatus
 from .enums import SubscribeStatus, HistoryStatus
 from .actor_subscribe import ActorSubscribe, ActorSubscribeDownload
 from .setting_entry import SettingEntry
+from .job_run import JobRun
+from .job_lock import JobLock
+from .scraped_metadata import ScrapedMetadata
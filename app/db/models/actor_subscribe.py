@@ -14,6 +14,7 @@ from sqlalchemy import (
     Boolean,
     Date,
     DECIMAL,
+    JSON,
     UniqueConstraint,
 )
 
@@ -41,6 +42,10 @@ class ActorSubscribe(Base):
         Integer, nullable=True, default=0, comment="订阅作品总数（缓存）"
     )
     works_count_updated_at = Column(DateTime, nullable=True, comment="作品数量更新时间")
+    # 增量检查水位：早于 watermark_date 的作品及当天已检查过的番号不再重复处理
+    watermark_date = Column(Date, nullable=True, comment="已检查作品的最新发布日期")
+    watermark_nums = Column(JSON, nullable=True, comment="水位当天已检查的番号列表")
+    last_checked_at = Column(DateTime, nullable=True, comment="最近一次检查新作品的时间")
 
 
 class ActorSubscribeDownload(Base):
@@ -0,0 +1,27 @@
+"""
+任务锁数据模型 - 多实例共享数据库时保证定时任务只在一个实例上执行
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.db.models.base import Base
+
+
+class JobLock(Base):
+    """任务租约表 - 每个任务一行，持有者需在租约到期前续约"""
+    __tablename__ = 'job_lock'
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
+
+    job_key = Column(String(64), nullable=False, comment='任务标识')
+    owner = Column(String(128), nullable=False, comment='租约持有者（实例标识）')
+    acquired_at = Column(DateTime, nullable=False, comment='获取时间')
+    heartbeat_at = Column(DateTime, nullable=True, comment='最近续约时间')
+    expires_at = Column(DateTime, nullable=False, comment='租约到期时间')
+    released_at = Column(DateTime, nullable=True, comment='释放时间，为空表示仍在执行或实例异常退出')
+
+    __table_args__ = (
+        Index('uq_job_lock_job_key', 'job_key', unique=True),
+        {'comment': '任务租约表 - 多实例部署时的定时任务互斥'}
+    )
+
+    def __repr__(self):
+        return f"<JobLock(job_key='{self.job_key}', owner='{self.owner}', expires_at='{self.expires_at}')>"
@@ -0,0 +1,46 @@
+"""
+任务执行记录数据模型 - 存储定时任务的执行历史
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
+from app.db.models.base import Base
+
+
+class JobRun(Base):
+    """任务执行记录表 - 每个任务只保留最近若干条记录"""
+    __tablename__ = 'job_run'
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
+
+    job_key = Column(String(64), nullable=False, comment='任务标识')
+    job_name = Column(String(100), nullable=True, comment='任务名称')
+
+    start_time = Column(DateTime, nullable=False, default=datetime.now, comment='开始时间')
+    end_time = Column(DateTime, nullable=True, comment='结束时间')
+    duration = Column(Float, nullable=True, comment='耗时(秒)')
+
+    status = Column(String(20), nullable=False, default='running', comment='执行状态: running/success/failed/skipped')
+    result = Column(Text, nullable=True, comment='执行结果摘要')
+    error_message = Column(Text, nullable=True, comment='错误信息')
+
+    __table_args__ = (
+        Index('idx_job_run_key_start', 'job_key', 'start_time'),
+        {'comment': '任务执行记录表 - 存储定时任务的执行历史'}
+    )
+
+    def __repr__(self):
+        return f"<JobRun(id={self.id}, job_key='{self.job_key}', status='{self.status}', duration={self.duration})>"
+
+    def to_dict(self):
+        """转换为字典格式"""
+        return {
+            'id': self.id,
+            'job_key': self.job_key,
+            'job_name': self.job_name,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'duration': self.duration,
+            'status': self.status,
+            'result': self.result,
+            'error_message': self.error_message,
+        }
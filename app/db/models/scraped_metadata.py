@@ -0,0 +1,35 @@
+"""
+刮削结果数据模型 - 按番号持久化多站点刮削结果
+
+detail 保存合并后的 VideoDetail，sources 保存各站点的原始结果，
+field_fetched_at 记录各字段组（元数据/下载/预览/评论）的最近抓取时间，用于按字段组判断是否需要重新刮削。
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, JSON
+
+from app.db.models.base import Base
+
+
+class ScrapedMetadata(Base):
+    """刮削结果表 - 每个番号一行"""
+    __tablename__ = 'scraped_metadata'
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
+
+    num = Column(String(50), nullable=False, comment='视频番号（大写）')
+    detail = Column(JSON, nullable=False, comment='合并后的刮削结果（VideoDetail）')
+    sources = Column(JSON, comment='各站点原始结果 {"站点": {"fetched_at": "...", "detail": {...}}}')
+    field_fetched_at = Column(JSON, comment='各字段组最近抓取时间 {"metadata": "...", "downloads": "..."}')
+
+    created_at = Column(DateTime, default=datetime.now, comment='创建时间')
+    fetched_at = Column(DateTime, default=datetime.now, comment='最近抓取时间')
+
+    __table_args__ = (
+        Index('uq_scraped_metadata_num', 'num', unique=True),
+        Index('idx_scraped_metadata_fetched_at', 'fetched_at'),
+        {'comment': '刮削结果表 - 按番号保存的多站点刮削结果'}
+    )
+
+    def __repr__(self):
+        return f"<ScrapedMetadata(num='{self.num}', fetched_at='{self.fetched_at}')>"
@@ -1,14 +1,36 @@
 """
 视频缓存数据模型 - 存储从多个网站预抓取的视频数据
+
+CachedVideo 按番号保存一份视频元数据；VideoCache 是轻量的榜单成员行，
+同一番号出现在多个榜单（日/周/月榜）时只引用同一条 CachedVideo。
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Index, JSON
+from typing import Any, List
+
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Index, JSON, ForeignKey, event
+from sqlalchemy.orm import relationship
+
 from app.db.models.base import Base
 
 
-class VideoCache(Base):
-    """视频缓存表 - 系统预抓取的视频数据"""
-    __tablename__ = 'video_cache'
+def normalize_actor_id(actor: Any) -> str:
+    """演员ID统一去除首尾空白，兼容字典和直接传入ID"""
+    raw_value = actor.get("id") if isinstance(actor, dict) else actor
+    return str(raw_value).strip() if raw_value is not None else ""
+
+
+def normalize_tag_value(tag: Any) -> str:
+    """标签统一转为小写并去除首尾空白，兼容字符串和 {"name"/"tag"/"value"/"label": ...} 格式"""
+    if isinstance(tag, dict):
+        raw_value = tag.get("name") or tag.get("tag") or tag.get("value") or tag.get("label")
+    else:
+        raw_value = tag
+    return str(raw_value).strip().lower() if raw_value is not None else ""
+
+
+class CachedVideo(Base):
+    """缓存视频表 - 每个番号一条元数据"""
+    __tablename__ = 'cached_video'
 
     id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
 
@@ -35,33 +57,29 @@ class VideoCache(Base):
     # 下载信息 (JSON格式存储磁力链接列表)
     magnets = Column(JSON, comment='磁力链接列表 [{"title": "xxx", "link": "magnet:..."}]')
 
-    # 数据源信息
-    source = Column(String(50), nullable=False, comment='数据来源: JavDB, JavBus等')
-    video_type = Column(String(20), comment='视频类型: censored, uncensored')
-    cycle = Column(String(20), comment='榜单周期: daily, weekly, monthly')
-    rank_position = Column(Integer, comment='在榜单中的排名位置')
-
     # 额外元数据
     extra_data = Column(JSON, comment='其他扩展数据')
 
+    # 演员/标签关联行，由 actors/tags 赋值时自动同步，用于 SQL 过滤
+    actor_links = relationship('VideoCacheActor', cascade='all, delete-orphan')
+    tag_links = relationship('VideoCacheTag', cascade='all, delete-orphan')
+    rankings = relationship('VideoCache', back_populates='video', cascade='all, delete-orphan')
+
     # 时间戳
     created_at = Column(DateTime, default=datetime.now, comment='创建时间')
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
     fetched_at = Column(DateTime, default=datetime.now, comment='抓取时间')
 
-    # 创建索引优化查询性能
     __table_args__ = (
-        Index('idx_num', 'num'),  # 番号索引
-        Index('idx_source_type_cycle', 'source', 'video_type', 'cycle'),  # 数据源组合索引
-        Index('idx_rating', 'rating'),  # 评分索引
-        Index('idx_comments', 'comments_count'),  # 评论数索引
-        Index('idx_fetched_at', 'fetched_at'),  # 抓取时间索引
-        Index('idx_release_date', 'release_date'),  # 发布日期索引
-        {'comment': '视频缓存表 - 存储预抓取的排行榜视频数据'}
+        Index('uq_cached_video_num', 'num', unique=True),  # 番号唯一，批量 upsert 冲突键
+        Index('idx_cached_video_rating', 'rating'),
+        Index('idx_cached_video_comments', 'comments_count'),
+        Index('idx_cached_video_release_date', 'release_date'),
+        {'comment': '缓存视频表 - 按番号去重的视频元数据'}
     )
 
     def __repr__(self):
-        return f"<VideoCache(num='{self.num}', title='{self.title}', source='{self.source}', rating={self.rating})>"
+        return f"<CachedVideo(num='{self.num}', title='{self.title}', rating={self.rating})>"
 
     def to_dict(self):
         """转换为字典格式，兼容现有的视频数据结构"""
@@ -83,10 +101,114 @@ class VideoCache(Base):
             'actors': self.actors or [],
             'tags': self.tags or [],
             'magnets': self.magnets or [],
+            'extra_data': self.extra_data,
+            'fetched_at': self.fetched_at.isoformat() if self.fetched_at else None,
+        }
+
+
+class VideoCache(Base):
+    """视频缓存表 - 榜单成员行，元数据保存在 CachedVideo"""
+    __tablename__ = 'video_cache'
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    video_id = Column(Integer, ForeignKey('cached_video.id', ondelete='CASCADE'), nullable=False,
+                      comment='缓存视频ID')
+    num = Column(String(50), nullable=False, comment='视频番号')
+
+    # 数据源信息
+    source = Column(String(50), nullable=False, comment='数据来源: JavDB, JavBus等')
+    video_type = Column(String(20), comment='视频类型: censored, uncensored')
+    cycle = Column(String(20), comment='榜单周期: daily, weekly, monthly')
+    rank_position = Column(Integer, comment='在榜单中的排名位置')
+
+    video = relationship(CachedVideo, back_populates='rankings', lazy='joined')
+
+    # 时间戳
+    created_at = Column(DateTime, default=datetime.now, comment='创建时间')
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+    fetched_at = Column(DateTime, default=datetime.now, comment='抓取时间')
+
+    # 创建索引优化查询性能
+    __table_args__ = (
+        Index('idx_num', 'num'),  # 番号索引
+        Index('uq_video_cache_ranking', 'num', 'source', 'video_type', 'cycle', unique=True),  # 批量 upsert 冲突键
+        Index('idx_source_type_cycle', 'source', 'video_type', 'cycle'),  # 数据源组合索引
+        Index('idx_video_cache_video', 'video_id'),
+        Index('idx_fetched_at', 'fetched_at'),  # 抓取时间索引
+        {'comment': '视频缓存表 - 排行榜成员'}
+    )
+
+    def __repr__(self):
+        return f"<VideoCache(num='{self.num}', source='{self.source}', cycle='{self.cycle}', rank={self.rank_position})>"
+
+    def to_dict(self):
+        """视频元数据合并榜单信息，兼容现有的视频数据结构"""
+        data = self.video.to_dict() if self.video is not None else {'num': self.num}
+        data.update({
             'source': self.source,
             'video_type': self.video_type,
             'cycle': self.cycle,
             'rank_position': self.rank_position,
-            'extra_data': self.extra_data,
             'fetched_at': self.fetched_at.isoformat() if self.fetched_at else None,
-        }
+        })
+        return data
+
+
+class VideoCacheActor(Base):
+    """视频缓存演员关联表 - 支持按演员ID索引过滤"""
+    __tablename__ = 'video_cache_actor'
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    video_id = Column(Integer, ForeignKey('cached_video.id', ondelete='CASCADE'), nullable=False,
+                      comment='缓存视频ID')
+    actor_id = Column(String(100), nullable=False, comment='演员ID（去除首尾空白）')
+    actor_name = Column(String(200), comment='演员名称')
+
+    __table_args__ = (
+        Index('idx_video_cache_actor_actor', 'actor_id', 'video_id'),
+        Index('idx_video_cache_actor_video', 'video_id'),
+        {'comment': '视频缓存演员关联表'}
+    )
+
+
+class VideoCacheTag(Base):
+    """视频缓存标签关联表 - 支持按标签索引过滤"""
+    __tablename__ = 'video_cache_tag'
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    video_id = Column(Integer, ForeignKey('cached_video.id', ondelete='CASCADE'), nullable=False,
+                      comment='缓存视频ID')
+    tag = Column(String(200), nullable=False, comment='标签（小写并去除首尾空白）')
+
+    __table_args__ = (
+        Index('idx_video_cache_tag_tag', 'tag', 'video_id'),
+        Index('idx_video_cache_tag_video', 'video_id'),
+        {'comment': '视频缓存标签关联表'}
+    )
+
+
+def actor_link_values(actors: Any) -> List[dict]:
+    """演员列表转换为去重后的关联行字段"""
+    links = {}
+    for actor in actors or []:
+        actor_id = normalize_actor_id(actor)
+        if actor_id and actor_id not in links:
+            name = actor.get("name") if isinstance(actor, dict) else None
+            links[actor_id] = {"actor_id": actor_id, "actor_name": name}
+    return list(links.values())
+
+
+def tag_link_values(tags: Any) -> List[dict]:
+    """标签列表转换为去重后的关联行字段"""
+    values = dict.fromkeys(normalize_tag_value(tag) for tag in tags or [])
+    return [{"tag": value} for value in values if value]
+
+
+@event.listens_for(CachedVideo.actors, 'set')
+def _sync_actor_links(target: CachedVideo, value, oldvalue, initiator):
+    target.actor_links = [VideoCacheActor(**item) for item in actor_link_values(value)]
+
+
+@event.listens_for(CachedVideo.tags, 'set')
+def _sync_tag_links(target: CachedVideo, value, oldvalue, initiator):
+    target.tag_links = [VideoCacheTag(**item) for item in tag_link_values(value)]
@@ -5,6 +5,12 @@ LastEditors: Await
 LastEditTime: 2025-05-26 18:33:25
 Description: 请填写简介
 '''
+import threading
+
+# 启动分析模式（TISSUE_STARTUP_PROFILE=1）下尽早安装导入计时钩子
+from app.utils.startup_profiler import startup_profiler
+startup_profiler.install_import_timer()
+
 # 初始化兼容性修复
 from app.utils.compat import init_compatibility
 init_compatibility()
@@ -17,10 +23,15 @@ from fastapi import FastAPI
 from app import middleware, db, exception
 from app.scheduler import scheduler
 from app.api import api_router, actor_subscribe, performance, site_management
+from app.utils.cover_fetcher import cover_fetcher
+from app.utils.image import pool as image_pool
 from app.utils.version_manager import version_manager
+from app.utils.schema_fingerprint import schema_fingerprint
 from app.utils.logger import logger
 from version import APP_VERSION
 
+startup_profiler.checkpoint("imports")
+
 app = FastAPI(
     title="Tissue-Plus",
     description="A tool for scraping and managing JAV metadata. Based on chris-2s/tissue project.",
@@ -31,26 +42,17 @@ middleware.init(app)
 exception.init(app)
 
 
-@app.on_event("startup")
-def on_startup():
-    # 版本检测和自动迁移
-    perform_version_check_and_migration()
-
-    db.init()
-
-    # 数据库Schema检查和自动修复
-    perform_schema_checks()
-    
-    # 注册路由
+def register_routers():
+    """注册路由（在模块加载时完成，服务启动后即可响应请求）"""
     logger.info("开始注册API路由...")
     try:
         # 打印路由信息
         logger.info(f"API路由器中的路由数: {len(api_router.routes)}")
-        
+
         # 注册主API路由
         app.include_router(api_router, prefix="/api")
         logger.info("API路由注册成功")
-        
+
         # 注册actor-subscribe路由
         app.include_router(
             actor_subscribe.router,
@@ -66,28 +68,85 @@ def on_startup():
         # 注册站点管理路由
         app.include_router(site_management.router, prefix="/api/site-management")
         logger.info("站点管理路由注册成功")
-        
-        # 打印路由注册后的信息
-        auto_download_routes = [r for r in app.routes if '/api/auto-download/' in getattr(r, 'path', '')]
-        logger.info(f"注册后，自动下载相关路由数量: {len(auto_download_routes)}")
-        
+
     except Exception as e:
         logger.error(f"注册路由时出错: {str(e)}")
-    
-    # 执行数据库迁移
+
+
+@app.get("/api/health")
+def health():
+    """健康检查：HTTP 服务可用即返回，ready 表示后台初始化是否完成"""
+    return startup_profiler.report()
+
+
+register_routers()
+
+
+@app.on_event("startup")
+def on_startup():
+    # 结构指纹未变化时跳过版本迁移、建表检查、Schema 检查和迁移检查
+    with startup_profiler.phase("schema_fingerprint"):
+        unchanged = schema_fingerprint.is_unchanged()
+    if unchanged:
+        logger.info("数据库结构指纹未变化，跳过版本迁移和结构检查")
+
+    # 关键阶段：版本检测（需在建表前执行 Alembic 迁移）和数据库初始化，完成后即可对外服务
+    upgrade_ok = True
+    if not unchanged:
+        with startup_profiler.phase("version_check"):
+            upgrade_ok = perform_version_check_and_migration()
+
+    with startup_profiler.phase("db_init"):
+        db.init(create_tables=not unchanged)
+
+    # 非关键阶段放到后台线程执行，不阻塞 HTTP 服务就绪
+    threading.Thread(
+        target=run_background_init, args=(not unchanged, upgrade_ok), name="startup-init", daemon=True
+    ).start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await cover_fetcher.aclose()
+    image_pool.shutdown(wait=False)
+
+
+def run_background_init(check_schema: bool = True, upgrade_ok: bool = True):
+    """后台初始化：Schema 检查、迁移检查都会修改表结构，按顺序执行后再启动调度器"""
     try:
-        logger.info("开始执行数据库迁移检查...")
-        db_migration.check_and_migrate()
-        logger.info("数据库迁移检查完成")
+        if check_schema:
+            with startup_profiler.phase("schema_check"):
+                schema_ok = perform_schema_checks()
+
+            with startup_profiler.phase("db_migration"):
+                migration_ok = False
+                try:
+                    logger.info("开始执行数据库迁移检查...")
+                    db_migration.check_and_migrate()
+                    migration_ok = True
+                    logger.info("数据库迁移检查完成")
+                except Exception as e:
+                    logger.error(f"数据库迁移失败: {e}")
+                    # 迁移失败不影响应用启动
+
+            # 全部检查通过后才记录指纹，失败时下次启动继续完整检查
+            if upgrade_ok and schema_ok and migration_ok:
+                try:
+                    schema_fingerprint.save()
+                except Exception as e:
+                    logger.warning(f"保存数据库结构指纹失败: {e}")
+
+        with startup_profiler.phase("scheduler_init"):
+            scheduler.init()
     except Exception as e:
-        logger.error(f"数据库迁移失败: {e}")
-        # 迁移失败不影响应用启动
-    
-    scheduler.init()
+        logger.error(f"后台初始化失败: {e}")
+    finally:
+        startup_profiler.mark_ready()
+        startup_profiler.log_report(logger)
 
 
-def perform_version_check_and_migration():
-    """执行版本检测和自动迁移"""
+def perform_version_check_and_migration() -> bool:
+    """执行版本检测和自动迁移，返回是否成功"""
     try:
         logger.info(f"应用启动 - 当前版本: {APP_VERSION}")
         
@@ -119,14 +178,17 @@ def perform_version_check_and_migration():
         # 记录警告信息
         for warning in upgrade_result.get('warnings', []):
             logger.warning(warning)
-            
+
+        return upgrade_result['success']
+
     except Exception as e:
         logger.error(f"版本检测和迁移过程中发生异常: {str(e)}")
         logger.warning("应用将继续启动，但可能存在版本不一致的问题")
+        return False
 
 
-def perform_schema_checks():
-    """执行数据库Schema检查和自动修复"""
+def perform_schema_checks() -> bool:
+    """执行数据库Schema检查和自动修复，返回是否成功"""
     try:
         logger.info("开始执行数据库Schema检查...")
         
@@ -139,15 +201,18 @@ def perform_schema_checks():
             logger.info("数据库Schema检查完成")
             for check in check_result['checks_performed']:
                 logger.info(f"  - {check}")
+            return True
         else:
             logger.error("数据库Schema检查失败:")
             for error in check_result['errors']:
                 logger.error(f"  - {error}")
             logger.warning("应用将继续启动，但可能存在数据库结构问题")
-            
+            return False
+
     except Exception as e:
         logger.error(f"Schema检查过程中发生异常: {str(e)}")
         logger.warning("应用将继续启动，但数据库结构可能不完整")
+        return False
 
 
 if __name__ == '__main__':
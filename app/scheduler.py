@@ -1,6 +1,9 @@
+import threading
+import time
 from datetime import datetime
-from typing import Callable
+from typing import Callable, Optional
 
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
@@ -11,21 +14,38 @@ from app.service.download import DownloadService
 from app.service.job import clean_cache
 from app.service.subscribe import SubscribeService
 from app.utils.logger import logger
-from app.service.actor_subscribe import ActorSubscribeService
+from app.service.actor_subscribe import ActorSubscribeService, ACTOR_CHECK_JOB_MINUTES
 from app.service.auto_download import AutoDownloadService
 from app.service.cookiecloud import cookiecloud_service
 from app.service.video_cache import VideoCacheService
 from app.service.pending_torrent import PendingTorrentService
 from app.service.file_scan import run_scan_task
+from app.service.job_run import JobRunService
+from app.utils.job_lock import job_lock_manager
+
+# 网络密集型任务使用独立线程池，避免慢任务占满线程导致每分钟执行的快速任务被饿死
+HEAVY_EXECUTOR = "heavy"
+DEFAULT_EXECUTOR = "default"
 
 
 class Job(BaseModel):
     key: str
     name: str
     job: Callable
-    interval: int
+    interval: int = 0
     running: int = 0
     jitter: int = 0
+    cron: Optional[dict] = None
+    executor: str = DEFAULT_EXECUTOR
+    # 手动触发时执行的任务，未设置时与定时执行相同
+    manual_job: Optional[Callable] = None
+
+    @property
+    def cooldown(self) -> int:
+        """其他实例刚执行完该任务后的冷却时间（秒），避免各实例按各自的调度重复执行"""
+        if self.cron:
+            return 60 * 60
+        return self.interval * 60 // 2
 
 
 class Scheduler:
@@ -36,6 +56,7 @@ class Scheduler:
             job=SubscribeService.job_subscribe,
             interval=400,
             jitter=30 * 60,
+            executor=HEAVY_EXECUTOR,
         ),
         "subscribe_meta_update": Job(
             key="subscribe_meta_update",
@@ -43,12 +64,14 @@ class Scheduler:
             job=SubscribeService.job_subscribe_meta_update,
             interval=100 * 60,
             jitter=6 * 60 * 60,
+            executor=HEAVY_EXECUTOR,
         ),
         "scrape_download": Job(
             key="scrape_download",
             name="整理已完成下载",
             job=DownloadService.job_scrape_download,
             interval=5,
+            executor=HEAVY_EXECUTOR,
         ),
         "delete_complete_download": Job(
             key="delete_complete_download",
@@ -57,7 +80,11 @@ class Scheduler:
             interval=5,
         ),
         "clean_cache": Job(
-            key="clean_cache", name="清理缓存", job=clean_cache, interval=7 * 24 * 60
+            key="clean_cache",
+            name="清理缓存",
+            job=clean_cache,
+            interval=7 * 24 * 60,
+            executor=HEAVY_EXECUTOR,
         ),
         "auto_download": Job(
             key="auto_download",
@@ -65,6 +92,7 @@ class Scheduler:
             job=AutoDownloadService.job_auto_download,
             interval=60,
             jitter=10 * 60,
+            executor=HEAVY_EXECUTOR,
         ),
         "stop_seeding_completed": Job(
             key="stop_seeding_completed",
@@ -79,6 +107,7 @@ class Scheduler:
             job=VideoCacheService.job_refresh_video_cache,
             interval=120,
             jitter=30 * 60,
+            executor=HEAVY_EXECUTOR,
         ),  # 每2小时执行，抖动30分钟
         "process_pending_torrents": Job(
             key="process_pending_torrents",
@@ -94,7 +123,39 @@ class Scheduler:
             interval=60,
             jitter=10 * 60,
         ),
+        "actor_subscribe": Job(
+            key="actor_subscribe",
+            name="演员订阅",
+            job=ActorSubscribeService.job_actor_subscribe,
+            manual_job=ActorSubscribeService.job_actor_subscribe_all,
+            interval=ACTOR_CHECK_JOB_MINUTES,
+            jitter=5 * 60,
+            executor=HEAVY_EXECUTOR,
+        ),  # 每小时检查一部分到期演员，全天分摊
+        "actor_works_count_update": Job(
+            key="actor_works_count_update",
+            name="更新演员作品数量",
+            job=ActorSubscribeService.job_update_works_counts,
+            cron={"hour": 6, "minute": 0},
+            executor=HEAVY_EXECUTOR,
+        ),  # 每天早上6点执行
+        "cleanup_pending_torrents": Job(
+            key="cleanup_pending_torrents",
+            name="清理待处理种子",
+            job=PendingTorrentService.job_cleanup_pending_torrents,
+            cron={"hour": 3, "minute": 0},
+        ),  # 每天凌晨3点执行
+        "file_scan_job": Job(
+            key="file_scan_job",
+            name="定期扫描本地视频文件",
+            job=run_scan_task,
+            cron={"hour": 2, "minute": 0},
+            executor=HEAVY_EXECUTOR,
+        ),  # 每天凌晨2点执行
     }
+    history_limit = 200
+    _lock = threading.Lock()
+    _forced = set()
 
     def __init__(self):
         self.scheduler = BackgroundScheduler()
@@ -105,9 +166,10 @@ class Scheduler:
             logger.warning("调度器已初始化，跳过重复初始化")
             return
 
+        setting = Setting()
+        self.configure(setting.scheduler)
         self.scheduler.start()
 
-        setting = Setting()
         self.jobs["auto_download"].interval = max(
             1, int(getattr(setting.auto_download, "check_interval", 60) or 60)
         )
@@ -129,51 +191,35 @@ class Scheduler:
         if setting.download.stop_seeding:
             self.add("stop_seeding_completed")
 
-        self.scheduler.add_job(
-            ActorSubscribeService.job_actor_subscribe,
-            "cron",
-            hour="2",
-            minute="30",
-            id="actor_subscribe",
-            replace_existing=True,
-        )
-
-        # 添加演员作品数量更新任务（每天早上6点执行）
-        self.scheduler.add_job(
-            ActorSubscribeService.job_update_works_counts,
-            "cron",
-            hour="6",
-            minute="0",
-            id="actor_works_count_update",
-            replace_existing=True,
-        )
+        self.add("actor_subscribe")
+        self.add("actor_works_count_update")
+        self.add("cleanup_pending_torrents")
 
-        # 添加待处理种子每日清理任务（每天凌晨3点执行）
-        self.scheduler.add_job(
-            PendingTorrentService.job_cleanup_pending_torrents,
-            "cron",
-            hour="3",
-            minute="0",
-            id="cleanup_pending_torrents",
-            replace_existing=True,
-        )
-
-        # 添加本地视频扫描任务（每天凌晨2点执行）
-        # 根据配置决定是否启用
+        # 本地视频扫描任务根据配置决定是否启用
         if setting.app.enable_scheduled_scan:
             logger.info("启用定时本地视频扫描任务（每天凌晨2点执行）")
-            self.scheduler.add_job(
-                run_scan_task,
-                trigger=CronTrigger(hour=2, minute=0),
-                id="file_scan_job",
-                name="定期扫描本地视频文件",
-                replace_existing=True,
-            )
+            self.add("file_scan_job")
         else:
             logger.info("定时本地视频扫描任务已禁用（可在配置中启用）")
 
         self._initialized = True
 
+    def configure(self, config):
+        """配置线程池和错过执行/合并执行策略，需在调度器启动前调用"""
+        self.scheduler.configure(
+            executors={
+                DEFAULT_EXECUTOR: ThreadPoolExecutor(max(1, config.default_pool_size)),
+                HEAVY_EXECUTOR: ThreadPoolExecutor(max(1, config.heavy_pool_size)),
+            },
+            job_defaults={
+                "coalesce": config.coalesce,
+                "misfire_grace_time": config.misfire_grace_time,
+                "max_instances": 1,
+            },
+        )
+        Scheduler.history_limit = config.history_limit
+        job_lock_manager.configure(config.lock_backend, config.lock_ttl)
+
     def list(self):
         return self.scheduler.get_jobs()
 
@@ -183,12 +229,17 @@ class Scheduler:
             logger.warning(f"任务不存在，无法启动: {key}")
             return
         logger.info(f"启动任务，{job.name}")
+        if job.cron:
+            trigger = CronTrigger(**job.cron)
+        else:
+            trigger = IntervalTrigger(minutes=job.interval, jitter=job.jitter)
         self.scheduler.add_job(
             self.do_job,
-            trigger=IntervalTrigger(minutes=job.interval, jitter=job.jitter),
+            trigger=trigger,
             id=job.key,
             name=job.name,
             args=[job.key],
+            executor=job.executor,
             replace_existing=True,
         )
 
@@ -203,21 +254,51 @@ class Scheduler:
         if job is None:
             logger.warning(f"任务不存在，无法手动触发: {key}")
             return False
+        # 手动触发不受其他实例的冷却时间限制
+        with self._lock:
+            self._forced.add(key)
         job.modify(next_run_time=datetime.now())
         return True
 
     @classmethod
     def do_job(cls, key):
         job = cls.jobs[key]
-        if job.running > 0:
+        with cls._lock:
+            running = job.running > 0
+            if not running:
+                job.running += 1
+        if running:
             logger.warning(f"任务正在执行中，跳过重入: {job.name}")
+            JobRunService.safe_skip(job.key, job.name, "任务正在执行中", cls.history_limit)
             return
+
+        with cls._lock:
+            forced = key in cls._forced
+            cls._forced.discard(key)
+        lease = job_lock_manager.lease(job.key)
+        if not lease.acquire(cooldown=0 if forced else job.cooldown):
+            with cls._lock:
+                job.running -= 1
+            logger.info(f"任务已由其他实例执行，跳过: {job.name}")
+            JobRunService.safe_skip(job.key, job.name, "其他实例持有任务租约", cls.history_limit)
+            return
+
+        run_id = JobRunService.safe_start(job.key, job.name)
+        started = time.monotonic()
+        status, result, error = "failed", None, None
         try:
             logger.info(f"执行任务，{job.name}")
-            job.running += 1
-            job.job()
+            result = (job.manual_job if forced and job.manual_job else job.job)()
+            status = "success"
+        except Exception as e:
+            error = str(e)
+            raise
         finally:
-            job.running -= 1
+            lease.release()
+            with cls._lock:
+                job.running -= 1
+            logger.info(f"任务结束，{job.name}，状态: {status}，耗时: {time.monotonic() - started:.2f}秒")
+            JobRunService.safe_finish(run_id, status, result, error, cls.history_limit)
 
 
 scheduler = Scheduler()
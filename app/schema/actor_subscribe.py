@@ -35,6 +35,7 @@ class ActorSubscribe(ActorSubscribeUpdate):
     last_updated: Optional[datetime] = None
     download_count: Optional[int] = 0  # 添加下载数量统计字段
     subscribed_works_count: Optional[int] = 0  # 添加订阅作品总数统计字段
+    last_checked_at: Optional[datetime] = None  # 最近一次检查新作品的时间
 
 
 class ActorSubscribeStatusUpdate(BaseModel):
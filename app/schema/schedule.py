@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Schedule(BaseModel):
@@ -9,3 +9,34 @@ class Schedule(BaseModel):
     name: str
     status: bool
     next_run_time: Optional[datetime] = None
+    executor: Optional[str] = None
+
+
+class JobRun(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    job_key: str
+    job_name: Optional[str] = None
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    duration: Optional[float] = None
+    status: str
+    result: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+class JobStats(BaseModel):
+    job_key: str
+    job_name: Optional[str] = None
+    total: int = 0
+    success: int = 0
+    failed: int = 0
+    skipped: int = 0
+    avg: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
+    last_status: Optional[str] = None
+    last_start_time: Optional[datetime] = None
@@ -16,6 +16,28 @@ class SettingApp(BaseModel):
     video_format: str = ".mp4,.mkv,.mov"
     concurrent_scraping: bool = True
     max_concurrent_spiders: int = 4
+    # 并发刮削：单个站点的最长等待（秒）；开启先到先得时，标题/封面/演员齐全后
+    # 只再等待 scrape_grace_period 秒让其余站点补充信息
+    scrape_spider_timeout: float = 20.0
+    scrape_first_hit: bool = True
+    scrape_grace_period: float = 3.0
+    # 后台并发抓取时同一站点的请求间隔（另加 0~host_request_jitter 秒随机抖动）和并发上限
+    host_request_interval: float = 3.0
+    host_request_jitter: float = 2.0
+    host_max_concurrency: int = 2
+    # 演员订阅：每个演员的检查周期（小时）和同时检查的演员数，检查分散到周期内的各次任务执行
+    actor_check_interval: int = 24
+    actor_check_concurrency: int = 3
+    # 刮削结果按字段组保存的有效期（小时），过期的字段组才重新刮削
+    scrape_freshness_hours: dict[str, int] = Field(default_factory=lambda: {
+        "metadata": 30 * 24, "downloads": 24, "previews": 30 * 24, "comments": 7 * 24,
+    })
+    # 封面缓存容量上限（MB），超出后淘汰最久未访问的封面
+    cover_cache_max_mb: int = 2048
+    # 封面代理对同一站点的并发抓取数
+    cover_fetch_per_host: int = 4
+    # 图片处理（缩略图、海报）进程数，0 表示按 CPU 核数
+    image_process_workers: int = 0
     javdb_cookie: str | None = None
     proxy: str | None = None
     preview_trace: bool = False
@@ -137,6 +159,18 @@ class SettingCookieCloud(BaseModel):
     password: str | None = None
 
 
+class SettingScheduler(BaseModel):
+    # 网络密集型任务（订阅、智能下载、榜单刷新等）使用独立线程池，避免拖慢快速任务
+    heavy_pool_size: int = 3
+    default_pool_size: int = 5
+    misfire_grace_time: int = 5 * 60
+    coalesce: bool = True
+    history_limit: int = 200
+    # 多实例共享数据库时的任务租约：database 跨实例互斥，local 仅进程内互斥
+    lock_backend: str = "database"
+    lock_ttl: int = 120
+
+
 class Setting(BaseModel):
     app: SettingApp = Field(default_factory=SettingApp)
     file: SettingFile = Field(default_factory=SettingFile)
@@ -144,6 +178,7 @@ class Setting(BaseModel):
     notify: SettingNotify = Field(default_factory=SettingNotify)
     auto_download: SettingAutoDownload = Field(default_factory=SettingAutoDownload)
     cookiecloud: SettingCookieCloud = Field(default_factory=SettingCookieCloud)
+    scheduler: SettingScheduler = Field(default_factory=SettingScheduler)
 
     def __init__(self, **data: Any):
         if not data:
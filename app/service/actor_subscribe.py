@@ -1,9 +1,13 @@
+import math
+import threading
 import time
 import traceback
 import re
 import os
-from datetime import datetime
-from random import randint
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Optional
 
 from fastapi import Depends
 from sqlalchemy.orm import Session
@@ -16,9 +20,84 @@ from app.db.models.actor_subscribe import ActorSubscribe, ActorSubscribeDownload
 from app.db.transaction import transaction
 from app.exception import BizException
 from app.service.base import BaseService
+from app.schema.setting import Setting
 from app.utils import spider, notify
+from app.utils.host_limiter import host_rate_limiter
 from app.utils.logger import logger
 from app.utils.qbittorent import qbittorent
+from app.utils.spider.javdb import JavdbSpider
+
+
+# 待重试的作品只在发布后该天数内压住水位，避免长期不达标的作品让水位停滞
+WATERMARK_RECHECK_DAYS = 30
+# 作品数量在该时间内已由订阅检查刷新过时，定时任务直接复用（与默认检查周期一致）
+WORKS_COUNT_REUSE_HOURS = 24
+# 演员订阅定时任务的执行间隔（分钟），每次执行分摊一部分到期演员
+ACTOR_CHECK_JOB_MINUTES = 60
+# 进度中保留的最近检查记录数
+ACTOR_CHECK_HISTORY = 100
+RESET_WATERMARK = {"watermark_date": None, "watermark_nums": None}
+
+
+class ActorCheckProgress:
+    """演员订阅检查进度（进程内），供 API 查询当前批次进度和各演员耗时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = {}
+        self._recent = deque(maxlen=ACTOR_CHECK_HISTORY)
+        self.total = 0
+        self.done = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self, total: int):
+        with self._lock:
+            self.total, self.done = total, 0
+            self.started_at, self.finished_at = datetime.now(), None
+            self._running.clear()
+
+    def begin(self, subscription_id: int, actor_name: str):
+        with self._lock:
+            started_at = self._running.get(subscription_id, {}).get("started_at", datetime.now())
+            self._running[subscription_id] = {
+                "id": subscription_id, "actor_name": actor_name, "started_at": started_at,
+            }
+
+    def finish(self, subscription_id: int, actor_name: str, duration: float,
+               new_videos: int, error: Optional[str] = None):
+        with self._lock:
+            self._running.pop(subscription_id, None)
+            self.done += 1
+            self._recent.appendleft({
+                "id": subscription_id,
+                "actor_name": actor_name,
+                "finished_at": datetime.now(),
+                "duration": round(duration, 2),
+                "new_videos": new_videos,
+                "status": "failed" if error else "success",
+                "error": error,
+            })
+
+    def end(self):
+        with self._lock:
+            self.finished_at = datetime.now()
+            self._running.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.started_at is not None and self.finished_at is None,
+                "total": self.total,
+                "done": self.done,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "current": list(self._running.values()),
+                "recent": list(self._recent),
+            }
+
+
+actor_check_progress = ActorCheckProgress()
 
 
 def get_actor_subscribe_service(db: Session = Depends(get_db)):
@@ -61,6 +140,7 @@ class ActorSubscribeService(BaseService):
                     if getattr(row, "min_comments", None) is not None
                     else 0,
                     "download_count": row.download_count,
+                    "last_checked_at": getattr(row, "last_checked_at", None),
                     "subscribed_works_count": 0,  # 默认值，将在下面计算
                 }
 
@@ -106,7 +186,7 @@ class ActorSubscribeService(BaseService):
             # 如果已存在，则更新订阅设置
             exist_data = param.model_dump()
             logger.info(f"[DEBUG] 更新已存在的订阅，数据: {exist_data}")
-            exist.update(self.db, exist_data)
+            exist.update(self.db, {**exist_data, **RESET_WATERMARK})
             return exist
 
         # 不存在则创建新订阅
@@ -122,7 +202,8 @@ class ActorSubscribeService(BaseService):
         exist = ActorSubscribe.get(self.db, param.id)
         if not exist:
             raise BizException("该演员订阅不存在")
-        exist.update(self.db, param.model_dump())
+        # 筛选条件可能变化，清空水位让下次检查重新评估全部作品
+        exist.update(self.db, {**param.model_dump(), **RESET_WATERMARK})
         return exist
 
     @transaction
@@ -271,136 +352,259 @@ class ActorSubscribeService(BaseService):
 
         return True
 
-    def do_actor_subscribe(self):
-        """执行演员订阅任务，检查每个演员的新作品并下载"""
-        subscriptions = self.get_actor_subscriptions()
-        logger.info(f"获取到{len(subscriptions)}个演员订阅")
+    def do_actor_subscribe(self, limit: Optional[int] = None, due_only: bool = True):
+        """执行演员订阅任务：按优先级选出到期的演员，在线程池中并发检查新作品并下载
 
-        # 过滤掉已暂停的订阅
-        active_subscriptions = [s for s in subscriptions if not s["is_paused"]]
-        if len(active_subscriptions) < len(subscriptions):
-            logger.info(
-                f"跳过{len(subscriptions) - len(active_subscriptions)}个已暂停的订阅"
+        Args:
+            limit: 本次最多检查的演员数，None 表示检查全部到期演员
+            due_only: 为 False 时不按检查周期筛选，检查全部启用的演员
+        """
+        setting = Setting().app
+        records = (
+            self.db.query(ActorSubscribe)
+            .filter(ActorSubscribe.is_paused == False)
+            .all()
+        )
+        due = self._select_due_subscriptions(records, setting.actor_check_interval, limit, due_only)
+        logger.info(f"获取到{len(records)}个启用的演员订阅，本次检查{len(due)}个")
+        if not due:
+            return
+
+        # 站点请求间隔和并发由 host_rate_limiter 统一控制，不再固定等待
+        host_rate_limiter.configure(
+            min_interval=setting.host_request_interval,
+            jitter=setting.host_request_jitter,
+            max_concurrency=setting.host_max_concurrency,
+        )
+        max_workers = max(1, min(setting.actor_check_concurrency, len(due)))
+        actor_check_progress.start(len(due))
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="actor-subscribe") as executor:
+                list(executor.map(self._check_subscription_in_session, due))
+        finally:
+            actor_check_progress.end()
+
+    @staticmethod
+    def _select_due_subscriptions(
+        records: list, interval_hours: int, limit: Optional[int] = None, due_only: bool = True
+    ) -> List[int]:
+        """选出到期的订阅ID：从未检查过的优先，其次是最近有新作品的，再按上次检查时间先后
+
+        检查失败也会记录 last_checked_at，失败的演员同样等到下一个周期再试，不会一直排在最前面。
+        due_only 为 False 时不筛选到期时间，全部订阅按同样的优先级排序。
+        """
+        due_before = datetime.now() - timedelta(hours=max(1, interval_hours))
+        due = [r for r in records if not due_only or not r.last_checked_at or r.last_checked_at <= due_before]
+        due.sort(
+            key=lambda r: (
+                r.last_checked_at is not None,
+                -(r.watermark_date or date.min).toordinal(),
+                r.last_checked_at or datetime.min,
+            )
+        )
+        if limit is not None:
+            due = due[:limit]
+        return [r.id for r in due]
+
+    @staticmethod
+    def _check_subscription_in_session(subscription_id: int):
+        """工作线程入口：独立 Session 中检查单个演员并记录耗时"""
+        actor_name = str(subscription_id)
+        started = time.monotonic()
+        actor_check_progress.begin(subscription_id, actor_name)
+        new_videos, error = 0, None
+        try:
+            with SessionFactory() as db:
+                service = ActorSubscribeService(db)
+                record = ActorSubscribe.get(db, subscription_id)
+                if record is None:
+                    return
+                actor_name = record.actor_name
+                actor_check_progress.begin(subscription_id, actor_name)
+                new_videos = service.check_actor_subscription(service._to_check_dict(record))
+        except Exception as e:
+            error = str(e)
+            logger.error(f"处理演员 {actor_name} 订阅失败: {e}")
+            logger.debug(traceback.format_exc())
+            ActorSubscribeService._mark_checked(subscription_id)
+        finally:
+            actor_check_progress.finish(
+                subscription_id, actor_name, time.monotonic() - started, new_videos, error
             )
 
-        for subscription in active_subscriptions:
-            try:
-                logger.info(f"开始处理演员订阅: {subscription['actor_name']}")
-                logger.info(
-                    f"订阅条件 - 最低评分: {subscription.get('min_rating', 0.0)}, 最低评论数: {subscription.get('min_comments', 0)}"
-                )
+    @staticmethod
+    def _mark_checked(subscription_id: int):
+        """检查异常时也记录检查时间，避免同一个演员每次都被优先重试而挤占其他演员"""
+        try:
+            with SessionFactory() as db:
+                record = ActorSubscribe.get(db, subscription_id)
+                if record is not None:
+                    record.last_checked_at = datetime.now()
+                    db.commit()
+        except Exception as e:
+            logger.error(f"记录演员订阅 {subscription_id} 检查时间失败: {e}")
+
+    @staticmethod
+    def _to_check_dict(record: ActorSubscribe) -> dict:
+        return {
+            "id": record.id,
+            "actor_name": record.actor_name,
+            "from_date": record.from_date,
+            "is_hd": record.is_hd,
+            "is_zh": record.is_zh,
+            "is_uncensored": record.is_uncensored,
+            "min_rating": float(record.min_rating) if record.min_rating is not None else 0.0,
+            "min_comments": int(record.min_comments) if record.min_comments is not None else 0,
+        }
+
+    def check_actor_subscription(self, subscription: dict) -> int:
+        """检查单个演员的新作品：水位之前的作品直接跳过，同时刷新作品数量缓存
 
-                # 获取演员的作品列表
-                actor_videos = spider.get_web_actor_videos(
-                    subscription["actor_name"], "javdb"
-                )
-                if not actor_videos:
-                    logger.error(
-                        f"未获取到演员 {subscription['actor_name']} 的作品列表"
-                    )
-                    continue
+        Returns:
+            int: 符合条件的新作品数量
+        """
+        from app.utils.data_converter import DataConverter
 
-                logger.info(
-                    f"获取到演员 {subscription['actor_name']} 的 {len(actor_videos)} 个作品"
-                )
+        actor_name = subscription["actor_name"]
+        logger.info(f"开始处理演员订阅: {actor_name}")
+        logger.info(
+            f"订阅条件 - 最低评分: {subscription.get('min_rating', 0.0)}, 最低评论数: {subscription.get('min_comments', 0)}"
+        )
 
-                # 获取该演员已下载的作品列表
-                downloaded_videos = self.get_actor_subscription_downloads(
-                    subscription["id"]
-                )
-                downloaded_nums = {video.num for video in downloaded_videos}
-                logger.info(f"已下载作品数量: {len(downloaded_nums)}")
-
-                # 筛选出符合条件的新作品
-                new_videos = []
-                total_filtered = 0
-                for video in actor_videos:
-                    total_filtered += 1
-                    logger.info(
-                        f"检查作品 {total_filtered}/{len(actor_videos)}: {video.get('num')} - {video.get('title', '')[:50]}"
-                    )
+        # 获取演员的作品列表
+        with host_rate_limiter.slot(JavdbSpider.host):
+            actor_videos = spider.get_web_actor_videos(actor_name, "javdb")
+        if not actor_videos:
+            logger.error(f"未获取到演员 {actor_name} 的作品列表")
+            record = ActorSubscribe.get(self.db, subscription["id"])
+            if record is not None:
+                record.last_checked_at = datetime.now()
+                self.db.commit()
+            return 0
 
-                    # 显示作品的基本信息
-                    rating = video.get("rating", "N/A")
-                    comments_count = video.get("comments_count", "N/A")
-                    publish_date = video.get("publish_date", "N/A")
-                    logger.info(
-                        f"  评分: {rating}, 评论数: {comments_count}, 发布日期: {publish_date}"
+        record = ActorSubscribe.get(self.db, subscription["id"])
+        watermark_date = record.watermark_date
+        watermark_nums = set(record.watermark_nums or [])
+        from_date = DataConverter.to_date(subscription["from_date"])
+        downloaded_nums = self._get_downloaded_nums(subscription["id"])
+
+        # 筛选出符合条件的新作品
+        new_videos = []
+        evaluated = []
+        skipped_by_watermark = 0
+        for video in actor_videos:
+            num = video.get("num")
+            video_date = DataConverter.to_date(video.get("publish_date"))
+            if watermark_date and video_date and (
+                video_date < watermark_date
+                or (video_date == watermark_date and num in watermark_nums)
+            ):
+                skipped_by_watermark += 1
+                continue
+
+            # 检查是否是新作品（发布日期晚于订阅起始日期）
+            if video_date and from_date and video_date < from_date:
+                logger.debug(f"跳过 {num}: 发布日期 {video_date} 早于订阅起始日期 {from_date}")
+                continue
+
+            evaluated.append((num, video_date))
+
+            # 检查是否已下载
+            if num in downloaded_nums:
+                logger.debug(f"跳过 {num}: 已下载")
+                continue
+
+            # 检查评分筛选条件
+            if subscription.get("min_rating", 0.0) > 0.0:
+                video_rating = DataConverter.normalize_rating(video.get("rating"))
+                if video_rating < subscription["min_rating"]:
+                    logger.debug(
+                        f"跳过 {num}: 评分 {video_rating} 低于要求的 {subscription['min_rating']}"
                     )
-                    # 检查是否是新作品（发布日期晚于订阅起始日期）
-                    if video.get("publish_date"):
-                        try:
-                            from app.utils.data_converter import DataConverter
-
-                            video_date = DataConverter.to_date(video["publish_date"])
-                            from_date = DataConverter.to_date(subscription["from_date"])
-
-                            if video_date and from_date and video_date < from_date:
-                                logger.info(
-                                    f"  跳过: 发布日期 {video_date} 早于订阅起始日期 {from_date}"
-                                )
-                                continue
-                        except Exception as e:
-                            logger.error(f"解析日期失败: {e}")
-                            continue
-                        except Exception as e:
-                            logger.error(f"解析日期失败: {e}")
-                            continue
-
-                    # 检查是否已下载
-                    if video["num"] in downloaded_nums:
-                        logger.info(f"  跳过: 已下载 {video['num']}")
-                        continue
+                    continue
 
-                    # 检查评分筛选条件
-                    from app.utils.data_converter import DataConverter
-
-                    if subscription.get("min_rating", 0.0) > 0.0:
-                        video_rating = DataConverter.normalize_rating(
-                            video.get("rating")
-                        )
-                        if video_rating < subscription["min_rating"]:
-                            logger.info(
-                                f"  跳过: 评分 {video_rating} 低于要求的 {subscription['min_rating']}"
-                            )
-                            continue
-
-                    # 检查评论数筛选条件
-                    if subscription.get("min_comments", 0) > 0:
-                        video_comments = DataConverter.normalize_comments_count(
-                            video.get("comments_count", video.get("comments"))
-                        )
-                        if video_comments < subscription["min_comments"]:
-                            logger.info(
-                                f"  跳过: 评论数 {video_comments} 低于要求的 {subscription['min_comments']}"
-                            )
-                            continue
-
-                    logger.info(f"  ✓ 符合条件: {video['num']}")
-                    new_videos.append(video)
-
-                logger.info(
-                    f"演员 {subscription['actor_name']} 有 {len(new_videos)} 个新作品"
+            # 检查评论数筛选条件
+            if subscription.get("min_comments", 0) > 0:
+                video_comments = DataConverter.normalize_comments_count(
+                    video.get("comments_count", video.get("comments"))
                 )
+                if video_comments < subscription["min_comments"]:
+                    logger.debug(
+                        f"跳过 {num}: 评论数 {video_comments} 低于要求的 {subscription['min_comments']}"
+                    )
+                    continue
 
-                # 处理每个新作品
-                for video in new_videos:
-                    try:
-                        self.process_new_video(subscription, video)
-                        # 每个视频处理后随机等待一段时间，避免请求过于频繁
-                        time.sleep(randint(10, 30))
-                    except Exception as e:
-                        logger.error(
-                            f"处理视频 {video.get('num', 'unknown')} 失败: {e}"
-                        )
-                        traceback.print_exc()
+            new_videos.append(video)
+
+        logger.info(
+            f"演员 {actor_name} 共 {len(actor_videos)} 个作品，水位内跳过 {skipped_by_watermark} 个，"
+            f"有 {len(new_videos)} 个新作品"
+        )
 
+        # 处理每个新作品
+        for video in new_videos:
+            try:
+                self.process_new_video(subscription, video)
             except Exception as e:
-                logger.error(f"处理演员 {subscription['actor_name']} 订阅失败: {e}")
+                logger.error(f"处理视频 {video.get('num', 'unknown')} 失败: {e}")
                 traceback.print_exc()
 
-            # 每个演员处理完后随机等待一段时间
-            time.sleep(randint(30, 60))
+        # 未下载成功的近期作品（评分未达标、暂无资源等）下次仍需检查，水位停在它们之前
+        downloaded_nums = self._get_downloaded_nums(subscription["id"])
+        pending_dates = [
+            video_date
+            for num, video_date in evaluated
+            if num not in downloaded_nums and video_date
+        ]
+        self._advance_watermark(record, actor_videos, pending_dates)
+
+        # 同一份作品列表顺便刷新作品数量缓存，定时任务不再重复抓取
+        if from_date:
+            record.subscribed_works_count = sum(
+                1
+                for video in actor_videos
+                if (DataConverter.to_date(video.get("publish_date")) or date.min) >= from_date
+            )
+            record.works_count_updated_at = datetime.now()
+        record.last_checked_at = datetime.now()
+        self.db.commit()
+        return len(new_videos)
+
+    def _get_downloaded_nums(self, subscription_id: int) -> set:
+        rows = (
+            self.db.query(ActorSubscribeDownload.num)
+            .filter(ActorSubscribeDownload.actor_subscribe_id == subscription_id)
+            .all()
+        )
+        return {row.num for row in rows}
+
+    @staticmethod
+    def _advance_watermark(record: ActorSubscribe, actor_videos: list, pending_dates: list):
+        """水位推进到最新作品的发布日期；近期待重试的作品会把水位压在其发布日期前一天"""
+        from app.utils.data_converter import DataConverter
+
+        dated = [
+            (video.get("num"), DataConverter.to_date(video.get("publish_date")))
+            for video in actor_videos
+        ]
+        dates = [video_date for _, video_date in dated if video_date]
+        if not dates:
+            return
+
+        mark = max(dates)
+        recheck_from = date.today() - timedelta(days=WATERMARK_RECHECK_DAYS)
+        recent_pending = [d for d in pending_dates if d >= recheck_from]
+        if recent_pending:
+            mark = min(mark, min(recent_pending) - timedelta(days=1))
+
+        current = record.watermark_date
+        if current and mark < current:
+            return
+        nums = {num for num, video_date in dated if video_date == mark}
+        if current and mark == current:
+            nums |= set(record.watermark_nums or [])
+        record.watermark_date = mark
+        record.watermark_nums = sorted(nums)
 
     def process_new_video(self, subscription: dict, video_info: dict):
         """处理单个新视频，获取下载链接并选择最佳资源下载"""
@@ -412,7 +616,7 @@ class ActorSubscribeService(BaseService):
         logger.info(f"处理新视频: {video_num}")
 
         # 获取视频详情和下载资源
-        video_detail = spider.get_video(video_num)
+        video_detail = spider.get_video(video_num, rate_limiter=host_rate_limiter)
         if not video_detail or not video_detail.downloads:
             logger.error(f"未找到视频 {video_num} 的下载资源")
             return
@@ -548,10 +752,20 @@ class ActorSubscribeService(BaseService):
 
     @classmethod
     def job_actor_subscribe(cls):
-        """演员订阅定时任务"""
+        """演员订阅定时任务：每次只检查一个周期内应分摊的演员数，全天均匀执行"""
         with SessionFactory() as db:
             service = ActorSubscribeService(db)
-            service.do_actor_subscribe()
+            interval = max(1, Setting().app.actor_check_interval)
+            active = db.query(ActorSubscribe).filter(ActorSubscribe.is_paused == False).count()
+            limit = math.ceil(active * ACTOR_CHECK_JOB_MINUTES / (interval * 60))
+            service.do_actor_subscribe(limit=limit)
+            db.commit()
+
+    @classmethod
+    def job_actor_subscribe_all(cls):
+        """手动执行演员订阅：检查全部启用的演员，不受每次检查数量和检查周期的限制"""
+        with SessionFactory() as db:
+            ActorSubscribeService(db).do_actor_subscribe(limit=None, due_only=False)
             db.commit()
 
     def update_works_count_for_subscription(self, subscription_id: int) -> bool:
@@ -574,8 +788,9 @@ class ActorSubscribeService(BaseService):
 
             logger.info(f"开始更新演员 {subscription.actor_name} 的作品数量")
 
-            # 获取演员的作品列表
-            actor_videos = spider.get_web_actor_videos(subscription.actor_name, "javdb")
+            # 获取演员的作品列表（请求间隔由 host_rate_limiter 控制）
+            with host_rate_limiter.slot(JavdbSpider.host):
+                actor_videos = spider.get_web_actor_videos(subscription.actor_name, "javdb")
             if not actor_videos:
                 logger.warning(f"无法获取演员 {subscription.actor_name} 的作品列表")
                 return False
@@ -614,22 +829,29 @@ class ActorSubscribeService(BaseService):
         """更新所有订阅的作品数量（定时任务调用）"""
         try:
             subscriptions = self.db.query(ActorSubscribe).all()
-            logger.info(f"开始更新 {len(subscriptions)} 个演员订阅的作品数量")
+
+            # 近期订阅检查已用同一份作品列表刷新过的，直接复用
+            fresh_after = datetime.now() - timedelta(hours=WORKS_COUNT_REUSE_HOURS)
+            stale = [
+                s
+                for s in subscriptions
+                if not s.works_count_updated_at or s.works_count_updated_at < fresh_after
+            ]
+            logger.info(
+                f"开始更新 {len(stale)} 个演员订阅的作品数量，"
+                f"复用近期检查结果 {len(subscriptions) - len(stale)} 个"
+            )
 
             success_count = 0
-            for subscription in subscriptions:
+            for subscription in stale:
                 try:
                     if self.update_works_count_for_subscription(subscription.id):
                         success_count += 1
-                    # 添加延迟避免请求过于频繁
-                    import time
-
-                    time.sleep(randint(5, 10))
                 except Exception as e:
                     logger.error(f"更新订阅 {subscription.id} 失败: {e}")
                     continue
 
-            logger.info(f"作品数量更新完成: 成功 {success_count}/{len(subscriptions)}")
+            logger.info(f"作品数量更新完成: 成功 {success_count}/{len(stale)}")
 
         except Exception as e:
             logger.error(f"批量更新作品数量失败: {e}")
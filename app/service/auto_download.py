@@ -4,12 +4,11 @@
 
 import traceback
 from datetime import datetime
-import time
-from random import randint
 import hashlib
 import json
-from typing import List, Dict, Any, Optional
-from sqlalchemy import and_
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from fastapi import Depends
 from sqlalchemy.orm import Session
@@ -27,12 +26,52 @@ from app.utils.video_collector import VideoCollector
 from app.utils.async_logger import get_logger
 from app.service.download_filter import DownloadFilterService
 from app.service.video_cache import VideoCacheService
+from app.service.auto_download_engine import Candidate, CompiledRule, loosest_query
 
 # 获取适合智能下载的日志记录器
 logger = get_logger()
 from app.service.download import DownloadService
 from app.service.subscribe import SubscribeService
 from app.utils import spider
+from app.utils.host_limiter import host_rate_limiter
+
+
+# 加载订阅索引时每批番号数量，避免超出 SQLite 参数上限
+INDEX_QUERY_BATCH = 500
+# 共享候选集的查询上限，以及每条规则保留的候选数量（与单规则查询时一致）
+CANDIDATE_QUERY_LIMIT = 5000
+RULE_CANDIDATE_LIMIT = 200
+
+
+class SubscriptionIndex:
+    """已有订阅的内存索引，一轮规则执行只查询一次数据库"""
+
+    def __init__(self):
+        # 状态非失败的 (rule_id, num)
+        self.rule_nums: Set[Tuple[int, str]] = set()
+        # 资源哈希 -> 持有该资源（状态非失败）的规则ID
+        self.hash_rules: Dict[str, Set[int]] = defaultdict(set)
+        # 失败订阅 (rule_id, num) -> 订阅ID，重新创建前需要删除
+        self.failed_ids: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+
+    def load(self, subscription_id: int, rule_id: int, num: str, resource_hash: Optional[str], status):
+        if status == DownloadStatus.FAILED:
+            self.failed_ids[(rule_id, num)].append(subscription_id)
+            return
+        self.add(rule_id, num, resource_hash)
+
+    def add(self, rule_id: int, num: str, resource_hash: Optional[str]):
+        self.rule_nums.add((rule_id, num))
+        if resource_hash:
+            self.hash_rules[resource_hash].add(rule_id)
+
+    def duplicate_reason(self, rule_id: int, num: str, resource_hash: Optional[str]) -> Optional[str]:
+        """返回重复原因，不重复时返回 None"""
+        if resource_hash and self.hash_rules.get(resource_hash, set()) - {rule_id}:
+            return "跨规则"
+        if (rule_id, num) in self.rule_nums:
+            return "同规则"
+        return None
 
 
 def get_auto_download_service(db: Session = Depends(get_db)):
@@ -94,9 +133,9 @@ class AutoDownloadService:
             # 可选：添加演员信息作为区分因素
             "actors": sorted(
                 [
-                    actor.strip().lower()
+                    self._actor_key(actor)
                     for actor in video.get("actors", [])
-                    if actor.strip()
+                    if self._actor_key(actor)
                 ]
             )
             if video.get("actors")
@@ -107,59 +146,41 @@ class AutoDownloadService:
         key_string = json.dumps(key_info, ensure_ascii=False, sort_keys=True)
         return hashlib.md5(key_string.encode("utf-8")).hexdigest()
 
-    def _check_duplicate_by_resource_hash(
-        self, resource_hash: str, rule_id: Optional[int] = None
-    ) -> bool:
-        """
-        检查是否存在相同资源哈希的记录（跨规则重复检测）
-
-        Args:
-            resource_hash: 资源哈希值
-            rule_id: 规则ID，如果提供则排除该规则的记录
-
-        Returns:
-            bool: 存在重复则返回True
-        """
-        query = self.db.query(AutoDownloadSubscription).filter(
-            and_(
-                AutoDownloadSubscription.resource_hash == resource_hash,
-                AutoDownloadSubscription.status
-                != DownloadStatus.FAILED,  # 允许重新处理失败的订阅
-            )
-        )
-
-        # 如果指定了规则ID，则排除该规则的记录（允许同规则内的重试）
-        if rule_id:
-            query = query.filter(AutoDownloadSubscription.rule_id != rule_id)
-
-        existing = query.first()
-        return existing is not None
-
-    def _check_duplicate_by_num(self, rule_id: int, num: str) -> bool:
-        """
-        检查是否存在相同番号的记录（同规则内重复检测）
-
-        Args:
-            rule_id: 规则ID
-            num: 番号
-
-        Returns:
-            bool: 存在重复则返回True
-        """
-        existing = (
-            self.db.query(AutoDownloadSubscription)
-            .filter(
-                and_(
-                    AutoDownloadSubscription.rule_id == rule_id,
-                    AutoDownloadSubscription.num == num,
-                    AutoDownloadSubscription.status
-                    != DownloadStatus.FAILED,  # 允许重新处理失败的订阅
-                )
-            )
-            .first()
+    @staticmethod
+    def _actor_key(actor: Any) -> str:
+        """演员标准化为小写名称（缓存中的演员为 {"id", "name"} 字典）"""
+        if isinstance(actor, dict):
+            actor = actor.get("name") or actor.get("id") or ""
+        return str(actor).strip().lower()
+
+    def _load_subscription_index(
+        self, nums: Optional[Iterable[str]] = None
+    ) -> "SubscriptionIndex":
+        """一次查询加载已有订阅的 (rule_id, num) 和资源哈希，供本轮重复检测使用"""
+        index = SubscriptionIndex()
+        columns = (
+            AutoDownloadSubscription.id,
+            AutoDownloadSubscription.rule_id,
+            AutoDownloadSubscription.num,
+            AutoDownloadSubscription.resource_hash,
+            AutoDownloadSubscription.status,
         )
-
-        return existing is not None
+        if nums is None:
+            batches = [None]
+        else:
+            # 资源哈希包含番号，只需加载候选番号对应的订阅；分批避免超出 SQLite 参数上限
+            unique_nums = sorted({num for num in nums if num})
+            batches = [
+                unique_nums[i : i + INDEX_QUERY_BATCH]
+                for i in range(0, len(unique_nums), INDEX_QUERY_BATCH)
+            ]
+        for batch in batches:
+            query = self.db.query(*columns)
+            if batch is not None:
+                query = query.filter(AutoDownloadSubscription.num.in_(batch))
+            for row in query:
+                index.load(row.id, row.rule_id, row.num, row.resource_hash, row.status)
+        return index
 
     @staticmethod
     def _resolve_time_range_days(rule: AutoDownloadRule, force: bool = False) -> int:
@@ -193,6 +214,22 @@ class AutoDownloadService:
             return round(value / 2, 2)
         return value
 
+    def _compile_rule(self, rule: AutoDownloadRule, force: bool = False) -> CompiledRule:
+        """规则条件编译为内存谓词，语义与 VideoCacheService.query_videos 一致"""
+        return CompiledRule(
+            rule_id=rule.id,
+            name=rule.name,
+            days=self._resolve_time_range_days(rule, force=force),
+            min_rating=self._resolve_min_rating_for_cache(rule),
+            min_comments=rule.min_comments,
+            is_hd=bool(rule.is_hd),
+            is_zh=bool(rule.is_zh),
+            is_uncensored=bool(rule.is_uncensored),
+            actor_id=getattr(rule, "actor_id", None) or "",
+            required_tags=set(self._split_csv_values(getattr(rule, "tags", "")) or []),
+            exclude_tags=set(self._split_csv_values(getattr(rule, "exclude_tags", "")) or []),
+        )
+
     def execute_rules(
         self, rule_ids: Optional[List[int]] = None, force: bool = False
     ) -> Dict[str, Any]:
@@ -230,78 +267,107 @@ class AutoDownloadService:
 
         logger.info(f"找到 {len(rules)} 个规则需要执行")
         processed_count = 0
-        new_subscriptions = 0
 
         # 使用视频缓存服务替代 VideoCollector，从数据库读取预抓取的数据
         cache_service = VideoCacheService(self.db)
 
+        # 按最宽松的规则条件只查询一次候选集，各规则在内存中用编译后的谓词筛选
+        compiled: Dict[int, CompiledRule] = {}
         for rule in rules:
+            try:
+                compiled[rule.id] = self._compile_rule(rule, force=force)
+            except Exception as e:
+                logger.error(f"解析规则 [{rule.name}] 条件时出错: {str(e)}")
+                logger.debug(traceback.format_exc())
+
+        shared: List[Candidate] = []
+        shared_rules = [rule for rule in compiled.values() if not rule.selective]
+        if shared_rules:
+            try:
+                shared = [
+                    Candidate(video)
+                    for video in cache_service.query_videos(
+                        **loosest_query(shared_rules),
+                        limit=CANDIDATE_QUERY_LIMIT,
+                    )
+                ]
+                logger.info(f"共享候选集查询得到 {len(shared)} 个视频")
+                if len(shared) >= CANDIDATE_QUERY_LIMIT:
+                    logger.warning(
+                        f"共享候选集达到查询上限 {CANDIDATE_QUERY_LIMIT}，评分较低的视频未参与本轮筛选"
+                    )
+            except Exception as e:
+                logger.error(f"查询候选视频时出错: {str(e)}")
+                logger.debug(traceback.format_exc())
+                for rule in shared_rules:
+                    compiled.pop(rule.rule_id, None)
+
+        candidates: Dict[int, List[Dict[str, Any]]] = {}
+        for rule in rules:
+            if rule.id not in compiled:
+                continue
             try:
                 logger.info(f"===== 执行规则 [{rule.name}] ID:{rule.id} =====")
                 logger.info(
                     f"规则条件: 评分>={rule.min_rating or '无限制'}, 评论>={rule.min_comments or '无限制'}, 高清={rule.is_hd}, 中文字幕={rule.is_zh}, 无码={rule.is_uncensored}"
                 )
-                # 调试日志: 检查参数类型(用于排查 Decimal vs Float 问题)
-                logger.debug(
-                    f"规则参数类型: min_rating={type(rule.min_rating).__name__}, min_comments={type(rule.min_comments).__name__}"
-                )
-
-                # 计算时间范围
-                time_range_days = self._resolve_time_range_days(rule, force=force)
-
-                # 从缓存数据库查询视频（无需实时爬取，使用预抓取的数据）
-                videos = cache_service.query_videos(
-                    min_rating=self._resolve_min_rating_for_cache(rule),
-                    min_comments=rule.min_comments,
-                    is_hd=rule.is_hd,
-                    is_zh=rule.is_zh,
-                    is_uncensored=True if rule.is_uncensored else None,
-                    days=time_range_days,
-                    limit=200,  # 限制返回数量以提高性能
-                    required_actor_id=getattr(rule, "actor_id", None),
-                    required_tags=self._split_csv_values(getattr(rule, "tags", "")),
-                    exclude_tags=self._split_csv_values(
-                        getattr(rule, "exclude_tags", "")
-                    ),
-                )
-
+                compiled_rule = compiled[rule.id]
+                if compiled_rule.selective:
+                    # 演员/标签条件在 SQL 中通过关联表过滤，不受共享候选集上限影响
+                    own = [
+                        Candidate(video)
+                        for video in cache_service.query_videos(
+                            **compiled_rule.query_params(), limit=RULE_CANDIDATE_LIMIT
+                        )
+                    ]
+                    videos = compiled_rule.select(own, RULE_CANDIDATE_LIMIT)
+                else:
+                    videos = compiled_rule.select(shared, RULE_CANDIDATE_LIMIT)
+                candidates[rule.id] = videos
                 logger.info(f"规则 [{rule.name}] 初步筛选得到 {len(videos)} 个视频")
+            except Exception as e:
+                logger.error(f"执行规则 [{rule.name}] 时出错: {str(e)}")
+                logger.debug(traceback.format_exc())
 
-                # 显示前3个视频的详细信息用于调试
-                for i, video in enumerate(videos[:3]):
-                    logger.info(
-                        f"视频 {i + 1}: {video.get('num')} - 评分: {video.get('rating')} - 评论: {video.get('comments')} - 评论数: {video.get('comments_count')}"
-                    )
+        # 已有订阅一次性加载到内存，本轮所有规则共用；新建的订阅同步加入索引，后续规则可见
+        index = self._load_subscription_index(
+            video.get("num") for videos in candidates.values() for video in videos
+        )
+        pending: List[AutoDownloadSubscription] = []
 
+        for rule in rules:
+            if rule.id not in candidates:
+                continue
+            try:
                 # 额外筛选（比如排除已订阅的）
-                filtered_videos = self._filter_videos(rule, videos)
+                filtered_videos = self._filter_videos(rule, candidates[rule.id], index)
                 logger.info(
                     f"规则 [{rule.name}] 最终筛选得到 {len(filtered_videos)} 个待处理视频"
                 )
 
-                if not filtered_videos:
-                    logger.info(f"规则 [{rule.name}] 没有找到符合条件的新视频")
-                    continue
-
-                # 处理符合条件的视频
                 rule_new_subscriptions = 0
                 for video in filtered_videos:
+                    if remaining_quota is not None and remaining_quota <= 0:
+                        logger.info(
+                            f"规则 [{rule.name}] 命中每日新增订阅上限，停止继续创建"
+                        )
+                        break
                     try:
-                        if remaining_quota is not None and remaining_quota <= 0:
-                            logger.info(
-                                f"规则 [{rule.name}] 命中每日新增订阅上限，停止继续创建"
-                            )
-                            break
-                        if self._create_subscription(rule, video):
-                            rule_new_subscriptions += 1
-                            new_subscriptions += 1
-                            if remaining_quota is not None:
-                                remaining_quota -= 1
+                        subscription = self._build_subscription(rule, video)
                     except Exception as e:
                         logger.error(f"处理视频 {video.get('num')} 时出错: {str(e)}")
+                        continue
+                    logger.info(
+                        f"为规则 [{rule.name}] 创建新订阅: {subscription.num} - {subscription.title}"
+                    )
+                    pending.append(subscription)
+                    index.add(rule.id, subscription.num, subscription.resource_hash)
+                    rule_new_subscriptions += 1
+                    if remaining_quota is not None:
+                        remaining_quota -= 1
 
                 logger.info(
-                    f"规则 [{rule.name}] 执行完成，新增 {rule_new_subscriptions} 个订阅"
+                    f"规则 [{rule.name}] 执行完成，待新增 {rule_new_subscriptions} 个订阅"
                 )
                 processed_count += 1
 
@@ -309,6 +375,9 @@ class AutoDownloadService:
                 logger.error(f"执行规则 [{rule.name}] 时出错: {str(e)}")
                 logger.debug(traceback.format_exc())
 
+        # 所有规则的新订阅在一个事务中写入
+        new_subscriptions = self._save_subscriptions(pending, index)
+
         logger.info(
             f"规则执行完成，共处理 {processed_count} 个规则，新增 {new_subscriptions} 个订阅"
         )
@@ -357,15 +426,19 @@ class AutoDownloadService:
             return []
 
     def _filter_videos(
-        self, rule: AutoDownloadRule, videos: List[Dict[str, Any]]
+        self,
+        rule: AutoDownloadRule,
+        videos: List[Dict[str, Any]],
+        index: Optional["SubscriptionIndex"] = None,
     ) -> List[Dict[str, Any]]:
-        """筛选符合条件的视频"""
+        """筛选符合条件的视频（基于已有订阅索引在内存中做重复检测）"""
+        if index is None:
+            index = self._load_subscription_index(video.get("num") for video in videos)
+
         filtered_videos = []
+        seen_nums = set()
 
         for video in videos:
-            # 减少调试日志输出
-            pass
-
             # 如果视频已经被标记为详情获取失败，暂时保留
             if video.get("detail_missing", False):
                 logger.warning(
@@ -374,106 +447,98 @@ class AutoDownloadService:
                 filtered_videos.append(video)
                 continue
 
-            # 执行智能重复检测
-
-            # 1. 生成资源哈希
-            resource_hash = self._generate_resource_hash(video)
-
-            # 2. 检查跨规则重复（基于资源哈希）
-            if self._check_duplicate_by_resource_hash(resource_hash, rule.id):
-                logger.debug(
-                    f"跳过重复影片（跨规则）: {video.get('num')} - {video.get('title')}"
-                )
+            # 同一番号可能出现在多个榜单中，只保留一次
+            num = video.get("num")
+            if num in seen_nums:
                 continue
 
-            # 3. 检查同规则内重复（基于番号）
-            if self._check_duplicate_by_num(rule.id, video.get("num")):
+            # 跨规则重复（基于资源哈希）和同规则内重复（基于番号）
+            resource_hash = self._generate_resource_hash(video)
+            reason = index.duplicate_reason(rule.id, num, resource_hash)
+            if reason:
                 logger.debug(
-                    f"跳过重复影片（同规则）: {video.get('num')} - {video.get('title')}"
+                    f"跳过重复影片（{reason}）: {num} - {video.get('title')}"
                 )
                 continue
 
-            # 通过所有检查，添加到结果
+            seen_nums.add(num)
             filtered_videos.append(video)
 
         return filtered_videos
 
-    def _create_subscription(
+    def _build_subscription(
         self, rule: AutoDownloadRule, video: Dict[str, Any]
-    ) -> bool:
-        """创建订阅记录"""
-        try:
-            num = video.get("num")
-            title = video.get("title")
-            logger.info(f"为规则 [{rule.name}] 创建新订阅: {num} - {title}")
-
-            # 生成资源哈希
-            resource_hash = self._generate_resource_hash(video)
-
-            # 创建订阅记录
-            subscription_data = {
-                "rule_id": rule.id,
-                "num": num,
-                "title": title,
-                "rating": video.get("rating"),
-                "comments_count": video.get("comments_count", 0)
-                or video.get("comments", 0),
-                "cover": video.get("cover"),
-                "actors": video.get("actors"),
-                "status": DownloadStatus.PENDING,
-                "resource_hash": resource_hash,
-                "error_message": None,  # 初始化时错误信息为空
-                "created_at": datetime.now(),
-            }
-
-            # 查询是否已存在，避免重复（但允许重新创建失败的订阅）
-            existing = (
-                self.db.query(AutoDownloadSubscription)
-                .filter(
-                    and_(
-                        AutoDownloadSubscription.rule_id == rule.id,
-                        AutoDownloadSubscription.num == num,
-                        AutoDownloadSubscription.status
-                        != DownloadStatus.FAILED,  # 允许重新创建失败的订阅
-                    )
-                )
-                .first()
-            )
+    ) -> AutoDownloadSubscription:
+        """根据缓存视频构建订阅记录"""
+        actors = video.get("actors")
+        if actors is not None and not isinstance(actors, str):
+            actors = json.dumps(actors, ensure_ascii=False)
+
+        return AutoDownloadSubscription(
+            rule_id=rule.id,
+            num=video.get("num"),
+            title=video.get("title"),
+            rating=video.get("rating"),
+            comments_count=video.get("comments_count", 0) or video.get("comments", 0),
+            cover=video.get("cover"),
+            actors=actors,
+            status=DownloadStatus.PENDING,
+            resource_hash=self._generate_resource_hash(video),
+            error_message=None,  # 初始化时错误信息为空
+            created_at=datetime.now(),
+        )
 
-            if existing:
-                logger.warning(f"订阅已存在且状态非失败: {num}, 跳过创建")
-                return False
+    def _save_subscriptions(
+        self,
+        subscriptions: List[AutoDownloadSubscription],
+        index: "SubscriptionIndex",
+    ) -> int:
+        """
+        在一个事务中批量创建订阅
 
-            # 如果存在失败的订阅，先删除它
-            failed_subscription = (
-                self.db.query(AutoDownloadSubscription)
-                .filter(
-                    and_(
-                        AutoDownloadSubscription.rule_id == rule.id,
-                        AutoDownloadSubscription.num == num,
-                        AutoDownloadSubscription.status == DownloadStatus.FAILED,
-                    )
+        同规则同番号的失败订阅先删除再重新创建（允许重试失败的订阅）。
+        """
+        if not subscriptions:
+            return 0
+        try:
+            failed_ids = [
+                subscription_id
+                for subscription in subscriptions
+                for subscription_id in index.failed_ids.get(
+                    (subscription.rule_id, subscription.num), []
                 )
-                .first()
-            )
-
-            if failed_subscription:
-                logger.info(f"删除失败的订阅记录并重新创建: {num}")
-                self.db.delete(failed_subscription)
-                self.db.commit()
-
-            # 创建新订阅
-            subscription = AutoDownloadSubscription(**subscription_data)
-            self.db.add(subscription)
+            ]
+            if failed_ids:
+                logger.info(f"删除 {len(failed_ids)} 条失败的订阅记录并重新创建")
+                for failed in self.db.query(AutoDownloadSubscription).filter(
+                    AutoDownloadSubscription.id.in_(failed_ids)
+                ):
+                    self.db.delete(failed)
+                # 先刷新删除，SQLite 可能复用被删除记录的主键
+                self.db.flush()
+
+            self.db.add_all(subscriptions)
             self.db.commit()
-
-            logger.info(f"成功创建订阅: {num}")
-            return True
-
+            for subscription in subscriptions:
+                logger.info(f"成功创建订阅: {subscription.num}")
+            return len(subscriptions)
         except Exception as e:
             self.db.rollback()
-            logger.error(f"创建订阅记录时出错: {str(e)}")
+            logger.error(f"批量创建订阅记录时出错: {str(e)}")
+            return 0
+
+    def _create_subscription(
+        self, rule: AutoDownloadRule, video: Dict[str, Any]
+    ) -> bool:
+        """创建单个订阅记录"""
+        num = video.get("num")
+        logger.info(f"为规则 [{rule.name}] 创建新订阅: {num} - {video.get('title')}")
+
+        index = self._load_subscription_index([num])
+        if (rule.id, num) in index.rule_nums:
+            logger.warning(f"订阅已存在且状态非失败: {num}, 跳过创建")
             return False
+        return self._save_subscriptions([self._build_subscription(rule, video)], index) == 1
 
     def run_cycle(
         self, rule_ids: Optional[List[int]] = None, force: bool = False
@@ -622,20 +687,71 @@ class AutoDownloadService:
                 return
             query_limit = min(query_limit, remaining_download_quota)
 
-        # 获取待下载的订阅
-        pending_subscriptions = (
-            self.db.query(AutoDownloadSubscription)
+        # 获取待下载的订阅（只取ID，工作线程各自使用独立 Session）
+        pending_ids = [
+            row.id
+            for row in self.db.query(AutoDownloadSubscription.id)
             .filter(AutoDownloadSubscription.status == DownloadStatus.PENDING)
+            .order_by(AutoDownloadSubscription.id)
             .limit(query_limit)
             .all()
-        )  # 限制数量避免过载
+        ]  # 限制数量避免过载
+
+        logger.info(f"开始处理 {len(pending_ids)} 个待下载订阅")
+        if not pending_ids:
+            return
+
+        # 订阅在线程池中并发处理，站点请求间隔和并发由 host_rate_limiter 统一控制
+        app_setting = Setting().app
+        host_rate_limiter.configure(
+            min_interval=app_setting.host_request_interval,
+            jitter=app_setting.host_request_jitter,
+            max_concurrency=app_setting.host_max_concurrency,
+        )
+        max_workers = max(1, min(app_setting.max_concurrent_spiders, len(pending_ids)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="auto-download") as executor:
+            results = list(executor.map(self._process_subscription_in_session, pending_ids))
 
-        logger.info(f"开始处理 {len(pending_subscriptions)} 个待下载订阅")
+        logger.info(f"待下载订阅处理完成，成功提交 {sum(1 for r in results if r)}/{len(results)} 个")
+
+    @staticmethod
+    def _claim_subscription(db: Session, subscription_id: int) -> bool:
+        """以条件更新把订阅从待下载原子地切换为下载中，避免被重复处理"""
+        claimed = (
+            db.query(AutoDownloadSubscription)
+            .filter(
+                AutoDownloadSubscription.id == subscription_id,
+                AutoDownloadSubscription.status == DownloadStatus.PENDING,
+            )
+            .update(
+                {
+                    AutoDownloadSubscription.status: DownloadStatus.DOWNLOADING,
+                    AutoDownloadSubscription.download_time: datetime.now(),
+                    AutoDownloadSubscription.error_message: None,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return claimed == 1
 
-        for subscription in pending_subscriptions:
-            self._process_single_subscription(subscription)
-            # 添加延迟避免过于频繁
-            time.sleep(randint(2, 5))  # 减少延迟时间
+    @staticmethod
+    def _process_subscription_in_session(subscription_id: int) -> bool:
+        """工作线程入口：独立 Session 中认领并处理单个订阅"""
+        try:
+            with SessionFactory() as db:
+                if not AutoDownloadService._claim_subscription(db, subscription_id):
+                    logger.info(f"订阅 {subscription_id} 已被其他任务处理，跳过")
+                    return False
+                subscription = db.get(AutoDownloadSubscription, subscription_id)
+                service = AutoDownloadService(db=db)
+                return service._process_single_subscription(
+                    subscription, rate_limiter=host_rate_limiter
+                )
+        except Exception as e:
+            logger.error(f"处理订阅 {subscription_id} 时出错: {str(e)}")
+            logger.debug(traceback.format_exc())
+            return False
 
     def _find_suitable_download(
         self, rule: AutoDownloadRule, downloads: List[Any]
@@ -664,8 +780,8 @@ class AutoDownloadService:
         # 返回第一个符合条件的下载
         return suitable_downloads[0]
 
-    def _process_single_subscription(self, subscription):
-        """处理单个订阅下载"""
+    def _process_single_subscription(self, subscription, rate_limiter=None):
+        """处理单个订阅下载，每次状态变更立即提交"""
         try:
             logger.info(f"开始处理订阅: {subscription.num}")
 
@@ -677,7 +793,7 @@ class AutoDownloadService:
             self.db.commit()
 
             # 获取视频详情和下载链接
-            video_detail = spider.get_video(subscription.num)
+            video_detail = spider.get_video(subscription.num, rate_limiter=rate_limiter)
             if not video_detail or not getattr(video_detail, "downloads", []):
                 error_msg = f"视频 {subscription.num} 无法获取下载链接"
                 logger.warning(error_msg)
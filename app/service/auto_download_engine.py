@@ -0,0 +1,142 @@
+"""
+智能下载规则求值
+
+每轮执行时按所有规则中最宽松的条件从视频缓存查询一次候选集，
+再把每条规则编译为只包含已启用条件的谓词列表，在内存中逐条筛选。
+候选视频的标签、演员等字段只标准化一次，供所有规则共用。
+指定了演员或必含标签的规则命中的视频很少，在共享候选集（按评分截断）中可能被截掉，
+这类规则单独查询，演员/标签条件通过关联表在 SQL 中过滤。
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.db.models.video_cache import normalize_actor_id, normalize_tag_value
+
+
+class Candidate:
+    """标准化后的候选视频，保留原始字典用于创建订阅"""
+    __slots__ = (
+        "video", "rating", "comments_count", "is_hd", "is_zh", "is_uncensored",
+        "release_date", "fetched_at", "actor_ids", "tags",
+    )
+
+    def __init__(self, video: Dict[str, Any]):
+        self.video = video
+        self.rating = video.get("rating")
+        self.comments_count = video.get("comments_count") or 0
+        self.is_hd = bool(video.get("is_hd"))
+        self.is_zh = bool(video.get("is_zh"))
+        self.is_uncensored = bool(video.get("is_uncensored"))
+        self.release_date = video.get("release_date") or ""
+        fetched_at = video.get("fetched_at")
+        self.fetched_at = datetime.fromisoformat(fetched_at) if isinstance(fetched_at, str) else fetched_at
+        self.actor_ids = {normalize_actor_id(actor) for actor in video.get("actors") or []}
+        self.tags = {normalize_tag_value(tag) for tag in video.get("tags") or []}
+
+
+Predicate = Callable[[Candidate], bool]
+
+
+@dataclass
+class CompiledRule:
+    """规则条件，与 VideoCacheService.query_videos 的过滤语义保持一致"""
+    rule_id: int
+    name: str
+    days: int = 0
+    min_rating: Optional[float] = None
+    min_comments: Optional[int] = None
+    is_hd: bool = False
+    is_zh: bool = False
+    is_uncensored: bool = False
+    actor_id: str = ""
+    required_tags: Set[str] = field(default_factory=set)
+    exclude_tags: Set[str] = field(default_factory=set)
+    now: Optional[datetime] = None
+    predicates: List[Predicate] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        self.actor_id = normalize_actor_id(self.actor_id)
+        self.required_tags = {normalize_tag_value(tag) for tag in self.required_tags} - {""}
+        self.exclude_tags = {normalize_tag_value(tag) for tag in self.exclude_tags} - {""}
+        self.predicates = self._compile()
+
+    def _compile(self) -> List[Predicate]:
+        predicates: List[Predicate] = []
+        if self.days > 0:
+            now = self.now or datetime.now()
+            release_cutoff = (now - timedelta(days=self.days)).strftime("%Y-%m-%d")
+            fetched_cutoff = now - timedelta(days=self.days)
+            predicates.append(
+                lambda c: c.release_date >= release_cutoff if c.release_date
+                else c.fetched_at is not None and c.fetched_at >= fetched_cutoff
+            )
+        if self.min_rating is not None and self.min_rating > 0:
+            min_rating = self.min_rating
+            predicates.append(lambda c: c.rating is not None and c.rating >= min_rating)
+        if self.min_comments is not None and self.min_comments > 0:
+            min_comments = self.min_comments
+            predicates.append(lambda c: c.comments_count >= min_comments)
+        if self.is_hd:
+            predicates.append(lambda c: c.is_hd)
+        if self.is_zh:
+            predicates.append(lambda c: c.is_zh)
+        if self.is_uncensored:
+            predicates.append(lambda c: c.is_uncensored)
+        if self.actor_id:
+            actor_id = self.actor_id
+            predicates.append(lambda c: actor_id in c.actor_ids)
+        if self.required_tags:
+            required_tags = self.required_tags
+            predicates.append(lambda c: required_tags <= c.tags)
+        if self.exclude_tags:
+            exclude_tags = self.exclude_tags
+            predicates.append(lambda c: not (exclude_tags & c.tags))
+        return predicates
+
+    @property
+    def selective(self) -> bool:
+        """是否需要单独查询（演员/必含标签条件只能在 SQL 中可靠地过滤）"""
+        return bool(self.actor_id or self.required_tags)
+
+    def query_params(self) -> Dict[str, Any]:
+        """单独查询时的 VideoCacheService.query_videos 参数"""
+        return {
+            "days": self.days,
+            "min_rating": self.min_rating if self.min_rating and self.min_rating > 0 else None,
+            "min_comments": self.min_comments if self.min_comments and self.min_comments > 0 else None,
+            "is_hd": self.is_hd,
+            "is_zh": self.is_zh,
+            "is_uncensored": True if self.is_uncensored else None,
+            "required_actor_id": self.actor_id or None,
+            "required_tags": sorted(self.required_tags) or None,
+            "exclude_tags": sorted(self.exclude_tags) or None,
+        }
+
+    def matches(self, candidate: Candidate) -> bool:
+        return all(predicate(candidate) for predicate in self.predicates)
+
+    def select(self, candidates: List[Candidate], limit: int) -> List[Dict[str, Any]]:
+        """按候选集原有排序返回前 limit 个命中的视频"""
+        selected = []
+        for candidate in candidates:
+            if self.matches(candidate):
+                selected.append(candidate.video)
+                if len(selected) >= limit:
+                    break
+        return selected
+
+
+def loosest_query(rules: List[CompiledRule]) -> Dict[str, Any]:
+    """所有规则条件的并集，作为共享候选集查询参数（排除标签在内存中筛选）"""
+    days = [rule.days for rule in rules]
+    ratings = [rule.min_rating if rule.min_rating and rule.min_rating > 0 else None for rule in rules]
+    comments = [rule.min_comments if rule.min_comments and rule.min_comments > 0 else None for rule in rules]
+    return {
+        "days": 0 if any(value <= 0 for value in days) else max(days),
+        "min_rating": None if None in ratings else min(ratings),
+        "min_comments": None if None in comments else min(comments),
+        "is_hd": all(rule.is_hd for rule in rules),
+        "is_zh": all(rule.is_zh for rule in rules),
+        "is_uncensored": True if all(rule.is_uncensored for rule in rules) else None,
+    }
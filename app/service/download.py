@@ -12,6 +12,7 @@ from app.service.base import BaseService
 from app.service.video import VideoService
 from app.service.download_filter import DownloadFilterService
 from app.utils import notify
+from app.utils.image import image_batch
 from app.utils.logger import logger
 from app.utils.qbittorent import qbittorent
 
@@ -318,71 +319,82 @@ class DownloadService(BaseService):
                 include_failed=True, include_success=True
             )
             logger.info(f"获取到{len(torrents)}个下载任务")
-            for torrent in torrents:
-                if any(tag in ["整理成功", "整理失败"] for tag in torrent.tags):
-                    continue
-                download_service.scrape_download(
-                    video_service, torrent, setting.download.trans_mode
-                )
+            # 所有种子的封面及水印图片合并为一批，由进程池并行生成
+            with image_batch():
+                for torrent in torrents:
+                    if any(tag in ["整理成功", "整理失败"] for tag in torrent.tags):
+                        continue
+                    download_service.scrape_download(
+                        video_service, torrent, setting.download.trans_mode
+                    )
             db.commit()
 
     def scrape_download(
         self, video_service: VideoService, torrent: Torrent, trans_mode: str
     ):
         has_error = False
-        for file in torrent.files:
-            num = None
-            video = VideoNotify(path=file.path)
-            try:
-                matched_torrent = (
-                    self.db.query(DBTorrent)
-                    .filter_by(hash=torrent.hash)
-                    .order_by(DBTorrent.id.desc())
-                    .limit(1)
-                    .one_or_none()
-                )
-                if matched_torrent is not None:
-                    match_num = VideoDetail(**matched_torrent.__dict__)
-                else:
-                    match_num = video_service.parse_video(file.path)
-
-                num = match_num.num
-                if num is None:
-                    raise BizException(message="番号识别失败")
-                video = video_service.scrape_video(num)
-                video.path = file.path
-                video.is_zh = match_num.is_zh
-                video.is_uncensored = match_num.is_uncensored
-                video_service.save_video(video, mode="download")
-
-                if matched_torrent is not None:
-                    # 删除所有匹配的种子记录以避免重复
-                    self.db.query(DBTorrent).filter_by(hash=torrent.hash).delete()
-            except BizException as e:
-                has_error = True
-
-                history = History(
-                    status=0,
-                    num=num,
-                    is_zh=video.is_zh,
-                    is_uncensored=video.is_uncensored,
-                    source_path=file.path,
-                    trans_method=trans_mode,
-                )
-                history.add(video_service.db)
-
-                video_notify = VideoNotify(**video.model_dump())
-                if os.path.exists(file.path):
-                    video_notify.size = utils.convert_size(os.stat(file.path).st_size)
-                    video_notify.message = e.message
-                else:
-                    video_notify.size = "N/A"
-                    video_notify.message = "文件不存在"
-                video_notify.is_success = False
-                logger.error(f"影片刮削失败，{video_notify.message}")
-                notify.send_video(video_notify)
-
-        self.complete_download(torrent.hash, not has_error)
+        # 封面及水印图片在批次结束时统一生成，生成完成后才标记该种子的整理结果
+        with image_batch() as images:
+            start = len(images.items)
+            for file in torrent.files:
+                num = None
+                video = VideoNotify(path=file.path)
+                try:
+                    matched_torrent = (
+                        self.db.query(DBTorrent)
+                        .filter_by(hash=torrent.hash)
+                        .order_by(DBTorrent.id.desc())
+                        .limit(1)
+                        .one_or_none()
+                    )
+                    if matched_torrent is not None:
+                        match_num = VideoDetail(**matched_torrent.__dict__)
+                    else:
+                        match_num = video_service.parse_video(file.path)
+
+                    num = match_num.num
+                    if num is None:
+                        raise BizException(message="番号识别失败")
+                    video = video_service.scrape_video(num)
+                    video.path = file.path
+                    video.is_zh = match_num.is_zh
+                    video.is_uncensored = match_num.is_uncensored
+                    video_service.save_video(video, mode="download")
+
+                    if matched_torrent is not None:
+                        # 删除所有匹配的种子记录以避免重复
+                        self.db.query(DBTorrent).filter_by(hash=torrent.hash).delete()
+                except BizException as e:
+                    has_error = True
+
+                    history = History(
+                        status=0,
+                        num=num,
+                        is_zh=video.is_zh,
+                        is_uncensored=video.is_uncensored,
+                        source_path=file.path,
+                        trans_method=trans_mode,
+                    )
+                    history.add(video_service.db)
+
+                    video_notify = VideoNotify(**video.model_dump())
+                    if os.path.exists(file.path):
+                        video_notify.size = utils.convert_size(os.stat(file.path).st_size)
+                        video_notify.message = e.message
+                    else:
+                        video_notify.size = "N/A"
+                        video_notify.message = "文件不存在"
+                    video_notify.is_success = False
+                    logger.error(f"影片刮削失败，{video_notify.message}")
+                    notify.send_video(video_notify)
+
+            # 图片缺失时 NFO 引用的 poster/thumb 不存在，按整理失败处理
+            images.when_done(
+                [video_path for _, video_path in images.items[start:]],
+                lambda failed: self.complete_download(
+                    torrent.hash, not (has_error or failed)
+                ),
+            )
 
     @classmethod
     def job_delete_complete_download(cls):
@@ -0,0 +1,161 @@
+"""
+任务执行记录服务
+
+记录定时任务每次执行的开始/结束时间、耗时、结果摘要和错误信息，
+并按任务统计耗时分位数，帮助定位拖慢调度的慢任务。
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db import SessionFactory
+from app.db.models import JobRun
+from app.service.base import BaseService
+from app.utils.logger import logger
+
+MAX_SUMMARY_LENGTH = 500
+
+
+def summarize_result(result: Any) -> Optional[str]:
+    """将任务返回值压缩为简短的摘要文本"""
+    if result is None:
+        return None
+    try:
+        text = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        text = str(result)
+    return text[:MAX_SUMMARY_LENGTH]
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """线性插值计算分位数，values 需已排序"""
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class JobRunService(BaseService):
+
+    def __init__(self, db: Session):
+        super().__init__(db)
+
+    def start(self, job_key: str, job_name: str) -> JobRun:
+        run = JobRun(job_key=job_key, job_name=job_name, start_time=datetime.now(), status='running')
+        self.db.add(run)
+        self.db.commit()
+        return run
+
+    def finish(self, run: JobRun, status: str, result: Any = None, error: Optional[str] = None,
+               history_limit: int = 200) -> JobRun:
+        run.end_time = datetime.now()
+        run.duration = round((run.end_time - run.start_time).total_seconds(), 3)
+        run.status = status
+        run.result = summarize_result(result)
+        run.error_message = error[:2000] if error else None
+        self.db.commit()
+        self.prune(run.job_key, history_limit)
+        return run
+
+    def record_skipped(self, job_key: str, job_name: str, reason: str, history_limit: int = 200) -> JobRun:
+        now = datetime.now()
+        run = JobRun(job_key=job_key, job_name=job_name, start_time=now, end_time=now,
+                     duration=0.0, status='skipped', result=reason)
+        self.db.add(run)
+        self.db.commit()
+        self.prune(job_key, history_limit)
+        return run
+
+    def prune(self, job_key: str, keep: int):
+        """每个任务只保留最近 keep 条记录"""
+        if keep <= 0:
+            return
+        boundary = (
+            self.db.query(JobRun.id)
+            .filter(JobRun.job_key == job_key)
+            .order_by(JobRun.id.desc())
+            .offset(keep)
+            .limit(1)
+            .scalar()
+        )
+        if boundary is None:
+            return
+        self.db.query(JobRun).filter(JobRun.job_key == job_key, JobRun.id <= boundary).delete(
+            synchronize_session=False
+        )
+        self.db.commit()
+
+    def list_runs(self, job_key: Optional[str] = None, limit: int = 50) -> List[JobRun]:
+        query = self.db.query(JobRun)
+        if job_key:
+            query = query.filter(JobRun.job_key == job_key)
+        return query.order_by(JobRun.id.desc()).limit(limit).all()
+
+    def get_stats(self, job_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按任务统计执行次数、失败次数和耗时分位数"""
+        query = self.db.query(JobRun.job_key, JobRun.job_name, JobRun.status, JobRun.duration, JobRun.start_time)
+        if job_key:
+            query = query.filter(JobRun.job_key == job_key)
+
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for key, name, status, duration, start_time in query.order_by(JobRun.id).all():
+            item = grouped.setdefault(key, {
+                'job_key': key, 'job_name': name, 'total': 0, 'success': 0, 'failed': 0,
+                'skipped': 0, 'durations': [], 'last_status': None, 'last_start_time': None,
+            })
+            item['total'] += 1
+            if status in ('success', 'failed', 'skipped'):
+                item[status] += 1
+            if status in ('success', 'failed') and duration is not None:
+                item['durations'].append(duration)
+            item['job_name'] = name or item['job_name']
+            item['last_status'] = status
+            item['last_start_time'] = start_time
+
+        stats = []
+        for item in grouped.values():
+            durations = sorted(item.pop('durations'))
+            item['avg'] = round(sum(durations) / len(durations), 3) if durations else None
+            item['p50'] = percentile(durations, 50)
+            item['p90'] = percentile(durations, 90)
+            item['p99'] = percentile(durations, 99)
+            item['max'] = durations[-1] if durations else None
+            stats.append(item)
+        return sorted(stats, key=lambda i: i['job_key'])
+
+    @staticmethod
+    def safe_start(job_key: str, job_name: str) -> Optional[int]:
+        """记录任务开始，失败时不影响任务本身执行"""
+        try:
+            with SessionFactory() as db:
+                return JobRunService(db).start(job_key, job_name).id
+        except Exception as e:
+            logger.warning(f"记录任务开始失败: {job_name}, {e}")
+            return None
+
+    @staticmethod
+    def safe_finish(run_id: Optional[int], status: str, result: Any = None, error: Optional[str] = None,
+                    history_limit: int = 200):
+        if run_id is None:
+            return
+        try:
+            with SessionFactory() as db:
+                run = db.get(JobRun, run_id)
+                if run is not None:
+                    JobRunService(db).finish(run, status, result, error, history_limit)
+        except Exception as e:
+            logger.warning(f"记录任务结果失败: {run_id}, {e}")
+
+    @staticmethod
+    def safe_skip(job_key: str, job_name: str, reason: str, history_limit: int = 200):
+        try:
+            with SessionFactory() as db:
+                JobRunService(db).record_skipped(job_key, job_name, reason, history_limit)
+        except Exception as e:
+            logger.warning(f"记录任务跳过失败: {job_name}, {e}")
@@ -1,6 +1,5 @@
 import ipaddress
 import mimetypes
-from hashlib import md5
 from typing import Optional
 from urllib.parse import urlparse
 
@@ -10,6 +9,9 @@ from fastapi.responses import StreamingResponse
 
 from app.schema import Setting
 from app.utils import spider
+from app.utils.cover_cache import CoverEntry, cover_cache
+from app.utils.cover_fetcher import cover_fetcher
+from app.utils.image import thumbnail
 from app.utils.m3u8 import fix_m3u8_paths, is_m3u8
 
 
@@ -73,25 +75,95 @@ class ResourceService:
         return "image/jpeg"
 
     @classmethod
-    def proxy_cover(cls, url: str) -> Response:
+    def get_cover_entry(cls, url: str) -> CoverEntry | None:
+        """返回缓存中的封面，未缓存时抓取并写入缓存"""
+        entry = cover_cache.lookup(url)
+        if entry is not None:
+            return entry
+
+        cover = cls.fetch_image_bytes(url, "cover")
+        if not cover:
+            return None
+        # JavBus/JavDB 的封面在抓取时已经写入缓存
+        return cover_cache.lookup(url) or cover_cache.put(url, cover)
+
+    @classmethod
+    def proxy_cover(cls, url: str, if_none_match: str | None = None) -> Response:
         normalized_url = f"https:{url}" if url.startswith("//") else url
         blocked_status = cls.get_remote_url_block_status(normalized_url)
         if blocked_status is not None:
             return Response(status_code=blocked_status)
 
-        cover = cls.fetch_image_bytes(normalized_url, "cover")
-        if not cover:
+        response = cls._cover_response(normalized_url, cls.get_cover_entry(normalized_url), if_none_match)
+        if response is None:
+            # 文件在查找之后被淘汰，重新获取一次
+            response = cls._cover_response(normalized_url, cls.get_cover_entry(normalized_url), if_none_match)
+        return response or Response(status_code=502)
+
+    @classmethod
+    async def proxy_cover_async(cls, url: str, if_none_match: str | None = None,
+                                width: int | None = None, accept: str | None = None) -> Response:
+        """异步封面代理：连接池复用、同一封面只抓取一次、按站点限制并发
+
+        指定 width 时返回对应宽度档位的缩略图，格式按 accept 协商。
+        """
+        normalized_url = f"https:{url}" if url.startswith("//") else url
+        blocked_status = cls.get_remote_url_block_status(normalized_url)
+        if blocked_status is not None:
+            return Response(status_code=blocked_status)
+
+        bucket = thumbnail.bucket_width(width)
+        fmt = thumbnail.negotiate_format(accept) if bucket is not None else None
+        # 文件在查找之后被淘汰时重新获取一次
+        for _ in range(2):
+            if bucket is None:
+                response = cls._cover_response(
+                    normalized_url, await cover_fetcher.get(normalized_url), if_none_match
+                )
+            else:
+                entry = await cover_fetcher.get_variant(normalized_url, bucket, fmt)
+                # 缩略图生成失败时返回的是原图
+                media_type = thumbnail.MEDIA_TYPES[fmt] if entry is not None and entry.key.endswith(f".{fmt}") else None
+                response = cls._cover_response(
+                    normalized_url, entry, if_none_match, media_type=media_type, vary_accept=True
+                )
+            if response is not None:
+                return response
+        return Response(status_code=502)
+
+    @classmethod
+    def _cover_response(cls, url: str, entry: CoverEntry | None, if_none_match: str | None,
+                        media_type: str | None = None, vary_accept: bool = False) -> Response | None:
+        """返回封面响应；缓存文件已被删除时返回 None，由调用方重新获取"""
+        if entry is None:
             return Response(status_code=502)
 
-        return Response(
-            content=cover,
-            media_type=cls._guess_image_media_type(normalized_url),
-            headers={
-                "Cache-Control": "public, max-age=31536000",
-                "ETag": md5(normalized_url.encode()).hexdigest(),
-            },
+        headers = {
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": entry.etag,
+        }
+        if vary_accept:
+            headers["Vary"] = "Accept"
+        if if_none_match and entry.etag in {tag.strip() for tag in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+
+        # 先打开文件再返回，之后即使被其它请求的淘汰删除也能读完；流式返回，不把整张图片读入内存
+        file = entry.open()
+        if file is None:
+            return None
+        headers["Content-Length"] = str(entry.size)
+        return StreamingResponse(
+            cls._iter_file(file),
+            media_type=media_type or cls._guess_image_media_type(url),
+            headers=headers,
         )
 
+    @staticmethod
+    def _iter_file(file, chunk_size: int = 64 * 1024):
+        with file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
     @staticmethod
     def _build_proxy_headers(request: Request, url: str) -> dict[str, str]:
         headers: dict[str, str] = {
@@ -1,97 +1,206 @@
 """
 并发刮削服务 - 提供异步并发刮削能力
+
+各站点爬虫的构造（域名探测、会话预热）和 get_info 都在常驻线程池中执行，每个站点有独立的等待上限；开启先到先得时，
+必需字段（标题/封面/演员）一旦由已返回的站点凑齐，只再等待一个宽限期收集补充信息，
+不再被最慢或已失联的站点拖住。同步调用复用一个常驻事件循环，不再每次新建线程池和事件循环。
 """
 import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional
 
-from starlette.concurrency import run_in_threadpool
-
 from app.schema.video import VideoDetail
 from app.utils.logger import logger
-from app.utils.spider import get_spiders
+from app.utils.singleflight import SingleFlight
+from app.utils.spider import SPIDER_CLASSES, miss_cache
+from app.utils.spider.metadata_store import COMMENTS, DOWNLOADS, METADATA, PREVIEWS, metadata_store, \
+    requested_groups
+from app.utils.spider.spider_exception import SpiderNotFound
+
+# 先到先得模式下判断"已可用"的字段
+REQUIRED_FIELDS = ("title", "cover", "actors")
+# 站点明确未收录该番号时 _get_video_by_spider 的返回值，与超时、出错区分
+NOT_FOUND = object()
 
 
 class SpiderService:
     """并发刮削服务"""
 
-    def __init__(self, max_concurrent: Optional[int] = None):
-        # 从配置中读取并发数，如果未提供则使用配置默认值
+    def __init__(self, max_concurrent: Optional[int] = None,
+                 spider_timeout: Optional[float] = None,
+                 first_hit: Optional[bool] = None,
+                 grace_period: Optional[float] = None):
+        # 未显式传入的参数从配置读取
+        from app.schema.setting import Setting
+        app_setting = Setting().app
         if max_concurrent is None:
-            from app.schema.setting import Setting
-            setting = Setting()
-            max_concurrent = setting.app.max_concurrent_spiders
+            max_concurrent = app_setting.max_concurrent_spiders
 
         self.max_concurrent = max_concurrent
-        self.semaphore = asyncio.Semaphore(max_concurrent)
-
-    def _get_spiders(self):
-        """获取所有可用的爬虫"""
-        return get_spiders()
+        self.spider_timeout = app_setting.scrape_spider_timeout if spider_timeout is None else spider_timeout
+        self.first_hit = app_setting.scrape_first_hit if first_hit is None else first_hit
+        self.grace_period = app_setting.scrape_grace_period if grace_period is None else grace_period
+        # 线程池常驻复用，同时限制同时进行的站点请求数
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="spider")
+        # 同一番号、同样选项的并发刮削合并为一次
+        self._flight = SingleFlight()
+
+    def _get_spider_classes(self):
+        """获取所有可用的爬虫类，实例在线程池中构造"""
+        return list(SPIDER_CLASSES)
+
+    def _get_video_by_spider(self, spider_cls, number: str,
+                             include_downloads: bool = True,
+                             include_previews: bool = True,
+                             include_comments: bool = True):
+        """单个爬虫刮削，在线程池中执行"""
+        try:
+            start_time = time.time()
+            spider = spider_cls()
+            result = spider.get_info(
+                number,
+                include_downloads=include_downloads,
+                include_previews=include_previews,
+                include_comments=include_comments
+            )
+            execution_time = time.time() - start_time
+            logger.info(f"{spider_cls.name} 刮削完成，耗时: {execution_time:.2f}秒")
+            miss_cache.clear_miss(spider_cls.name, number)
+            return result
+        except SpiderNotFound:
+            ttl = miss_cache.record_miss(spider_cls.name, number)
+            logger.info(f"{spider_cls.name} 未收录番号 {number}，{ttl // 3600} 小时内不再查询")
+            return NOT_FOUND
+        except Exception as e:
+            logger.error(f"{spider_cls.name} 刮削失败: {str(e)}")
+            return None
 
-    async def _get_video_by_spider_async(self, spider, number: str,
+    async def _get_video_by_spider_async(self, spider_cls, number: str,
                                          include_downloads: bool = True,
                                          include_previews: bool = True,
                                          include_comments: bool = True):
         """异步版本的单个爬虫刮削"""
-        async with self.semaphore:
-            def __get_video_by_spider():
-                try:
-                    start_time = time.time()
-                    result = spider.get_info(
-                        number,
-                        include_downloads=include_downloads,
-                        include_previews=include_previews,
-                        include_comments=include_comments
-                    )
-                    execution_time = time.time() - start_time
-                    logger.info(f"{spider.name} 刮削完成，耗时: {execution_time:.2f}秒")
-                    return result
-                except Exception as e:
-                    logger.error(f"{spider.name} 刮削失败: {str(e)}")
-                    return None
-
-            return await run_in_threadpool(__get_video_by_spider)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self._get_video_by_spider, spider_cls, number,
+            include_downloads, include_previews, include_comments
+        )
+
+    @staticmethod
+    def _missing_required(results: List[VideoDetail]) -> List[str]:
+        return [field for field in REQUIRED_FIELDS if not any(getattr(r, field, None) for r in results)]
 
     async def get_video_info_async(self, number: str,
                                    include_downloads: bool = True,
                                    include_previews: bool = True,
-                                   include_comments: bool = True) -> Optional[VideoDetail]:
-        """异步版本的视频信息获取"""
+                                   include_comments: bool = True,
+                                   first_hit: Optional[bool] = None) -> Optional[VideoDetail]:
+        """异步版本的视频信息获取
+
+        每个站点最多等待 spider_timeout 秒；first_hit 为 True 时（默认取配置），必需字段凑齐后
+        只再等待 grace_period 秒，之后返回的站点结果不再合并。
+        同一番号、同样选项的并发调用（包括 get_video_info_sync）共享一次刮削。
+        """
+        first_hit = self.first_hit if first_hit is None else first_hit
+        key = ((number or "").strip().upper(), include_downloads, include_previews, include_comments, first_hit)
+        if self._flight.in_flight(key):
+            logger.info(f"番号 {number} 正在刮削中，等待共享结果")
+        return await self._flight.do_async(
+            key, self._scrape, number, include_downloads, include_previews, include_comments, first_hit
+        )
+
+    async def _scrape(self, number: str, include_downloads: bool, include_previews: bool,
+                      include_comments: bool, first_hit: bool) -> Optional[VideoDetail]:
+        # 已保存的结果中仍在有效期内的字段组不再抓取
+        stored = await asyncio.to_thread(metadata_store.load, number)
+        groups = requested_groups(include_downloads, include_previews, include_comments)
+        if stored is not None:
+            stale = stored.stale_groups(groups, datetime.now())
+            if not stale:
+                logger.info(f"番号 {number} 使用已保存的刮削结果")
+                return stored.detail
+            groups = (METADATA, *[group for group in stale if group != METADATA])
+            include_downloads = DOWNLOADS in groups
+            include_previews = PREVIEWS in groups
+            include_comments = COMMENTS in groups
+
         logger.info(f"开始并发刮削番号: {number}")
         start_time = time.time()
 
-        spiders = self._get_spiders()
+        spiders = []
+        for spider_cls in self._get_spider_classes():
+            if miss_cache.is_known_miss(spider_cls.name, number):
+                logger.info(f"{spider_cls.name} 近期未收录番号 {number}，跳过")
+            else:
+                spiders.append(spider_cls)
         logger.info(f"准备使用 {len(spiders)} 个爬虫进行并发刮削")
 
-        tasks = [
-            self._get_video_by_spider_async(
+        loop = asyncio.get_running_loop()
+        tasks = {
+            asyncio.ensure_future(self._get_video_by_spider_async(
                 spider, number, include_downloads, include_previews, include_comments
-            )
-            for spider in spiders
-        ]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        valid_results = []
-        for i, result in enumerate(results):
-            if result is not None and not isinstance(result, Exception):
-                valid_results.append(result)
-                logger.info(f"爬虫 {spiders[i].name} 成功获取数据")
-            elif isinstance(result, Exception):
-                logger.error(f"爬虫 {spiders[i].name} 执行异常: {str(result)}")
-            else:
-                logger.warning(f"爬虫 {spiders[i].name} 未获取到数据")
-
+            )): index
+            for index, spider in enumerate(spiders)
+        }
+        results = {}
+        # 明确未收录的站点也算给出了结果
+        answered = 0
+        pending = set(tasks)
+        deadline = loop.time() + self.spider_timeout
+        grace_deadline = None
+
+        while pending:
+            timeout = (grace_deadline or deadline) - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = tasks[task]
+                result = None if task.cancelled() else task.exception() or task.result()
+                if isinstance(result, VideoDetail):
+                    results[index] = result
+                    answered += 1
+                    logger.info(f"爬虫 {spiders[index].name} 成功获取数据")
+                elif result is NOT_FOUND:
+                    answered += 1
+                elif isinstance(result, BaseException):
+                    logger.error(f"爬虫 {spiders[index].name} 执行异常: {str(result)}")
+                else:
+                    logger.warning(f"爬虫 {spiders[index].name} 未获取到数据")
+            if first_hit and grace_deadline is None and results \
+                    and not self._missing_required(list(results.values())):
+                grace_deadline = min(deadline, loop.time() + self.grace_period)
+                if pending:
+                    logger.info(f"番号 {number} 必需字段已齐全，最多再等待 {self.grace_period} 秒补充信息")
+
+        # 线程中的请求无法中断，超时站点的结果直接丢弃
+        for task in pending:
+            task.cancel()
+            logger.warning(f"爬虫 {spiders[tasks[task]].name} 未在时限内返回，跳过")
+
+        valid_results = [results[index] for index in sorted(results)]
+        # 合并会修改第一个结果，各站点原始结果先复制一份用于保存
+        sources = {spiders[index].name: results[index].model_copy(deep=True) for index in sorted(results)}
         total_time = time.time() - start_time
         logger.info(f"并发刮削完成，总耗时: {total_time:.2f}秒，成功: {len(valid_results)}/{len(spiders)}")
 
         if not valid_results:
             logger.error(f"所有爬虫都未能获取到番号 {number} 的信息")
+            if stored is not None:
+                logger.warning(f"番号 {number} 使用已保存的刮削结果")
+                return stored.detail
             return None
 
         merged_result = self._merge_video_info(valid_results)
+        # 有站点超时、出错或在宽限期后才返回时不推进抓取时间，下次补齐
+        saved = await asyncio.to_thread(
+            metadata_store.save, number, merged_result, groups, sources, answered == len(spiders)
+        )
+        if saved is not None:
+            merged_result = saved.detail
         logger.info(f"数据合并完成，最终结果包含 {len(merged_result.downloads or [])} 个下载链接")
 
         return merged_result
@@ -142,23 +251,42 @@ async def get_video_info_async(number: str,
     )
 
 
+class _BackgroundLoop:
+    """常驻后台事件循环，供同步代码提交协程"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="spider-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro):
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("不能在刮削事件循环线程内同步等待刮削结果")
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+
+_background_loop = _BackgroundLoop()
+
+
 def get_video_info_sync(number: str,
                         include_downloads: bool = True,
                         include_previews: bool = True,
                         include_comments: bool = True) -> Optional[VideoDetail]:
     """同步版本的视频信息获取 - 保持向后兼容"""
-    try:
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(
-                asyncio.run,
-                get_video_info_async(number, include_downloads, include_previews, include_comments)
-            )
-            return future.result()
-    except RuntimeError:
-        return asyncio.run(
-            get_video_info_async(number, include_downloads, include_previews, include_comments)
-        )
+    return _background_loop.run(
+        get_video_info_async(number, include_downloads, include_previews, include_comments)
+    )
 
 
 def get_video_info_with_config(number: str,
@@ -1,7 +1,9 @@
 import re
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from random import randint
 
 from fastapi import Depends
@@ -17,6 +19,7 @@ from app.exception import BizException
 from app.service.base import BaseService
 from app.service.download_filter import DownloadFilterService
 from app.utils import spider, notify
+from app.utils.host_limiter import host_rate_limiter
 from app.utils.logger import logger
 from app.utils.qbittorent import qbittorent
 from app.utils.spider import JavdbSpider
@@ -108,64 +111,92 @@ class SubscribeService(BaseService):
     def do_subscribe(self):
         subscribes = self.get_subscribes()
         logger.info(f"获取到{len(subscribes)}个订阅")
+        if not subscribes:
+            return
+
+        # 按番号去重后在线程池中并发刮削（同站点受 host_rate_limiter 限速），
+        # 匹配和下载按完成顺序在当前线程执行，Session 不跨线程使用
+        setting = Setting().app
+        host_rate_limiter.configure(
+            min_interval=setting.host_request_interval,
+            jitter=setting.host_request_jitter,
+            max_concurrency=setting.host_max_concurrency,
+        )
+        by_num = {}
         for subscribe in subscribes:
-            time.sleep(randint(30, 60))
+            by_num.setdefault(subscribe.num, []).append(subscribe)
+
+        max_workers = max(1, min(setting.max_concurrent_spiders, len(by_num)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="subscribe") as executor:
+            futures = {executor.submit(self._fetch_video, num): num for num in by_num}
+            for future in as_completed(futures):
+                video = future.result()
+                for subscribe in by_num[futures[future]]:
+                    self._resolve_subscribe(subscribe, video)
+
+    @staticmethod
+    def _fetch_video(num: str):
+        try:
+            return spider.get_video(num, rate_limiter=host_rate_limiter, use_cache=True, use_stored=False)
+        except Exception as e:
+            logger.error(f"刮削番号《{num}》失败: {e}")
+            return None
 
-            result = spider.get_video(subscribe.num)
-            if not result:
-                logger.error("所有站点均未获取到影片")
-                continue
-
-            def get_matched(item):
-                if subscribe.is_hd and not item.is_hd:
-                    logger.error(f"{item.name} 不匹配高清，已跳过")
-                    return False
-                if subscribe.is_zh and not item.is_zh:
-                    logger.error(f"{item.name} 不匹配中文，已跳过")
-                    return False
-                if subscribe.is_uncensored and not item.is_uncensored:
-                    logger.error(f"{item.name} 不匹配无码，已跳过")
-                    return False
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile_keyword(pattern: str):
+        """订阅关键字编译后缓存，正则无效时返回 None（跳过该关键字过滤）"""
+        try:
+            return re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            logger.error(f"正则表达式错误: {e}，跳过关键字过滤")
+            return None
 
-                try:
-                    if subscribe.include_keyword and not re.search(
-                        subscribe.include_keyword, item.name, re.IGNORECASE
-                    ):
-                        logger.error(f"{item.name} 不匹配包含关键字，已跳过")
-                        return False
-
-                    if subscribe.exclude_keyword and re.search(
-                        subscribe.exclude_keyword, item.name, re.IGNORECASE
-                    ):
-                        logger.error(f"{item.name} 匹配排除关键字，已跳过")
-                        return False
-                except re.error as e:
-                    logger.error(f"正则表达式错误: {e}，跳过关键字过滤")
-                    # 正则表达式无效时，继续处理不过滤
-                    pass
-
-                return True
-
-            result = list(filter(get_matched, result.downloads))
-            if not result:
-                logger.error(f"未匹配到符合条件的影片")
-                continue
-
-            logger.info(f"匹配到符合条件的影片{len(result)}部，将选择最新发布的影片")
-            matched = result[0]
-            if matched:
-                try:
-                    self.download_video(
-                        schema.SubscribeCreate.model_validate(subscribe), matched
-                    )
-                    logger.info(f"订阅《{subscribe.num}》已完成")
-                    subscribe.update(self.db, {"status": SubscribeStatus.COMPLETED})
-                    self.db.commit()
-                except Exception as e:
-                    self.db.rollback()
-                    logger.error("下载任务创建失败")
-                    traceback.print_exc()
-                    continue
+    def _resolve_subscribe(self, subscribe: Subscribe, video):
+        """从刮削结果中挑选符合订阅条件的资源并下载"""
+        if not video:
+            logger.error(f"订阅《{subscribe.num}》所有站点均未获取到影片")
+            return
+
+        include = self._compile_keyword(subscribe.include_keyword) if subscribe.include_keyword else None
+        exclude = self._compile_keyword(subscribe.exclude_keyword) if subscribe.exclude_keyword else None
+
+        def get_matched(item):
+            if subscribe.is_hd and not item.is_hd:
+                logger.error(f"{item.name} 不匹配高清，已跳过")
+                return False
+            if subscribe.is_zh and not item.is_zh:
+                logger.error(f"{item.name} 不匹配中文，已跳过")
+                return False
+            if subscribe.is_uncensored and not item.is_uncensored:
+                logger.error(f"{item.name} 不匹配无码，已跳过")
+                return False
+            if include and not include.search(item.name):
+                logger.error(f"{item.name} 不匹配包含关键字，已跳过")
+                return False
+            if exclude and exclude.search(item.name):
+                logger.error(f"{item.name} 匹配排除关键字，已跳过")
+                return False
+            return True
+
+        result = list(filter(get_matched, video.downloads or []))
+        if not result:
+            logger.error(f"订阅《{subscribe.num}》未匹配到符合条件的影片")
+            return
+
+        logger.info(f"匹配到符合条件的影片{len(result)}部，将选择最新发布的影片")
+        matched = result[0]
+        try:
+            self.download_video(
+                schema.SubscribeCreate.model_validate(subscribe), matched
+            )
+            logger.info(f"订阅《{subscribe.num}》已完成")
+            subscribe.update(self.db, {"status": SubscribeStatus.COMPLETED})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            logger.error("下载任务创建失败")
+            traceback.print_exc()
 
     def download_video(
         self,
@@ -247,8 +278,8 @@ class SubscribeService(BaseService):
             )
             from app.utils import spider
 
-            # 获取视频详情以获取演员信息
-            video_detail = spider.get_video(video.num)
+            # 获取视频详情以获取演员信息（下载前通常刚刮削过，优先复用）
+            video_detail = spider.get_video(video.num, use_cache=True)
             if not video_detail:
                 logger.info(f"[智能下载] 未能获取视频详情: {video.num}")
                 return
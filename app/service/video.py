@@ -13,9 +13,10 @@ from app.exception import BizException
 from app.schema import VideoList, VideoDetail, Setting, VideoNotify
 from app.schema.video import VideoActor
 from app.service.base import BaseService
-from app.utils import nfo, spider, num_parser, cache, notify
+from app.utils import nfo, spider, num_parser, notify
+from app.utils.cover_cache import cover_cache
 from app.service.spider import get_video_info_with_config
-from app.utils.image import save_images
+from app.utils.image import save_images, current_image_batch
 from app.utils.logger import logger
 
 
@@ -154,9 +155,9 @@ class VideoService(BaseService):
         if not video:
             raise BizException("未找到该番号")
 
-        cache.clean_cache_file("cover", video.cover)
+        cover_cache.remove(video.cover)
         for actor in video.actors:
-            cache.clean_cache_file("cover", actor.thumb)
+            cover_cache.remove(actor.thumb)
 
         return video
 
@@ -188,22 +189,47 @@ class VideoService(BaseService):
 
         dest_path = self.trans(video, setting.app.video_path, trans_mode)
         if dest_path != source_path:
-            history = History(
-                status=1,
-                num=video.num,
-                is_zh=video.is_zh,
-                is_uncensored=video.is_uncensored,
-                source_path=source_path,
-                dest_path=dest_path,
-                trans_method=trans_mode,
-            )
-            history.add(self.db)
-            self.db.commit()
-
-            video_notify.is_success = True
-            notify.send_video(video_notify)
+            images = current_image_batch()
+            if images is None:
+                self._record_saved(video, video_notify, source_path, dest_path, trans_mode)
+            else:
+                # 批次中图片尚未生成，等生成结果出来后再记录历史并通知
+                images.when_done(
+                    [dest_path],
+                    lambda failed: self._record_saved(
+                        video, video_notify, source_path, dest_path, trans_mode, failed
+                    ),
+                )
 
         video_cache.pop("videos", None)
+        return dest_path
+
+    def _record_saved(
+        self,
+        video: VideoDetail,
+        video_notify: VideoNotify,
+        source_path: str,
+        dest_path: str,
+        trans_mode: str,
+        failed: Optional[list] = None,
+    ):
+        history = History(
+            status=0 if failed else 1,
+            num=video.num,
+            is_zh=video.is_zh,
+            is_uncensored=video.is_uncensored,
+            source_path=source_path,
+            dest_path=dest_path,
+            trans_method=trans_mode,
+        )
+        history.add(self.db)
+        self.db.commit()
+
+        video_notify.is_success = not failed
+        if failed:
+            video_notify.message = "封面及水印图片生成失败"
+            logger.error(f"影片《{video.num}》整理失败，{video_notify.message}")
+        notify.send_video(video_notify)
 
     def trans(self, video: VideoDetail, video_path: str, trans_mode: str):
         if not os.path.exists(video.path):
@@ -2,20 +2,52 @@
 视频缓存服务 - 管理预抓取的视频数据
 """
 
+import concurrent.futures
 import traceback
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from sqlalchemy import and_, or_, desc, func
-from sqlalchemy.orm import Session
-
-from app.db.models.video_cache import VideoCache
+from sqlalchemy import and_, or_, desc, distinct, func, insert, null, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, contains_eager
+
+from app.db.models.video_cache import (
+    CachedVideo,
+    VideoCache,
+    VideoCacheActor,
+    VideoCacheTag,
+    actor_link_values,
+    normalize_actor_id,
+    normalize_tag_value,
+    tag_link_values,
+)
 from app.schema.setting import Setting
 from app.service.base import BaseService
 from app.utils import spider
+from app.utils.host_limiter import host_rate_limiter
 from app.utils.async_logger import get_logger
 
 logger = get_logger()
 
+# SQLite 旧版本默认最多 999 个绑定参数，批量 upsert 按此上限分批
+UPSERT_MAX_VARIABLES = 900
+
+# cached_video / video_cache 各自写入的字段
+VIDEO_FIELDS = (
+    "num", "title", "cover", "url", "rating", "comments_count", "release_date", "is_hd", "is_zh",
+    "is_uncensored", "actors", "tags", "magnets", "extra_data", "created_at", "updated_at", "fetched_at",
+    "create_time",
+)
+RANKING_FIELDS = (
+    "num", "source", "video_type", "cycle", "rank_position", "created_at", "updated_at", "fetched_at",
+    "create_time",
+)
+
+# 抓取结果缺少这些字段时保留数据库中的原值
+KEEP_EXISTING_WHEN_MISSING = (
+    "title", "cover", "url", "rating", "release_date", "actors", "tags", "magnets", "extra_data",
+)
+
 
 class VideoCacheService(BaseService):
     """视频缓存服务 - 提供统一的视频数据访问接口"""
@@ -49,26 +81,60 @@ class VideoCacheService(BaseService):
 
         stats = {"total_fetched": 0, "total_new": 0, "total_updated": 0, "errors": []}
 
+        # 每个数据源只初始化一次爬虫（JavDB 初始化时会探测可用镜像）
+        spiders = {}
         for source in sources:
-            for video_type in video_types:
-                for cycle in cycles:
-                    try:
-                        count = self._fetch_and_cache_single_ranking(
-                            source, video_type, cycle, max_pages, apply_delay
-                        )
-                        stats["total_fetched"] += count["fetched"]
-                        stats["total_new"] += count["new"]
-                        stats["total_updated"] += count["updated"]
-
-                        logger.info(
-                            f"缓存完成: {source} {video_type} {cycle} - "
-                            f"抓取{count['fetched']}个, 新增{count['new']}个, 更新{count['updated']}个"
-                        )
-                    except Exception as e:
-                        error_msg = f"抓取失败 {source} {video_type} {cycle}: {str(e)}"
-                        logger.error(error_msg)
-                        logger.debug(traceback.format_exc())
-                        stats["errors"].append(error_msg)
+            spider_instance = self._get_spider(source)
+            if spider_instance:
+                spiders[source] = spider_instance
+            else:
+                stats["errors"].append(f"不支持的数据源: {source}")
+
+        rankings = [
+            (source, video_type, cycle)
+            for source in spiders
+            for video_type in video_types
+            for cycle in cycles
+        ]
+        if not rankings:
+            return stats
+
+        setting = Setting().app
+        host_rate_limiter.configure(
+            min_interval=setting.host_request_interval,
+            jitter=setting.host_request_jitter,
+            max_concurrency=setting.host_max_concurrency,
+        )
+        max_workers = max(1, min(setting.max_concurrent_spiders, len(rankings)))
+
+        # 抓取在线程池中并发执行（同站点受 host_rate_limiter 限速），
+        # 解析结果按完成顺序在当前线程写入数据库，Session 不跨线程使用
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ranking") as executor:
+            futures = {
+                executor.submit(
+                    self._fetch_ranking, spiders[source], video_type, cycle, max_pages, apply_delay
+                ): (source, video_type, cycle)
+                for source, video_type, cycle in rankings
+            }
+            for future in concurrent.futures.as_completed(futures):
+                source, video_type, cycle = futures[future]
+                try:
+                    videos = future.result()
+                    count = self._cache_ranking(source, video_type, cycle, videos)
+                    stats["total_fetched"] += count["fetched"]
+                    stats["total_new"] += count["new"]
+                    stats["total_updated"] += count["updated"]
+
+                    logger.info(
+                        f"缓存完成: {source} {video_type} {cycle} - "
+                        f"抓取{count['fetched']}个, 新增{count['new']}个, 更新{count['updated']}个"
+                    )
+                except Exception as e:
+                    self.db.rollback()
+                    error_msg = f"抓取失败 {source} {video_type} {cycle}: {str(e)}"
+                    logger.error(error_msg)
+                    logger.debug(traceback.format_exc())
+                    stats["errors"].append(error_msg)
 
         logger.info(
             f"视频缓存更新完成: 总计抓取{stats['total_fetched']}个, "
@@ -90,60 +156,49 @@ class VideoCacheService(BaseService):
         if not spider_instance:
             raise ValueError(f"不支持的数据源: {source}")
 
-        # 获取排行榜数据（包含详细信息）
-        if hasattr(spider_instance, "get_ranking_with_details"):
-            videos = spider_instance.get_ranking_with_details(
-                video_type, cycle, max_pages, apply_delay=apply_delay
-            )
-        else:
+        videos = self._fetch_ranking(spider_instance, video_type, cycle, max_pages, apply_delay)
+        return self._cache_ranking(source, video_type, cycle, videos)
+
+    @staticmethod
+    def _fetch_ranking(spider_instance, video_type: str, cycle: str, max_pages: int,
+                       apply_delay: bool = True) -> List[Dict]:
+        """抓取排行榜数据（可在工作线程中执行，不访问数据库）"""
+        # 请求间隔由站点限速器统一控制，不再在爬虫内部随机等待
+        limiter = host_rate_limiter.slot(spider_instance.host) if apply_delay else nullcontext()
+        with limiter:
+            # 获取排行榜数据（包含详细信息）
+            if hasattr(spider_instance, "get_ranking_with_details"):
+                return spider_instance.get_ranking_with_details(
+                    video_type, cycle, max_pages, apply_delay=False
+                )
             # 降级方案：获取基础排行榜
             videos = spider_instance.get_ranking(video_type, cycle)
-            if not isinstance(videos, list):
-                videos = []
-
-        new_count = 0
-        updated_count = 0
+            return videos if isinstance(videos, list) else []
 
+    def _cache_ranking(
+        self, source: str, video_type: str, cycle: str, videos: List[Dict]
+    ) -> Dict[str, int]:
+        """将一个榜单的抓取结果批量写入缓存"""
+        rows = {}
         for idx, video in enumerate(videos, 1):
             try:
-                # 检查是否已存在
-                existing = (
-                    self.db.query(VideoCache)
-                    .filter(
-                        and_(
-                            VideoCache.num == video.get("num"),
-                            VideoCache.source == source,
-                            VideoCache.video_type == video_type,
-                            VideoCache.cycle == cycle,
-                        )
-                    )
-                    .first()
-                )
-
-                if existing:
-                    # 更新现有记录
-                    self._update_video_cache(existing, video, idx)
-                    updated_count += 1
-                else:
-                    # 创建新记录
-                    cache_entry = self._create_video_cache(
-                        video, source, video_type, cycle, idx
-                    )
-                    self.db.add(cache_entry)
-                    new_count += 1
-
+                values = self._build_cache_values(video, source, video_type, cycle, idx)
             except Exception as e:
                 logger.error(f"缓存视频失败 {video.get('num')}: {str(e)}")
                 logger.debug(traceback.format_exc())
+                continue
+            # 同一榜单中重复出现的番号以首次出现的排名为准
+            rows.setdefault(values["num"], values)
 
+        counts = self._upsert_cache_rows(source, video_type, cycle, list(rows.values()))
         self.db.commit()
 
-        return {"fetched": len(videos), "new": new_count, "updated": updated_count}
+        return {"fetched": len(videos), **counts}
 
-    def _create_video_cache(
+    def _build_cache_values(
         self, video: Dict, source: str, video_type: str, cycle: str, rank_position: int
-    ) -> VideoCache:
-        """创建视频缓存记录"""
+    ) -> Dict[str, Any]:
+        """校验抓取结果并转换为视频缓存表的字段"""
         # 数据验证
         if not video.get("num"):
             raise ValueError(f"视频番号不能为空: {video}")
@@ -180,49 +235,133 @@ class VideoCacheService(BaseService):
                 )
                 comments_count = 0
 
-        return VideoCache(
-            num=video.get("num"),
-            title=video.get("title"),
-            cover=video.get("cover"),
-            url=video.get("url"),
-            rating=rating,
-            comments_count=comments_count,
-            release_date=video.get("release_date"),
-            is_hd=video.get("is_hd", False),
-            is_zh=video.get("is_zh", False),
-            is_uncensored=video_type == "uncensored",
-            actors=video.get("actors", []),
-            tags=video.get("tags", []),
-            magnets=video.get("magnets", []),
-            source=source,
-            video_type=video_type,
-            cycle=cycle,
-            rank_position=rank_position,
-            extra_data=video.get("extra_data"),
-            fetched_at=datetime.now(),
+        now = datetime.now()
+        return {
+            "num": video.get("num"),
+            "title": video.get("title"),
+            "cover": video.get("cover"),
+            "url": video.get("url"),
+            "rating": rating,
+            "comments_count": comments_count or 0,
+            "release_date": video.get("release_date"),
+            "is_hd": bool(video.get("is_hd", False)),
+            "is_zh": bool(video.get("is_zh", False)),
+            "is_uncensored": video_type == "uncensored",
+            "actors": video.get("actors"),
+            "tags": video.get("tags"),
+            "magnets": video.get("magnets"),
+            "source": source,
+            "video_type": video_type,
+            "cycle": cycle,
+            "rank_position": rank_position,
+            "extra_data": video.get("extra_data"),
+            "created_at": now,
+            "updated_at": now,
+            "fetched_at": now,
+            "create_time": now,
+        }
+
+    def _upsert_cache_rows(
+        self, source: str, video_type: str, cycle: str, rows: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        批量 upsert 一个榜单的数据
+
+        元数据按番号写入 cached_video（同一番号在多个榜单中只保存一份），
+        榜单成员按 (num, source, video_type, cycle) 写入 video_cache。
+        每批各一条 INSERT ... ON CONFLICT DO UPDATE，抓取结果中缺失的字段保留原值；
+        演员/标签关联行按批删除后重新插入。
+        """
+        if not rows:
+            return {"new": 0, "updated": 0}
+
+        ranking_filter = and_(
+            VideoCache.source == source,
+            VideoCache.video_type == video_type,
+            VideoCache.cycle == cycle,
         )
+        new_count = 0
+        # SQLite 单条语句的绑定参数数量有限，按列数计算每批行数
+        batch_size = max(1, UPSERT_MAX_VARIABLES // len(VIDEO_FIELDS))
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            nums = [row["num"] for row in batch]
+            existing = {
+                num for (num,) in self.db.query(VideoCache.num).filter(ranking_filter, VideoCache.num.in_(nums))
+            }
+            new_count += len(set(nums) - existing)
+
+            self._upsert_videos(batch)
+            video_ids = dict(self.db.query(CachedVideo.num, CachedVideo.id).filter(CachedVideo.num.in_(nums)))
+            self._upsert_rankings(batch, video_ids)
+            self._replace_link_rows(batch, video_ids)
+
+        return {"new": new_count, "updated": len(rows) - new_count}
+
+    def _upsert_videos(self, batch: List[Dict[str, Any]]):
+        table = CachedVideo.__table__
+        # JSON 列的 None 会被序列化为 'null'，这里显式写入 SQL NULL 以便 coalesce 保留原值
+        stmt = sqlite_insert(table).values(
+            [{key: null() if row[key] is None else row[key] for key in VIDEO_FIELDS} for row in batch]
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.num],
+            set_={
+                **{
+                    name: func.coalesce(excluded[name], table.c[name])
+                    for name in KEEP_EXISTING_WHEN_MISSING
+                },
+                "comments_count": excluded.comments_count,
+                "is_hd": excluded.is_hd,
+                "is_zh": excluded.is_zh,
+                "is_uncensored": excluded.is_uncensored,
+                "updated_at": excluded.updated_at,
+                "fetched_at": excluded.fetched_at,
+                "update_time": excluded.updated_at,
+            },
+        )
+        self.db.execute(stmt)
 
-    def _update_video_cache(
-        self, existing: VideoCache, video: Dict, rank_position: int
-    ):
-        """更新视频缓存记录"""
-        existing.title = video.get("title", existing.title)
-        existing.cover = video.get("cover", existing.cover)
-        existing.url = video.get("url", existing.url)
-        existing.rating = video.get("rating", existing.rating)
-        existing.comments_count = video.get("comments") or video.get(
-            "comments_count", existing.comments_count
+    def _upsert_rankings(self, batch: List[Dict[str, Any]], video_ids: Dict[str, int]):
+        table = VideoCache.__table__
+        stmt = sqlite_insert(table).values(
+            [{"video_id": video_ids[row["num"]], **{key: row[key] for key in RANKING_FIELDS}} for row in batch]
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.num, table.c.source, table.c.video_type, table.c.cycle],
+            set_={
+                "video_id": excluded.video_id,
+                "rank_position": excluded.rank_position,
+                "updated_at": excluded.updated_at,
+                "fetched_at": excluded.fetched_at,
+                "update_time": excluded.updated_at,
+            },
         )
-        existing.release_date = video.get("release_date", existing.release_date)
-        existing.is_hd = video.get("is_hd", existing.is_hd)
-        existing.is_zh = video.get("is_zh", existing.is_zh)
-        existing.actors = video.get("actors", existing.actors)
-        existing.tags = video.get("tags", existing.tags)
-        existing.magnets = video.get("magnets", existing.magnets)
-        existing.rank_position = rank_position
-        existing.extra_data = video.get("extra_data", existing.extra_data)
-        existing.updated_at = datetime.now()
-        existing.fetched_at = datetime.now()
+        self.db.execute(stmt)
+
+    def _replace_link_rows(self, batch: List[Dict[str, Any]], video_ids: Dict[str, int]):
+        """批量重建演员/标签关联行（upsert 不经过 ORM 事件）"""
+        now = datetime.now()
+        for model, field, build in (
+            (VideoCacheActor, "actors", actor_link_values),
+            (VideoCacheTag, "tags", tag_link_values),
+        ):
+            targets = {video_ids[row["num"]]: row[field] for row in batch if row[field] is not None}
+            if not targets:
+                continue
+            self.db.query(model).filter(model.video_id.in_(list(targets))).delete(
+                synchronize_session=False
+            )
+            link_rows = [
+                {"video_id": video_id, "create_time": now, **item}
+                for video_id, values in targets.items()
+                for item in build(values)
+            ]
+            if link_rows:
+                self.db.execute(insert(model), link_rows)
 
     def query_videos(
         self,
@@ -263,41 +402,20 @@ class VideoCacheService(BaseService):
         Returns:
             ���频列表
         """
-        query = self.db.query(VideoCache)
-
-        normalized_required_actor_id = (
-            str(required_actor_id).strip() if required_actor_id is not None else ""
+        query = (
+            self.db.query(VideoCache)
+            .join(CachedVideo, VideoCache.video_id == CachedVideo.id)
+            .options(contains_eager(VideoCache.video))
         )
 
-        def _normalize_tag_value(tag: Any) -> str:
-            if isinstance(tag, dict):
-                raw_value = (
-                    tag.get("name")
-                    or tag.get("tag")
-                    or tag.get("value")
-                    or tag.get("label")
-                )
-            else:
-                raw_value = tag
-            return str(raw_value).strip().lower() if raw_value is not None else ""
-
+        normalized_required_actor_id = normalize_actor_id(required_actor_id)
         normalized_required_tags = {
-            _normalize_tag_value(tag)
-            for tag in (required_tags or [])
-            if _normalize_tag_value(tag)
+            normalize_tag_value(tag) for tag in (required_tags or []) if normalize_tag_value(tag)
         }
         normalized_exclude_tags = {
-            _normalize_tag_value(tag)
-            for tag in (exclude_tags or [])
-            if _normalize_tag_value(tag)
+            normalize_tag_value(tag) for tag in (exclude_tags or []) if normalize_tag_value(tag)
         }
 
-        has_memory_filters = bool(
-            normalized_required_actor_id
-            or normalized_required_tags
-            or normalized_exclude_tags
-        )
-
         # 时间范围过滤
         if days > 0:
             release_cutoff = (datetime.now() - timedelta(days=days)).strftime(
@@ -307,14 +425,14 @@ class VideoCacheService(BaseService):
             query = query.filter(
                 or_(
                     and_(
-                        VideoCache.release_date.isnot(None),
-                        VideoCache.release_date != "",
-                        VideoCache.release_date >= release_cutoff,
+                        CachedVideo.release_date.isnot(None),
+                        CachedVideo.release_date != "",
+                        CachedVideo.release_date >= release_cutoff,
                     ),
                     and_(
                         or_(
-                            VideoCache.release_date.is_(None),
-                            VideoCache.release_date == "",
+                            CachedVideo.release_date.is_(None),
+                            CachedVideo.release_date == "",
                         ),
                         VideoCache.fetched_at >= fallback_fetched_cutoff,
                     ),
@@ -323,19 +441,19 @@ class VideoCacheService(BaseService):
 
         # 评分过滤
         if min_rating is not None and min_rating > 0:
-            query = query.filter(VideoCache.rating >= min_rating)
+            query = query.filter(CachedVideo.rating >= min_rating)
 
         # 评论数过滤
         if min_comments is not None and min_comments > 0:
-            query = query.filter(VideoCache.comments_count >= min_comments)
+            query = query.filter(CachedVideo.comments_count >= min_comments)
 
         # 属性过滤
         if is_hd:
-            query = query.filter(VideoCache.is_hd.is_(True))
+            query = query.filter(CachedVideo.is_hd.is_(True))
         if is_zh:
-            query = query.filter(VideoCache.is_zh.is_(True))
+            query = query.filter(CachedVideo.is_zh.is_(True))
         if is_uncensored is not None:
-            query = query.filter(VideoCache.is_uncensored == is_uncensored)
+            query = query.filter(CachedVideo.is_uncensored == is_uncensored)
 
         # 数据源过滤
         if sources:
@@ -347,81 +465,42 @@ class VideoCacheService(BaseService):
 
         # 排序：优先按评分和评论数排序
         query = query.order_by(
-            desc(VideoCache.rating),
-            desc(VideoCache.comments_count),
+            desc(CachedVideo.rating),
+            desc(CachedVideo.comments_count),
             desc(VideoCache.fetched_at),
         )
 
-        # 分页
-        if has_memory_filters:
-            prefetch_limit = max(limit + max(offset, 0), 1000)
-            query = query.limit(prefetch_limit)
-        else:
-            query = query.limit(limit).offset(offset)
-
-        results = query.all()
-        videos = [video.to_dict() for video in results]
-
-        # 演员和标签过滤（在内存中进行，因为JSON字段不支持高效的数据库查询）
-        filtered_videos = videos
-
-        # 过滤：必须包含指定演员
+        # 演员和标签过滤：通过关联表索引在数据库中完成，分页结果准确
         if normalized_required_actor_id:
-            filtered_videos = [
-                v
-                for v in filtered_videos
-                if v.get("actors")
-                and any(
-                    str(actor.get("id", "")).strip() == normalized_required_actor_id
-                    for actor in v.get("actors", [])
+            query = query.filter(
+                CachedVideo.id.in_(
+                    select(VideoCacheActor.video_id).where(
+                        VideoCacheActor.actor_id == normalized_required_actor_id
+                    )
                 )
-            ]
-            logger.info(
-                f"演员过滤后剩余 {len(filtered_videos)} 个视频（要求演员ID: {normalized_required_actor_id}）"
             )
-
-        # 过滤：必须包含所有指定标签
         if normalized_required_tags:
-            filtered_videos = [
-                v
-                for v in filtered_videos
-                if v.get("tags")
-                and normalized_required_tags.issubset(
-                    {
-                        _normalize_tag_value(tag)
-                        for tag in v.get("tags", [])
-                        if _normalize_tag_value(tag)
-                    }
+            query = query.filter(
+                CachedVideo.id.in_(
+                    select(VideoCacheTag.video_id)
+                    .where(VideoCacheTag.tag.in_(normalized_required_tags))
+                    .group_by(VideoCacheTag.video_id)
+                    .having(func.count(distinct(VideoCacheTag.tag)) == len(normalized_required_tags))
                 )
-            ]
-            logger.info(
-                f"标签过滤后剩余 {len(filtered_videos)} 个视频（要求标签: {sorted(normalized_required_tags)}）"
             )
-
-        # 过滤：排除包含指定标签的视频
         if normalized_exclude_tags:
-            filtered_videos = [
-                v
-                for v in filtered_videos
-                if not v.get("tags")
-                or not (
-                    {
-                        _normalize_tag_value(tag)
-                        for tag in v.get("tags", [])
-                        if _normalize_tag_value(tag)
-                    }
-                    & normalized_exclude_tags
+            query = query.filter(
+                CachedVideo.id.notin_(
+                    select(VideoCacheTag.video_id).where(
+                        VideoCacheTag.tag.in_(normalized_exclude_tags)
+                    )
                 )
-            ]
-            logger.info(
-                f"排除标签后剩余 {len(filtered_videos)} 个视频（排除标签: {sorted(normalized_exclude_tags)}）"
             )
 
-        if has_memory_filters:
-            safe_offset = max(offset, 0)
-            filtered_videos = filtered_videos[safe_offset : safe_offset + limit]
+        # 分页
+        query = query.limit(limit).offset(max(offset, 0))
 
-        return filtered_videos
+        return [video.to_dict() for video in query.all()]
 
     def get_ranking_videos(
         self,
@@ -472,7 +551,19 @@ class VideoCacheService(BaseService):
         deleted = (
             self.db.query(VideoCache)
             .filter(VideoCache.fetched_at < cutoff_date)
-            .delete()
+            .delete(synchronize_session=False)
+        )
+
+        # 不再属于任何榜单的视频连同关联行一起删除（批量删除不经过 ORM 级联）
+        orphan_ids = select(CachedVideo.id).where(
+            ~CachedVideo.id.in_(select(VideoCache.video_id).distinct())
+        )
+        for link_model in (VideoCacheActor, VideoCacheTag):
+            self.db.query(link_model).filter(link_model.video_id.in_(orphan_ids)).delete(
+                synchronize_session=False
+            )
+        self.db.query(CachedVideo).filter(CachedVideo.id.in_(orphan_ids)).delete(
+            synchronize_session=False
         )
         self.db.commit()
 
@@ -482,6 +573,7 @@ class VideoCacheService(BaseService):
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         total = self.db.query(func.count(VideoCache.id)).scalar()
+        unique_videos = self.db.query(func.count(CachedVideo.id)).scalar()
 
         # 按数据源统计
         by_source = (
@@ -502,6 +594,7 @@ class VideoCacheService(BaseService):
 
         return {
             "total_videos": total,
+            "unique_videos": unique_videos,
             "by_source": dict(by_source),
             "by_cycle": dict(by_cycle),
             "latest_fetch": latest_fetch.isoformat() if latest_fetch else None,
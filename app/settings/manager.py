@@ -12,6 +12,7 @@ from app.schema.setting import (
     SettingDownload,
     SettingFile,
     SettingNotify,
+    SettingScheduler,
     config_path,
 )
 from app.settings.migrations import NAMESPACE_ORDER, get_upgrade, latest_version
@@ -26,6 +27,7 @@ class SettingsManager:
         "notify": SettingNotify,
         "auto_download": SettingAutoDownload,
         "cookiecloud": SettingCookieCloud,
+        "scheduler": SettingScheduler,
     }
 
     def bootstrap(self) -> None:
@@ -115,6 +117,7 @@ class SettingsManager:
             "notify": SettingNotify(**legacy_sections.get("notify", {})).model_dump(),
             "auto_download": SettingAutoDownload(**legacy_sections.get("auto_download", {})).model_dump(),
             "cookiecloud": SettingCookieCloud(**legacy_sections.get("cookiecloud", {})).model_dump(),
+            "scheduler": SettingScheduler(**legacy_sections.get("scheduler", {})).model_dump(),
         }
 
     def _migrate_entry(self, db: Any, entry: Any) -> None:
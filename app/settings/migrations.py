@@ -10,6 +10,7 @@ NAMESPACE_ORDER = (
     "notify",
     "auto_download",
     "cookiecloud",
+    "scheduler",
 )
 
 LATEST_VERSIONS: dict[str, int] = {
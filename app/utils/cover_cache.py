@@ -0,0 +1,376 @@
+"""
+封面缓存
+
+封面按 URL 的 md5 存放在 cover/<md5 前两位>/<md5> 下，避免单个目录下堆积几十万个文件；
+cover/index.db（SQLite）记录每个文件的大小和最近访问时间，总大小超过 Setting.app.cover_cache_max_mb 时
+按最近最少访问淘汰。写入时先写临时文件再原子替换，读取方不会读到半个文件；
+每次写入只顺带淘汰少量文件，完整的淘汰由定时任务执行；最近 RECENT_SECONDS 秒内被访问或写入的文件不参与淘汰，
+避免刚查到的封面在返回给客户端之前被删除。旧版平铺在 cover/<md5> 的文件在读取时迁移到分片目录。
+缩略图等派生文件以 <md5>.<variant> 存放在原图旁边，与原图一起参与淘汰，原图更新或删除时一并清除。
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional
+
+from app.utils import cache
+from app.utils.logger import logger
+
+COVER_PARENT = "cover"
+INDEX_NAME = "index.db"
+# 访问时间精度（秒），同一文件在此时间内的重复访问不再写索引
+TOUCH_INTERVAL = 10 * 60
+# 写入时顺带淘汰的文件数上限，淘汰到预算的 90% 为止
+INLINE_EVICT_LIMIT = 64
+LOW_WATERMARK = 0.9
+# 淘汰时跳过最近访问过的文件（秒），以及最多记录的最近访问文件数
+RECENT_SECONDS = 60
+RECENT_LIMIT = 4096
+DEFAULT_MAX_MB = 2048
+
+
+def is_image_binary(content: bytes) -> bool:
+    """按文件头判断是否为常见图片格式"""
+    if not content:
+        return False
+
+    if content.startswith(b"\xff\xd8\xff"):  # jpeg
+        return True
+    if content.startswith(b"\x89PNG\r\n\x1a\n"):  # png
+        return True
+    if content.startswith((b"GIF87a", b"GIF89a")):  # gif
+        return True
+    if content.startswith(b"RIFF") and content[8:12] == b"WEBP":  # webp
+        return True
+    if (
+        len(content) >= 12
+        and content[4:8] == b"ftyp"
+        and content[8:12] in (b"avif", b"mif1")
+    ):  # avif/heif
+        return True
+    return False
+
+
+def cover_key(url: str, variant: str = "") -> str:
+    key = hashlib.md5(url.encode("utf-8")).hexdigest()
+    return f"{key}.{variant}" if variant else key
+
+
+class CoverEntry:
+    """已缓存的封面文件"""
+    __slots__ = ("key", "path", "stat_result")
+
+    def __init__(self, key: str, path: str, stat_result: os.stat_result):
+        self.key = key
+        self.path = path
+        self.stat_result = stat_result
+
+    @property
+    def size(self) -> int:
+        return self.stat_result.st_size
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key}-{self.size}-{int(self.stat_result.st_mtime)}"'
+
+    def read(self) -> Optional[bytes]:
+        try:
+            with open(self.path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def open(self) -> Optional[BinaryIO]:
+        """打开缓存文件，之后即使文件被淘汰删除也能读完；文件已不存在或已被替换时返回 None"""
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+        stat = os.fstat(file.fileno())
+        if (stat.st_ino, stat.st_size) != (self.stat_result.st_ino, self.stat_result.st_size):
+            file.close()
+            return None
+        return file
+
+
+class _Index:
+    """index.db 连接和缓存总大小，同一目录共享一个实例"""
+
+    def __init__(self, root: Path):
+        root.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(root / INDEX_NAME), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+        self.total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        # 最近访问的 key -> 时间，只保存在内存中，用于淘汰时跳过正在使用的文件
+        self.recent: "OrderedDict[str, float]" = OrderedDict()
+
+    def mark_recent(self, key: str, now: float):
+        with self.lock:
+            self.recent[key] = now
+            self.recent.move_to_end(key)
+            while len(self.recent) > RECENT_LIMIT:
+                self.recent.popitem(last=False)
+
+    def recently_used(self, now: float) -> set:
+        with self.lock:
+            return {key for key, at in self.recent.items() if now - at < RECENT_SECONDS}
+
+    def upsert(self, key: str, size: int, now: float):
+        with self.lock:
+            row = self.conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT INTO entries (key, size, last_access, created_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET size = excluded.size, last_access = excluded.last_access",
+                (key, size, now, now),
+            )
+            self.total += size - (row[0] if row else 0)
+
+    def touch(self, key: str, size: int, now: float):
+        with self.lock:
+            updated = self.conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ? AND last_access < ?",
+                (now, key, now - TOUCH_INTERVAL),
+            ).rowcount
+            if updated:
+                return
+            if self.conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone():
+                return
+        # 文件存在但索引中没有（索引丢失或其它进程写入），补录
+        self.upsert(key, size, now)
+
+    def remove(self, key: str) -> int:
+        with self.lock:
+            row = self.conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.total -= row[0]
+                return row[0]
+        return 0
+
+    def variants(self, key: str) -> list:
+        """原图 key 的所有派生文件（<key>.<variant>）"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key FROM entries WHERE key > ? AND key < ?", (f"{key}.", f"{key}/")
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def oldest(self, limit: int):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT key FROM entries ORDER BY last_access LIMIT ?", (limit,)
+            ).fetchall()
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CoverCache:
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        self._root = Path(root) if root else None
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._indexes: Dict[Path, _Index] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        # 未指定目录时跟随 cache.cache_path，测试中替换 cache_path 即可隔离
+        return self._root or Path(cache.cache_path) / COVER_PARENT
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        from app.schema.setting import Setting
+        try:
+            max_mb = Setting().app.cover_cache_max_mb
+        except Exception:
+            max_mb = DEFAULT_MAX_MB
+        return max_mb * 1024 * 1024
+
+    def _index(self) -> _Index:
+        root = self.root
+        with self._lock:
+            index = self._indexes.get(root)
+            if index is None:
+                index = self._indexes[root] = _Index(root)
+            return index
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def lookup(self, url: str, variant: str = "") -> Optional[CoverEntry]:
+        """返回已缓存的封面（或其派生文件）并记录访问，未缓存时返回 None"""
+        key = cover_key(url, variant)
+        path = self.path_for(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if variant or not self._migrate_legacy(key):
+                return None
+            stat = os.stat(path)
+        index = self._index()
+        now = self._clock()
+        index.touch(key, stat.st_size, now)
+        index.mark_recent(key, now)
+        return CoverEntry(key, str(path), stat)
+
+    def read(self, url: str) -> Optional[bytes]:
+        entry = self.lookup(url)
+        return entry.read() if entry else None
+
+    def put(self, url: str, content: bytes, variant: str = "") -> CoverEntry:
+        """原子写入封面（或其派生文件），超出预算时顺带淘汰少量最久未访问的文件"""
+        key = cover_key(url, variant)
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        stat = os.stat(path)
+        index = self._index()
+        if not variant:
+            # 原图更新后旧的派生文件失效
+            self._remove_keys(index.variants(key))
+        now = self._clock()
+        index.upsert(key, stat.st_size, now)
+        index.mark_recent(key, now)
+        if index.total > self.max_bytes:
+            self.evict(limit=INLINE_EVICT_LIMIT, keep=key)
+        return CoverEntry(key, str(path), stat)
+
+    def mark_revalidated(self, url: str):
+        """重新抓取失败时更新原图的修改时间，过了再验证周期才再次尝试"""
+        try:
+            os.utime(self.path_for(cover_key(url)))
+        except FileNotFoundError:
+            pass
+
+    def remove(self, url: Optional[str]):
+        if not url:
+            return
+        key = cover_key(url)
+        self._remove_keys([key, *self._index().variants(key)])
+        try:
+            os.remove(self.root / key)
+        except FileNotFoundError:
+            pass
+
+    def _remove_keys(self, keys):
+        index = self._index()
+        for key in keys:
+            index.remove(key)
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def evict(self, limit: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """按最近访问时间淘汰，直到总大小降到预算的 90%；limit 为本次最多淘汰的文件数
+
+        keep 和最近 RECENT_SECONDS 秒内访问过的文件不淘汰。
+        """
+        index = self._index()
+        target = int(self.max_bytes * LOW_WATERMARK)
+        protected = index.recently_used(self._clock())
+        if keep:
+            protected.add(keep)
+        removed = 0
+        while index.total > target and (limit is None or removed < limit):
+            batch = min(256, limit - removed) if limit is not None else 256
+            keys = [row[0] for row in index.oldest(batch + len(protected)) if row[0] not in protected][:batch]
+            if not keys:
+                break
+            for key in keys:
+                if index.total <= target:
+                    break
+                index.remove(key)
+                try:
+                    os.remove(self.path_for(key))
+                except FileNotFoundError:
+                    pass
+                removed += 1
+        return removed
+
+    def _migrate_legacy(self, key: str) -> bool:
+        legacy = self.root / key
+        if not legacy.is_file():
+            return False
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(legacy, path)
+        except FileNotFoundError:
+            return path.exists()
+        return True
+
+    def migrate_legacy(self, limit: Optional[int] = None) -> int:
+        """把旧版平铺的封面文件迁移到分片目录并补录索引"""
+        root = self.root
+        if not root.exists():
+            return 0
+        migrated = 0
+        index = self._index()
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if limit is not None and migrated >= limit:
+                    break
+                if len(entry.name) != 32 or not entry.is_file():
+                    continue
+                size = entry.stat().st_size
+                if self._migrate_legacy(entry.name):
+                    index.upsert(entry.name, size, self._clock())
+                    migrated += 1
+        return migrated
+
+    def stats(self) -> dict:
+        index = self._index()
+        return {"files": index.count(), "bytes": index.total, "max_bytes": self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            for index in self._indexes.values():
+                index.close()
+            self._indexes.clear()
+
+
+cover_cache = CoverCache()
+
+
+def clean_cover_cache():
+    """迁移旧版封面文件并把缓存淘汰到预算以内"""
+    migrated = cover_cache.migrate_legacy()
+    removed = cover_cache.evict()
+    stats = cover_cache.stats()
+    logger.info(
+        f"封面缓存清理完成：迁移 {migrated} 个旧文件，淘汰 {removed} 个文件，"
+        f"当前 {stats['files']} 个文件，{stats['bytes'] / 1024 / 1024:.1f} MB"
+    )
@@ -0,0 +1,181 @@
+"""
+异步封面抓取
+
+/common/cover 在事件循环中抓取封面：复用连接池（curl_cffi 可用时用其 AsyncSession 模拟浏览器指纹，
+否则用 httpx.AsyncClient），同一 URL 同时只抓取一次，同一站点的并发请求数受 Setting.app.cover_fetch_per_host 限制。
+已缓存但超过 REVALIDATE_SECONDS 的封面先直接返回，再在后台重新抓取（stale-while-revalidate）；
+重新抓取失败时保留旧文件并更新其修改时间，下一个周期再尝试。
+缩略图（get_variant）由原图在图片处理进程池中生成，同一缩略图同时只生成一次，生成失败时返回原图。
+连接池、并发限制等状态按事件循环分别维护。
+"""
+import asyncio
+import time
+import weakref
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from app.utils.cover_cache import CoverEntry, cover_cache, is_image_binary
+from app.utils.image import pool, thumbnail
+from app.utils.logger import logger
+
+REVALIDATE_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_PER_HOST = 4
+_IMPERSONATE = "chrome120"
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+_ACCEPT = "image/avif,image/webp,image/apng,image/*,*/*;q=0.8"
+
+
+def _referer(url: str) -> Optional[str]:
+    hostname = urlparse(url).hostname or ""
+    if hostname in ("www.javbus.com", "javbus.com"):
+        from app.utils.spider.javbus import JavbusSpider
+        return JavbusSpider.host
+    if hostname in ("c0.jdbstatic.com", "jdbstatic.com"):
+        from app.utils.spider.javdb import JavdbSpider
+        return JavdbSpider.host
+    return None
+
+
+def _default_client(per_host: int, timeout: float):
+    try:
+        from curl_cffi.requests import AsyncSession
+        return AsyncSession(impersonate=_IMPERSONATE, timeout=timeout, max_clients=per_host * 8)
+    except ImportError:
+        import httpx
+        return httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=per_host * 8, max_keepalive_connections=per_host * 4),
+        )
+
+
+class _LoopState:
+
+    def __init__(self, client):
+        self.client = client
+        self.host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.rendering: Dict[tuple, asyncio.Task] = {}
+
+
+class AsyncCoverFetcher:
+
+    def __init__(self, per_host: Optional[int] = None, timeout: float = 15.0,
+                 revalidate_after: float = REVALIDATE_SECONDS,
+                 client_factory: Optional[Callable[[int, float], object]] = None):
+        self._per_host = per_host
+        self.timeout = timeout
+        self.revalidate_after = revalidate_after
+        self._client_factory = client_factory or _default_client
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = \
+            weakref.WeakKeyDictionary()
+
+    @property
+    def per_host(self) -> int:
+        if self._per_host is not None:
+            return self._per_host
+        from app.schema.setting import Setting
+        try:
+            return max(1, Setting().app.cover_fetch_per_host)
+        except Exception:
+            return DEFAULT_PER_HOST
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self._client_factory(self.per_host, self.timeout))
+        return state
+
+    async def _download(self, state: _LoopState, url: str) -> Optional[bytes]:
+        host = urlparse(url).netloc
+        limit = state.host_limits.get(host)
+        if limit is None:
+            limit = state.host_limits[host] = asyncio.Semaphore(self.per_host)
+        headers = {"User-Agent": _USER_AGENT, "Accept": _ACCEPT}
+        referer = _referer(url)
+        if referer:
+            headers["Referer"] = referer
+        async with limit:
+            response = await state.client.get(url, headers=headers)
+        if response.status_code != 200:
+            logger.warning(f"获取封面失败: {response.status_code} - {url}")
+            return None
+        content = response.content
+        if not is_image_binary(content):
+            logger.warning(f"封面抓取结果不是图片内容: {url}")
+            return None
+        return content
+
+    async def _refresh(self, state: _LoopState, url: str) -> Optional[CoverEntry]:
+        try:
+            content = await self._download(state, url)
+        except Exception as e:
+            logger.error(f"获取封面异常: {e} - {url}")
+            content = None
+        if content is None:
+            await asyncio.to_thread(cover_cache.mark_revalidated, url)
+            return None
+        return await asyncio.to_thread(cover_cache.put, url, content)
+
+    def _fetch_once(self, url: str) -> asyncio.Task:
+        """同一 URL 的抓取在事件循环内只进行一次"""
+        state = self._state()
+        task = state.inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(state, url))
+            state.inflight[url] = task
+            task.add_done_callback(lambda _: state.inflight.pop(url, None))
+        return task
+
+    async def get(self, url: str) -> Optional[CoverEntry]:
+        """返回缓存中的封面，未缓存时抓取；缓存已过期时先返回旧文件并在后台刷新"""
+        entry = await asyncio.to_thread(cover_cache.lookup, url)
+        if entry is not None:
+            if time.time() - entry.stat_result.st_mtime > self.revalidate_after:
+                self._fetch_once(url)
+            return entry
+        # 单个请求被取消时不影响其它等待同一封面的请求
+        return await asyncio.shield(self._fetch_once(url))
+
+    async def _render(self, url: str, entry: CoverEntry, variant: str, width: int, fmt: str) -> CoverEntry:
+        try:
+            content = await pool.run_async(thumbnail.render_variant, entry.path, width, fmt)
+        except Exception as e:
+            logger.warning(f"生成封面缩略图失败: {e} - {url}")
+            return entry
+        return await asyncio.to_thread(cover_cache.put, url, content, variant)
+
+    async def get_variant(self, url: str, width: int, fmt: str) -> Optional[CoverEntry]:
+        """返回 width 宽、fmt 格式的缩略图，未生成时先取原图再在进程池中生成"""
+        variant = thumbnail.variant_name(width, fmt)
+        entry = await asyncio.to_thread(cover_cache.lookup, url, variant)
+        if entry is not None:
+            return entry
+        original = await self.get(url)
+        if original is None:
+            return None
+        state = self._state()
+        key = (url, variant)
+        task = state.rendering.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render(url, original, variant, width, fmt))
+            state.rendering[key] = task
+            task.add_done_callback(lambda _: state.rendering.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        state = self._states.pop(loop, None)
+        if state is None:
+            return
+        for task in [*state.inflight.values(), *state.rendering.values()]:
+            task.cancel()
+        close = getattr(state.client, "aclose", None) or state.client.close
+        await close()
+
+
+cover_fetcher = AsyncCoverFetcher()
@@ -0,0 +1,82 @@
+"""
+按站点（host）限速
+
+后台任务并发抓取时，同一站点的请求共享最小间隔（带随机抖动）和并发上限，
+不同站点互不影响。间隔按“预约”方式分配：每个请求在获取并发名额后预约下一个可用时间点，
+等待到点再发起，因此总耗时取决于站点限速而不是各请求等待时间之和。
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+
+def host_key(host_or_url: str) -> str:
+    """从 URL 或域名中提取限速键"""
+    parsed = urlparse(host_or_url if "://" in host_or_url else f"//{host_or_url}")
+    return (parsed.netloc or host_or_url).lower()
+
+
+class _HostState:
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.next_at = 0.0
+
+
+class HostRateLimiter:
+
+    def __init__(self, min_interval: float = 3.0, jitter: float = 2.0, max_concurrency: int = 2,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self._clock = clock
+        self._sleep = sleep
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, min_interval: Optional[float] = None, jitter: Optional[float] = None,
+                  max_concurrency: Optional[int] = None):
+        with self._lock:
+            if min_interval is not None:
+                self.min_interval = max(0.0, min_interval)
+            if jitter is not None:
+                self.jitter = max(0.0, jitter)
+            if max_concurrency is not None and max_concurrency != self.max_concurrency:
+                self.max_concurrency = max(1, max_concurrency)
+                # 并发上限变化后重新创建信号量，正在执行的请求释放旧信号量不受影响
+                self._hosts.clear()
+
+    def _state(self, key: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(key)
+            if state is None:
+                state = self._hosts[key] = _HostState(self.max_concurrency)
+            return state
+
+    def _reserve(self, state: _HostState) -> float:
+        """预约下一个请求时间点，返回需要等待的秒数"""
+        with self._lock:
+            now = self._clock()
+            start = max(now, state.next_at)
+            state.next_at = start + self.min_interval + random.uniform(0, self.jitter)
+        return start - now
+
+    @contextmanager
+    def slot(self, host_or_url: str):
+        """获取站点的并发名额并等待到预约时间点"""
+        state = self._state(host_key(host_or_url))
+        state.semaphore.acquire()
+        try:
+            wait = self._reserve(state)
+            if wait > 0:
+                self._sleep(wait)
+            yield
+        finally:
+            state.semaphore.release()
+
+
+host_rate_limiter = HostRateLimiter()
@@ -1,30 +1,137 @@
 import io
 import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
-from PIL import Image
 from urllib.parse import urlparse
-from . import cutter, badge
-from .. import spider
 from ...schema import VideoDetail
 
+_batch = threading.local()
 
-def save_images(video: VideoDetail, video_path: str):
-    path = urlparse(video.cover).path
-    file_name = os.path.basename(path)
-    extension = os.path.splitext(file_name)[-1]
 
-    fanart_data = spider.get_video_cover(video.cover)
+def render_images(fanart_data: bytes, save_path: str, extension: str, is_zh: bool, is_uncensored: bool):
+    """由封面生成 fanart、poster、thumb 三张图片，在图片处理进程池中执行"""
+    # Pillow 仅在生成图片时才需要，延迟导入以加快启动
+    from PIL import Image
+    from . import cutter, badge
+
     fanart = Image.open(io.BytesIO(fanart_data))
 
     poster_image = cutter.cut(fanart)
-    poster = badge.tags(poster_image, video.is_zh, video.is_uncensored)
-    thumb = badge.tags(fanart, video.is_zh, video.is_uncensored)
-
-    save_path, _ = os.path.splitext(video_path)
+    poster = badge.tags(poster_image, is_zh, is_uncensored)
+    thumb = badge.tags(fanart, is_zh, is_uncensored)
 
     with open(save_path + f"-fanart{extension}", "wb") as f:
         f.write(fanart_data)
     poster.save(save_path + f"-poster{extension}", quality=95, subsampling=0, optimize=True)
     thumb.save(save_path + f"-thumb{extension}", quality=95, subsampling=0, optimize=True)
 
+
+def _prepare(video: VideoDetail, video_path: str) -> Tuple[tuple, str]:
+    """在当前线程获取封面，返回 render_images 的参数和图片扩展名"""
+    from .. import spider
+
+    path = urlparse(video.cover).path
+    file_name = os.path.basename(path)
+    extension = os.path.splitext(file_name)[-1]
+
+    fanart_data = spider.get_video_cover(video.cover)
+    save_path, _ = os.path.splitext(video_path)
+    return (fanart_data, save_path, extension, video.is_zh, video.is_uncensored), extension
+
+
+class ImageBatch:
+    """image_batch() 登记的任务，退出后 failed 为生成失败的 (影片, 异常)"""
+
+    def __init__(self):
+        self.items: List[Tuple[VideoDetail, str]] = []
+        self.failed: List[Tuple[VideoDetail, Exception]] = []
+        self.callbacks: List[Tuple[set, Callable[[List[Tuple[VideoDetail, Exception]]], None]]] = []
+        self._errors: Dict[str, Tuple[VideoDetail, Exception]] = {}
+
+    def when_done(self, video_paths: Iterable[str], callback: Callable[[List[Tuple[VideoDetail, Exception]]], None]):
+        """批次生成完成后调用 callback，参数为 video_paths 中生成失败的 (影片, 异常)"""
+        self.callbacks.append((set(video_paths), callback))
+
+    def _resolve(self):
+        from ..logger import logger
+
+        if self.items:
+            for (video, video_path), result in zip(self.items, save_images_batch(self.items)):
+                if isinstance(result, Exception):
+                    logger.error(f"生成影片《{video.num}》的封面及水印图片失败: {result}")
+                    self.failed.append((video, result))
+                    self._errors[video_path] = (video, result)
+        for video_paths, callback in self.callbacks:
+            failed = [self._errors[path] for path in video_paths if path in self._errors]
+            try:
+                callback(failed)
+            except Exception as e:
+                logger.error(f"图片生成完成后的回调执行失败: {e}")
+
+
+def current_image_batch() -> Optional[ImageBatch]:
+    """当前线程所在的 image_batch()，不在批次中时为 None"""
+    return getattr(_batch, "current", None)
+
+
+def save_images(video: VideoDetail, video_path: str):
+    batch = current_image_batch()
+    if batch is not None:
+        # 处于 image_batch() 中时只登记，离开时统一生成
+        batch.items.append((video, video_path))
+        return os.path.splitext(os.path.basename(urlparse(video.cover).path))[-1]
+
+    from . import pool
+
+    args, extension = _prepare(video, video_path)
+    pool.run(render_images, *args)
     return extension
+
+
+def save_images_batch(items: Iterable[Tuple[VideoDetail, str]]) -> List[Union[str, Exception]]:
+    """批量生成图片：封面在当前线程依次获取，图片在进程池中并行生成
+
+    返回与 items 一一对应的扩展名，生成失败的项为对应的异常。
+    """
+    from . import pool
+
+    pending = []
+    for video, video_path in items:
+        try:
+            args, extension = _prepare(video, video_path)
+            pending.append((extension, pool.submit(render_images, *args)))
+        except Exception as e:
+            pending.append((e, None))
+
+    results = []
+    for extension, future in pending:
+        if future is None:
+            results.append(extension)
+            continue
+        try:
+            future.result()
+            results.append(extension)
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+@contextmanager
+def image_batch():
+    """在此范围内（当前线程）调用 save_images 只登记任务，退出时通过 save_images_batch 并行生成
+
+    生成失败的任务记录在返回的 ImageBatch.failed 中，依赖图片结果的后续处理通过 ImageBatch.when_done 登记；
+    嵌套使用时沿用外层的批次，在外层退出时统一生成。
+    """
+    outer = current_image_batch()
+    if outer is not None:
+        yield outer
+        return
+    _batch.current = batch = ImageBatch()
+    try:
+        yield batch
+    finally:
+        _batch.current = None
+        batch._resolve()
@@ -1,5 +1,28 @@
+import os
+from functools import lru_cache
+
 from PIL import Image
 
+BADGE_DIR = os.path.dirname(os.path.abspath(__file__))
+ZH_BADGE = "ch.png"
+UNCENSORED_BADGE = "uncensored.png"
+
+
+@lru_cache(maxsize=None)
+def load_badge(name: str) -> Image.Image:
+    """读取角标原图并转换为 RGBA，每个进程只读取一次"""
+    with Image.open(os.path.join(BADGE_DIR, name)) as img:
+        return img.convert('RGBA')
+
+
+@lru_cache(maxsize=64)
+def scaled_badge(name: str, badge_height: int) -> Image.Image:
+    """按输出尺寸缩放后的角标，同一尺寸只缩放一次；返回的图片只用于粘贴，不得修改"""
+    tag = load_badge(name)
+    tag_width, tag_height = tag.size
+    badge_width = int(badge_height * (tag_width / tag_height))
+    return tag.resize((badge_width, badge_height), Image.Resampling.LANCZOS)
+
 
 def tags(fan_art: Image, is_zh, is_uncensored):
     mode = fan_art.mode
@@ -7,15 +30,11 @@ def tags(fan_art: Image, is_zh, is_uncensored):
 
     index = 0
     if is_zh:
-        with Image.open("./app/utils/image/ch.png") as img:
-            tag = img.convert('RGBA')
-            thumb = add_badges(thumb, tag, index)
+        thumb = add_badges(thumb, ZH_BADGE, index)
         index += 1
 
     if is_uncensored:
-        with Image.open("./app/utils/image/uncensored.png") as img:
-            tag = img.convert('RGBA')
-            thumb = add_badges(thumb, tag, index)
+        thumb = add_badges(thumb, UNCENSORED_BADGE, index)
         index += 1
 
     if thumb.mode != mode:
@@ -24,14 +43,12 @@ def tags(fan_art: Image, is_zh, is_uncensored):
         return thumb
 
 
-def add_badges(thumb: Image, tag, index):
+def add_badges(thumb: Image, name: str, index):
     thumb_width, thumb_height = thumb.size
-    tag_width, tag_height = tag.size
 
     badge_height = int((35 / 538) * thumb_height)
-    badge_width = int(badge_height * (tag_width / tag_height))
-
-    resized_badge = tag.resize((badge_width, badge_height), Image.Resampling.LANCZOS)
+    resized_badge = scaled_badge(name, badge_height)
+    badge_width = resized_badge.width
 
     badge_step = int((5 / 538) * thumb_width)
 
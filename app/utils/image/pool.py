@@ -0,0 +1,91 @@
+"""
+图片处理进程池
+
+缩放、转码、生成海报等 Pillow 操作都是 CPU 密集型，放在线程里会和事件循环、定时任务争抢 GIL。
+这里维护一个全局共享、按需创建的进程池（spawn 启动，子进程只导入图片处理模块），
+进程数取 Setting.app.image_process_workers，为 0 时按 CPU 核数。
+子进程异常退出导致进程池不可用时自动重建一次。提交的函数和参数必须可以 pickle。
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.utils.logger import logger
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def worker_count() -> int:
+    from app.schema.setting import Setting
+    try:
+        workers = Setting().app.image_process_workers
+    except Exception:
+        workers = 0
+    if workers > 0:
+        return workers
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _reset(broken: ProcessPoolExecutor):
+    global _executor
+    with _lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(fn: Callable[..., Any], *args) -> Future:
+    """提交到进程池，进程池已损坏时重建后重试一次"""
+    executor = get_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        logger.warning("图片处理进程池不可用，重新创建")
+        _reset(executor)
+        return get_executor().submit(fn, *args)
+
+
+def run(fn: Callable[..., Any], *args) -> Any:
+    """在进程池中执行并等待结果"""
+    executor = get_executor()
+    try:
+        return executor.submit(fn, *args).result()
+    except BrokenProcessPool:
+        logger.warning("图片处理进程异常退出，重新创建进程池")
+        _reset(executor)
+        return get_executor().submit(fn, *args).result()
+
+
+async def run_async(fn: Callable[..., Any], *args) -> Any:
+    """在进程池中执行，不阻塞事件循环"""
+    executor = get_executor()
+    try:
+        return await asyncio.wrap_future(executor.submit(fn, *args))
+    except BrokenProcessPool:
+        logger.warning("图片处理进程异常退出，重新创建进程池")
+        _reset(executor)
+        return await asyncio.wrap_future(get_executor().submit(fn, *args))
+
+
+def shutdown(wait: bool = True):
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,255 @@
+"""
+任务租约锁 - 多个实例共享同一个数据库时保证后台任务单实例执行
+
+Scheduler.do_job 在执行任务前获取任务租约，执行期间由心跳线程定期续约；
+实例异常退出后租约到期，其他实例可以接管。任务正常结束后，
+其他实例在冷却时间内不会重复执行同一任务（避免各实例按各自的调度再跑一遍）。
+"""
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Protocol
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+
+from app.db.models import JobLock
+from app.utils.logger import logger
+
+
+class JobLockBackend(Protocol):
+    key: str
+
+    def acquire(self, job_key: str, owner: str, ttl: int, cooldown: int = 0) -> bool: ...
+
+    def renew(self, job_key: str, owner: str, ttl: int) -> bool: ...
+
+    def release(self, job_key: str, owner: str) -> None: ...
+
+
+class LocalJobLockBackend:
+    """进程内实现，单实例部署或测试使用"""
+    key = "local"
+
+    def __init__(self, now: Callable[[], datetime] = datetime.now):
+        self._now = now
+        self._locks: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, job_key: str, owner: str, ttl: int, cooldown: int = 0) -> bool:
+        now = self._now()
+        with self._lock:
+            current = self._locks.get(job_key)
+            if current and current["owner"] != owner:
+                if current["expires_at"] >= now:
+                    return False
+                released_at = current["released_at"]
+                if released_at is not None and released_at >= now - timedelta(seconds=cooldown):
+                    return False
+            self._locks[job_key] = {
+                "owner": owner,
+                "expires_at": now + timedelta(seconds=ttl),
+                "released_at": None,
+            }
+            return True
+
+    def renew(self, job_key: str, owner: str, ttl: int) -> bool:
+        with self._lock:
+            current = self._locks.get(job_key)
+            if not current or current["owner"] != owner or current["released_at"] is not None:
+                return False
+            current["expires_at"] = self._now() + timedelta(seconds=ttl)
+            return True
+
+    def release(self, job_key: str, owner: str) -> None:
+        now = self._now()
+        with self._lock:
+            current = self._locks.get(job_key)
+            if current and current["owner"] == owner:
+                current["expires_at"] = now
+                current["released_at"] = now
+
+
+class DatabaseJobLockBackend:
+    """基于 job_lock 表的实现，依赖 SQLite 的写锁保证 upsert 原子性"""
+    key = "database"
+
+    def __init__(self, engine: Optional[Engine] = None, now: Callable[[], datetime] = datetime.now):
+        self._engine = engine
+        self._now = now
+        self.table = JobLock.__table__
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from app.db import engine
+            self._engine = engine
+        return self._engine
+
+    def acquire(self, job_key: str, owner: str, ttl: int, cooldown: int = 0) -> bool:
+        now = self._now()
+        table = self.table
+        stmt = insert(table).values(
+            job_key=job_key,
+            owner=owner,
+            acquired_at=now,
+            heartbeat_at=now,
+            expires_at=now + timedelta(seconds=ttl),
+            released_at=None,
+            create_time=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.job_key],
+            set_={
+                "owner": stmt.excluded.owner,
+                "acquired_at": stmt.excluded.acquired_at,
+                "heartbeat_at": stmt.excluded.heartbeat_at,
+                "expires_at": stmt.excluded.expires_at,
+                "released_at": None,
+                "update_time": now,
+            },
+            # 自己持有的租约可直接重入；他人的租约必须已过期，且不在刚执行完的冷却期内
+            where=or_(
+                table.c.owner == owner,
+                and_(
+                    table.c.expires_at < now,
+                    or_(
+                        table.c.released_at.is_(None),
+                        table.c.released_at < now - timedelta(seconds=cooldown),
+                    ),
+                ),
+            ),
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+            holder = conn.execute(select(table.c.owner).where(table.c.job_key == job_key)).scalar()
+        return holder == owner
+
+    def renew(self, job_key: str, owner: str, ttl: int) -> bool:
+        now = self._now()
+        table = self.table
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.job_key == job_key, table.c.owner == owner, table.c.released_at.is_(None))
+                .values(heartbeat_at=now, expires_at=now + timedelta(seconds=ttl))
+            )
+        return result.rowcount == 1
+
+    def release(self, job_key: str, owner: str) -> None:
+        now = self._now()
+        table = self.table
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.job_key == job_key, table.c.owner == owner)
+                .values(expires_at=now, released_at=now)
+            )
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table))
+
+
+class JobLease:
+    """单次任务执行持有的租约"""
+
+    def __init__(self, manager: "JobLockManager", job_key: str):
+        self.manager = manager
+        self.job_key = job_key
+        self.acquired = False
+        self.lost = False
+
+    def acquire(self, cooldown: int = 0) -> bool:
+        self.acquired = self.manager.acquire(self, cooldown)
+        return self.acquired
+
+    def release(self):
+        if self.acquired:
+            self.manager.release(self)
+            self.acquired = False
+
+
+class JobLockManager:
+    """管理租约后端、实例标识和统一的心跳续约线程"""
+
+    backends: Dict[str, type] = {
+        LocalJobLockBackend.key: LocalJobLockBackend,
+        DatabaseJobLockBackend.key: DatabaseJobLockBackend,
+    }
+
+    def __init__(self, backend: Optional[JobLockBackend] = None, ttl: int = 120):
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.backend = backend or DatabaseJobLockBackend()
+        self.ttl = ttl
+        self._held: Dict[str, JobLease] = {}
+        self._lock = threading.Lock()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def register(cls, backend_cls) -> None:
+        cls.backends[backend_cls.key] = backend_cls
+
+    def configure(self, backend: str, ttl: int):
+        backend_cls = self.backends.get(backend)
+        if backend_cls is None:
+            logger.warning(f"不支持的任务锁后端: {backend}，使用数据库租约")
+            backend_cls = DatabaseJobLockBackend
+        if not isinstance(self.backend, backend_cls):
+            self.backend = backend_cls()
+        self.ttl = max(10, ttl)
+
+    def lease(self, job_key: str) -> JobLease:
+        return JobLease(self, job_key)
+
+    def acquire(self, lease: JobLease, cooldown: int = 0) -> bool:
+        try:
+            acquired = self.backend.acquire(lease.job_key, self.owner, self.ttl, cooldown)
+        except Exception as e:
+            # 锁后端不可用时宁可跳过本次执行，避免多实例重复执行
+            logger.error(f"获取任务租约失败: {lease.job_key}, {e}")
+            return False
+        if acquired:
+            with self._lock:
+                self._held[lease.job_key] = lease
+                self._ensure_heartbeat()
+        return acquired
+
+    def release(self, lease: JobLease):
+        with self._lock:
+            self._held.pop(lease.job_key, None)
+        try:
+            self.backend.release(lease.job_key, self.owner)
+        except Exception as e:
+            logger.warning(f"释放任务租约失败: {lease.job_key}, {e}")
+
+    def renew_all(self):
+        with self._lock:
+            leases = list(self._held.values())
+        for lease in leases:
+            try:
+                renewed = self.backend.renew(lease.job_key, self.owner, self.ttl)
+            except Exception as e:
+                logger.warning(f"任务租约续约异常: {lease.job_key}, {e}")
+                continue
+            if not renewed and not lease.lost:
+                lease.lost = True
+                logger.warning(f"任务租约已被其他实例接管: {lease.job_key}")
+
+    def _ensure_heartbeat(self):
+        if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+            return
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="job-lock-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat(self):
+        # 每 1/3 个租约周期续约一次，留出两次重试的余量
+        while not self._stop_event.wait(self.ttl / 3):
+            self.renew_all()
+
+
+job_lock_manager = JobLockManager()
@@ -0,0 +1,209 @@
+"""
+日志实时推送 - 单读取线程 + 多客户端广播
+
+一个守护线程从日志文件末尾开始跟踪（兼容 RotatingFileHandler 轮转），
+最近的日志保存在内存环形缓冲区中，每个 SSE 客户端只持有一个 asyncio.Queue，
+不再为每个连接占用一个线程池工作线程。
+"""
+import asyncio
+import logging
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional, Set, Tuple
+
+log_path = Path(f'{Path(__file__).cwd()}/config/app.log')
+
+LEVEL_PATTERN = re.compile(r'^【(\w+)】')
+
+
+def parse_level(line: str) -> Optional[int]:
+    """解析日志行的级别，非标准行（如异常堆栈）返回 None"""
+    matched = LEVEL_PATTERN.match(line)
+    if not matched:
+        return None
+    return to_level_no(matched.group(1))
+
+
+def to_level_no(level: Optional[str]) -> int:
+    """将级别名称转换为数值，无法识别时不过滤"""
+    if not level:
+        return logging.NOTSET
+    level_no = logging.getLevelName(level.strip().upper())
+    return level_no if isinstance(level_no, int) else logging.NOTSET
+
+
+def read_tail(path: Path, count: int, block_size: int = 8192) -> List[str]:
+    """从文件末尾向前按块读取最后 count 行，避免读取整个文件"""
+    if count <= 0 or not path.exists():
+        return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    return lines[-count:]
+
+
+class LogSubscriber:
+    """单个客户端的订阅，日志由读取线程投递到所属事件循环的队列中"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, min_level: int = logging.NOTSET, max_queue: int = 1000):
+        self.loop = loop
+        self.min_level = min_level
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._last_level = logging.INFO
+
+    def accept(self, line: str) -> bool:
+        level = parse_level(line)
+        # 堆栈等续行沿用上一条日志的级别
+        if level is None:
+            level = self._last_level
+        else:
+            self._last_level = level
+        return level >= self.min_level
+
+    def push(self, line: str):
+        """在事件循环线程中调用，队列已满时丢弃最旧的日志"""
+        if not self.accept(line):
+            return
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(line)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """获取下一条日志，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LogBroadcaster:
+    """日志广播器：一个读取线程，任意数量的订阅者"""
+
+    def __init__(self, path: Path = log_path, buffer_size: int = 500, poll_interval: float = 0.5):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.buffer: Deque[str] = deque(maxlen=buffer_size)
+        self._subscribers: Set[LogSubscriber] = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, level: Optional[str] = None, history: int = 50) -> Tuple[LogSubscriber, List[str]]:
+        """
+        注册订阅者
+
+        Args:
+            level: 最低日志级别（如 WARNING），为空时不过滤
+            history: 返回的最近日志行数
+
+        Returns:
+            (订阅者, 按级别过滤后的最近日志)
+        """
+        subscriber = LogSubscriber(asyncio.get_running_loop(), to_level_no(level))
+        with self._lock:
+            self._ensure_started()
+            recent = list(self.buffer)
+            self._subscribers.add(subscriber)
+        lines = [line for line in recent if subscriber.accept(line)]
+        return subscriber, lines[-history:] if history > 0 else []
+
+    def unsubscribe(self, subscriber: LogSubscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                # 没有客户端时停止读取线程，下次订阅时重新从文件末尾加载
+                self._stop_event.set()
+                self._thread = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event = threading.Event()
+        self.buffer.clear()
+        self.buffer.extend(read_tail(self.path, self.buffer.maxlen))
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stop_event,), name='log-broadcaster', daemon=True
+        )
+        self._thread.start()
+
+    def _publish(self, line: str):
+        with self._lock:
+            self.buffer.append(line)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.push, line)
+            except RuntimeError:
+                # 事件循环已关闭，客户端已断开
+                self.unsubscribe(subscriber)
+
+    def _open(self, from_end: bool):
+        if not self.path.exists():
+            return None
+        f = open(self.path, 'r', encoding='utf-8', errors='replace')
+        if from_end:
+            f.seek(0, os.SEEK_END)
+        return f
+
+    def _is_rotated(self, f) -> bool:
+        """文件被轮转（inode 变化）或被截断时需要重新打开"""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(f.fileno())
+        return current.st_ino != opened.st_ino or current.st_size < f.tell()
+
+    def _run(self, stop_event: threading.Event):
+        f = None
+        partial = ''
+        try:
+            f = self._open(from_end=True)
+            while not stop_event.is_set():
+                if f is None:
+                    f = self._open(from_end=False)
+                    if f is None:
+                        stop_event.wait(self.poll_interval)
+                        continue
+
+                chunk = f.read()
+                if chunk:
+                    partial += chunk
+                    *lines, partial = partial.split('\n')
+                    for line in lines:
+                        self._publish(line.rstrip('\r'))
+                    continue
+
+                if self._is_rotated(f):
+                    # 轮转前的残余内容已经读完，新文件从头开始读取
+                    f.close()
+                    f = self._open(from_end=False)
+                    partial = ''
+                    continue
+
+                stop_event.wait(self.poll_interval)
+        except Exception as e:
+            print(f"日志广播线程异常: {e}")
+        finally:
+            if f is not None:
+                f.close()
+
+
+log_broadcaster = LogBroadcaster()
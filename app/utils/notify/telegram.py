@@ -3,7 +3,7 @@ import requests
 
 from app.schema import VideoNotify, SubscribeNotify
 from app.schema.actor_subscribe import ActorSubscribeNotify
-from app.utils import cache
+from app.utils.cover_cache import cover_cache
 from app.utils.notify.base import Base
 
 
@@ -29,7 +29,7 @@ class Telegram(Base):
 大小：{video.size}
 消息: <tg-spoiler>{video.message}</tg-spoiler>
 '''
-        picture = cache.get_cache_file('cover', video.cover)
+        picture = cover_cache.read(video.cover)
         _, ext_name = os.path.splitext(video.cover)
         self.send(content, picture=picture, picture_name=f'cover{ext_name}')
 
@@ -49,7 +49,7 @@ class Telegram(Base):
 日期：{subscribe.publish_date}
 标签：<tg-spoiler>{', '.join(tags)}</tg-spoiler>
         '''
-        picture = cache.get_cache_file('cover', subscribe.cover)
+        picture = cover_cache.read(subscribe.cover)
         _, ext_name = os.path.splitext(subscribe.cover)
         self.send(content, picture=picture, picture_name=f'cover{ext_name}')
 
@@ -66,7 +66,7 @@ class Telegram(Base):
 大小：{actor_subscribe.size or '未知'}
 标签：<tg-spoiler>{', '.join(tags)}</tg-spoiler>
         '''
-        picture = cache.get_cache_file('cover', actor_subscribe.cover) if actor_subscribe.cover else None
+        picture = cover_cache.read(actor_subscribe.cover) if actor_subscribe.cover else None
         picture_name = None
         if picture and actor_subscribe.cover:
             _, ext_name = os.path.splitext(actor_subscribe.cover)
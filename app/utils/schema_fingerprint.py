@@ -0,0 +1,128 @@
+"""
+数据库结构指纹
+
+指纹由模型元数据（表、列、索引）、Alembic head 版本和应用版本计算得出，
+保存在数据库自身的 schema_meta 表中（数据库被替换后指纹随之失效）。
+启动时指纹未变化则跳过版本迁移、Schema 检查、迁移检查和备份。
+设置环境变量 TISSUE_FORCE_SCHEMA_CHECK=1 可强制执行完整检查。
+"""
+import hashlib
+import json
+import os
+from typing import Any, List, Optional
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Engine
+
+from app.utils.logger import logger
+from version import APP_VERSION
+
+FORCE_CHECK_ENV = "TISSUE_FORCE_SCHEMA_CHECK"
+FINGERPRINT_KEY = "schema_fingerprint"
+
+
+def describe_metadata(metadata: MetaData) -> List[Any]:
+    """将模型元数据转换为稳定排序的结构描述"""
+    tables = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        columns = [
+            [column.name, str(column.type), bool(column.nullable), bool(column.primary_key)]
+            for column in table.columns
+        ]
+        indexes = sorted(
+            [index.name or "", sorted(column.name for column in index.columns), bool(index.unique)]
+            for index in table.indexes
+        )
+        tables.append([table.name, columns, indexes])
+    return tables
+
+
+def get_alembic_heads(config_path: str = "alembic.ini") -> List[str]:
+    if not os.path.exists(config_path):
+        return []
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return sorted(ScriptDirectory.from_config(Config(config_path)).get_heads())
+
+
+class SchemaFingerprint:
+
+    def __init__(self, engine: Optional[Engine] = None, metadata: Optional[MetaData] = None,
+                 app_version: str = APP_VERSION, alembic_config: str = "alembic.ini"):
+        self._engine = engine
+        self._metadata = metadata
+        self.app_version = app_version
+        self.alembic_config = alembic_config
+        self._current: Optional[str] = None
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from app.db import engine
+            self._engine = engine
+        return self._engine
+
+    @property
+    def metadata(self) -> MetaData:
+        if self._metadata is None:
+            from app.db.models import Base
+            self._metadata = Base.metadata
+        return self._metadata
+
+    def compute(self) -> str:
+        if self._current is None:
+            payload = {
+                "tables": describe_metadata(self.metadata),
+                "alembic_heads": get_alembic_heads(self.alembic_config),
+                "app_version": self.app_version,
+            }
+            raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+            self._current = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        return self._current
+
+    def stored(self) -> Optional[str]:
+        with self.engine.connect() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_meta'")
+            ).scalar()
+            if not exists:
+                return None
+            return conn.execute(
+                text("SELECT value FROM schema_meta WHERE key = :key"), {"key": FINGERPRINT_KEY}
+            ).scalar()
+
+    def save(self, value: Optional[str] = None):
+        value = value or self.compute()
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_meta "
+                "(key VARCHAR PRIMARY KEY, value VARCHAR NOT NULL, update_time DATETIME)"
+            ))
+            conn.execute(
+                text(
+                    "INSERT INTO schema_meta (key, value, update_time) VALUES (:key, :value, CURRENT_TIMESTAMP) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, update_time = excluded.update_time"
+                ),
+                {"key": FINGERPRINT_KEY, "value": value},
+            )
+        logger.info(f"数据库结构指纹已更新: {value[:12]}")
+
+    def is_unchanged(self) -> bool:
+        """指纹一致时返回 True；读取或计算失败时按已变化处理，走完整检查"""
+        if os.getenv(FORCE_CHECK_ENV, "").lower() in ("1", "true", "yes"):
+            logger.info("已设置强制检查，执行完整的数据库结构检查")
+            return False
+        try:
+            stored = self.stored()
+            current = self.compute()
+        except Exception as e:
+            logger.warning(f"计算数据库结构指纹失败，执行完整检查: {e}")
+            return False
+        if stored != current:
+            logger.info("数据库结构指纹已变化，执行完整的版本迁移和结构检查")
+            return False
+        return True
+
+
+schema_fingerprint = SchemaFingerprint()
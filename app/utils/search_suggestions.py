@@ -3,7 +3,6 @@
 提供智能的搜索建议，包括演员名称、番号、标签等
 """
 import re
-import jieba
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
@@ -186,7 +185,8 @@ class SearchSuggestionService:
 
                 # 检查标题匹配
                 if query in video.title.lower():
-                    # 使用关键词匹配度
+                    # 使用关键词匹配度（jieba 加载较慢，延迟到首次使用时导入）
+                    import jieba
                     words = jieba.lcut(query)
                     title_words = jieba.lcut(video.title.lower())
 
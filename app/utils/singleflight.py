@@ -0,0 +1,79 @@
+"""
+同键请求合并（single-flight）
+
+同一个键同时只执行一次：第一个调用者负责执行，期间到达的其它调用者（无论来自线程还是协程）
+等待同一个结果或异常，执行结束后键即释放，下一次调用重新执行。
+结果对象会被多方持有，非首个调用者拿到的是深拷贝，避免调用方修改结果时互相影响。
+"""
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """返回 (进行中的 Future, 是否由当前调用者执行)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """同步执行 fn，同键的并发调用共享一次执行"""
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """异步执行 fn 返回的协程，可与 do 的同步调用者共享同一次执行
+
+        执行放在独立的任务中，首个调用者被取消时不影响其它等待者拿到结果。
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(await asyncio.wrap_future(future))
+        try:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+        except BaseException as e:
+            self._finish(key, future)
+            future.set_exception(e)
+            raise
+        task.add_done_callback(lambda done: self._settle(key, future, done))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Hashable, future: Future, task: asyncio.Future):
+        self._finish(key, future)
+        if task.cancelled():
+            future.set_exception(asyncio.CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
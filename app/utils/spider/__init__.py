@@ -1,4 +1,5 @@
 import traceback
+from contextlib import nullcontext
 from typing import List
 from datetime import datetime
 from urllib.parse import urlparse
@@ -6,13 +7,29 @@ from urllib.parse import urlparse
 from app.schema import VideoDetail
 from app.schema.setting import Setting
 from app.utils import cache
+from app.utils.cover_cache import cover_cache, is_image_binary
 from app.utils.logger import logger
+from app.utils.singleflight import SingleFlight
+from app.utils.spider import miss_cache
 from app.utils.spider.dmm import DmmSpider
 from app.utils.spider.jav321 import Jav321Spider
+from app.utils.spider.metadata_store import DOWNLOADS, METADATA, PREVIEWS, metadata_store
 from app.utils.spider.javbus import JavbusSpider
 from app.utils.spider.javdb import JavdbSpider
 from app.utils.spider.spider import Spider
-from app.utils.spider.spider_exception import SpiderException
+from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
+
+
+# 最近刮削的下载资源缓存（秒），同一番号短时间内重复刮削时可直接复用
+VIDEO_CACHE_PARENT = "video_detail"
+VIDEO_CACHE_SECONDS = 30 * 60
+
+# 同一番号同时只刮削一次，并发的调用者共享结果
+_scrape_flight = SingleFlight()
+
+
+def _flight_key(kind: str, number: str):
+    return kind, (number or "").strip().upper()
 
 
 def _normalize_cover_url(url: str):
@@ -22,27 +39,6 @@ def _normalize_cover_url(url: str):
     return normalized
 
 
-def _is_image_binary(content: bytes):
-    if not content:
-        return False
-
-    if content.startswith(b"\xff\xd8\xff"):  # jpeg
-        return True
-    if content.startswith(b"\x89PNG\r\n\x1a\n"):  # png
-        return True
-    if content.startswith((b"GIF87a", b"GIF89a")):  # gif
-        return True
-    if content.startswith(b"RIFF") and content[8:12] == b"WEBP":  # webp
-        return True
-    if (
-        len(content) >= 12
-        and content[4:8] == b"ftyp"
-        and content[8:12] in (b"avif", b"mif1")
-    ):  # avif/heif
-        return True
-    return False
-
-
 def get_web_actor_videos(actor_name: str, source: str = "javdb"):
     """获取演员的视频列表，这是一个辅助函数，用于避免循环导入"""
     # 延迟导入以避免循环引用
@@ -59,12 +55,12 @@ def get_video_cover(url: str):
         logger.warning(f"封面地址格式无效: {url}")
         return None
 
-    cached = cache.get_cache_file("cover", normalized_url)
+    cached = cover_cache.read(normalized_url)
     if cached is not None:
-        if _is_image_binary(cached):
+        if is_image_binary(cached):
             return cached
         logger.warning(f"封面缓存内容非图片，清理并重新抓取: {normalized_url}")
-        cache.clean_cache_file("cover", normalized_url)
+        cover_cache.remove(normalized_url)
 
     hostname = component.hostname
     if hostname in ("www.javbus.com", "javbus.com"):
@@ -78,12 +74,12 @@ def get_video_cover(url: str):
         logger.warning(f"封面抓取结果类型异常: {normalized_url}")
         return None
 
-    if not _is_image_binary(bytes(response)):
+    if not is_image_binary(bytes(response)):
         logger.warning(f"封面抓取结果不是图片内容: {normalized_url}")
         return None
 
     cover_bytes = bytes(response)
-    cache.cache_file("cover", normalized_url, cover_bytes)
+    cover_cache.put(normalized_url, cover_bytes)
     return cover_bytes
 
 
@@ -113,26 +109,69 @@ def _merge_video_info(metas: List[VideoDetail]) -> VideoDetail:
     return meta
 
 
+# 刮削元数据的站点，顺序即合并时的优先级
+SPIDER_CLASSES = [JavbusSpider, JavdbSpider, Jav321Spider, DmmSpider]
+
+
+def _skip_known_misses(spider_classes, number: str):
+    """过滤掉负缓存有效期内确认没有该番号的站点，避免构造爬虫和发起请求"""
+    available = []
+    for spider_cls in spider_classes:
+        if miss_cache.is_known_miss(spider_cls.name, number):
+            logger.info(f"{spider_cls.name} 近期未收录番号《{number}》，跳过")
+        else:
+            available.append(spider_cls)
+    return available
+
+
+def _note_not_found(spider_name: str, number: str):
+    ttl = miss_cache.record_miss(spider_name, number)
+    logger.info(f"{spider_name} 未收录番号《{number}》，{ttl // 3600} 小时内不再查询")
+
+
 def get_video_info(number: str):
-    spiders = [JavbusSpider(), JavdbSpider(), Jav321Spider(), DmmSpider()]
+    """刮削元数据，已保存的元数据在有效期内时直接使用"""
+    stored = metadata_store.fresh(number, (METADATA,))
+    if stored is not None:
+        logger.info(f"番号《{number}》使用已保存的刮削结果")
+        return stored
+    return _scrape_flight.do(_flight_key("info", number), _get_video_info, number)
+
+
+def _get_video_info(number: str):
     metas = []
+    sources = {}
+    # 所有站点都给出结果（包括明确未收录）时才推进保存结果的抓取时间
+    complete = True
     logger.info(f"开始刮削番号《{number}》")
-    for spider in spiders:
+    for spider_cls in _skip_known_misses(SPIDER_CLASSES, number):
         try:
+            spider = spider_cls()
             logger.info(f"{spider.name} 开始刮削...")
             meta = spider.get_info(number)
             metas.append(meta)
+            sources[spider.name] = meta.model_copy(deep=True)
+            miss_cache.clear_miss(spider.name, number)
             logger.info(f"{spider.name} 刮削成功")
+        except SpiderNotFound:
+            _note_not_found(spider_cls.name, number)
         except SpiderException as e:
-            logger.info(f"{spider.name} {e.message}")
+            complete = False
+            logger.info(f"{spider_cls.name} {e.message}")
         except Exception:
-            logger.error(f"{spider.name} 未知错误，请检查网站连通性")
+            complete = False
+            logger.error(f"{spider_cls.name} 未知错误，请检查网站连通性")
             traceback.print_exc()
 
     if len(metas) == 0:
+        stored = metadata_store.load(number)
+        if stored is not None:
+            logger.warning(f"番号《{number}》刮削失败，使用已保存的刮削结果")
+            return stored.detail
         return
 
     meta = _merge_video_info(metas)
+    metadata_store.save(number, meta, (METADATA,), sources, complete)
 
     actor_names = [
         actor.name
@@ -147,23 +186,48 @@ def get_video_info(number: str):
 
 def get_spiders():
     """获取所有可用的爬虫实例"""
-    return [JavbusSpider(), JavdbSpider(), Jav321Spider(), DmmSpider()]
-
-
-def get_video(number: str):
-    spiders = [JavbusSpider(), JavdbSpider()]
+    return [spider_cls() for spider_cls in SPIDER_CLASSES]
+
+
+def get_video(number: str, rate_limiter=None, use_cache: bool = False, use_stored: bool = True):
+    """刮削下载资源；传入 rate_limiter（HostRateLimiter）时，各站点请求在其 slot 内执行，
+    use_cache 为 True 时优先复用最近一次的刮削结果，或有效期内已保存的下载/预览列表；
+    use_stored 为 False 时只复用最近一次的刮削结果（订阅检查新资源时不能沿用长时间内的下载列表）"""
+    if use_cache:
+        cached = cache.get_cache_json(VIDEO_CACHE_PARENT, number)
+        if cached is not None:
+            logger.info(f"番号《{number}》复用最近的刮削结果")
+            return VideoDetail.model_validate(cached)
+        stored = metadata_store.fresh(number, (DOWNLOADS, PREVIEWS)) if use_stored else None
+        if stored is not None:
+            logger.info(f"番号《{number}》使用已保存的下载列表")
+            return stored
+
+    return _scrape_flight.do(_flight_key("video", number), _get_video, number, rate_limiter)
+
+
+def _get_video(number: str, rate_limiter=None):
+    # 只重新抓取过期的字段组：预览仍有效时不再解析预览，元数据仍有效时保留已保存的合并结果
+    stored = metadata_store.load(number)
+    stale = stored.stale_groups((METADATA, PREVIEWS), datetime.now()) if stored else [METADATA, PREVIEWS]
+    groups = (DOWNLOADS, *stale)
     metas = []
+    sources = {}
+    complete = True
     preview_trace = bool(getattr(Setting().app, "preview_trace", False))
     logger.info(f"开始刮削番号《{number}》")
 
-    for spider in spiders:
+    for spider_cls in _skip_known_misses([JavbusSpider, JavdbSpider], number):
         try:
+            spider = spider_cls()
             if spider.downloadable:
                 logger.info(f"{spider.name} 获取下载列表...")
                 try:
-                    videos = spider.get_info(
-                        number, include_downloads=True, include_previews=True
-                    )
+                    limiter = rate_limiter.slot(spider.host) if rate_limiter else nullcontext()
+                    with limiter:
+                        videos = spider.get_info(
+                            number, include_downloads=True, include_previews=PREVIEWS in groups
+                        )
                     if videos:
                         download_count = len(videos.downloads or [])
                         preview_count = sum(
@@ -193,15 +257,23 @@ def get_video(number: str):
                             )
 
                         metas.append(videos)
+                        sources[spider.name] = videos.model_copy(deep=True)
+                        miss_cache.clear_miss(spider.name, number)
                     else:
+                        complete = False
                         logger.warning(f"{spider.name} 未获取到影片信息")
+                except SpiderNotFound:
+                    _note_not_found(spider.name, number)
                 except SpiderException as e:
+                    complete = False
                     logger.error(f"{spider.name} 获取下载列表失败: {e.message}")
                 except Exception as e:
+                    complete = False
                     logger.error(f"{spider.name} 获取下载列表失败: {str(e)}")
                     traceback.print_exc()
         except Exception as e:
-            logger.error(f"{spider.name} 未知错误: {str(e)}")
+            complete = False
+            logger.error(f"{spider_cls.name} 未知错误: {str(e)}")
             traceback.print_exc()
             continue
 
@@ -210,6 +282,10 @@ def get_video(number: str):
         return None
 
     meta = _merge_video_info(metas)
+    # 有站点出错时下载列表可能不全，保存但不标记为有效，下次重新抓取
+    saved = metadata_store.save(number, meta, groups, sources, complete)
+    if saved is not None:
+        meta = saved.detail
     if preview_trace:
         merged_preview_count = sum(len(p.items or []) for p in (meta.previews or []))
         logger.info(
@@ -217,4 +293,9 @@ def get_video(number: str):
         )
     if not (meta.downloads or []):
         logger.warning(f"番号《{number}》未匹配到下载资源，但已返回可用元数据")
+
+    try:
+        cache.cache_json(VIDEO_CACHE_PARENT, number, meta.model_dump(mode="json"), VIDEO_CACHE_SECONDS)
+    except Exception as e:
+        logger.warning(f"缓存番号《{number}》刮削结果失败: {e}")
     return meta
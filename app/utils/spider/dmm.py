@@ -4,7 +4,7 @@ from urllib.parse import urljoin
 
 from app.schema import VideoDetail, VideoActor, VideoPreviewItem, VideoPreview
 from app.utils.spider.spider import Spider
-from app.utils.spider.spider_exception import SpiderException
+from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
 
 
 class DmmSpider(Spider):
@@ -17,7 +17,7 @@ class DmmSpider(Spider):
         url, code = self.get_real_page(num)
         response = self.session.get(url)
         if response.status_code == 404:
-            raise SpiderException('未找到番号')
+            raise SpiderNotFound('未找到番号')
 
         meta = VideoDetail()
 
@@ -50,7 +50,7 @@ class DmmSpider(Spider):
 
         content = data.get("ppvContent")
         if not content:
-            raise SpiderException('未找到番号')
+            raise SpiderNotFound('未找到番号')
 
         review = data.get("reviewSummary")
 
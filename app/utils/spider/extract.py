@@ -0,0 +1,151 @@
+"""
+爬虫页面字段提取
+
+XPath 表达式按字符串缓存为预编译的 etree.XPath 对象，同一表达式在进程内只编译一次；
+CardExtractor 以声明方式描述列表卡片的字段（每个字段一组候选表达式，取第一个命中的），
+info_panel 单次遍历详情页的信息面板得到 {标签: 值}，不再按字段逐个扫描整页。
+field_timings 用于基准测试时按表达式/字段统计解析耗时，未启用时只多一次判空。
+"""
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from lxml import etree
+
+
+@lru_cache(maxsize=1024)
+def compiled(expression: str) -> etree.XPath:
+    """预编译并缓存 XPath 表达式"""
+    return etree.XPath(expression)
+
+
+# 启用统计时为 {键: [累计秒数, 调用次数]}，仅供单线程基准使用
+_timings: Optional[Dict[str, List[float]]] = None
+
+
+@contextmanager
+def field_timings():
+    """在 with 块内统计各表达式/卡片字段的累计耗时与调用次数"""
+    global _timings
+    previous, _timings = _timings, defaultdict(lambda: [0.0, 0])
+    try:
+        yield _timings
+    finally:
+        _timings = previous
+
+
+def _record(key: str, start: float):
+    entry = _timings[key]
+    entry[0] += perf_counter() - start
+    entry[1] += 1
+
+
+def select(node, expression: str) -> list:
+    if _timings is None:
+        return compiled(expression)(node)
+    start = perf_counter()
+    result = compiled(expression)(node)
+    _record(expression, start)
+    return result
+
+
+def select_first(node, *expressions: str):
+    """按顺序尝试候选表达式，返回第一个命中的结果，都没有时返回 None"""
+    for expression in expressions:
+        result = select(node, expression)
+        if result:
+            return result[0]
+    return None
+
+
+def element_text(element) -> str:
+    if element is None:
+        return ""
+    return "".join(element.itertext()).strip()
+
+
+def clean_label(text: str) -> str:
+    """信息面板标签归一化：合并空白、去掉结尾冒号并转为小写"""
+    if not text:
+        return ""
+    return re.sub(r"\s+", " ", text).strip().rstrip(":：").lower()
+
+
+class Field:
+    """卡片字段：name 为结果键，expressions 为按顺序尝试的候选表达式；many 为 True 时返回全部结果"""
+    __slots__ = ("name", "expressions", "many")
+
+    def __init__(self, name: str, *expressions: str, many: bool = False):
+        self.name = name
+        self.expressions = expressions
+        self.many = many
+
+
+class CardExtractor:
+    """声明式卡片提取，表达式在构造时预编译"""
+
+    def __init__(self, *fields: Field, name: str = ""):
+        self.name = name
+        self._fields = [
+            (field.name, tuple(compiled(expression) for expression in field.expressions), field.many)
+            for field in fields
+        ]
+
+    def extract(self, node) -> Dict[str, Any]:
+        values = {}
+        for name, xpaths, many in self._fields:
+            start = perf_counter() if _timings is not None else 0.0
+            value = [] if many else None
+            for xpath in xpaths:
+                result = xpath(node)
+                if result:
+                    value = result if many else result[0]
+                    break
+            values[name] = value
+            if _timings is not None:
+                _record(f"{self.name}.{name}" if self.name else name, start)
+        return values
+
+
+# 信息面板标签后的值：优先 span.value，其次链接，最后任意相邻元素（与逐字段查询时的顺序一致）
+_INFO_VALUE_XPATHS = (
+    compiled("./following-sibling::span[contains(@class,'value')][1]"),
+    compiled("./following-sibling::a[1]"),
+    compiled("./following-sibling::*[1]"),
+)
+
+
+def info_panel(root, label_expression: str = "//strong",
+               labels: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """单次遍历标签元素，返回 {归一化标签: 值文本}
+
+    同一标签出现多次时取第一个非空值；传入 labels 时只解析这些标签的值。
+    """
+    start = perf_counter() if _timings is not None else 0.0
+    wanted = {clean_label(label) for label in labels} if labels is not None else None
+    panel: Dict[str, str] = {}
+    for label_element in compiled(label_expression)(root):
+        label = clean_label(element_text(label_element))
+        if not label or label in panel or (wanted is not None and label not in wanted):
+            continue
+        for xpath in _INFO_VALUE_XPATHS:
+            nodes = xpath(label_element)
+            value = element_text(nodes[0]) if nodes else ""
+            if value:
+                panel[label] = value
+                break
+    if _timings is not None:
+        _record(f"info_panel:{label_expression}", start)
+    return panel
+
+
+def panel_value(panel: Dict[str, str], labels: Iterable[str]) -> Optional[str]:
+    """取信息面板中任一候选标签的值，多个候选同时存在时以页面中先出现的为准"""
+    wanted = {clean_label(label) for label in labels}
+    for label, value in panel.items():
+        if label in wanted:
+            return value
+    return None
@@ -4,8 +4,9 @@ import requests
 from lxml import etree
 
 from app.schema import VideoDetail, VideoActor
+from app.utils.spider.extract import select
 from app.utils.spider.spider import Spider
-from app.utils.spider.spider_exception import SpiderException
+from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
 
 
 class Jav321Spider(Spider):
@@ -16,17 +17,22 @@ class Jav321Spider(Spider):
     def get_info(self, num: str, url: str = None, include_downloads=False, include_previews=False,
                  include_comments: bool = False):
         response = self.session.post(urljoin(self.host, '/search'), data={'sn': num})
+        if response.status_code != 200:
+            raise SpiderException(f'请求失败，状态码: {response.status_code}')
         html = etree.HTML(response.text)
+        # 站点正常返回的页面都套在 container 布局里；风控/挑战页没有，不能当作未收录
+        if html is None or not select(html, "//div[contains(@class,'container')]"):
+            raise SpiderException('搜索页面结构异常')
 
-        no = html.xpath("//small")
-        if not no or num.lower() not in no[0].text.lower().strip():
-            raise SpiderException('未找到番号')
+        no = select(html, "//small")
+        if not no or num.lower() not in (no[0].text or '').lower().strip():
+            raise SpiderNotFound('未找到番号')
 
         meta = VideoDetail()
         meta.num = num
 
         # Title: <h3>Title Text <small>num</small></h3>
-        h3 = html.xpath("//h3")
+        h3 = select(html, "//h3")
         if h3:
             # Get full text then strip the trailing num in <small>
             h3_el = h3[0]
@@ -37,12 +43,12 @@ class Jav321Spider(Spider):
             meta.title = "".join(title_parts).strip()
 
         # Cover image
-        cover_els = html.xpath("//div[contains(@class,'col-md-3')]//img/@src")
+        cover_els = select(html, "//div[contains(@class,'col-md-3')]//img/@src")
         if cover_els:
             meta.cover = cover_els[0]
 
         # Metadata from <b> labels
-        info_rows = html.xpath("//div[b]")
+        info_rows = select(html, "//div[b]")
         if info_rows:
             info_text = etree.tostring(info_rows[0], encoding='unicode', method='text')
             import re
@@ -7,8 +7,9 @@ from lxml import etree
 from urllib.parse import urljoin, urlparse
 
 from app.schema import VideoDetail, VideoActor, VideoDownload, VideoPreviewItem, VideoPreview, VideoSiteActor
+from app.utils.spider.extract import select
 from app.utils.spider.spider import Spider
-from app.utils.spider.spider_exception import SpiderException
+from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
 from app.schema.home import JavDBRanking
 
 logger = logging.getLogger(__name__)
@@ -130,6 +131,8 @@ class JavbusSpider(Spider):
             response = self._check_and_bypass_verification(url)
             
             # 检查响应状态码
+            if response.status_code == 404:
+                raise SpiderNotFound(f'番号 {num} 不存在')
             if response.status_code != 200:
                 raise SpiderException(f'请求失败，状态码: {response.status_code}')
                 
@@ -137,23 +140,23 @@ class JavbusSpider(Spider):
             
             # 检查是否是有效的番号页面
             # 方法1: 检查是否有番号标题
-            title_element = html.xpath("//h3")
+            title_element = select(html, "//h3")
             
             # 方法2: 检查页面title，如果包含404或者找不到，说明是无效页面
-            page_title = html.xpath("//title/text()")
+            page_title = select(html, "//title/text()")
             if page_title:
                 title_lower = page_title[0].lower()
                 if '404' in title_lower or 'not found' in title_lower or '找不到' in title_lower:
-                    raise SpiderException(f'番号 {num} 不存在')
+                    raise SpiderNotFound(f'番号 {num} 不存在')
             
             # 方法3: 检查是否有作品信息容器
-            info_container = html.xpath("//div[@class='container']")
+            info_container = select(html, "//div[@class='container']")
             
             # 如果三个关键元素都找不到，说明页面无效
             if not title_element and not info_container:
                 # 尝试检查是否重定向到首页
                 if response.url.rstrip('/') == self.host.rstrip('/'):
-                    raise SpiderException(f'番号 {num} 不存在（重定向到首页）')
+                    raise SpiderNotFound(f'番号 {num} 不存在（重定向到首页）')
                 raise SpiderException('未找到番号或页面结构已变化')
 
             # 确保title_element不为空
@@ -167,7 +170,7 @@ class JavbusSpider(Spider):
             meta.title = title
 
             # 尝试从页面中提取评分信息
-            score_element = html.xpath("//div[contains(@class,'score')]")
+            score_element = select(html, "//div[contains(@class,'score')]")
             if score_element:
                 score_text = etree.tostring(score_element[0], method='text', encoding='utf-8').decode('utf-8').strip()
                 # 尝试提取评分值
@@ -180,42 +183,42 @@ class JavbusSpider(Spider):
                 
                 # 尝试提取评论数，但VideoDetail没有这个字段，所以不设置
 
-            premiered_element = html.xpath("//span[text()='發行日期:']")
+            premiered_element = select(html, "//span[text()='發行日期:']")
             if premiered_element:
                 meta.premiered = premiered_element[0].tail.strip()
 
-            runtime_element = html.xpath("//span[text()='長度:']")
+            runtime_element = select(html, "//span[text()='長度:']")
             if runtime_element:
                 runtime = runtime_element[0].tail.strip()
                 runtime = runtime.replace("分鐘", "")
                 meta.runtime = runtime
 
-            director_element = html.xpath("//span[text()='導演:']/../a")
+            director_element = select(html, "//span[text()='導演:']/../a")
             if director_element:
                 director = director_element[0].text
                 meta.director = director
 
-            studio_element = html.xpath("//span[text()='製作商:']/../a")
+            studio_element = select(html, "//span[text()='製作商:']/../a")
             if studio_element:
                 studio = studio_element[0].text
                 meta.studio = studio
 
-            publisher_element = html.xpath("//span[text()='發行商:']/../a")
+            publisher_element = select(html, "//span[text()='發行商:']/../a")
             if publisher_element:
                 publisher = publisher_element[0].text
                 meta.publisher = publisher
 
-            series_element = html.xpath("//span[text()='系列:']/../a")
+            series_element = select(html, "//span[text()='系列:']/../a")
             if series_element:
                 series = series_element[0].text
                 meta.series = series
 
-            tag_elements = html.xpath("//span[@class='genre']//a[contains(@href,'genre')]")
+            tag_elements = select(html, "//span[@class='genre']//a[contains(@href,'genre')]")
             if tag_elements:
                 tags = [tag.text for tag in tag_elements]
                 meta.tags = tags
 
-            actor_elements = html.xpath("//span[@class='genre']//a[contains(@href,'star')]")
+            actor_elements = select(html, "//span[@class='genre']//a[contains(@href,'star')]")
             if actor_elements:
                 actors = []
                 for element in actor_elements:
@@ -227,7 +230,7 @@ class JavbusSpider(Spider):
                 meta.actors = actors
                 meta.site_actors = [VideoSiteActor(website=self.name, items=actors)]
 
-            cover_element = html.xpath("//a[@class='bigImage']")
+            cover_element = select(html, "//a[@class='bigImage']")
             if cover_element:
                 cover = cover_element[0].get("href")
                 meta.cover = urljoin(self.host, cover)
@@ -253,9 +256,9 @@ class JavbusSpider(Spider):
     def get_previews(self, html: etree.HTML):
         result = []
 
-        images = html.xpath("//a[@class='sample-box']")
+        images = select(html, "//a[@class='sample-box']")
         for image in images:
-            img_elements = image.xpath("./div/img")
+            img_elements = select(image, "./div/img")
             if not img_elements:
                 continue
             thumb = img_elements[0]
@@ -287,9 +290,9 @@ class JavbusSpider(Spider):
         html = etree.HTML(f'<table>{response.text}</table>', parser=etree.HTMLParser(encoding='utf-8'))
 
         result = []
-        table = html.xpath("//tr")
+        table = select(html, "//tr")
         for item in table:
-            parts = item.xpath("./td[1]/a")
+            parts = select(item, "./td[1]/a")
             if not parts:
                 continue
 
@@ -309,12 +312,12 @@ class JavbusSpider(Spider):
                 if tag.text == '字幕':
                     download.is_zh = True
 
-            size_element = item.xpath("./td[2]/a")
+            size_element = select(item, "./td[2]/a")
             if not size_element:
                 continue
             download.size = size_element[0].text.strip()
 
-            publish_date_element = item.xpath("./td[3]/a")
+            publish_date_element = select(item, "./td[3]/a")
             if not publish_date_element:
                 continue
             try:
@@ -360,13 +363,14 @@ class JavbusSpider(Spider):
             html_content = response.content
             logger.info(f"响应内容大小: {len(html_content)} 字节")
             
-            # 保存页面内容用于调试
-            try:
-                with open("javbus_actresses_debug.html", "wb") as f:
-                    f.write(html_content)
-                logger.info("已保存actresses页面HTML文件")
-            except Exception as e:
-                logger.error(f"保存HTML文件失败: {str(e)}")
+            # 仅在 DEBUG 级别日志启用时保存页面内容用于调试
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    with open("javbus_actresses_debug.html", "wb") as f:
+                        f.write(html_content)
+                    logger.debug("已保存actresses页面HTML文件")
+                except Exception as e:
+                    logger.error(f"保存HTML文件失败: {str(e)}")
             
             html = etree.HTML(html_content, parser=etree.HTMLParser(encoding='utf-8'))
             
@@ -374,17 +378,17 @@ class JavbusSpider(Spider):
             
             # 尝试多种方式获取演员列表
             # 1. 先尝试使用XPath选择器
-            actresses = html.xpath('//a[@class="avatar-box text-center"]')
+            actresses = select(html, '//a[@class="avatar-box text-center"]')
             logger.info(f"使用XPath找到演员元素: {len(actresses)}个")
             
             if not actresses:
                 # 2. 尝试使用更宽松的选择器
-                actresses = html.xpath('//a[contains(@class, "avatar-box")]')
+                actresses = select(html, '//a[contains(@class, "avatar-box")]')
                 logger.info(f"使用宽松XPath找到演员元素: {len(actresses)}个")
             
             if not actresses:
                 # 3. 尝试查找包含演员照片的元素
-                actresses = html.xpath('//div[@id="waterfall"]/div/a') or html.xpath('//div[contains(@class, "item")]/a')
+                actresses = select(html, '//div[@id="waterfall"]/div/a') or select(html, '//div[contains(@class, "item")]/a')
                 logger.info(f"使用备用XPath找到演员元素: {len(actresses)}个")
             
             # 如果XPath都失败了，尝试正则表达式
@@ -426,12 +430,12 @@ class JavbusSpider(Spider):
                     actress_avatar = None
                     
                     # 尝试获取名称
-                    name_elements = actress.xpath('./div/img/@title') or actress.xpath('.//img/@title')
+                    name_elements = select(actress, './div/img/@title') or select(actress, './/img/@title')
                     if name_elements:
                         actress_name = name_elements[0]
                     else:
                         # 尝试其他方法
-                        name_elements = actress.xpath('.//span/text()') or actress.xpath('.//text()')
+                        name_elements = select(actress, './/span/text()') or select(actress, './/text()')
                         if name_elements:
                             for text in name_elements:
                                 if text.strip():
@@ -447,7 +451,7 @@ class JavbusSpider(Spider):
                         continue
                     
                     # 尝试获取头像
-                    avatar_elements = actress.xpath('./div/img/@src') or actress.xpath('.//img/@src')
+                    avatar_elements = select(actress, './div/img/@src') or select(actress, './/img/@src')
                     if avatar_elements:
                         actress_avatar = avatar_elements[0]
                         if actress_avatar.startswith('/'):
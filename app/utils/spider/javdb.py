@@ -19,12 +19,72 @@ from app.schema import (
     VideoSiteActor,
 )
 from app.schema.home import JavDBRanking
+from app.utils.spider.extract import (
+    CardExtractor,
+    Field,
+    info_panel,
+    panel_value,
+    select,
+)
 from app.utils.spider.spider import Spider
-from app.utils.spider.spider_exception import SpiderException
+from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
 
 # 获取logger
 logger = logging.getLogger("spider")
 
+_SCORE_XPATHS = (
+    ".//div[contains(@class, 'score')]//span[contains(@class, 'value')]",
+    ".//div[contains(@class, 'score')]/span",
+)
+
+# 排行榜页面卡片（div.item）
+_RANKING_PAGE_CARD = CardExtractor(
+    Field("num", ".//div[contains(@class, 'video-title')]/strong"),
+    Field(
+        "link",
+        ".//a[contains(@class, 'box') and contains(@href, '/v/')]",
+        ".//a[contains(@href, '/v/')]",
+    ),
+    Field("title", ".//div[contains(@class, 'video-title')]"),
+    Field("cover", ".//img"),
+    Field("score", *_SCORE_XPATHS),
+    Field("meta", ".//div[contains(@class, 'meta')]"),
+    Field("cnsub", ".//span[contains(@class, 'cnsub')]"),
+    Field("tags", ".//div[contains(@class, 'tags')]//span/text()", many=True),
+    name="javdb.ranking_page",
+)
+
+# get_ranking 以影片链接所在的 div.item 为卡片
+_RANKING_CARD = CardExtractor(
+    Field("cover", ".//div[contains(@class, 'cover')]//img"),
+    Field("title", ".//div[contains(@class, 'video-title')]"),
+    Field("num", ".//div[contains(@class, 'video-title')]/strong"),
+    Field("meta", ".//div[contains(@class, 'meta')]"),
+    Field("score", *_SCORE_XPATHS),
+    Field("tags", ".//div[contains(@class, 'tags')]/span/text()", many=True),
+    name="javdb.ranking",
+)
+
+# 演员作品列表（a.box）
+_ACTOR_VIDEO_BOX = CardExtractor(
+    Field("title", './/div[contains(@class, "video-title")]'),
+    Field("cover", './/img[@loading="lazy"]'),
+    Field("score", './/div[contains(@class, "score")]//span[@class="value"]'),
+    Field("cnsub", './/span[contains(@class, "cnsub")]'),
+    Field("uncensored", './/span[contains(@class, "uncensored")]'),
+    Field("date", './/div[contains(@class, "meta")]/text()'),
+    name="javdb.actor_videos",
+)
+
+_INFO_LABELS = {
+    "premiered": ["日期", "released date", "release date"],
+    "runtime": ["時長", "时长", "duration"],
+    "director": ["導演", "导演", "director"],
+    "studio": ["片商", "maker", "studio"],
+    "publisher": ["發行", "发行", "publisher"],
+    "series": ["系列", "series"],
+}
+
 
 class JavdbSpider(Spider):
     host = "https://javdb.com"
@@ -186,34 +246,7 @@ class JavdbSpider(Spider):
         return cleaned.lower()
 
     def _extract_info_value(self, html: etree.HTML, labels: List[str]) -> Optional[str]:
-        wanted = {self._clean_label(label) for label in labels}
-        blocks = html.xpath("//strong")
-        for strong in blocks:
-            label = self._clean_label(self._extract_text(strong))
-            if label not in wanted:
-                continue
-
-            sibling_values = strong.xpath(
-                "./following-sibling::span[contains(@class,'value')][1]"
-            )
-            if sibling_values:
-                value = self._extract_text(sibling_values[0])
-                if value:
-                    return value
-
-            sibling_links = strong.xpath("./following-sibling::a[1]")
-            if sibling_links:
-                value = self._extract_text(sibling_links[0])
-                if value:
-                    return value
-
-            sibling_nodes = strong.xpath("./following-sibling::*[1]")
-            if sibling_nodes:
-                value = self._extract_text(sibling_nodes[0])
-                if value:
-                    return value
-
-        return None
+        return panel_value(info_panel(html, labels=labels), labels)
 
     def _absolutize(self, maybe_url: str) -> str:
         url = (maybe_url or "").strip()
@@ -349,7 +382,7 @@ class JavdbSpider(Spider):
                 url = urljoin(self.host, url)
 
         if not url:
-            raise SpiderException("未找到番号")
+            raise SpiderNotFound("未找到番号")
         else:
             if searched:
                 time.sleep(randint(1, 3))
@@ -358,13 +391,13 @@ class JavdbSpider(Spider):
         meta.num = num
 
         if not isinstance(url, str):
-            raise SpiderException("未找到番号")
+            raise SpiderNotFound("未找到番号")
 
         response = self._get(url)
         html = etree.HTML(response.content, parser=etree.HTMLParser(encoding="utf-8"))
 
-        title_element = html.xpath(
-            "//strong[contains(@class,'current-title')] | //h2[contains(@class,'title')]"
+        title_element = select(
+            html, "//strong[contains(@class,'current-title')] | //h2[contains(@class,'title')]"
         )
         if title_element:
             title = self._extract_text(title_element[0])
@@ -377,13 +410,14 @@ class JavdbSpider(Spider):
             else:
                 meta.title = f"{num.upper()} {title}"
 
-        premiered = self._extract_info_value(
-            html, ["日期", "released date", "release date"]
-        )
+        # 信息面板只遍历一次，各字段从同一份 {标签: 值} 中读取
+        panel = info_panel(html)
+
+        premiered = panel_value(panel, _INFO_LABELS["premiered"])
         if premiered:
             meta.premiered = premiered
 
-        runtime = self._extract_info_value(html, ["時長", "时长", "duration"])
+        runtime = panel_value(panel, _INFO_LABELS["runtime"])
         if runtime:
             runtime = re.sub(
                 r"\s*(minute\(s\)|minutes?|分鍾|分钟|min)\s*",
@@ -393,24 +427,24 @@ class JavdbSpider(Spider):
             )
             meta.runtime = runtime.strip()
 
-        director = self._extract_info_value(html, ["導演", "导演", "director"])
+        director = panel_value(panel, _INFO_LABELS["director"])
         if director:
             meta.director = director
 
-        studio = self._extract_info_value(html, ["片商", "maker", "studio"])
+        studio = panel_value(panel, _INFO_LABELS["studio"])
         if studio:
             meta.studio = studio
 
-        publisher = self._extract_info_value(html, ["發行", "发行", "publisher"])
+        publisher = panel_value(panel, _INFO_LABELS["publisher"])
         if publisher:
             meta.publisher = publisher
 
-        series = self._extract_info_value(html, ["系列", "series"])
+        series = panel_value(panel, _INFO_LABELS["series"])
         if series:
             meta.series = series
 
         # 标签 - Tags (过滤掉导航类标签如 '類別', 'Tags')
-        tag_elements = html.xpath("//a[contains(@href,'/tags?')]")
+        tag_elements = select(html, "//a[contains(@href,'/tags?')]")
         if tag_elements:
             skip_tags = ["類別", "Tags", "标签"]
             tags = [
@@ -421,13 +455,13 @@ class JavdbSpider(Spider):
             meta.tags = tags
 
         # 演员 - 支持中英文标签，female symbol 或 Actor(s) 标签
-        actor_elements = html.xpath(
-            "//strong[contains(@class,'symbol') and contains(@class,'female')]"
+        actor_elements = select(
+            html, "//strong[contains(@class,'symbol') and contains(@class,'female')]"
         )
         if actor_elements:
             actors = []
             for element in actor_elements:
-                links = element.xpath("./preceding-sibling::a[1]")
+                links = select(element, "./preceding-sibling::a[1]")
                 if not links:
                     continue
                 actor_element = links[0]
@@ -446,11 +480,11 @@ class JavdbSpider(Spider):
             meta.site_actors = [VideoSiteActor(website=self.name, items=actors)]
         else:
             actors = []
-            actor_links = html.xpath("//a[contains(@href,'/actors/') and .//strong]")
+            actor_links = select(html, "//a[contains(@href,'/actors/') and .//strong]")
             for actor_link in actor_links:
                 actor_name = (
-                    self._extract_text(actor_link.xpath(".//strong")[0])
-                    if actor_link.xpath(".//strong")
+                    self._extract_text(select(actor_link, ".//strong")[0])
+                    if select(actor_link, ".//strong")
                     else ""
                 )
                 actor_url = actor_link.get("href") or ""
@@ -467,20 +501,20 @@ class JavdbSpider(Spider):
                 meta.actors = actors
                 meta.site_actors = [VideoSiteActor(website=self.name, items=actors)]
 
-        cover_element = html.xpath(
-            "//img[contains(@class,'video-cover')] | //div[contains(@class,'cover')]//img[1]"
+        cover_element = select(
+            html, "//img[contains(@class,'video-cover')] | //div[contains(@class,'cover')]//img[1]"
         )
         if cover_element:
             meta.cover = self._absolutize(cover_element[0].get("src") or "")
         if not meta.cover:
-            og_cover = html.xpath("//meta[@property='og:image']/@content")
+            og_cover = select(html, "//meta[@property='og:image']/@content")
             if og_cover:
                 meta.cover = self._absolutize(og_cover[0])
 
         # 评分和评论数 - 支持新格式 "4.56, by 1575 users" 和旧格式 "4.56分, 由1575人評價"
         # 新结构: strong[text()='Rating:']/following-sibling::span[@class='value']
-        rating_element = html.xpath(
-            "//strong[contains(normalize-space(),'Rating') or contains(normalize-space(),'評分')]/following-sibling::span[contains(@class,'value')][1]"
+        rating_element = select(
+            html, "//strong[contains(normalize-space(),'Rating') or contains(normalize-space(),'評分')]/following-sibling::span[contains(@class,'value')][1]"
         )
         if rating_element:
             # 获取所有文本内容
@@ -503,8 +537,8 @@ class JavdbSpider(Spider):
                     meta.comments_count = int(count_match.group(1))
         else:
             # 回退：旧的XPath方式
-            score_elements = html.xpath(
-                "//span[contains(@class,'score-stars')]/../text()"
+            score_elements = select(
+                html, "//span[contains(@class,'score-stars')]/../text()"
             )
             if score_elements:
                 score_text = str(score_elements[0])
@@ -514,7 +548,7 @@ class JavdbSpider(Spider):
 
         # 如果上面没有获取到评论数，从tabs获取
         if not meta.comments_count:
-            comments_elements = html.xpath("//div[contains(@class, 'tabs')]//a")
+            comments_elements = select(html, "//div[contains(@class, 'tabs')]//a")
             for el in comments_elements:
                 text = "".join(el.itertext()).strip()
                 if "短評" in text or "Reviews" in text:
@@ -539,11 +573,20 @@ class JavdbSpider(Spider):
         url = urljoin(self.host, f"/search?q={num}&f=all")
         response = self._get(url)
 
+        # 换镜像重试后仍被封禁、跳到登录页等都不是"站点没有该番号"，不能记入未收录缓存
+        if response.status_code != 200:
+            raise SpiderException(f"请求失败，状态码: {response.status_code}")
+        if self._is_banned_response(response) or "/login" in str(response.url):
+            raise SpiderException("搜索被风控拦截或需要登录")
         html = etree.HTML(response.content)
-        matched_elements = html.xpath("//div[contains(@class,'video-title')]/strong")
+        if html is None or not select(
+            html, "//div[contains(@class,'movie-list')] | //div[contains(@class,'empty-message')]"
+        ):
+            raise SpiderException("搜索页面缺少结果列表")
+        matched_elements = select(html, "//div[contains(@class,'video-title')]/strong")
         if not matched_elements:
-            matched_elements = html.xpath(
-                "//a[contains(@href,'/v/') and .//strong]//strong"
+            matched_elements = select(
+                html, "//a[contains(@href,'/v/') and .//strong]//strong"
             )
         # 记录搜索结果用于调试
         logger.debug(f"搜索 {num} 找到 {len(matched_elements)} 个结果")
@@ -552,8 +595,8 @@ class JavdbSpider(Spider):
         for matched_element in matched_elements:
             element_text = matched_element.text
             if element_text and element_text.strip().lower() == num.lower():
-                parent_links = matched_element.xpath(
-                    './ancestor::a[contains(@href,"/v/")][1]'
+                parent_links = select(
+                    matched_element, './ancestor::a[contains(@href,"/v/")][1]'
                 )
                 if not parent_links:
                     continue
@@ -570,8 +613,8 @@ class JavdbSpider(Spider):
                     element_text.strip().lower().replace("-", "").replace("_", "")
                 )
                 if element_normalized == num_normalized:
-                    parent_links = matched_element.xpath(
-                        './ancestor::a[contains(@href,"/v/")][1]'
+                    parent_links = select(
+                        matched_element, './ancestor::a[contains(@href,"/v/")][1]'
                     )
                     if not parent_links:
                         continue
@@ -593,15 +636,15 @@ class JavdbSpider(Spider):
     def get_previews(self, html: etree.HTML):
         result = []
 
-        videos = html.xpath(
-            "//div[contains(@class,'preview-images')]/a[contains(@class,'preview-video-container')]"
+        videos = select(
+            html, "//div[contains(@class,'preview-images')]/a[contains(@class,'preview-video-container')]"
         )
         for video in videos:
             href = video.get("href")
             # 跳过指向登录页面的链接（未登录用户）
             if not href or href == "/login":
                 continue
-            thumb_elements = video.xpath("./img")
+            thumb_elements = select(video, "./img")
             if not thumb_elements:
                 continue
             thumb = thumb_elements[0]
@@ -609,7 +652,7 @@ class JavdbSpider(Spider):
             if href.startswith("#"):
                 video_sources = html.xpath(f"//video[@id='{href[1:]}']/source")
             if not video_sources:
-                video_sources = video.xpath(".//source")
+                video_sources = select(video, ".//source")
 
             if video_sources:
                 thumb_src = thumb.get("src") or ""
@@ -625,11 +668,11 @@ class JavdbSpider(Spider):
                     )
                     result.append(preview)
 
-        images = html.xpath(
-            "//div[contains(@class,'preview-images')]/a[contains(@class,'tile-item')]"
+        images = select(
+            html, "//div[contains(@class,'preview-images')]/a[contains(@class,'tile-item')]"
         )
         for image in images:
-            thumb_elements = image.xpath("./img")
+            thumb_elements = select(image, "./img")
             if not thumb_elements:
                 continue
             thumb = thumb_elements[0]
@@ -899,15 +942,15 @@ class JavdbSpider(Spider):
     def get_downloads(self, url: str, html: etree.HTML):
         result = []
         # 新结构: div.item.columns > div.magnet-name > a
-        table = html.xpath("//div[@id='magnets-content']/div[contains(@class, 'item')]")
+        table = select(html, "//div[@id='magnets-content']/div[contains(@class, 'item')]")
 
         for item in table:
             download = VideoDownload()
 
             # 获取磁力链接元素
-            magnet_link = item.xpath(".//div[contains(@class, 'magnet-name')]/a")
+            magnet_link = select(item, ".//div[contains(@class, 'magnet-name')]/a")
             if not magnet_link:
-                magnet_link = item.xpath("./div[1]/a")
+                magnet_link = select(item, "./div[1]/a")
             if not magnet_link:
                 continue
 
@@ -917,12 +960,12 @@ class JavdbSpider(Spider):
             download.magnet = parts.get("href")
 
             # 获取名称 - 新结构使用 span.name
-            name_el = parts.xpath("./span[@class='name']")
+            name_el = select(parts, "./span[@class='name']")
             if name_el:
                 download.name = name_el[0].text.strip()
             else:
                 # 旧结构回退
-                first_text = parts.xpath("./text()")
+                first_text = select(parts, "./text()")
                 if first_text:
                     download.name = first_text[0].strip()
                 else:
@@ -934,12 +977,12 @@ class JavdbSpider(Spider):
                 download.is_uncensored = True
 
             # 获取文件大小 - 新结构使用 span.meta
-            size_el = parts.xpath("./span[@class='meta']")
+            size_el = select(parts, "./span[@class='meta']")
             if size_el:
                 download.size = size_el[0].text.strip().split(",")[0].strip()
             else:
                 # 旧结构回退
-                size = parts.xpath("./span[2]")
+                size = select(parts, "./span[2]")
                 if size:
                     download.size = (
                         size[0].text.split(",")[0].strip() if size[0].text else ""
@@ -947,8 +990,8 @@ class JavdbSpider(Spider):
 
             # 获取标签 (HD, 字幕等) - 新结构使用 span.tag
             # 先尝试 div.tags 内的 span，再尝试直接的 span.tag
-            tag_elements = parts.xpath('.//div[@class="tags"]/span') or parts.xpath(
-                './/span[contains(@class, "tag")]'
+            tag_elements = select(parts, './/div[@class="tags"]/span') or select(
+                parts, './/span[contains(@class, "tag")]'
             )
             for tag in tag_elements:
                 tag_text = tag.text.strip() if tag.text else ""
@@ -959,9 +1002,9 @@ class JavdbSpider(Spider):
 
             # 获取发布日期 - 新结构使用不同的元素
             publish_date = (
-                item.xpath(".//span[@class='time']")
-                or item.xpath(".//div[contains(@class, 'date')]")
-                or item.xpath("./div[last()]")
+                select(item, ".//span[@class='time']")
+                or select(item, ".//div[contains(@class, 'date')]")
+                or select(item, "./div[last()]")
             )
             if publish_date:
                 date_text = publish_date[0].text
@@ -985,8 +1028,8 @@ class JavdbSpider(Spider):
 
         result = []
 
-        videos = html.xpath(
-            "//div[contains(@class, 'movie-list')]//a[contains(@href, '/v/')]"
+        videos = select(
+            html, "//div[contains(@class, 'movie-list')]//a[contains(@href, '/v/')]"
         )
 
         # 如果没有找到视频，检测是否需要登录并尝试fallback
@@ -1008,45 +1051,31 @@ class JavdbSpider(Spider):
             try:
                 ranking = JavDBRanking()
 
+                card = select(video, "./ancestor::div[contains(@class, 'item')][1]")
+                fields = _RANKING_CARD.extract(card[0] if card else video)
+
                 # 封面图片
-                card = video.xpath("./ancestor::div[contains(@class, 'item')][1]")
-                card = card[0] if card else video
-                cover_imgs = card.xpath(".//div[contains(@class, 'cover')]//img")
-                if cover_imgs:
-                    ranking.cover = self._absolutize(cover_imgs[0].get("src") or "")
+                if fields["cover"] is not None:
+                    ranking.cover = self._absolutize(fields["cover"].get("src") or "")
 
                 # 标题
                 ranking.title = video.get("title")
-                if not ranking.title:
-                    title_nodes = card.xpath(".//div[contains(@class, 'video-title')]")
-                    if title_nodes:
-                        ranking.title = self._extract_text(title_nodes[0])
+                if not ranking.title and fields["title"] is not None:
+                    ranking.title = self._extract_text(fields["title"])
 
                 # 番号
-                num_elements = card.xpath(
-                    ".//div[contains(@class, 'video-title')]/strong"
-                )
-                if num_elements:
-                    ranking.num = self._extract_text(num_elements[0])
+                if fields["num"] is not None:
+                    ranking.num = self._extract_text(fields["num"])
 
                 # 发布日期 - 使用公共方法解析
-                meta_elements = card.xpath(".//div[contains(@class, 'meta')]")
-                if meta_elements:
-                    date_str = self._extract_text(meta_elements[0])
+                if fields["meta"] is not None:
+                    date_str = self._extract_text(fields["meta"])
                     if date_str:
                         ranking.publish_date = self._parse_date(date_str)
 
                 # 评分 - 使用公共方法解析
-                score_elements = card.xpath(
-                    ".//div[contains(@class, 'score')]//span[contains(@class, 'value')]"
-                )
-                if not score_elements:
-                    score_elements = card.xpath(
-                        ".//div[contains(@class, 'score')]/span"
-                    )
-
-                if score_elements:
-                    score_text = "".join(score_elements[0].itertext()).strip()
+                if fields["score"] is not None:
+                    score_text = self._extract_text(fields["score"])
                     ranking.rank, ranking.rank_count = self._parse_score_text(
                         score_text
                     )
@@ -1054,14 +1083,8 @@ class JavdbSpider(Spider):
                 ranking.url = self._absolutize(video.get("href") or "")
 
                 # 标签 - 检查是否有中文字幕
-                tag_elements = card.xpath(
-                    ".//div[contains(@class, 'tags')]/span/text()"
-                )
-                if tag_elements:
-                    tag_str = " ".join(tag_elements)
-                    ranking.is_zh = "中字" in tag_str or "CnSub" in tag_str
-                else:
-                    ranking.is_zh = False
+                tag_str = " ".join(fields["tags"])
+                ranking.is_zh = "中字" in tag_str or "CnSub" in tag_str
 
                 result.append(ranking)
             except Exception as e:
@@ -1284,8 +1307,8 @@ class JavdbSpider(Spider):
         videos = []
 
         # 排行榜页面使用movie-list结构
-        video_elements = html.xpath(
-            "//div[contains(@class, 'movie-list')]//div[contains(@class, 'item')]"
+        video_elements = select(
+            html, "//div[contains(@class, 'movie-list')]//div[contains(@class, 'item')]"
         )
         logger.info(f"{page_type}第 {page} 页找到 {len(video_elements)} 个视频元素")
 
@@ -1299,7 +1322,7 @@ class JavdbSpider(Spider):
             ]
 
             for selector in alternative_selectors:
-                video_elements = html.xpath(selector)
+                video_elements = select(html, selector)
                 if video_elements:
                     logger.info(
                         f"使用备用选择器找到 {len(video_elements)} 个视频元素: {selector}"
@@ -1327,55 +1350,35 @@ class JavdbSpider(Spider):
             try:
                 video_info = {}
 
+                fields = _RANKING_PAGE_CARD.extract(element)
+
                 # 获取番号 - 从video-title下的strong元素
-                title_element = element.xpath(
-                    ".//div[contains(@class, 'video-title')]/strong"
-                )
-                if not title_element or not title_element[0].text:
+                if fields["num"] is None or not fields["num"].text:
                     continue
-                num = title_element[0].text.strip()
+                num = fields["num"].text.strip()
                 video_info["num"] = num
                 video_info["page_type"] = page_type
 
-                # 获取链接 - 从a.box元素
-                link_element = element.xpath(
-                    ".//a[contains(@class, 'box') and contains(@href, '/v/')]"
-                )
-                if not link_element:
-                    link_element = element.xpath(".//a[contains(@href, '/v/')]")
-                if link_element:
-                    video_url = self._absolutize(link_element[0].get("href") or "")
-                    video_info["url"] = video_url
+                # 获取链接 - 优先a.box元素
+                if fields["link"] is not None:
+                    video_info["url"] = self._absolutize(fields["link"].get("href") or "")
 
                 # 获取标题 - video-title的完整文本
-                title_div = element.xpath(".//div[contains(@class, 'video-title')]")
-                if title_div:
-                    # 提取完整标题文本
-                    full_title = "".join(title_div[0].itertext()).strip()
-                    video_info["title"] = full_title
+                if fields["title"] is not None:
+                    video_info["title"] = self._extract_text(fields["title"])
                 else:
                     video_info["title"] = num
 
                 # 获取封面
-                cover_element = element.xpath(".//img")
-                if cover_element:
-                    video_info["cover"] = self._absolutize(
-                        cover_element[0].get("src") or ""
-                    )
+                if fields["cover"] is not None:
+                    video_info["cover"] = self._absolutize(fields["cover"].get("src") or "")
 
                 # 获取评分和评论数 - 使用公共方法解析
-                score_element = element.xpath(
-                    ".//div[contains(@class, 'score')]//span[contains(@class, 'value')]"
-                )
-                if not score_element:
-                    score_element = element.xpath(
-                        ".//div[contains(@class, 'score')]/span"
-                    )
                 rating = None
                 comments = 0
 
-                if score_element:
-                    score_text = "".join(score_element[0].itertext()).strip()
+                if fields["score"] is not None:
+                    score_text = self._extract_text(fields["score"])
                     logger.debug(f"原始评分文本: '{score_text}'")
                     rating, comments = self._parse_score_text(score_text)
                     if rating is not None:
@@ -1389,9 +1392,8 @@ class JavdbSpider(Spider):
                 video_info["rank_count"] = comments
 
                 # 获取发布日期
-                meta_elements = element.xpath(".//div[contains(@class, 'meta')]")
-                if meta_elements:
-                    date_text = "".join(meta_elements[0].itertext()).strip()
+                if fields["meta"] is not None:
+                    date_text = self._extract_text(fields["meta"])
                     if date_text:
                         parsed_date = self._parse_date(date_text)
                         video_info["release_date"] = (
@@ -1405,12 +1407,9 @@ class JavdbSpider(Spider):
                 video_info["is_hd"] = False  # 排行榜数据默认不标记为高清，避免影响筛选
 
                 # 检查中文字幕: cnsub标签（封面区域）或含中字的tags
-                cnsub_elements = element.xpath(".//span[contains(@class, 'cnsub')]")
-                tag_texts = " ".join(
-                    element.xpath(".//div[contains(@class, 'tags')]//span/text()")
-                )
+                tag_texts = " ".join(fields["tags"])
                 video_info["is_zh"] = (
-                    bool(cnsub_elements) or "中字" in tag_texts or "CnSub" in tag_texts
+                    fields["cnsub"] is not None or "中字" in tag_texts or "CnSub" in tag_texts
                 )
 
                 video_info["website"] = self.name
@@ -1437,35 +1436,36 @@ class JavdbSpider(Spider):
         response = self._get(url)
         html_content = response.content
 
-        # 保存HTML用于调试
-        try:
-            with open("javdb_actors_debug.html", "wb") as f:
-                f.write(html_content)
-            logger.info(
-                f"已保存演员列表页面到javdb_actors_debug.html，页面大小: {len(html_content)}字节"
-            )
-        except Exception as e:
-            logger.error(f"保存调试HTML失败: {str(e)}")
+        # 仅在 DEBUG 级别日志启用时保存HTML用于调试
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                with open("javdb_actors_debug.html", "wb") as f:
+                    f.write(html_content)
+                logger.debug(
+                    f"已保存演员列表页面到javdb_actors_debug.html，页面大小: {len(html_content)}字节"
+                )
+            except Exception as e:
+                logger.error(f"保存调试HTML失败: {str(e)}")
 
         html = etree.HTML(html_content, parser=etree.HTMLParser(encoding="utf-8"))
 
         # 网站结构：div.actors > div.actor-box > a
-        actors_container = html.xpath('//div[contains(@class, "actors")]')
+        actors_container = select(html, '//div[contains(@class, "actors")]')
         logger.info(f"找到actors容器元素: {len(actors_container)}个")
 
         if not actors_container:
             logger.warning("未找到actors容器元素，尝试查找其他可能的演员元素")
 
-            alt_actors = html.xpath('//a[contains(@href, "/actors/")]')
+            alt_actors = select(html, '//a[contains(@href, "/actors/")]')
             logger.info(f"尝试替代方式找到演员元素: {len(alt_actors)}个")
 
             if not alt_actors:
                 logger.error("无法找到任何演员元素，可能需要登录或网站结构已更改")
-                title = html.xpath("//title/text()")
+                title = select(html, "//title/text()")
                 logger.info(f"页面标题: {title}")
 
-                login_form = html.xpath(
-                    '//form[contains(@action, "login") or contains(@action, "sign_in")]'
+                login_form = select(
+                    html, '//form[contains(@action, "login") or contains(@action, "sign_in")]'
                 )
                 if login_form:
                     logger.error("检测到登录表单，网站可能需要登录才能访问演员列表")
@@ -1474,12 +1474,12 @@ class JavdbSpider(Spider):
 
         result = []
         # 使用 //a 来穿透中间的 div.actor-box 层
-        actors = html.xpath(
-            '//div[contains(@class, "actors")]//a[contains(@href, "/actors/")]'
+        actors = select(
+            html, '//div[contains(@class, "actors")]//a[contains(@href, "/actors/")]'
         )
 
         if not actors:
-            actors = html.xpath('//a[contains(@href, "/actors/") and .//strong]')
+            actors = select(html, '//a[contains(@href, "/actors/") and .//strong]')
             logger.info(f"使用替代XPath找到演员: {len(actors)}个")
 
         logger.info(f"找到演员元素: {len(actors)}个")
@@ -1505,7 +1505,7 @@ class JavdbSpider(Spider):
 
                 if not actor_name:
                     # 从 strong 标签获取名称
-                    name_el = actor.xpath("./strong/text()")
+                    name_el = select(actor, "./strong/text()")
                     if name_el:
                         actor_name = name_el[0].strip()
                     else:
@@ -1539,7 +1539,7 @@ class JavdbSpider(Spider):
         result = []
 
         # 尝试不同的XPath表达式找到演员列表
-        actors = html.xpath('//a[contains(@href, "/actors/")]')
+        actors = select(html, '//a[contains(@href, "/actors/")]')
 
         for actor in actors:
             try:
@@ -1551,7 +1551,7 @@ class JavdbSpider(Spider):
 
                 # 查找演员名称
                 name = None
-                name_el = actor.xpath("./strong") or actor.xpath(".//strong")
+                name_el = select(actor, "./strong") or select(actor, ".//strong")
                 if name_el:
                     name = name_el[0].text.strip()
                 else:
@@ -1647,7 +1647,7 @@ class JavdbSpider(Spider):
             result = []
 
             # 从演员页面直接提取作品信息（包含评分、评论数、日期等）
-            movie_boxes = html.xpath('//a[@class="box"]')
+            movie_boxes = select(html, '//a[@class="box"]')
             logger.info(f"从演员页面找到 {len(movie_boxes)} 个作品")
 
             for box in movie_boxes:
@@ -1660,23 +1660,23 @@ class JavdbSpider(Spider):
                         video_url = urljoin(self.host, video_url)
                     item.url = video_url
 
+                    fields = _ACTOR_VIDEO_BOX.extract(box)
+
                     # 提取番号和标题
-                    title_element = box.xpath('.//div[contains(@class, "video-title")]')
-                    if title_element:
+                    if fields["title"] is not None:
                         # 提取番号
-                        num_element = title_element[0].xpath("./strong/text()")
+                        num_element = select(fields["title"], "./strong/text()")
                         if num_element:
                             item.num = num_element[0].strip()
 
                         # 提取完整标题
-                        full_title = title_element[0].xpath("string(.)")
+                        full_title = self._extract_text(fields["title"])
                         if full_title:
-                            item.title = full_title.strip()
+                            item.title = full_title
 
                     # 提取封面
-                    cover_element = box.xpath('.//img[@loading="lazy"]')
-                    if cover_element:
-                        cover_url = cover_element[0].get("src")
+                    if fields["cover"] is not None:
+                        cover_url = fields["cover"].get("src")
                         if cover_url and not cover_url.startswith("http"):
                             cover_url = (
                                 "https:" + cover_url
@@ -1686,11 +1686,8 @@ class JavdbSpider(Spider):
                         item.cover = cover_url
 
                     # 使用公共方法提取评分和评论数
-                    score_element = box.xpath(
-                        './/div[contains(@class, "score")]//span[@class="value"]'
-                    )
-                    if score_element:
-                        score_text = "".join(score_element[0].itertext()).strip()
+                    if fields["score"] is not None:
+                        score_text = self._extract_text(fields["score"])
                         rank, rank_count = self._parse_score_text(score_text)
                         if rank is not None:
                             item.rank = rank  # 前端使用
@@ -1699,19 +1696,12 @@ class JavdbSpider(Spider):
                             item.rank_count = rank_count
 
                     # 检查中文字幕和无码标签
-                    cnsub_element = box.xpath('.//span[contains(@class, "cnsub")]')
-                    item.is_zh = len(cnsub_element) > 0
-
-                    uncensored_element = box.xpath(
-                        './/span[contains(@class, "uncensored")]'
-                    )
-                    item.is_uncensored = len(uncensored_element) > 0
+                    item.is_zh = fields["cnsub"] is not None
+                    item.is_uncensored = fields["uncensored"] is not None
 
                     # 使用公共方法解析发布日期
-                    date_element = box.xpath('.//div[contains(@class, "meta")]/text()')
-                    if date_element and len(date_element) > 0:
-                        date_text = date_element[0].strip()
-                        item.publish_date = self._parse_date(date_text)
+                    if fields["date"] is not None:
+                        item.publish_date = self._parse_date(fields["date"].strip())
 
                     # 只有有番号的条目才添加到结果中
                     if item.num:
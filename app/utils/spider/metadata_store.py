@@ -0,0 +1,194 @@
+"""
+刮削结果持久化
+
+按番号把合并后的 VideoDetail、各站点原始结果和各字段组的抓取时间保存在 scraped_metadata 表中。
+字段分为 metadata（标题、演员等）、downloads、previews、comments 四组，各组有效期取
+Setting.app.scrape_freshness_hours：调用方只在所需字段组过期时才重新刮削，写回时也只覆盖本次抓取的字段组。
+只有所有参与刮削的站点都给出了结果（包括明确未收录）时才推进字段组的抓取时间，
+部分站点超时或出错时结果照常保存，但下次仍会重新抓取。
+网络不可用时可直接使用已保存的结果整理文件、重新生成 NFO。数据库异常只记录日志，不影响刮削本身。
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.models import ScrapedMetadata
+from app.schema import VideoDetail
+from app.utils.logger import logger
+
+METADATA = "metadata"
+DOWNLOADS = "downloads"
+PREVIEWS = "previews"
+COMMENTS = "comments"
+
+# 单独成组的字段，其余字段都属于 metadata
+FIELD_GROUPS = {"downloads": DOWNLOADS, "previews": PREVIEWS, "comments": COMMENTS}
+
+DEFAULT_FRESHNESS_HOURS = {METADATA: 30 * 24, DOWNLOADS: 24, PREVIEWS: 30 * 24, COMMENTS: 7 * 24}
+
+
+def field_group(field: str) -> str:
+    return FIELD_GROUPS.get(field, METADATA)
+
+
+def requested_groups(include_downloads: bool = False, include_previews: bool = False,
+                     include_comments: bool = False) -> tuple:
+    """get_info 的 include 参数对应的字段组"""
+    groups = [METADATA]
+    if include_downloads:
+        groups.append(DOWNLOADS)
+    if include_previews:
+        groups.append(PREVIEWS)
+    if include_comments:
+        groups.append(COMMENTS)
+    return tuple(groups)
+
+
+def freshness_hours() -> Dict[str, int]:
+    from app.schema.setting import Setting
+    try:
+        configured = Setting().app.scrape_freshness_hours or {}
+    except Exception:
+        configured = {}
+    return {**DEFAULT_FRESHNESS_HOURS, **configured}
+
+
+def normalize_num(num: str) -> str:
+    return (num or "").strip().upper()
+
+
+class StoredMetadata:
+    """已保存的刮削结果"""
+
+    def __init__(self, num: str, detail: dict, sources: Optional[dict], field_fetched_at: Optional[dict]):
+        self.num = num
+        self.raw_detail = detail or {}
+        self.sources = sources or {}
+        self.field_fetched_at = {
+            group: datetime.fromisoformat(value) for group, value in (field_fetched_at or {}).items()
+        }
+
+    @property
+    def detail(self) -> VideoDetail:
+        return VideoDetail.model_validate(self.raw_detail)
+
+    def stale_groups(self, groups: Iterable[str], now: datetime,
+                     hours: Optional[Dict[str, int]] = None) -> list:
+        """返回 groups 中未抓取过或已超过有效期的字段组"""
+        hours = freshness_hours() if hours is None else hours
+        stale = []
+        for group in groups:
+            fetched_at = self.field_fetched_at.get(group)
+            if fetched_at is None or now - fetched_at > timedelta(hours=hours.get(group, 0)):
+                stale.append(group)
+        return stale
+
+
+def _merge_detail(existing: dict, detail: dict, groups: Iterable[str]) -> dict:
+    """用本次抓取的字段组覆盖已保存的结果；metadata 组中本次缺失的字段保留原值"""
+    groups = set(groups)
+    merged = dict(existing)
+    for field, value in detail.items():
+        group = field_group(field)
+        if group not in groups:
+            continue
+        if group == METADATA and not value and merged.get(field):
+            continue
+        merged[field] = value
+    return merged
+
+
+class MetadataStore:
+
+    def __init__(self, engine: Optional[Engine] = None, now: Callable[[], datetime] = datetime.now):
+        self._engine = engine
+        self._now = now
+        self.table = ScrapedMetadata.__table__
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from app.db import engine
+            self._engine = engine
+        return self._engine
+
+    def load(self, num: str) -> Optional[StoredMetadata]:
+        table = self.table
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    select(table.c.detail, table.c.sources, table.c.field_fetched_at)
+                    .where(table.c.num == normalize_num(num))
+                ).first()
+        except SQLAlchemyError as e:
+            logger.warning(f"读取番号《{num}》的刮削结果失败: {e}")
+            return None
+        if row is None:
+            return None
+        return StoredMetadata(normalize_num(num), row.detail, row.sources, row.field_fetched_at)
+
+    def fresh(self, num: str, groups: Iterable[str]) -> Optional[VideoDetail]:
+        """groups 都在有效期内时返回已保存的结果，否则返回 None"""
+        stored = self.load(num)
+        if stored is None or stored.stale_groups(groups, self._now()):
+            return None
+        return stored.detail
+
+    def save(self, num: str, detail: VideoDetail, groups: Iterable[str],
+             sources: Optional[Dict[str, VideoDetail]] = None,
+             complete: bool = True) -> Optional[StoredMetadata]:
+        """写入本次抓取的字段组和各站点原始结果，返回合并后的保存结果
+
+        complete 为 False 表示有站点未返回结果，此时保留各字段组原来的抓取时间。
+        """
+        key = normalize_num(num)
+        groups = tuple(groups)
+        now = self._now()
+        table = self.table
+        try:
+            with self.engine.begin() as conn:
+                row = conn.execute(
+                    select(table.c.detail, table.c.sources, table.c.field_fetched_at).where(table.c.num == key)
+                ).first()
+                merged = _merge_detail(row.detail if row else {}, detail.model_dump(mode="json"), groups)
+                merged_sources = dict(row.sources or {}) if row else {}
+                for site, site_detail in (sources or {}).items():
+                    merged_sources[site] = {
+                        "fetched_at": now.isoformat(),
+                        "groups": list(groups),
+                        "detail": site_detail.model_dump(mode="json"),
+                    }
+                fetched_at = dict(row.field_fetched_at or {}) if row else {}
+                if complete:
+                    fetched_at.update({group: now.isoformat() for group in groups})
+
+                stmt = insert(table).values(
+                    num=key,
+                    detail=merged,
+                    sources=merged_sources,
+                    field_fetched_at=fetched_at,
+                    created_at=now,
+                    fetched_at=now,
+                    create_time=now,
+                )
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[table.c.num],
+                    set_={
+                        "detail": stmt.excluded.detail,
+                        "sources": stmt.excluded.sources,
+                        "field_fetched_at": stmt.excluded.field_fetched_at,
+                        "fetched_at": stmt.excluded.fetched_at,
+                        "update_time": now,
+                    },
+                ))
+        except SQLAlchemyError as e:
+            logger.warning(f"保存番号《{num}》的刮削结果失败: {e}")
+            return None
+        return StoredMetadata(key, merged, merged_sources, fetched_at)
+
+
+metadata_store = MetadataStore()
@@ -0,0 +1,64 @@
+"""
+站点未收录番号的负缓存
+
+站点明确返回"没有该番号"（SpiderNotFound）时按 站点+番号 记录一次未命中，在有效期内不再向该站点刮削；
+连续未命中时有效期按 BASE_TTL × 2^(次数-1) 增长，最长 MAX_TTL。有效期过后会再尝试一次，
+期间累计的未命中次数在过期后还保留 MAX_TTL，以便下一次未命中继续翻倍；一旦刮削成功即清除记录。
+网络错误、页面结构变化等其它异常不计入。
+"""
+import time
+from typing import Optional
+
+from app.utils import cache
+from app.utils.logger import logger
+
+MISS_CACHE_PARENT = "spider_miss"
+BASE_TTL = 6 * 60 * 60
+MAX_TTL = 7 * 24 * 60 * 60
+
+
+def _key(site: str, number: str) -> str:
+    return f"{site}:{(number or '').strip().upper()}"
+
+
+def miss_ttl(misses: int) -> int:
+    """第 misses 次连续未命中后的跳过时长（秒）"""
+    return min(BASE_TTL * 2 ** max(misses - 1, 0), MAX_TTL)
+
+
+def _get_record(site: str, number: str) -> Optional[dict]:
+    try:
+        record = cache.get_cache_json(MISS_CACHE_PARENT, _key(site, number))
+    except OSError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def is_known_miss(site: str, number: str) -> bool:
+    """站点是否在负缓存有效期内确认过没有该番号"""
+    record = _get_record(site, number)
+    return bool(record) and time.time() < record.get("until", 0)
+
+
+def record_miss(site: str, number: str) -> int:
+    """记录一次未命中，返回本次的跳过时长（秒）"""
+    record = _get_record(site, number) or {}
+    misses = int(record.get("misses", 0)) + 1
+    ttl = miss_ttl(misses)
+    try:
+        cache.cache_json(
+            MISS_CACHE_PARENT, _key(site, number),
+            {"misses": misses, "until": time.time() + ttl},
+            ttl + MAX_TTL,
+        )
+    except OSError as e:
+        logger.warning(f"记录 {site} 番号《{number}》未命中失败: {e}")
+    return ttl
+
+
+def clear_miss(site: str, number: str):
+    """刮削成功后清除该站点的未命中记录"""
+    try:
+        cache.clean_cache_json(MISS_CACHE_PARENT, _key(site, number))
+    except OSError:
+        pass
@@ -21,17 +21,9 @@ Description: 请填写简介
 '''
 from abc import abstractmethod
 import logging
+import threading
 import time
 
-try:
-    from curl_cffi import requests as cffi_requests
-    from curl_cffi.requests import Session as CffiSession
-    HAS_CURL_CFFI = True
-except ImportError:
-    import requests as cffi_requests
-    from requests import Session as CffiSession
-    HAS_CURL_CFFI = False
-
 import requests
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
@@ -48,48 +40,95 @@ logger = logging.getLogger('spider')
 # curl_cffi 使用的 Chrome 版本（与 UA 对齐）
 _IMPERSONATE = "chrome120"
 
+# curl_cffi 导入较慢，延迟到第一次发起请求时加载
+_http_backend = None
+_session_class = None
+_backend_lock = threading.Lock()
+# 封面请求按线程复用会话（连接池），curl_cffi 的会话不保证线程安全
+_cover_sessions = threading.local()
+
+
+def _get_http_backend():
+    """返回 (请求模块, 是否为 curl_cffi)，curl_cffi 不可用时回退到 requests"""
+    global _http_backend
+    if _http_backend is None:
+        with _backend_lock:
+            if _http_backend is None:
+                try:
+                    from curl_cffi import requests as cffi_requests
+                    _http_backend = (cffi_requests, True)
+                except ImportError:
+                    _http_backend = (requests, False)
+    return _http_backend
+
+
+def has_curl_cffi() -> bool:
+    return _get_http_backend()[1]
+
 
-class Session(CffiSession if HAS_CURL_CFFI else requests.Session):
-
-    def __init__(self, timeout: int = 10):
-        if HAS_CURL_CFFI:
-            super().__init__(impersonate=_IMPERSONATE)
-        else:
-            super().__init__()
-        self.timeout = timeout
-        # curl_cffi 不需要禁用SSL验证，它自带了对Cloudflare的支持
-        if not HAS_CURL_CFFI:
-            self.verify = False
-
-    def request(self, *args, **kwargs):
-        method = args[0] if args else kwargs.get('method')
-        url = args[1] if len(args) > 1 else kwargs.get('url')
-        logger.info(f"请求: {method} {url}")
-
-        kwargs.setdefault('timeout', self.timeout)
-        if not HAS_CURL_CFFI:
-            kwargs.setdefault('verify', False)
-        else:
-            # curl_cffi 用 impersonate 排试指纹，不需要额外verify参数
-            kwargs.setdefault('impersonate', _IMPERSONATE)
-
-        # 添加重试机制
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = super(Session, self).request(*args, **kwargs)
-                logger.info(f"响应: {response.status_code} - {url}")
-                if response.status_code != 200:
-                    logger.error(f"请求失败: {response.status_code} - {url}")
-                    logger.error(f"响应内容: {response.text[:200]}")
-                return response
-            except Exception as e:
-                logger.warning(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # 指数退避
-                else:
-                    logger.error(f"所有重试都失败了: {url}")
-                    raise
+def get_session_class():
+    """按可用的请求后端构建带重试的 Session 类（只构建一次）"""
+    global _session_class
+    if _session_class is not None:
+        return _session_class
+
+    backend, use_cffi = _get_http_backend()
+
+    class Session(backend.Session):
+
+        def __init__(self, timeout: int = 10):
+            if use_cffi:
+                super().__init__(impersonate=_IMPERSONATE)
+            else:
+                super().__init__()
+            self.timeout = timeout
+            # curl_cffi 不需要禁用SSL验证，它自带了对Cloudflare的支持
+            if not use_cffi:
+                self.verify = False
+
+        def request(self, *args, **kwargs):
+            method = args[0] if args else kwargs.get('method')
+            url = args[1] if len(args) > 1 else kwargs.get('url')
+            logger.info(f"请求: {method} {url}")
+
+            kwargs.setdefault('timeout', self.timeout)
+            if not use_cffi:
+                kwargs.setdefault('verify', False)
+            else:
+                # curl_cffi 用 impersonate 排试指纹，不需要额外verify参数
+                kwargs.setdefault('impersonate', _IMPERSONATE)
+
+            # 添加重试机制
+            max_retries = 3
+            for attempt in range(max_retries):
+                try:
+                    response = super(Session, self).request(*args, **kwargs)
+                    logger.info(f"响应: {response.status_code} - {url}")
+                    if response.status_code != 200:
+                        logger.error(f"请求失败: {response.status_code} - {url}")
+                        logger.error(f"响应内容: {response.text[:200]}")
+                    return response
+                except Exception as e:
+                    logger.warning(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {e}")
+                    if attempt < max_retries - 1:
+                        time.sleep(2 ** attempt)  # 指数退避
+                    else:
+                        logger.error(f"所有重试都失败了: {url}")
+                        raise
+
+    _session_class = Session
+    return _session_class
+
+
+def __getattr__(name):
+    # 兼容旧的模块属性访问（Session / HAS_CURL_CFFI / cffi_requests）
+    if name == 'Session':
+        return get_session_class()
+    if name == 'HAS_CURL_CFFI':
+        return has_curl_cffi()
+    if name == 'cffi_requests':
+        return _get_http_backend()[0]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class Spider:
     name = None
@@ -98,7 +137,7 @@ class Spider:
 
     def __init__(self):
         self.setting = Setting().app
-        self.session = Session()
+        self.session = get_session_class()()
         user_agent = getattr(self.setting, 'user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
         self.session.headers = {'User-Agent': user_agent, 'Referer': self.host}
         self.session.timeout = (5, self.session.timeout)
@@ -158,15 +197,15 @@ class Spider:
     def get_cover(cls, url):
         logger.info(f"获取封面: {url}")
         try:
-            if HAS_CURL_CFFI:
-                response = cffi_requests.get(
-                    url,
-                    headers={'Referer': cls.host},
-                    impersonate=_IMPERSONATE,
-                    timeout=10,
-                )
+            backend, use_cffi = _get_http_backend()
+            session = getattr(_cover_sessions, "session", None)
+            if session is None:
+                session = backend.Session(impersonate=_IMPERSONATE) if use_cffi else requests.Session()
+                _cover_sessions.session = session
+            if use_cffi:
+                response = session.get(url, headers={'Referer': cls.host}, timeout=10)
             else:
-                response = requests.get(url, headers={'Referer': cls.host}, verify=False, timeout=10)
+                response = session.get(url, headers={'Referer': cls.host}, verify=False, timeout=10)
             if response.ok:
                 return response.content
             else:
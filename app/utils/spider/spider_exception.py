@@ -2,3 +2,7 @@ class SpiderException(Exception):
     def __init__(self, message):
         super().__init__()
         self.message = message
+
+
+class SpiderNotFound(SpiderException):
+    """站点明确没有该番号（搜索无结果、404 等），区别于网络错误和页面结构变化"""
@@ -0,0 +1,145 @@
+"""
+启动性能分析
+
+设置环境变量 TISSUE_STARTUP_PROFILE=1 后，记录模块导入耗时和各启动阶段耗时，
+启动完成后输出到日志，并可通过 /api/health 查看。
+未开启时只记录启动阶段的状态和耗时，不安装导入钩子。
+"""
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+PROFILE_ENV = "TISSUE_STARTUP_PROFILE"
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """包装原始 loader，统计 exec_module 的耗时（包含其子模块导入）"""
+
+    def __init__(self, loader, fullname: str, timer: "ImportTimer"):
+        self._loader = loader
+        self._fullname = fullname
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 恢复原始 loader，避免 importlib.reload 等场景继续经过包装
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.records[self._fullname] = time.perf_counter() - started
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """导入计时钩子，只在启动分析模式下安装"""
+
+    def __init__(self):
+        self.records: Dict[str, float] = {}
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, fullname, self)
+                    return spec
+            return None
+        finally:
+            self._local.busy = False
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        items = sorted(self.records.items(), key=lambda i: i[1], reverse=True)[:limit]
+        return [{"module": name, "seconds": round(seconds, 4)} for name, seconds in items]
+
+
+class StartupProfiler:
+    """记录启动阶段（同步关键阶段和后台初始化阶段）的状态与耗时"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.getenv(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.import_timer = ImportTimer() if enabled else None
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def install_import_timer(self):
+        if self.import_timer is not None:
+            self.import_timer.install()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        with self._lock:
+            self.phases[name] = {"status": "running", "seconds": None}
+        status = "failed"
+        try:
+            yield
+            status = "success"
+        finally:
+            with self._lock:
+                self.phases[name] = {"status": status, "seconds": round(time.perf_counter() - started, 4)}
+
+    def checkpoint(self, name: str):
+        """记录从进程启动（本模块加载）到当前的耗时，用于统计模块导入阶段"""
+        with self._lock:
+            self.phases[name] = {"status": "success", "seconds": round(time.perf_counter() - self.started_at, 4)}
+
+    def mark_ready(self):
+        self.ready.set()
+        if self.import_timer is not None:
+            self.import_timer.uninstall()
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = {name: dict(item) for name, item in self.phases.items()}
+        result = {
+            "ready": self.ready.is_set(),
+            "uptime": round(time.perf_counter() - self.started_at, 3),
+            "phases": phases,
+        }
+        if self.import_timer is not None:
+            result["slowest_imports"] = self.import_timer.slowest()
+        return result
+
+    def log_report(self, logger):
+        if not self.enabled:
+            return
+        report = self.report()
+        logger.info(f"启动耗时分析，总耗时: {report['uptime']}秒")
+        for name, item in report["phases"].items():
+            logger.info(f"  阶段 {name}: {item['status']} {item['seconds']}秒")
+        for item in report.get("slowest_imports", []):
+            logger.info(f"  导入 {item['module']}: {item['seconds']}秒")
+
+
+startup_profiler = StartupProfiler()
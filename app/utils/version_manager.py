@@ -4,6 +4,7 @@
 import os
 import json
 import logging
+import sqlite3
 import subprocess
 import traceback
 from typing import Optional, Dict, Any, List
@@ -13,12 +14,19 @@ from pathlib import Path
 from app.utils.logger import logger
 from version import APP_VERSION
 
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_SLEEP = 0.01
+BACKUP_KEEP = 3
+
 
 class VersionManager:
     """版本管理器"""
     
-    def __init__(self, storage_path: str = "data/version_info.json"):
+    def __init__(self, storage_path: str = "data/version_info.json", db_path: str = "config/app.db",
+                 backup_dir: str = "config/backups"):
         self.storage_path = storage_path
+        self.db_path = db_path
+        self.backup_dir = backup_dir
         self.current_version = APP_VERSION
         self.ensure_storage_dir()
     
@@ -134,23 +142,54 @@ class VersionManager:
             return False
     
     def backup_database(self) -> bool:
-        """备份数据库（可选功能）"""
+        """
+        使用 SQLite 在线备份 API 分批复制数据库页
+
+        每批复制 BACKUP_PAGES_PER_STEP 页后短暂让出数据库锁，
+        大数据库备份期间不会长时间阻塞其他连接，也不需要整文件复制。
+        """
         logger.info("开始备份数据库...")
-        
+
         try:
-            # 这里可以添加数据库备份逻辑
-            # 例如：mysqldump、pg_dump等
-            # 当前仅记录日志
+            if not os.path.exists(self.db_path):
+                logger.info("数据库文件不存在，跳过备份")
+                return True
+
+            os.makedirs(self.backup_dir, exist_ok=True)
             backup_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-            logger.info(f"数据库备份时间点: {backup_time}")
-            
-            # TODO: 实现具体的备份逻辑
+            backup_path = os.path.join(self.backup_dir, f"app_{backup_time}.db")
+            temp_path = f"{backup_path}.tmp"
+
+            def progress(status, remaining, total):
+                if total and remaining and (total - remaining) % (BACKUP_PAGES_PER_STEP * 50) == 0:
+                    logger.info(f"数据库备份进度: {total - remaining}/{total} 页")
+
+            source = sqlite3.connect(self.db_path, timeout=60)
+            target = sqlite3.connect(temp_path)
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP)
+            finally:
+                target.close()
+                source.close()
+            os.replace(temp_path, backup_path)
+
+            logger.info(f"数据库备份完成: {backup_path}")
+            self._prune_backups()
             return True
-            
+
         except Exception as e:
             logger.error(f"数据库备份失败: {str(e)}")
             return False
-    
+
+    def _prune_backups(self):
+        """只保留最近 BACKUP_KEEP 份备份"""
+        backups = sorted(Path(self.backup_dir).glob("app_*.db"))
+        for path in backups[:-BACKUP_KEEP]:
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.warning(f"删除旧数据库备份失败: {path}, {e}")
+
     def check_migration_requirements(self) -> Dict[str, Any]:
         """检查迁移前置条件"""
         requirements = {
@@ -502,5 +502,18 @@ class VideoCollector:
         return cache_entry['data']
 
 
-# 全局实例
-video_collector = VideoCollector()
\ No newline at end of file
+# 全局实例（构造 JavdbSpider 时会探测可用域名，延迟到首次使用时创建，避免拖慢启动）
+_video_collector = None
+
+
+def get_video_collector() -> VideoCollector:
+    global _video_collector
+    if _video_collector is None:
+        _video_collector = VideoCollector()
+    return _video_collector
+
+
+def __getattr__(name):
+    if name == 'video_collector':
+        return get_video_collector()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
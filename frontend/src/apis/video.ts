@@ -48,8 +48,9 @@ export async function parseVideoNum(path: string) {
     return response.data
 }
 
-export function getVideoCover(url: string) {
-    return configs.BASE_API + '/common/cover?url=' + encodeURIComponent(url)
+export function getVideoCover(url: string, width?: number) {
+    const cover = configs.BASE_API + '/common/cover?url=' + encodeURIComponent(url)
+    return width ? cover + '&w=' + width : cover
 }
 
 export function getVideoTrailer(url: string) {
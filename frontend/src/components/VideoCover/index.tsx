@@ -8,16 +8,17 @@ import { RootState } from "../../models";
 import { LazyLoadImage } from "react-lazy-load-image-component";
 
 
-function VideoCover(props: HTMLProps<any>) {
-    const { src, ...otherProps } = props
+// thumbWidth: 列表卡片只需缩略图，由后端按宽度档位缩小并转为 WebP/AVIF
+function VideoCover(props: HTMLProps<any> & { thumbWidth?: number }) {
+    const { src, thumbWidth, ...otherProps } = props
     const { goodBoy } = useSelector((state: RootState) => state.app)
     const [errorMessage, setErrorMessage] = useState<string | null>(null)
 
     const coverSrc = typeof src === 'string' ? src : ''
     const coverUrl = useMemo(() => {
         if (!coverSrc) return ''
-        return api.getVideoCover(coverSrc)
-    }, [coverSrc])
+        return api.getVideoCover(coverSrc, thumbWidth)
+    }, [coverSrc, thumbWidth])
 
     useEffect(() => {
         setErrorMessage(null)
@@ -178,7 +178,7 @@ function JavDBItem(props: { item: any; downloadStatus?: DownloadStatus }) {
                         overflow: 'hidden',
                         position: 'relative',
                     }}>
-                        <VideoCover src={item.cover} />
+                        <VideoCover src={item.cover} thumbWidth={400} />
                         
                         {/* 顶部淡入遮罩 */}
                         <div style={{
@@ -101,7 +101,7 @@ function Video() {
                             className="tissue-hover-card"
                             cover={
                                 <div className="tissue-cover" style={{ height: '240px' }}>
-                                    <VideoCover src={video.cover}/>
+                                    <VideoCover src={video.cover} thumbWidth={400}/>
                                 </div>
                             }
                             onClick={() => setSelected(video.path)}
@@ -0,0 +1,402 @@
+"""
+爬虫解析离线基准
+用录制的页面（tests/fixtures/spider/<站点>/）启动本地替身 HTTP 服务，各爬虫的 host 指向该服务，
+按真实调用路径（get_info / get_ranking_with_details / get_actors / search 等）重复执行，
+输出吞吐（中位数/P95 耗时）、内存分配（tracemalloc）和按字段/表达式统计的解析耗时。
+
+用法: python3 scripts/benchmark_spider_parsers.py [--rounds 50] [--only javdb.detail] [--save result.json] [--compare result.json]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import re
+import statistics
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import lxml
+import requests
+
+from app.utils.spider.dmm import DmmSpider
+from app.utils.spider.extract import field_timings
+from app.utils.spider.jav321 import Jav321Spider
+from app.utils.spider.javbus import JavbusSpider
+from app.utils.spider.javdb import JavdbSpider
+from app.utils.spider.spider import Spider, has_curl_cffi
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "spider"
+
+RANKING_CARDS = 100
+TOP_FIELDS = 12
+
+_CARD_PATTERN = re.compile(r'(\s*<div class="item">.*?\n  </div>\n)', re.S)
+
+# (方法, 路径[?查询]) -> (fixture 相对路径或已渲染的 bytes, Content-Type)
+Routes = Dict[Tuple[str, str], Tuple[Any, str]]
+
+HTML = "text/html; charset=utf-8"
+JSON = "application/json; charset=utf-8"
+
+
+def load_fixture(name: str) -> bytes:
+    return (FIXTURE_DIR / name).read_bytes()
+
+
+def build_ranking_page(cards: int = RANKING_CARDS) -> bytes:
+    """把录制排行榜页面中的卡片重复到指定数量，番号与链接按序号区分"""
+    page = load_fixture("javdb/ranking.html").decode("utf-8")
+    samples = _CARD_PATTERN.findall(page)
+    body = []
+    for index in range(cards):
+        card = samples[index % len(samples)]
+        card = re.sub(r"<strong>([A-Z0-9-]+?)-(\d+)</strong>", rf"<strong>\1-{index:04d}</strong>", card)
+        card = card.replace('href="/v/', f'href="/v/{index:04d}')
+        body.append(card)
+    start = page.index(samples[0])
+    end = page.index(samples[-1]) + len(samples[-1])
+    return (page[:start] + "".join(body) + page[end:]).encode("utf-8")
+
+
+class FixtureServer:
+    """本地替身站点：按 (方法, 路径) 返回录制页面，页面中的 {{host}} 替换为服务地址"""
+
+    def __init__(self, routes: Routes):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.requests = 0
+        self._routes = {}
+        for key, (source, content_type) in routes.items():
+            body = source if isinstance(source, bytes) else load_fixture(source)
+            self._routes[key] = (body.replace(b"{{host}}", self.base_url.encode()), content_type)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 避免 Nagle 与延迟 ACK 叠加出的 ~40ms 固定等待掩盖解析耗时
+            disable_nagle_algorithm = True
+
+            def _serve(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                server.requests += 1
+                parts = urlsplit(self.path)
+                route = server._routes.get((method, f"{parts.path}?{parts.query}")) or server._routes.get(
+                    (method, parts.path)
+                )
+                body, content_type = route or (b"not found", "text/plain")
+                self.send_response(200 if route else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _offline_session(session):
+    """替身服务在本机，忽略用户配置与环境变量中的代理"""
+    session.proxies = {}
+    if hasattr(session, "trust_env"):
+        session.trust_env = False
+    return session
+
+
+def _spider(spider_cls, host: str, **attrs) -> Spider:
+    """构造指向替身服务的爬虫，跳过构造函数中的域名探测与预热请求"""
+    spider = spider_cls.__new__(spider_cls)
+    spider.host = host
+    for key, value in attrs.items():
+        setattr(spider, key, value)
+    Spider.__init__(spider)
+    _offline_session(spider.session)
+    return spider
+
+
+def _javbus_spider(host: str) -> JavbusSpider:
+    spider = JavbusSpider.__new__(JavbusSpider)
+    spider.host = host
+    spider.setting = None
+    spider.session = _offline_session(requests.Session())
+    spider.session.headers = {"User-Agent": "Mozilla/5.0", "Referer": host}
+    return spider
+
+
+@dataclass
+class Scenario:
+    name: str
+    site: str
+    run: Callable[[Spider], Any]
+    check: Callable[[Any], bool]
+
+
+SITES: Dict[str, Tuple[Callable[[str], Spider], Routes]] = {
+    "javdb": (
+        lambda base: _spider(JavdbSpider, base),
+        {
+            ("GET", "/v/abc123"): ("javdb/detail.html", HTML),
+            ("GET", "/search"): ("javdb/search.html", HTML),
+            ("GET", "/rankings/movies"): (build_ranking_page(), HTML),
+            ("GET", "/actors"): ("javdb/actors.html", HTML),
+        },
+    ),
+    "javbus": (
+        lambda base: _javbus_spider(base + "/"),
+        {
+            ("GET", "/SSIS-001"): ("javbus/detail.html", HTML),
+            ("GET", "/ajax/uncledatoolsbyajax.php"): ("javbus/magnets.html", HTML),
+            ("GET", "/actresses"): ("javbus/actresses.html", HTML),
+        },
+    ),
+    "jav321": (
+        lambda base: _spider(Jav321Spider, base + "/"),
+        {("POST", "/search"): ("jav321/search.html", HTML)},
+    ),
+    "dmm": (
+        lambda base: _spider(DmmSpider, base, origin_host=base, api_url=base + "/graphql"),
+        {
+            ("GET", "/digital/videoa/-/detail/=/cid=ssis00001/"): ("dmm/age_check.html", HTML),
+            ("GET", "/digital/videoa/-/detail/=/cid=ssis00001/?age_check_done=1"): ("dmm/detail.html", HTML),
+            ("POST", "/graphql"): ("dmm/content.json", JSON),
+        },
+    ),
+}
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        "javdb.detail",
+        "javdb",
+        lambda s: s.get_info("SSIS-001", url="/v/abc123", include_downloads=True, include_previews=True),
+        lambda r: r.director == "Fixture Director" and len(r.downloads) == 3 and len(r.previews[0].items) == 5,
+    ),
+    Scenario("javdb.search", "javdb", lambda s: s.search("SSIS-001"), lambda r: r.endswith("/v/abc123")),
+    Scenario(
+        "javdb.ranking",
+        "javdb",
+        lambda s: s.get_ranking_with_details("censored", "weekly", apply_delay=False),
+        lambda r: len(r) == RANKING_CARDS,
+    ),
+    Scenario("javdb.actors", "javdb", lambda s: s.get_actors(), lambda r: len(r) == 6),
+    Scenario(
+        "javbus.detail",
+        "javbus",
+        lambda s: s.get_info("SSIS-001", include_downloads=True, include_previews=True),
+        lambda r: r.studio == "Fixture Maker" and len(r.downloads) == 3 and len(r.actors) == 2,
+    ),
+    Scenario("javbus.actors", "javbus", lambda s: s.get_actors(), lambda r: len(r) == 5),
+    Scenario(
+        "jav321.detail",
+        "jav321",
+        lambda s: s.get_info("SSIS-001"),
+        lambda r: r.premiered == "2026-01-01" and r.outline.startswith("Fixture outline"),
+    ),
+    Scenario(
+        "dmm.detail",
+        "dmm",
+        lambda s: s.get_info("SSIS-001", include_previews=True),
+        lambda r: r.runtime == "150" and len(r.previews[0].items) == 4,
+    ),
+]
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _time_rounds(func: Callable[[], Any], rounds: int) -> Dict[str, float]:
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+    median = statistics.median(samples)
+    return {
+        "median_ms": round(median, 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "stdev_ms": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "ops_per_sec": round(1000 / median, 1) if median else 0.0,
+    }
+
+
+def _measure_allocations(func: Callable[[], Any], rounds: int) -> Dict[str, float]:
+    """每轮的 Python 分配峰值与结束后仍保留的内存
+
+    tracemalloc 不统计 libxml2 的树内存，包含替身服务线程的少量分配。
+    """
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(rounds):
+            gc.collect()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            result = func()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+            del result
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib": round(statistics.median(peaks) / 1024, 1),
+        "retained_kib": round(statistics.median(retained) / 1024, 1),
+    }
+
+
+def _measure_fields(func: Callable[[], Any], rounds: int, total_ms: float) -> Dict[str, Any]:
+    with field_timings() as timings:
+        for _ in range(rounds):
+            func()
+    fields = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)
+    attributed_ms = sum(seconds for seconds, _ in timings.values()) * 1000 / rounds
+    return {
+        "attributed_ms": round(attributed_ms, 3),
+        "attributed_share": round(attributed_ms / total_ms, 3) if total_ms else 0.0,
+        "top": [
+            {"key": key, "us_per_op": round(seconds * 1e6 / rounds, 1), "calls_per_op": round(calls / rounds, 1)}
+            for key, (seconds, calls) in fields[:TOP_FIELDS]
+        ],
+    }
+
+
+def run_scenario(scenario: Scenario, spider: Spider, server: FixtureServer, rounds: int, warmup: int) -> Dict[str, Any]:
+    def call():
+        return scenario.run(spider)
+
+    result = call()
+    if not scenario.check(result):
+        raise RuntimeError(f"{scenario.name} 解析结果与录制页面不符: {result!r}")
+    for _ in range(warmup):
+        call()
+
+    server.requests = 0
+    timing = _time_rounds(call, rounds)
+    return {
+        **timing,
+        "requests_per_op": round(server.requests / rounds, 1),
+        "alloc": _measure_allocations(call, max(1, min(rounds, 10))),
+        "fields": _measure_fields(call, max(1, min(rounds, 20)), timing["mean_ms"]),
+    }
+
+
+def run_benchmark(rounds: int = 50, warmup: int = 5, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    selected = [s for s in SCENARIOS if not only or any(s.name.startswith(prefix) for prefix in only)]
+    results: Dict[str, Any] = {}
+    for site, (factory, routes) in SITES.items():
+        scenarios = [s for s in selected if s.site == site]
+        if not scenarios:
+            continue
+        with FixtureServer(routes) as server:
+            spider = factory(server.base_url)
+            for scenario in scenarios:
+                results[scenario.name] = run_scenario(scenario, spider, server, rounds, warmup)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "lxml": ".".join(map(str, lxml.etree.LXML_VERSION)),
+            "http_backend": "curl_cffi" if has_curl_cffi() else "requests",
+            "rounds": rounds,
+            "warmup": warmup,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """以中位数耗时和分配峰值对比两次结果，正数表示变慢/变多"""
+    lines = []
+    for name, entry in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            lines.append(f"{name:16s} 无基线")
+            continue
+        time_delta = (entry["median_ms"] - base["median_ms"]) / base["median_ms"] * 100 if base["median_ms"] else 0.0
+        peak_base = base["alloc"]["peak_kib"]
+        alloc_delta = (entry["alloc"]["peak_kib"] - peak_base) / peak_base * 100 if peak_base else 0.0
+        lines.append(
+            f"{name:16s} {base['median_ms']:8.3f} -> {entry['median_ms']:8.3f} ms ({time_delta:+6.1f}%)  "
+            f"峰值 {peak_base:8.1f} -> {entry['alloc']['peak_kib']:8.1f} KiB ({alloc_delta:+6.1f}%)"
+        )
+    return lines
+
+
+def format_table(result: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"{'场景':16s} {'中位ms':>9s} {'P95ms':>9s} {'ops/s':>8s} {'请求/次':>7s} {'峰值KiB':>9s} {'字段占比':>8s}  最耗时字段"
+    ]
+    for name, entry in result["scenarios"].items():
+        top = entry["fields"]["top"]
+        hottest = f"{top[0]['key']} ({top[0]['us_per_op']}us)" if top else "-"
+        lines.append(
+            f"{name:16s} {entry['median_ms']:9.3f} {entry['p95_ms']:9.3f} {entry['ops_per_sec']:8.1f} "
+            f"{entry['requests_per_op']:7.1f} {entry['alloc']['peak_kib']:9.1f} {entry['fields']['attributed_share']:8.1%}  {hottest}"
+        )
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="爬虫解析离线基准")
+    parser.add_argument("--rounds", type=int, default=50, help="每个场景的计时轮数")
+    parser.add_argument("--warmup", type=int, default=5, help="计时前的预热轮数")
+    parser.add_argument("--only", action="append", help="只运行指定前缀的场景，如 javdb 或 javbus.detail")
+    parser.add_argument("--json", action="store_true", help="输出完整 JSON 结果（含各字段耗时）")
+    parser.add_argument("--save", help="将结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    args = parser.parse_args()
+
+    # 请求/解析日志会显著影响耗时，基准期间只保留警告以上
+    logging.disable(logging.INFO)
+
+    result = run_benchmark(args.rounds, args.warmup, args.only)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print("\n".join(format_table(result)))
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print("\n".join(compare(result, baseline)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
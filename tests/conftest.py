@@ -87,3 +87,19 @@ def db_session_from_shared_engine(shared_db_engine):
         session.rollback()
     finally:
         session.close()
+
+
+@pytest.fixture
+def isolated_metadata_store(monkeypatch, tmp_path):
+    """刮削结果写入临时数据库，避免测试之间以及测试与 config/app.db 之间互相影响
+
+    涉及刮削的测试模块通过 pytestmark = pytest.mark.usefixtures("isolated_metadata_store") 使用
+    """
+    from app.db.models import ScrapedMetadata
+    from app.utils.spider.metadata_store import metadata_store
+
+    engine = create_engine(f"sqlite:///{tmp_path}/scraped_metadata.db")
+    ScrapedMetadata.__table__.create(engine)
+    monkeypatch.setattr(metadata_store, "_engine", engine)
+    yield metadata_store
+    engine.dispose()
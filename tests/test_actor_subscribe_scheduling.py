@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.actor_subscribe import ActorSubscribe
+from app.db.models.base import Base
+from app.service import actor_subscribe as actor_subscribe_module
+from app.service.actor_subscribe import ActorCheckProgress, ActorSubscribeService
+from app.utils.host_limiter import HostRateLimiter
+
+
+def _record(id, last_checked_hours=None, watermark_days=None):
+    now = datetime.now()
+    return SimpleNamespace(
+        id=id,
+        last_checked_at=now - timedelta(hours=last_checked_hours) if last_checked_hours is not None else None,
+        watermark_date=date.today() - timedelta(days=watermark_days) if watermark_days is not None else None,
+    )
+
+
+def test_due_subscriptions_are_prioritized():
+    records = [
+        _record(1, last_checked_hours=30, watermark_days=200),
+        _record(2, last_checked_hours=25, watermark_days=2),
+        _record(3),
+        _record(4, last_checked_hours=1, watermark_days=1),  # 未到期
+        _record(5, last_checked_hours=48, watermark_days=200),
+    ]
+
+    assert ActorSubscribeService._select_due_subscriptions(records, 24) == [3, 2, 5, 1]
+    assert ActorSubscribeService._select_due_subscriptions(records, 24, limit=2) == [3, 2]
+    # 手动执行时未到期的演员也检查，且不限制数量
+    assert ActorSubscribeService._select_due_subscriptions(records, 24, due_only=False) == [3, 4, 2, 5, 1]
+
+
+def test_progress_tracks_running_and_recent_checks():
+    progress = ActorCheckProgress()
+    progress.start(2)
+    progress.begin(1, "A")
+    progress.begin(2, "B")
+    progress.finish(1, "A", 1.234, 3)
+
+    snapshot = progress.snapshot()
+    assert snapshot["running"] and snapshot["done"] == 1 and snapshot["total"] == 2
+    assert [item["actor_name"] for item in snapshot["current"]] == ["B"]
+    assert snapshot["recent"][0]["duration"] == 1.23
+    assert snapshot["recent"][0]["new_videos"] == 3
+
+    progress.finish(2, "B", 0.5, 0, error="boom")
+    progress.end()
+    snapshot = progress.snapshot()
+    assert not snapshot["running"] and snapshot["current"] == []
+    assert snapshot["recent"][0]["status"] == "failed"
+
+
+def test_actors_are_checked_concurrently(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autocommit=False)
+    progress = ActorCheckProgress()
+    monkeypatch.setattr(actor_subscribe_module, "SessionFactory", session_factory)
+    monkeypatch.setattr(actor_subscribe_module, "actor_check_progress", progress)
+    monkeypatch.setattr(actor_subscribe_module, "host_rate_limiter", HostRateLimiter(0, 0, 4))
+    monkeypatch.setattr(actor_subscribe_module, "Setting", lambda: SimpleNamespace(app=SimpleNamespace(
+        actor_check_interval=24, actor_check_concurrency=3, host_request_interval=0,
+        host_request_jitter=0, host_max_concurrency=4)))
+
+    with session_factory() as db:
+        db.add_all(ActorSubscribe(actor_name=f"Actor {i}", from_date=date.today(), is_paused=(i == 4))
+                   for i in range(5))
+        db.commit()
+
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def fake_actor_videos(name, source):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return [{"num": f"{name}-001", "publish_date": "2000-01-01"}]
+
+    monkeypatch.setattr(actor_subscribe_module.spider, "get_web_actor_videos", fake_actor_videos)
+
+    with session_factory() as db:
+        ActorSubscribeService(db).do_actor_subscribe()
+
+    assert peak[0] > 1
+    snapshot = progress.snapshot()
+    assert snapshot["done"] == snapshot["total"] == 4
+    assert {item["status"] for item in snapshot["recent"]} == {"success"}
+    with session_factory() as db:
+        checked = {r.actor_name for r in db.query(ActorSubscribe) if r.last_checked_at}
+    assert checked == {f"Actor {i}" for i in range(4)}
+    engine.dispose()
+
+
+def test_failed_checks_do_not_starve_other_actors(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autocommit=False)
+    monkeypatch.setattr(actor_subscribe_module, "SessionFactory", session_factory)
+    monkeypatch.setattr(actor_subscribe_module, "actor_check_progress", ActorCheckProgress())
+    monkeypatch.setattr(actor_subscribe_module, "host_rate_limiter", HostRateLimiter(0, 0, 4))
+    monkeypatch.setattr(actor_subscribe_module, "Setting", lambda: SimpleNamespace(app=SimpleNamespace(
+        actor_check_interval=24, actor_check_concurrency=1, host_request_interval=0,
+        host_request_jitter=0, host_max_concurrency=4)))
+
+    with session_factory() as db:
+        db.add_all(ActorSubscribe(actor_name=name, from_date=date.today()) for name in ("Missing", "Broken", "A", "B"))
+        db.commit()
+
+    fetched = []
+
+    def fake_actor_videos(name, source):
+        fetched.append(name)
+        if name == "Broken":
+            raise RuntimeError("boom")
+        if name == "Missing":
+            return []
+        return [{"num": f"{name}-001", "publish_date": "2000-01-01"}]
+
+    monkeypatch.setattr(actor_subscribe_module.spider, "get_web_actor_videos", fake_actor_videos)
+
+    with session_factory() as db:
+        ActorSubscribeService(db).do_actor_subscribe(limit=2)
+    with session_factory() as db:
+        ActorSubscribeService(db).do_actor_subscribe(limit=2)
+
+    assert fetched == ["Missing", "Broken", "A", "B"]
+    engine.dispose()
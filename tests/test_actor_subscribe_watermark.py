@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.models.actor_subscribe import ActorSubscribe, ActorSubscribeDownload
+from app.middleware.requestvars import request_global
+from app.schema.actor_subscribe import ActorSubscribeUpdate
+from app.service import actor_subscribe as actor_subscribe_module
+from app.service.actor_subscribe import ActorSubscribeService
+from app.utils.host_limiter import HostRateLimiter
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    monkeypatch.setattr(actor_subscribe_module, "host_rate_limiter", HostRateLimiter(0, 0, 2))
+    return ActorSubscribeService(db=db_session)
+
+
+def _days_ago(days):
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def _add_subscription(db_session, **kwargs):
+    values = dict(actor_name="Actor", from_date=date.today() - timedelta(days=60),
+                  is_hd=False, is_zh=False, is_uncensored=False, min_rating=0, min_comments=0)
+    values.update(kwargs)
+    subscription = ActorSubscribe(**values)
+    db_session.add(subscription)
+    db_session.commit()
+    return subscription
+
+
+def _check(service, subscription):
+    return service.check_actor_subscription(service._to_check_dict(subscription))
+
+
+def _stub_site(monkeypatch, service, db_session, works, downloadable=None):
+    processed = []
+
+    def fake_process(subscription, video):
+        processed.append(video["num"])
+        if downloadable is None or video["num"] in downloadable:
+            db_session.add(ActorSubscribeDownload(actor_subscribe_id=subscription["id"], num=video["num"],
+                                                  download_time=datetime.now()))
+            db_session.commit()
+
+    monkeypatch.setattr(actor_subscribe_module.spider, "get_web_actor_videos", lambda name, source: list(works))
+    monkeypatch.setattr(service, "process_new_video", fake_process)
+    return processed
+
+
+def test_second_check_only_processes_works_above_watermark(db_session, service, monkeypatch):
+    subscription = _add_subscription(db_session)
+    works = [
+        {"num": "NEW-002", "publish_date": _days_ago(1)},
+        {"num": "NEW-001", "publish_date": _days_ago(5)},
+        {"num": "OLD-001", "publish_date": _days_ago(90)},
+    ]
+    processed = _stub_site(monkeypatch, service, db_session, works)
+
+    _check(service, subscription)
+    assert processed == ["NEW-002", "NEW-001"]
+    db_session.refresh(subscription)
+    assert subscription.watermark_date == date.today() - timedelta(days=1)
+    assert subscription.watermark_nums == ["NEW-002"]
+    assert subscription.subscribed_works_count == 2
+    assert subscription.last_checked_at is not None
+
+    # 同一天新增作品：水位当天未见过的番号仍会处理
+    works.insert(0, {"num": "NEW-003", "publish_date": _days_ago(1)})
+    processed.clear()
+    _check(service, subscription)
+    assert processed == ["NEW-003"]
+    db_session.refresh(subscription)
+    assert subscription.watermark_nums == ["NEW-002", "NEW-003"]
+
+
+def test_pending_recent_work_holds_watermark(db_session, service, monkeypatch):
+    subscription = _add_subscription(db_session, min_rating=4)
+    works = [
+        {"num": "RATED-001", "publish_date": _days_ago(1), "rating": "4.5"},
+        {"num": "UNRATED-001", "publish_date": _days_ago(3), "rating": None},
+    ]
+    processed = _stub_site(monkeypatch, service, db_session, works)
+
+    _check(service, subscription)
+    assert processed == ["RATED-001"]
+    db_session.refresh(subscription)
+    assert subscription.watermark_date == date.today() - timedelta(days=4)
+
+    # 评分上升后仍会被重新评估
+    works[1]["rating"] = "4.2"
+    processed.clear()
+    _check(service, subscription)
+    assert processed == ["UNRATED-001"]
+
+
+def test_works_count_job_reuses_recent_check(db_session, service, monkeypatch):
+    fresh = _add_subscription(db_session, actor_name="Fresh", works_count_updated_at=datetime.now())
+    stale = _add_subscription(db_session, actor_name="Stale")
+    calls = []
+    monkeypatch.setattr(service, "update_works_count_for_subscription", lambda sid: calls.append(sid) or True)
+
+    service.update_all_works_counts()
+
+    assert calls == [stale.id]
+    assert fresh.id not in calls
+
+
+def test_updating_conditions_resets_watermark(db_session, service):
+    # @transaction 从请求上下文中获取 Session
+    token = request_global.set(SimpleNamespace(db=db_session))
+    subscription = _add_subscription(db_session, watermark_date=date.today(), watermark_nums=["A-1"])
+    service.update_actor_subscription(ActorSubscribeUpdate(
+        id=subscription.id, actor_name="Actor", from_date=date.today() - timedelta(days=365)))
+    request_global.reset(token)
+
+    db_session.refresh(subscription)
+    assert subscription.watermark_date is None
+    assert subscription.watermark_nums is None
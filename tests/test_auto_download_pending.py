@@ -0,0 +1,77 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.auto_download import AutoDownloadRule, AutoDownloadSubscription, DownloadStatus
+from app.db.models.base import Base
+from app.service import auto_download
+from app.service.auto_download import AutoDownloadService
+from app.service.subscribe import SubscribeService
+from app.utils.host_limiter import HostRateLimiter
+
+
+@pytest.fixture
+def factory(monkeypatch, tmp_path):
+    # 工作线程使用独立 Session 和连接，使用文件数据库以便跨线程共享
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autocommit=False)
+    monkeypatch.setattr(auto_download, "SessionFactory", session_factory)
+    monkeypatch.setattr(auto_download, "host_rate_limiter", HostRateLimiter(0, 0, 2))
+    monkeypatch.setattr(auto_download, "Setting", lambda: SimpleNamespace(app=SimpleNamespace(
+        host_request_interval=0, host_request_jitter=0, host_max_concurrency=2, max_concurrent_spiders=4)))
+    monkeypatch.setattr(AutoDownloadService, "_get_auto_download_setting", staticmethod(
+        lambda: SimpleNamespace(max_daily_downloads=0, notification_enabled=False)))
+    yield session_factory
+    engine.dispose()
+
+
+def _seed(session_factory, nums):
+    with session_factory() as db:
+        rule = AutoDownloadRule(name="rule", is_hd=False, is_zh=False, is_uncensored=False)
+        db.add(rule)
+        db.flush()
+        db.add_all(AutoDownloadSubscription(rule_id=rule.id, num=num, resource_hash=num) for num in nums)
+        db.commit()
+
+
+def test_pending_subscriptions_are_processed_concurrently(factory, monkeypatch):
+    _seed(factory, ["OK-001", "OK-002", "OK-003", "MISS-001"])
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def fake_get_video(num, rate_limiter=None):
+        assert rate_limiter is auto_download.host_rate_limiter
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if num.startswith("MISS"):
+            return None
+        return SimpleNamespace(downloads=[SimpleNamespace(magnet=f"magnet:{num}", is_hd=False)])
+
+    monkeypatch.setattr(auto_download.spider, "get_video", fake_get_video)
+    monkeypatch.setattr(SubscribeService, "download_video", lambda self, *args, **kwargs: None)
+
+    with factory() as db:
+        AutoDownloadService(db=db)._process_pending_subscriptions()
+
+    assert peak[0] > 1
+    with factory() as db:
+        rows = {s.num: s for s in db.query(AutoDownloadSubscription)}
+    assert {num for num, s in rows.items() if s.status == DownloadStatus.DOWNLOADING} == {"OK-001", "OK-002", "OK-003"}
+    assert rows["OK-002"].download_url == "magnet:OK-002"
+    assert rows["MISS-001"].status == DownloadStatus.FAILED
+
+
+def test_claim_is_exclusive(factory):
+    _seed(factory, ["ABC-001"])
+    with factory() as db:
+        subscription_id = db.query(AutoDownloadSubscription.id).scalar()
+        assert AutoDownloadService._claim_subscription(db, subscription_id)
+        assert not AutoDownloadService._claim_subscription(db, subscription_id)
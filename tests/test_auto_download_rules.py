@@ -0,0 +1,155 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.models.auto_download import AutoDownloadRule, AutoDownloadSubscription, DownloadStatus
+from app.db.models.video_cache import CachedVideo, VideoCache
+from app.service.auto_download import AutoDownloadService
+from app.service.auto_download_engine import Candidate, CompiledRule, loosest_query
+from app.service.video_cache import VideoCacheService
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    monkeypatch.setattr(
+        AutoDownloadService,
+        "_get_auto_download_setting",
+        staticmethod(lambda: SimpleNamespace(max_daily_downloads=0)),
+    )
+    return AutoDownloadService(db=db_session)
+
+
+def _add_rule(db_session, name, **kwargs):
+    values = dict(name=name, min_rating=0, min_comments=0, is_hd=False, is_zh=False, is_uncensored=False)
+    values.update(kwargs)
+    rule = AutoDownloadRule(**values)
+    db_session.add(rule)
+    db_session.commit()
+    return rule
+
+
+def _add_video(db_session, num, cycles=("daily",), **kwargs):
+    values = dict(num=num, title=f"Title {num}", rating=4.5, comments_count=100,
+                  actors=[{"id": "a1", "name": "Actor"}], tags=[], fetched_at=datetime.now())
+    values.update(kwargs)
+    video = CachedVideo(**values)
+    for cycle in cycles:
+        db_session.add(VideoCache(video=video, num=num, source="JavDB", video_type="censored",
+                                  cycle=cycle, rank_position=1, fetched_at=datetime.now()))
+    db_session.commit()
+
+
+def test_execute_rules_dedupes_across_rankings_and_rules(db_session, service):
+    first = _add_rule(db_session, "first")
+    second = _add_rule(db_session, "second")
+    _add_video(db_session, "ABC-001", cycles=("daily", "weekly", "monthly"))
+    _add_video(db_session, "ABC-002")
+
+    result = service.execute_rules()
+
+    assert result["new_subscriptions"] == 2
+    subscriptions = db_session.query(AutoDownloadSubscription).all()
+    assert sorted(s.num for s in subscriptions) == ["ABC-001", "ABC-002"]
+    assert {s.rule_id for s in subscriptions} == {first.id}
+    assert '"Actor"' in subscriptions[0].actors
+
+    # 再次执行时已有订阅全部命中重复检测
+    assert service.execute_rules()["new_subscriptions"] == 0
+    assert second.id not in {s.rule_id for s in db_session.query(AutoDownloadSubscription)}
+
+
+def test_failed_subscription_is_replaced(db_session, service):
+    rule = _add_rule(db_session, "retry")
+    _add_video(db_session, "ABC-003")
+    failed = AutoDownloadSubscription(rule_id=rule.id, num="ABC-003", status=DownloadStatus.FAILED,
+                                      resource_hash="old")
+    db_session.add(failed)
+    db_session.commit()
+
+    assert service.execute_rules()["new_subscriptions"] == 1
+
+    rows = db_session.query(AutoDownloadSubscription).all()
+    assert len(rows) == 1
+    assert rows[0].status == DownloadStatus.PENDING
+
+
+def test_duplicate_index_is_loaded_with_a_single_query(db_session, service, monkeypatch):
+    for index in range(3):
+        _add_rule(db_session, f"rule-{index}")
+    for index in range(20):
+        _add_video(db_session, f"XYZ-{index:03d}")
+
+    calls = []
+    original = AutoDownloadService._load_subscription_index
+
+    def counting(self, nums=None):
+        calls.append(1)
+        return original(self, nums)
+
+    monkeypatch.setattr(AutoDownloadService, "_load_subscription_index", counting)
+    assert service.execute_rules()["new_subscriptions"] == 20
+    assert len(calls) == 1
+
+
+def test_rules_share_a_candidate_query_except_actor_and_tag_rules(db_session, service, monkeypatch):
+    hd = _add_rule(db_session, "hd", is_hd=True)
+    _add_rule(db_session, "rated-only", min_rating=9.9)
+    tagged = _add_rule(db_session, "tagged")
+    rated = _add_rule(db_session, "rated", min_rating=9)
+    # 演员/标签条件不是规则表字段，服务通过 getattr 读取
+    tagged.tags, tagged.exclude_tags = "drama", "vr"
+    rated.actor_id = "a2"
+    _add_video(db_session, "HD-001", is_hd=True, rating=4.0)
+    _add_video(db_session, "TAG-001", tags=["Drama"], rating=3.0)
+    _add_video(db_session, "TAG-002", tags=["drama", "VR"], rating=3.0)
+    _add_video(db_session, "ACT-001", actors=[{"id": " a2 ", "name": "Other"}], rating=4.8)
+    _add_video(db_session, "ACT-002", actors=[{"id": "a2", "name": "Other"}], rating=4.0)
+
+    calls = []
+    original = VideoCacheService.query_videos
+
+    def counting(self, **kwargs):
+        calls.append(kwargs)
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(VideoCacheService, "query_videos", counting)
+    assert service.execute_rules()["new_subscriptions"] == 3
+    # 无演员/标签条件的两条规则共用一次查询，演员、标签规则各自查询
+    assert len(calls) == 3
+    assert calls[0].get("required_actor_id") is None
+    assert {call.get("required_actor_id") for call in calls[1:]} == {"a2", None}
+    assert {tuple(call.get("required_tags") or ()) for call in calls[1:]} == {("drama",), ()}
+
+    by_rule = {s.num: s.rule_id for s in db_session.query(AutoDownloadSubscription)}
+    assert by_rule == {"HD-001": hd.id, "TAG-001": tagged.id, "ACT-001": rated.id}
+
+
+def test_rare_actor_outside_shared_candidate_window(db_session, service, monkeypatch):
+    from app.service import auto_download
+
+    monkeypatch.setattr(auto_download, "CANDIDATE_QUERY_LIMIT", 3)
+    _add_rule(db_session, "popular")
+    rare = _add_rule(db_session, "rare")
+    rare.actor_id = "rare"
+    for index in range(5):
+        _add_video(db_session, f"TOP-{index:03d}", rating=4.9)
+    _add_video(db_session, "RARE-001", actors=[{"id": "rare", "name": "Rare"}], rating=1.0)
+
+    service.execute_rules()
+
+    rare_nums = {s.num for s in db_session.query(AutoDownloadSubscription) if s.rule_id == rare.id}
+    assert rare_nums == {"RARE-001"}
+
+
+def test_compiled_rule_time_range_and_loosest_query():
+    now = datetime(2026, 1, 10)
+    rule = CompiledRule(rule_id=1, name="recent", days=7, now=now)
+    assert rule.matches(Candidate({"release_date": "2026-01-05"}))
+    assert not rule.matches(Candidate({"release_date": "2025-12-01"}))
+    assert rule.matches(Candidate({"release_date": "", "fetched_at": "2026-01-09T00:00:00"}))
+    assert not rule.matches(Candidate({"fetched_at": None}))
+
+    query = loosest_query([rule, CompiledRule(rule_id=2, name="month", days=30, min_rating=4, is_hd=True)])
+    assert query == {"days": 30, "min_rating": None, "min_comments": None,
+                     "is_hd": False, "is_zh": False, "is_uncensored": None}
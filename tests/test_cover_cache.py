@@ -0,0 +1,221 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi.responses import StreamingResponse
+
+from app.service.resource import ResourceService
+from app.utils import cache
+from app.utils.cover_cache import CoverCache, cover_key, cover_cache
+from app.utils.cover_fetcher import AsyncCoverFetcher
+
+JPEG = b"\xff\xd8\xff" + b"0" * 97
+
+
+class FakeClock:
+    def __init__(self):
+        self.value = 1_000_000.0
+
+    def __call__(self):
+        return self.value
+
+
+def _body(response):
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(read())
+
+
+@pytest.fixture
+def covers(tmp_path):
+    clock = FakeClock()
+    store = CoverCache(tmp_path / "cover", max_bytes=350, clock=clock)
+    yield store, clock
+    store.close()
+
+
+def test_covers_are_sharded_and_written_atomically(covers, tmp_path):
+    store, _ = covers
+    entry = store.put("https://example.com/a.jpg", JPEG)
+
+    key = cover_key("https://example.com/a.jpg")
+    assert entry.path == str(tmp_path / "cover" / key[:2] / key)
+    assert store.read("https://example.com/a.jpg") == JPEG
+    assert not [name for name in os.listdir(tmp_path / "cover" / key[:2]) if name.startswith(".")]
+    assert store.stats()["bytes"] == len(JPEG)
+    assert store.lookup("https://example.com/missing.jpg") is None
+
+
+def test_least_recently_used_covers_are_evicted_over_budget(covers):
+    store, clock = covers
+    for name in "abc":
+        store.put(f"https://example.com/{name}.jpg", JPEG)
+        clock.value += 3600
+    # a 最近被访问过，超出预算时先淘汰 b
+    assert store.lookup("https://example.com/a.jpg") is not None
+    clock.value += 3600
+    store.put("https://example.com/d.jpg", JPEG)
+
+    assert store.lookup("https://example.com/b.jpg") is None
+    assert store.lookup("https://example.com/a.jpg") is not None
+    assert store.lookup("https://example.com/d.jpg") is not None
+    assert store.stats()["bytes"] <= 350
+
+
+def test_recently_used_covers_survive_inline_eviction(covers):
+    store, clock = covers
+    for name in "abc":
+        store.put(f"https://example.com/{name}.jpg", JPEG)
+    # 三个文件都刚被访问过，超出预算时也不淘汰
+    store.put("https://example.com/d.jpg", JPEG)
+    assert all(store.lookup(f"https://example.com/{name}.jpg") for name in "abcd")
+
+    clock.value += 3600
+    store.lookup("https://example.com/c.jpg")
+    assert store.evict() == 1
+    assert store.lookup("https://example.com/c.jpg") is not None
+
+
+def test_proxy_cover_refetches_when_file_is_evicted_after_lookup(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    monkeypatch.setattr(ResourceService, "fetch_image_bytes", staticmethod(lambda url, image_type: JPEG))
+    url = "https://img.example.com/raced.jpg"
+    entry = cover_cache.put(url, JPEG)
+    lookup = cover_cache.lookup
+    raced = []
+
+    def lookup_then_evict(*args):
+        found = lookup(*args)
+        if found is not None and not raced:
+            raced.append(found.path)
+            os.remove(found.path)
+        return found
+
+    monkeypatch.setattr(cover_cache, "lookup", lookup_then_evict)
+    response = ResourceService.proxy_cover(url)
+
+    assert raced == [entry.path]
+    assert response.status_code == 200
+    assert _body(response) == JPEG
+    cover_cache.close()
+
+
+def test_legacy_flat_files_are_migrated(covers, tmp_path):
+    store, _ = covers
+    key = cover_key("https://example.com/old.jpg")
+    (tmp_path / "cover").mkdir(exist_ok=True)
+    (tmp_path / "cover" / key).write_bytes(JPEG)
+    other = cover_key("https://example.com/other.jpg")
+    (tmp_path / "cover" / other).write_bytes(JPEG)
+
+    assert store.read("https://example.com/old.jpg") == JPEG
+    assert store.migrate_legacy() == 1
+    assert (tmp_path / "cover" / other[:2] / other).exists()
+    assert store.stats()["files"] == 2
+
+
+def test_proxy_cover_streams_file_with_etag(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    fetched = []
+
+    def fetch(url, image_type):
+        fetched.append(url)
+        return JPEG
+
+    monkeypatch.setattr(ResourceService, "fetch_image_bytes", staticmethod(fetch))
+    url = "https://img.example.com/cover.jpg"
+
+    response = ResourceService.proxy_cover(url)
+    assert isinstance(response, StreamingResponse)
+    assert response.headers["content-length"] == str(len(JPEG))
+    assert _body(response) == JPEG
+    etag = response.headers["etag"]
+
+    assert ResourceService.proxy_cover(url, if_none_match=etag).status_code == 304
+    assert fetched == [url]
+    cover_cache.close()
+
+
+class FakeResponse:
+    status_code = 200
+    content = JPEG
+
+
+class FakeClient:
+    def __init__(self):
+        self.active = self.peak = 0
+        self.urls = []
+
+    async def get(self, url, headers=None):
+        self.urls.append(url)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        return FakeResponse()
+
+    async def aclose(self):
+        pass
+
+
+def test_async_fetcher_dedupes_and_limits_per_host(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    client = FakeClient()
+    fetcher = AsyncCoverFetcher(per_host=2, client_factory=lambda per_host, timeout: client)
+    urls = [f"https://img.example.com/{index % 5}.jpg" for index in range(20)]
+
+    async def main():
+        entries = await asyncio.gather(*(fetcher.get(url) for url in urls))
+        await fetcher.aclose()
+        return entries
+
+    entries = asyncio.run(main())
+    assert all(entry is not None for entry in entries)
+    assert sorted(client.urls) == sorted(set(urls))
+    assert client.peak <= 2
+    cover_cache.close()
+
+
+def test_async_fetcher_serves_stale_cover_and_revalidates(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    url = "https://img.example.com/stale.jpg"
+    old = cover_cache.put(url, b"\xff\xd8\xff" + b"1" * 10)
+    os.utime(old.path, (0, 0))
+    client = FakeClient()
+    fetcher = AsyncCoverFetcher(per_host=2, client_factory=lambda per_host, timeout: client)
+
+    async def main():
+        entry = await fetcher.get(url)
+        stale_size = entry.size
+        await asyncio.gather(*fetcher._state().inflight.values())
+        return stale_size
+
+    assert asyncio.run(main()) == 13
+    assert client.urls == [url]
+    assert cover_cache.read(url) == JPEG
+    cover_cache.close()
+
+
+def test_failed_revalidation_backs_off(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    url = "https://img.example.com/gone.jpg"
+    old = cover_cache.put(url, JPEG)
+    os.utime(old.path, (0, 0))
+    client = FakeClient()
+
+    async def not_found(url, headers=None):
+        client.urls.append(url)
+        return SimpleNamespace(status_code=404, content=b"")
+
+    client.get = not_found
+    fetcher = AsyncCoverFetcher(per_host=2, client_factory=lambda per_host, timeout: client)
+
+    async def main():
+        for _ in range(3):
+            assert (await fetcher.get(url)).read() == JPEG
+            await asyncio.gather(*fetcher._state().inflight.values())
+
+    asyncio.run(main())
+    assert client.urls == [url]
+    cover_cache.close()
@@ -0,0 +1,146 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from app.utils import cache
+from app.utils.cover_cache import CoverCache, cover_cache
+from app.utils.cover_fetcher import AsyncCoverFetcher
+from app.utils.image import pool, thumbnail
+
+
+def _jpeg(width=800, height=538):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeClient:
+    def __init__(self, content):
+        self.content = content
+        self.urls = []
+
+    async def get(self, url, headers=None):
+        self.urls.append(url)
+        return FakeResponse(self.content)
+
+    async def aclose(self):
+        pass
+
+
+def test_width_is_rounded_up_to_bucket():
+    assert thumbnail.bucket_width(None) is None
+    assert thumbnail.bucket_width(120) == 200
+    assert thumbnail.bucket_width(400) == 400
+    assert thumbnail.bucket_width(401) == 800
+    assert thumbnail.bucket_width(2000) is None
+
+
+def test_format_follows_accept_header(monkeypatch):
+    monkeypatch.setattr(thumbnail, "_supported", frozenset({"jpeg", "webp"}))
+    assert thumbnail.negotiate_format("image/avif,image/webp,*/*;q=0.8") == "webp"
+    assert thumbnail.negotiate_format("image/webp;q=0, image/*") == "jpeg"
+    assert thumbnail.negotiate_format(None) == "jpeg"
+
+    monkeypatch.setattr(thumbnail, "_supported", frozenset({"jpeg", "webp", "avif"}))
+    assert thumbnail.negotiate_format("image/avif,image/webp") == "avif"
+
+
+def test_render_variant_shrinks_and_transcodes(tmp_path):
+    path = tmp_path / "fanart.jpg"
+    path.write_bytes(_jpeg())
+
+    content = thumbnail.render_variant(str(path), 400, "webp")
+    with Image.open(io.BytesIO(content)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (400, 269)
+
+    # 不放大小图
+    small = thumbnail.render_variant(str(path), 1000, "jpeg")
+    with Image.open(io.BytesIO(small)) as image:
+        assert image.size == (800, 538)
+
+
+def test_variants_are_dropped_with_original(tmp_path):
+    store = CoverCache(tmp_path / "cover", max_bytes=10 ** 6)
+    url = "https://example.com/a.jpg"
+    store.put(url, b"original")
+    variant = store.put(url, b"small", "400.webp")
+    assert store.lookup(url, "400.webp").path == variant.path
+    assert store.lookup("https://example.com/b.jpg", "400.webp") is None
+
+    store.put(url, b"updated")
+    assert store.lookup(url, "400.webp") is None
+
+    store.put(url, b"small", "400.webp")
+    store.remove(url)
+    assert store.lookup(url, "400.webp") is None
+    assert store.stats()["bytes"] == 0
+    store.close()
+
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    calls = []
+
+    async def run_async(fn, *args):
+        calls.append(args)
+        return fn(*args)
+
+    monkeypatch.setattr(pool, "run_async", run_async)
+    return calls
+
+
+def test_fetcher_renders_variant_once(monkeypatch, tmp_path, inline_pool):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    client = FakeClient(_jpeg())
+    fetcher = AsyncCoverFetcher(per_host=2, client_factory=lambda per_host, timeout: client)
+    url = "https://img.example.com/a.jpg"
+
+    async def main():
+        entries = await asyncio.gather(*(fetcher.get_variant(url, 200, "webp") for _ in range(5)))
+        again = await fetcher.get_variant(url, 200, "webp")
+        await fetcher.aclose()
+        return entries, again
+
+    entries, again = asyncio.run(main())
+    assert client.urls == [url]
+    assert len(inline_pool) == 1
+    assert {entry.path for entry in entries} == {again.path}
+    assert again.key.endswith(".200.webp")
+    cover_cache.close()
+
+
+def test_fetcher_falls_back_to_original_when_render_fails(monkeypatch, tmp_path, inline_pool):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    client = FakeClient(b"\xff\xd8\xff" + b"not really a jpeg")
+    fetcher = AsyncCoverFetcher(per_host=2, client_factory=lambda per_host, timeout: client)
+    url = "https://img.example.com/broken.jpg"
+
+    async def main():
+        entry = await fetcher.get_variant(url, 200, "webp")
+        await fetcher.aclose()
+        return entry
+
+    entry = asyncio.run(main())
+    assert entry.key == cover_cache.lookup(url).key
+    cover_cache.close()
+
+
+def test_render_runs_in_process_pool(tmp_path):
+    path = tmp_path / "fanart.jpg"
+    path.write_bytes(_jpeg())
+    try:
+        content = pool.run(thumbnail.render_variant, str(path), 200, "jpeg")
+    finally:
+        pool.shutdown()
+    with Image.open(io.BytesIO(content)) as image:
+        assert image.size == (200, 134)
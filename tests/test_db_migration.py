@@ -220,5 +220,37 @@ class TestDatabaseMigrationIntegration:
         assert migration._table_exists('pending_torrent') is True
 
 
+def test_upgrade_after_create_all_with_video_cache_links(tmp_path):
+    """启动顺序：create_all 先按最新模型建好关联表，再执行 alembic upgrade heads"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine, text
+
+    from app.db.models.base import Base
+
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    config = Config(str(Path(__file__).resolve().parent.parent / 'alembic.ini'))
+    config.set_main_option('script_location', str(Path(__file__).resolve().parent.parent / 'alembic'))
+    config.set_main_option('sqlalchemy.url', url)
+    command.upgrade(config, '20260225_add_download_uniqueness')
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for title in ('old', 'new'):
+            conn.execute(text(
+                "INSERT INTO video_cache (num, source, video_type, cycle, title, actors, tags) "
+                "VALUES ('ABC-001', 'javdb', 'censored', 'daily', :title, :actors, :tags)"
+            ), {'title': title, 'actors': '[{"id": "a1", "name": "A"}]', 'tags': '["Drama"]'})
+    Base.metadata.create_all(engine)
+
+    command.upgrade(config, 'heads')
+
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT num, title FROM cached_video')).fetchall() == [('ABC-001', 'new')]
+        assert conn.execute(text('SELECT actor_id FROM video_cache_actor')).fetchall() == [('a1',)]
+        assert conn.execute(text('SELECT tag FROM video_cache_tag')).fetchall() == [('drama',)]
+    engine.dispose()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,60 @@
+import threading
+
+from app.utils.host_limiter import HostRateLimiter, host_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.value = 100.0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.value
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.value += seconds
+
+
+def test_host_key_accepts_urls_and_hosts():
+    assert host_key("https://JavDB.com/rankings/movies?p=daily") == "javdb.com"
+    assert host_key("javbus.com") == "javbus.com"
+
+
+def test_requests_to_same_host_are_spaced_and_other_hosts_are_independent():
+    clock = FakeClock()
+    limiter = HostRateLimiter(min_interval=3.0, jitter=0.0, max_concurrency=1, clock=clock, sleep=clock.sleep)
+    starts = []
+
+    for _ in range(3):
+        with limiter.slot("https://javdb.com/a"):
+            starts.append(("javdb", clock()))
+    with limiter.slot("https://javbus.com/b"):
+        starts.append(("javbus", clock()))
+
+    assert starts == [("javdb", 100.0), ("javdb", 103.0), ("javdb", 106.0), ("javbus", 106.0)]
+
+
+def test_concurrency_cap_per_host():
+    limiter = HostRateLimiter(min_interval=0.0, jitter=0.0, max_concurrency=2)
+    active, peak = 0, 0
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def worker():
+        nonlocal active, peak
+        with limiter.slot("javdb.com"):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            release.wait(0.05)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.db.models import JobLock
+from app.utils.job_lock import DatabaseJobLockBackend, JobLockManager, LocalJobLockBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.value = datetime(2026, 1, 1, 2, 0, 0)
+
+    def __call__(self):
+        return self.value
+
+    def advance(self, seconds):
+        self.value += timedelta(seconds=seconds)
+
+
+@pytest.fixture(params=["database", "local"])
+def backend_and_clock(request, tmp_path):
+    clock = FakeClock()
+    if request.param == "local":
+        yield LocalJobLockBackend(now=clock), clock
+        return
+    engine = create_engine(f"sqlite:///{tmp_path}/lock.db")
+    JobLock.__table__.create(engine)
+    yield DatabaseJobLockBackend(engine, now=clock), clock
+    engine.dispose()
+
+
+def test_lease_is_exclusive_until_expired(backend_and_clock):
+    backend, clock = backend_and_clock
+
+    assert backend.acquire("subscribe", "replica-a", ttl=60)
+    assert not backend.acquire("subscribe", "replica-b", ttl=60)
+
+    clock.advance(30)
+    assert backend.renew("subscribe", "replica-a", ttl=60)
+    clock.advance(45)
+    assert not backend.acquire("subscribe", "replica-b", ttl=60)
+
+    # replica-a 停止续约后租约过期，replica-b 接管
+    clock.advance(60)
+    assert backend.acquire("subscribe", "replica-b", ttl=60)
+    assert not backend.renew("subscribe", "replica-a", ttl=60)
+
+
+def test_released_lease_respects_cooldown_for_other_owners(backend_and_clock):
+    backend, clock = backend_and_clock
+
+    assert backend.acquire("auto_download", "replica-a", ttl=60)
+    backend.release("auto_download", "replica-a")
+
+    clock.advance(10)
+    assert not backend.acquire("auto_download", "replica-b", ttl=60, cooldown=1800)
+    assert backend.acquire("auto_download", "replica-a", ttl=60, cooldown=1800)
+    backend.release("auto_download", "replica-a")
+
+    clock.advance(10)
+    assert backend.acquire("auto_download", "replica-b", ttl=60, cooldown=0)
+
+
+def test_manager_tracks_held_leases_and_detects_takeover():
+    clock = FakeClock()
+    backend = LocalJobLockBackend(now=clock)
+    manager = JobLockManager(backend=backend, ttl=60)
+
+    lease = manager.lease("refresh_video_cache")
+    assert lease.acquire()
+
+    clock.advance(120)
+    assert backend.acquire("refresh_video_cache", "other-replica", ttl=60)
+    manager.renew_all()
+    assert lease.lost
+
+    lease.release()
+    assert not lease.acquired
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from app.db.models import JobRun
+from app.service.job_run import JobRunService, percentile, summarize_result
+
+
+def _add_run(db_session, key, duration, status="success"):
+    start = datetime(2026, 1, 1, 2, 0, 0)
+    run = JobRun(
+        job_key=key,
+        job_name=key,
+        start_time=start,
+        end_time=start + timedelta(seconds=duration),
+        duration=duration,
+        status=status,
+    )
+    db_session.add(run)
+    db_session.commit()
+    return run
+
+
+def test_finish_records_duration_status_and_summary(db_session):
+    service = JobRunService(db_session)
+    run = service.start("subscribe", "订阅下载")
+
+    service.finish(run, "success", result={"downloaded": 3})
+
+    saved = db_session.get(JobRun, run.id)
+    assert saved.status == "success"
+    assert saved.duration is not None and saved.duration >= 0
+    assert saved.result == '{"downloaded": 3}'
+
+
+def test_prune_keeps_only_latest_runs_per_job(db_session):
+    service = JobRunService(db_session)
+    for i in range(5):
+        _add_run(db_session, "subscribe", float(i))
+    _add_run(db_session, "auto_download", 1.0)
+
+    service.prune("subscribe", keep=2)
+
+    durations = [run.duration for run in service.list_runs("subscribe")]
+    assert durations == [4.0, 3.0]
+    assert len(service.list_runs("auto_download")) == 1
+
+
+def test_get_stats_reports_percentiles_and_counts(db_session):
+    service = JobRunService(db_session)
+    for duration in [1.0, 2.0, 3.0, 4.0, 10.0]:
+        _add_run(db_session, "refresh_video_cache", duration)
+    _add_run(db_session, "refresh_video_cache", 0.0, status="skipped")
+    _add_run(db_session, "refresh_video_cache", 5.0, status="failed")
+
+    stats = service.get_stats("refresh_video_cache")[0]
+
+    assert stats["total"] == 7
+    assert stats["failed"] == 1
+    assert stats["skipped"] == 1
+    assert stats["p50"] == 3.5
+    assert stats["max"] == 10.0
+    assert stats["last_status"] == "failed"
+
+
+def test_percentile_and_summary_helpers():
+    assert percentile([], 50) is None
+    assert percentile([1.0, 3.0], 50) == 2.0
+    assert summarize_result(None) is None
+    assert len(summarize_result("x" * 1000)) == 500
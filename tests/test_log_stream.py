@@ -0,0 +1,49 @@
+import asyncio
+import logging
+import os
+
+from app.utils.log_stream import LogBroadcaster, parse_level, read_tail
+
+
+def test_read_tail_returns_last_lines_without_full_read(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_text("".join(f"【INFO】line {i}\n" for i in range(1000)), encoding="utf-8")
+
+    lines = read_tail(log_file, 3, block_size=64)
+
+    assert lines == ["【INFO】line 997", "【INFO】line 998", "【INFO】line 999"]
+
+
+def test_parse_level_handles_standard_and_continuation_lines():
+    assert parse_level("【WARNING】2026-01-01 00:00:00 - app - msg") == logging.WARNING
+    assert parse_level("Traceback (most recent call last):") is None
+
+
+def test_broadcaster_fans_out_with_level_filter_and_rotation(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_text("【INFO】old\n", encoding="utf-8")
+    broadcaster = LogBroadcaster(log_file, buffer_size=10, poll_interval=0.01)
+
+    async def scenario():
+        all_sub, history = broadcaster.subscribe()
+        warn_sub, warn_history = broadcaster.subscribe(level="WARNING")
+        assert history == ["【INFO】old"]
+        assert warn_history == []
+        await asyncio.sleep(0.05)
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("【INFO】hello\n【ERROR】boom\n  detail\n")
+        assert await all_sub.get(timeout=2) == "【INFO】hello"
+        assert await warn_sub.get(timeout=2) == "【ERROR】boom"
+        assert await warn_sub.get(timeout=2) == "  detail"
+
+        # 模拟 RotatingFileHandler 的轮转
+        os.rename(log_file, tmp_path / "app.log.1")
+        log_file.write_text("【WARNING】rotated\n", encoding="utf-8")
+        assert await warn_sub.get(timeout=2) == "【WARNING】rotated"
+
+        broadcaster.unsubscribe(all_sub)
+        broadcaster.unsubscribe(warn_sub)
+        assert broadcaster.subscriber_count == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.schema import VideoActor, VideoDetail, VideoDownload, VideoPreview
+from app.service.spider import SpiderService
+from app.utils import spider as spider_module
+from app.utils.spider.metadata_store import DOWNLOADS, METADATA, PREVIEWS, MetadataStore
+
+pytestmark = pytest.mark.usefixtures("isolated_metadata_store")
+
+
+class FakeClock:
+    def __init__(self):
+        self.value = datetime(2026, 1, 1, 2, 0, 0)
+
+    def __call__(self):
+        return self.value
+
+    def advance(self, **kwargs):
+        self.value += timedelta(**kwargs)
+
+
+def _detail(**fields):
+    return VideoDetail(num="ABC-001", **fields)
+
+
+def test_only_fetched_groups_are_overwritten(isolated_metadata_store):
+    clock = FakeClock()
+    store = MetadataStore(isolated_metadata_store.engine, now=clock)
+
+    store.save("abc-001", _detail(title="Title", actors=[VideoActor(name="Actor")],
+                                  downloads=[VideoDownload(magnet="magnet:?old")]),
+               (METADATA, DOWNLOADS), {"JavBus": _detail(title="Title")})
+    clock.advance(days=2)
+    assert store.fresh("ABC-001", (METADATA,)).title == "Title"
+    assert store.fresh("ABC-001", (METADATA, DOWNLOADS)) is None
+
+    # 只刷新下载列表：标题保留，本次缺失的元数据字段不覆盖原值
+    saved = store.save("ABC-001", _detail(title="Other", downloads=[VideoDownload(magnet="magnet:?new")]),
+                       (DOWNLOADS,), {"JavDB": _detail()})
+    detail = saved.detail
+    assert detail.title == "Title"
+    assert [d.magnet for d in detail.downloads] == ["magnet:?new"]
+    assert set(saved.sources) == {"JavBus", "JavDB"}
+    assert store.load("ABC-001").stale_groups((METADATA, DOWNLOADS, PREVIEWS), clock()) == [PREVIEWS]
+
+
+class FakeSpider:
+    name = "JavBus"
+    host = "https://example.com/"
+    downloadable = True
+    calls = []
+
+    def get_info(self, num, **kwargs):
+        type(self).calls.append(kwargs)
+        return VideoDetail(num=num, title="Title", cover="cover.jpg", actors=[VideoActor(name="Actor")],
+                           website=["JavBus"], downloads=[VideoDownload(magnet="magnet:?1")],
+                           previews=[VideoPreview(website="JavBus")] if kwargs.get("include_previews") else [])
+
+
+def test_scrapes_reuse_stored_metadata(monkeypatch):
+    FakeSpider.calls = []
+    monkeypatch.setattr(spider_module, "SPIDER_CLASSES", [FakeSpider])
+    monkeypatch.setattr(spider_module, "JavbusSpider", FakeSpider)
+    monkeypatch.setattr(spider_module, "JavdbSpider", FakeSpider)
+
+    assert spider_module.get_video_info("ABC-002").title == "Title"
+    assert spider_module.get_video_info("ABC-002").title == "Title"
+    assert len(FakeSpider.calls) == 1
+
+    # 元数据仍有效、预览未抓取过：下载和预览需要抓取
+    spider_module.get_video("ABC-002")
+    assert FakeSpider.calls[-1]["include_previews"] is True
+    video = spider_module.get_video("ABC-002")
+    # 预览已保存：再次刷新下载列表时不再解析预览，返回结果仍包含已保存的预览
+    assert FakeSpider.calls[-1]["include_previews"] is False
+    assert video.previews and video.previews[0].website == "JavBus"
+
+    calls = len(FakeSpider.calls)
+    assert spider_module.get_video("ABC-002", use_cache=True).downloads[0].magnet == "magnet:?1"
+    assert len(FakeSpider.calls) == calls
+
+    # 最近的刮削结果过期后，不使用已保存下载列表的调用方重新抓取
+    monkeypatch.setattr(spider_module.cache, "get_cache_json", lambda *args: None)
+    spider_module.get_video("ABC-002", use_cache=True)
+    assert len(FakeSpider.calls) == calls
+    spider_module.get_video("ABC-002", use_cache=True, use_stored=False)
+    assert len(FakeSpider.calls) > calls
+
+
+def test_spider_service_uses_stored_groups(monkeypatch):
+    FakeSpider.calls = []
+    service = SpiderService(max_concurrent=2, spider_timeout=1.0, first_hit=True, grace_period=0.1)
+    monkeypatch.setattr(service, "_get_spider_classes", lambda: [FakeSpider])
+
+    detail = asyncio.run(service.get_video_info_async("ABC-003", include_comments=False))
+    assert detail.title == "Title"
+    assert asyncio.run(service.get_video_info_async("ABC-003", include_comments=False)).title == "Title"
+    assert len(FakeSpider.calls) == 1
+
+    # 评论从未抓取过，只补抓评论
+    asyncio.run(service.get_video_info_async("ABC-003"))
+    assert FakeSpider.calls[-1] == {"include_downloads": False, "include_previews": False,
+                                    "include_comments": True}
+
+
+def test_incomplete_scrape_keeps_groups_stale(isolated_metadata_store):
+    clock = FakeClock()
+    store = MetadataStore(isolated_metadata_store.engine, now=clock)
+
+    store.save("ABC-001", _detail(title="Title", downloads=[VideoDownload(magnet="magnet:?1")]),
+               (METADATA, DOWNLOADS), {"JavBus": _detail()}, complete=False)
+
+    assert store.load("ABC-001").detail.title == "Title"
+    assert store.fresh("ABC-001", (METADATA,)) is None
+    assert store.fresh("ABC-001", (DOWNLOADS,)) is None
+
+
+class BrokenSpider:
+    name = "JavDB"
+    host = "https://example.org/"
+    downloadable = True
+
+    def get_info(self, num, **kwargs):
+        raise ConnectionError("timeout")
+
+
+def test_site_errors_do_not_mark_downloads_fresh(monkeypatch, tmp_path):
+    FakeSpider.calls = []
+    monkeypatch.setattr(spider_module.cache, "cache_path", tmp_path)
+    monkeypatch.setattr(spider_module, "JavbusSpider", FakeSpider)
+    monkeypatch.setattr(spider_module, "JavdbSpider", BrokenSpider)
+
+    assert spider_module.get_video("ABC-004").downloads[0].magnet == "magnet:?1"
+    spider_module.cache.clean_cache_json(spider_module.VIDEO_CACHE_PARENT, "ABC-004")
+    spider_module.get_video("ABC-004", use_cache=True)
+    assert len(FakeSpider.calls) == 2
+
+
+def test_spider_service_timeout_keeps_groups_stale(monkeypatch):
+    FakeSpider.calls = []
+    service = SpiderService(max_concurrent=2, spider_timeout=0.3, first_hit=True, grace_period=0.05)
+
+    class SlowSpider(BrokenSpider):
+        def get_info(self, num, **kwargs):
+            import time
+            time.sleep(0.5)
+            return None
+
+    monkeypatch.setattr(service, "_get_spider_classes", lambda: [FakeSpider, SlowSpider])
+
+    assert asyncio.run(service.get_video_info_async("ABC-005")).downloads
+    assert spider_module.metadata_store.fresh("ABC-005", (DOWNLOADS,)) is None
+    assert spider_module.metadata_store.load("ABC-005").detail.title == "Title"
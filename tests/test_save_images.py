@@ -0,0 +1,170 @@
+import io
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image
+
+from app.schema import VideoDetail
+from app.utils import image, spider
+from app.utils.image import badge, pool
+
+
+def _jpeg(width=800, height=538):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (20, 120, 200)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    calls = []
+
+    def submit(fn, *args):
+        calls.append(args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    monkeypatch.setattr(pool, "submit", submit)
+    monkeypatch.setattr(pool, "run", lambda fn, *args: submit(fn, *args).result())
+    return calls
+
+
+def _video(num, cover="https://example.com/cover/abc.jpg"):
+    return VideoDetail(num=num, cover=cover, is_zh=True, is_uncensored=True)
+
+
+def test_badges_are_loaded_and_scaled_once_per_size():
+    badge.load_badge.cache_clear()
+    badge.scaled_badge.cache_clear()
+
+    for _ in range(3):
+        badge.tags(Image.new("RGB", (800, 538)), True, True)
+        badge.tags(Image.new("RGB", (379, 538)), True, False)
+
+    assert badge.load_badge.cache_info().misses == 2
+    # 两个尺寸的图片高度相同，角标只缩放一次
+    assert badge.scaled_badge.cache_info().misses == 2
+
+
+def test_save_images_renders_poster_and_thumb(monkeypatch, tmp_path, inline_pool):
+    monkeypatch.setattr(spider, "get_video_cover", lambda url: _jpeg())
+
+    extension = image.save_images(_video("ABC-001"), str(tmp_path / "ABC-001.mp4"))
+
+    assert extension == ".jpg"
+    assert len(inline_pool) == 1
+    with Image.open(tmp_path / "ABC-001-poster.jpg") as poster:
+        assert poster.size == (379, 538)
+    with Image.open(tmp_path / "ABC-001-thumb.jpg") as thumb:
+        assert thumb.size == (800, 538)
+        # 左上角已加上角标
+        assert thumb.getpixel((12, 12)) != (20, 120, 200)
+    assert (tmp_path / "ABC-001-fanart.jpg").read_bytes() == _jpeg()
+
+
+def test_batch_reports_failures_per_item(monkeypatch, tmp_path, inline_pool):
+    def get_video_cover(url):
+        if "broken" in url:
+            return b"not an image"
+        return _jpeg()
+
+    monkeypatch.setattr(spider, "get_video_cover", get_video_cover)
+    results = image.save_images_batch([
+        (_video("ABC-001"), str(tmp_path / "ABC-001.mp4")),
+        (_video("ABC-002", "https://example.com/broken.jpg"), str(tmp_path / "ABC-002.mp4")),
+        (_video("ABC-003"), str(tmp_path / "ABC-003.mp4")),
+    ])
+
+    assert results[0] == ".jpg" and results[2] == ".jpg"
+    assert isinstance(results[1], Exception)
+    assert (tmp_path / "ABC-003-poster.jpg").exists()
+
+
+def test_image_batch_defers_generation_until_exit(monkeypatch, tmp_path, inline_pool):
+    monkeypatch.setattr(spider, "get_video_cover", lambda url: _jpeg())
+
+    with image.image_batch():
+        with image.image_batch():
+            image.save_images(_video("ABC-001"), str(tmp_path / "ABC-001.mp4"))
+        image.save_images(_video("ABC-002"), str(tmp_path / "ABC-002.mp4"))
+        assert not inline_pool
+        assert not (tmp_path / "ABC-001-poster.jpg").exists()
+
+    assert len(inline_pool) == 2
+    assert (tmp_path / "ABC-001-poster.jpg").exists()
+    assert (tmp_path / "ABC-002-thumb.jpg").exists()
+
+
+def test_image_batch_reports_failures(monkeypatch, tmp_path, inline_pool):
+    monkeypatch.setattr(spider, "get_video_cover", lambda url: None if "broken" in url else _jpeg())
+
+    with image.image_batch() as batch:
+        image.save_images(_video("ABC-001"), str(tmp_path / "ABC-001.mp4"))
+        image.save_images(_video("ABC-002", "https://example.com/broken.jpg"), str(tmp_path / "ABC-002.mp4"))
+
+    assert [video.num for video, _ in batch.failed] == ["ABC-002"]
+    assert (tmp_path / "ABC-001-poster.jpg").exists()
+
+
+def test_torrent_is_marked_failed_when_images_fail(monkeypatch, db_session, tmp_path, inline_pool):
+    from app.schema import Torrent, TorrentFile
+    from app.service.download import DownloadService
+
+    monkeypatch.setattr(spider, "get_video_cover", lambda url: None)
+    completed = []
+
+    class FakeVideoService:
+        db = db_session
+
+        def parse_video(self, path):
+            return VideoDetail(num="ABC-001")
+
+        def scrape_video(self, num):
+            return _video(num)
+
+        def save_video(self, video, mode=None):
+            image.save_images(video, str(tmp_path / "ABC-001.mp4"))
+
+    service = DownloadService(db_session)
+    monkeypatch.setattr(service, "complete_download", lambda torrent_hash, ok: completed.append(ok))
+    torrent = Torrent(hash="h", name="n", size="1", path=str(tmp_path), tags=[],
+                      files=[TorrentFile(name="a.mp4", size="1", path=str(tmp_path / "a.mp4"))])
+
+    with image.image_batch():
+        service.scrape_download(FakeVideoService(), torrent, "move")
+        # 多个种子合并为一批时，图片生成完成前不标记整理结果
+        assert completed == []
+
+    assert completed == [False]
+
+
+def test_history_and_notify_wait_for_images(monkeypatch, db_session, tmp_path, inline_pool):
+    from app.db.models import History
+    from app.service import video as video_module
+
+    monkeypatch.setattr(spider, "get_video_cover", lambda url: None if "broken" in url else _jpeg())
+    sent = []
+    monkeypatch.setattr(video_module.notify, "send_video", sent.append)
+
+    def trans(self, video, video_path, trans_mode):
+        dest_path = str(tmp_path / f"{video.num}-library.mp4")
+        image.save_images(video, dest_path)
+        return dest_path
+
+    monkeypatch.setattr(video_module.VideoService, "trans", trans)
+    service = video_module.VideoService(db=db_session)
+
+    with image.image_batch():
+        for video in (_video("ABC-001"), _video("ABC-002", "https://example.com/broken.jpg")):
+            video.path = str(tmp_path / f"{video.num}.mp4")
+            (tmp_path / f"{video.num}.mp4").write_bytes(b"video")
+            service.save_video(video, mode="download")
+        assert not sent
+        assert db_session.query(History).count() == 0
+
+    assert {h.num: h.status for h in db_session.query(History)} == {"ABC-001": 1, "ABC-002": 0}
+    assert [(n.num, n.is_success) for n in sent] == [("ABC-001", True), ("ABC-002", False)]
@@ -0,0 +1,64 @@
+import sqlite3
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine
+
+from app.utils import version_manager as version_module
+from app.utils.schema_fingerprint import SchemaFingerprint
+from app.utils.version_manager import VersionManager
+
+
+def _metadata(with_extra_column=False):
+    metadata = MetaData()
+    columns = [Column("id", Integer, primary_key=True), Column("num", String, index=True)]
+    if with_extra_column:
+        columns.append(Column("title", String))
+    Table("video", metadata, *columns)
+    return metadata
+
+
+def test_fingerprint_round_trip_and_invalidation(tmp_path, monkeypatch):
+    monkeypatch.delenv("TISSUE_FORCE_SCHEMA_CHECK", raising=False)
+    engine = create_engine(f"sqlite:///{tmp_path}/app.db")
+    fingerprint = SchemaFingerprint(engine, _metadata(), app_version="1.0.0", alembic_config="missing.ini")
+
+    assert fingerprint.stored() is None
+    assert not fingerprint.is_unchanged()
+
+    fingerprint.save()
+    assert fingerprint.is_unchanged()
+
+    monkeypatch.setenv("TISSUE_FORCE_SCHEMA_CHECK", "1")
+    assert not fingerprint.is_unchanged()
+    monkeypatch.delenv("TISSUE_FORCE_SCHEMA_CHECK")
+
+    changed_model = SchemaFingerprint(engine, _metadata(True), app_version="1.0.0", alembic_config="missing.ini")
+    changed_version = SchemaFingerprint(engine, _metadata(), app_version="1.0.1", alembic_config="missing.ini")
+    assert not changed_model.is_unchanged()
+    assert not changed_version.is_unchanged()
+    engine.dispose()
+
+
+def test_backup_database_copies_incrementally_and_prunes(tmp_path, monkeypatch):
+    db_file = tmp_path / "app.db"
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE video (id INTEGER PRIMARY KEY, num TEXT)")
+    conn.executemany("INSERT INTO video (num) VALUES (?)", [(f"ABC-{i:05d}" * 20,) for i in range(2000)])
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(version_module, "BACKUP_PAGES_PER_STEP", 4)
+    monkeypatch.setattr(version_module, "BACKUP_KEEP", 2)
+    backup_dir = tmp_path / "backups"
+    for name in ["app_20200101_000000.db", "app_20200102_000000.db"]:
+        backup_dir.mkdir(exist_ok=True)
+        (backup_dir / name).write_bytes(b"")
+
+    manager = VersionManager(str(tmp_path / "version.json"), db_path=str(db_file), backup_dir=str(backup_dir))
+    assert manager.backup_database()
+
+    backups = sorted(backup_dir.glob("app_*.db"))
+    assert len(backups) == 2
+    assert backups[0].name == "app_20200102_000000.db"
+    copied = sqlite3.connect(backups[-1])
+    assert copied.execute("SELECT COUNT(*) FROM video").fetchone()[0] == 2000
+    copied.close()
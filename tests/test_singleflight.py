@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def fetch(num):
+        calls.append(num)
+        started.set()
+        release.wait(5)
+        return {"num": num}
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("ABC-001", fetch, "ABC-001")))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("ABC-001", fetch, "ABC-001")))
+                 for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert calls == ["ABC-001"]
+    assert results == [{"num": "ABC-001"}] * 4
+    # 等待者拿到的是副本
+    assert len({id(result) for result in results}) == 4
+    assert not flight.in_flight("ABC-001")
+
+
+def test_errors_are_shared_and_key_is_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 42) == 42
+
+
+def test_async_and_thread_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    thread_result = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "detail"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do_async("key", fetch))
+        await asyncio.sleep(0.01)
+        thread = threading.Thread(target=lambda: thread_result.append(flight.do("key", lambda: "other")))
+        thread.start()
+        results = await asyncio.gather(leader, flight.do_async("key", fetch))
+        await asyncio.get_running_loop().run_in_executor(None, thread.join, 5)
+        return results
+
+    assert asyncio.run(main()) == ["detail", "detail"]
+    assert thread_result == ["detail"]
+    assert calls == [1]
+
+
+def test_cancelled_leader_does_not_fail_waiters():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "detail"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do_async("key", fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.do_async("key", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == "detail"
@@ -0,0 +1,20 @@
+from scripts.benchmark_spider_parsers import SCENARIOS, compare, run_benchmark
+
+
+def test_every_scenario_parses_recorded_pages():
+    # run_scenario 在解析结果与录制页面不符时抛出异常
+    result = run_benchmark(rounds=1, warmup=0)
+
+    assert set(result["scenarios"]) == {scenario.name for scenario in SCENARIOS}
+    assert result["scenarios"]["javbus.detail"]["requests_per_op"] == 2.0
+    assert result["scenarios"]["dmm.detail"]["requests_per_op"] == 3.0
+    ranking_fields = {item["key"] for item in result["scenarios"]["javdb.ranking"]["fields"]["top"]}
+    assert "javdb.ranking_page.num" in ranking_fields
+
+
+def test_compare_reports_relative_change():
+    entry = {"median_ms": 2.0, "alloc": {"peak_kib": 10.0}}
+    lines = compare({"scenarios": {"javdb.detail": entry, "new": entry}},
+                    {"scenarios": {"javdb.detail": {"median_ms": 4.0, "alloc": {"peak_kib": 10.0}}}})
+    assert "-50.0%" in lines[0]
+    assert "无基线" in lines[1]
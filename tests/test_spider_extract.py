@@ -0,0 +1,101 @@
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+from lxml import etree
+
+from app.utils.spider.extract import CardExtractor, Field, compiled, info_panel, panel_value
+from app.utils.spider.javdb import JavdbSpider
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "spider" / "javdb"
+
+
+def _spider(detail_page: bytes = b"") -> JavdbSpider:
+    spider = JavdbSpider.__new__(JavdbSpider)
+    spider.host = "https://javdb.com"
+    spider.avatar_host = "https://c0.jdbstatic.com/avatars/"
+    spider.name = "JavDB"
+    spider._get = lambda url, headers=None: SimpleNamespace(content=detail_page, url=url)
+    return spider
+
+
+def _html(name: str):
+    return etree.HTML((FIXTURE_DIR / name).read_bytes(), parser=etree.HTMLParser(encoding="utf-8"))
+
+
+def test_compiled_xpath_is_cached():
+    assert compiled("//div[@class='item']") is compiled("//div[@class='item']")
+
+
+def test_card_extractor_uses_first_matching_expression():
+    node = etree.HTML("<div><span class='b'>B</span><i>x</i><i>y</i></div>")
+    extractor = CardExtractor(
+        Field("value", ".//span[@class='a']", ".//span[@class='b']"),
+        Field("missing", ".//em"),
+        Field("items", ".//i/text()", many=True),
+        Field("none", ".//u/text()", many=True),
+    )
+    fields = extractor.extract(node)
+    assert fields["value"].text == "B"
+    assert fields["missing"] is None
+    assert fields["items"] == ["x", "y"]
+    assert fields["none"] == []
+
+
+def test_info_panel_matches_per_field_lookup_order():
+    html = etree.HTML(
+        "<div><strong>Director:</strong><span class='value'></span><a>Link Director</a>"
+        "<strong>日期:</strong><span class='value'>2026-01-01</span>"
+        "<strong>Release Date:</strong><span class='value'>2025-01-01</span></div>"
+    )
+    panel = info_panel(html)
+    assert panel["director"] == "Link Director"
+    # 多个候选标签同时出现时以页面顺序为准
+    assert panel_value(panel, ["release date", "日期"]) == "2026-01-01"
+    assert _spider()._extract_info_value(html, ["release date", "日期"]) == "2026-01-01"
+
+
+def test_ranking_fixture_parses_all_cards():
+    videos = _spider()._parse_ranking_page(_html("ranking.html"), 1, "censored_ranking")
+    by_num = {video["num"]: video for video in videos}
+
+    assert list(by_num) == ["SSIS-001", "IPX-002", "MIDV-003", "FC2-PPV-004"]
+    assert by_num["SSIS-001"]["rating"] == 4.55
+    assert by_num["SSIS-001"]["comments"] == 754
+    assert by_num["SSIS-001"]["url"] == "https://javdb.com/v/abc123"
+    assert by_num["IPX-002"]["cover"] == "https://c0.jdbstatic.com/covers/de/def456.jpg"
+    assert by_num["IPX-002"]["comments"] == 1203
+    assert by_num["IPX-002"]["release_date"] == "2026-01-02"
+    assert by_num["MIDV-003"]["rating"] == 3.9
+    assert by_num["MIDV-003"]["cover"] == "https://javdb.com/covers/gh/ghi789.jpg"
+    assert [video["is_zh"] for video in videos] == [False, True, False, True]
+
+
+def test_detail_fixture_info_fields():
+    page = (FIXTURE_DIR / "detail.html").read_bytes()
+    meta = _spider(page).get_info("SSIS-001", url="/v/abc123")
+
+    assert meta.title == "SSIS-001 Fixture Title One"
+    assert meta.premiered == "2026-01-01"
+    assert meta.runtime == "150"
+    assert meta.director == "Fixture Director"
+    assert meta.studio == "Fixture Maker"
+    assert meta.publisher == "Fixture Publisher"
+    assert meta.series == "Fixture Series"
+    assert [actor.name for actor in meta.actors] == ["Fixture Actress"]
+    assert meta.comments_count == 754
+
+
+def test_actor_video_boxes_use_card_extractor():
+    spider = _spider()
+    spider.session = SimpleNamespace(headers={})
+    page = (FIXTURE_DIR / "ranking.html").read_bytes()
+    spider._get = lambda url, headers=None: SimpleNamespace(content=page, url=url)
+
+    videos = spider.get_actor_videos("https://javdb.com/actors/AbCd")
+
+    assert [video.num for video in videos] == ["SSIS-001", "IPX-002", "MIDV-003", "FC2-PPV-004"]
+    assert videos[1].is_zh is True
+    assert videos[3].is_uncensored is True
+    assert videos[0].publish_date == date(2026, 1, 1)
+    assert videos[1].cover == "https://c0.jdbstatic.com/covers/de/def456.jpg"
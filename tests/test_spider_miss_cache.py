@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from app.schema import VideoDetail
+from app.utils import cache
+from app.utils import spider as spider_module
+from app.utils.spider import miss_cache
+from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
+
+pytestmark = pytest.mark.usefixtures("isolated_metadata_store")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+
+
+def test_ttl_doubles_on_repeated_misses_up_to_cap(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(miss_cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+
+    assert miss_cache.record_miss("JavDB", "abc-001") == miss_cache.BASE_TTL
+    assert miss_cache.is_known_miss("JavDB", "ABC-001")
+    assert not miss_cache.is_known_miss("JavBus", "ABC-001")
+
+    # 有效期过后重新查询，仍未收录时跳过时长翻倍
+    now[0] += miss_cache.BASE_TTL + 1
+    assert not miss_cache.is_known_miss("JavDB", "ABC-001")
+    assert miss_cache.record_miss("JavDB", "ABC-001") == 2 * miss_cache.BASE_TTL
+
+    assert miss_cache.miss_ttl(20) == miss_cache.MAX_TTL
+
+    miss_cache.clear_miss("JavDB", "ABC-001")
+    assert not miss_cache.is_known_miss("JavDB", "ABC-001")
+
+
+def _spider(name, error=None):
+    class FakeSpider:
+        calls = 0
+        downloadable = True
+        host = "https://example.com/"
+
+        def get_info(self, num, **kwargs):
+            type(self).calls += 1
+            if error:
+                raise error
+            return VideoDetail(num=num, title="Title", website=[name])
+
+    FakeSpider.name = name
+    return FakeSpider
+
+
+def test_get_video_info_skips_sites_that_recently_missed(monkeypatch):
+    found, missing, broken = _spider("A"), _spider("B", SpiderNotFound("未找到番号")), \
+        _spider("C", SpiderException("请求失败，状态码: 503"))
+    monkeypatch.setattr(spider_module, "SPIDER_CLASSES", [found, missing, broken])
+    # 不使用已保存的刮削结果，每次都重新刮削
+    monkeypatch.setattr(spider_module.metadata_store, "fresh", lambda *args: None)
+
+    for _ in range(2):
+        assert spider_module.get_video_info("ABC-002").title == "Title"
+
+    assert (found.calls, missing.calls, broken.calls) == (2, 1, 2)
+
+
+def test_get_video_skips_sites_that_recently_missed(monkeypatch):
+    found, missing = _spider("A"), _spider("B", SpiderNotFound("未找到番号"))
+    monkeypatch.setattr(spider_module, "JavbusSpider", missing)
+    monkeypatch.setattr(spider_module, "JavdbSpider", found)
+
+    for _ in range(2):
+        assert spider_module.get_video("ABC-003").website == ["A"]
+
+    assert (found.calls, missing.calls) == (2, 1)
+
+
+def test_concurrent_get_video_info_calls_share_one_scrape(monkeypatch):
+    class SlowSpider(_spider("A")):
+        def get_info(self, num, **kwargs):
+            time.sleep(0.1)
+            return super().get_info(num, **kwargs)
+
+    monkeypatch.setattr(spider_module, "SPIDER_CLASSES", [SlowSpider])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(spider_module.get_video_info("ABC-004")))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert [result.title for result in results] == ["Title"] * 3
+    assert SlowSpider.calls == 1
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.schema import VideoActor, VideoDetail
+from app.service import spider as spider_module
+from app.service.spider import SpiderService
+from app.utils import cache
+from app.utils.spider import miss_cache
+from app.utils.spider.spider_exception import SpiderNotFound
+
+pytestmark = pytest.mark.usefixtures("isolated_metadata_store")
+
+release = threading.Event()
+
+
+@pytest.fixture(autouse=True)
+def _release_hanging_spiders(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    release.clear()
+    yield
+    release.set()
+
+
+def _fake_spider(name, delay=0.0, hang=False, missing=False, **fields):
+    class FakeSpider:
+        calls = 0
+
+        def get_info(self, num, **kwargs):
+            type(self).calls += 1
+            if missing:
+                raise SpiderNotFound("未找到番号")
+            if hang:
+                release.wait(5)
+                return VideoDetail(num=num, title="late", outline="late outline")
+            time.sleep(delay)
+            return VideoDetail(num=num, website=[name], **fields)
+
+    FakeSpider.name = name
+    return FakeSpider
+
+
+FULL = dict(title="Title", cover="cover.jpg", actors=[VideoActor(name="Actor")])
+
+
+def _service(monkeypatch, spiders, **kwargs):
+    options = dict(max_concurrent=4, spider_timeout=1.0, first_hit=True, grace_period=0.1)
+    options.update(kwargs)
+    service = SpiderService(**options)
+    monkeypatch.setattr(service, "_get_spider_classes", lambda: spiders)
+    return service
+
+
+def test_first_hit_returns_without_waiting_for_hanging_spider(monkeypatch):
+    service = _service(monkeypatch, [_fake_spider("A", **FULL), _fake_spider("Dead", hang=True)])
+
+    start = time.monotonic()
+    result = asyncio.run(service.get_video_info_async("ABC-001"))
+
+    assert time.monotonic() - start < 0.5
+    assert result.title == "Title"
+    assert result.outline is None
+
+
+def test_late_responders_enrich_within_grace_period(monkeypatch):
+    spiders = [
+        _fake_spider("Slow", delay=0.05, outline="from slow"),
+        _fake_spider("A", title="Title", cover="cover.jpg"),
+        _fake_spider("B", delay=0.02, actors=[VideoActor(name="Actor")]),
+        _fake_spider("Dead", hang=True),
+    ]
+    service = _service(monkeypatch, spiders, grace_period=0.3)
+
+    start = time.monotonic()
+    result = asyncio.run(service.get_video_info_async("ABC-002"))
+
+    assert time.monotonic() - start < 0.8
+    assert result.actors[0].name == "Actor"
+    assert result.outline == "from slow"
+    # 合并顺序沿用站点优先级，而不是返回先后
+    assert result.website == ["Slow", "A", "B"]
+
+
+def test_wait_all_mode_stops_at_spider_deadline(monkeypatch):
+    service = _service(
+        monkeypatch,
+        [_fake_spider("A", **FULL), _fake_spider("Dead", hang=True)],
+        first_hit=False,
+        spider_timeout=0.3,
+    )
+
+    start = time.monotonic()
+    result = asyncio.run(service.get_video_info_async("ABC-003"))
+
+    assert 0.25 < time.monotonic() - start < 1.0
+    assert result.website == ["A"]
+
+
+def test_sync_calls_reuse_background_loop(monkeypatch):
+    service = _service(monkeypatch, [_fake_spider("A", **FULL)])
+    monkeypatch.setattr(spider_module, "spider_service", service)
+
+    loops = []
+    original = service.get_video_info_async
+
+    async def recording(*args, **kwargs):
+        loops.append(asyncio.get_running_loop())
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(service, "get_video_info_async", recording)
+
+    assert spider_module.get_video_info_sync("ABC-004").title == "Title"
+    assert spider_module.get_video_info_sync("ABC-005").title == "Title"
+    assert loops[0] is loops[1]
+
+
+def test_not_found_site_is_skipped_until_miss_expires(monkeypatch):
+    missing = _fake_spider("Missing", missing=True)
+    service = _service(monkeypatch, [_fake_spider("A", **FULL), missing])
+
+    asyncio.run(service.get_video_info_async("ABC-006"))
+    assert miss_cache.is_known_miss("Missing", "abc-006")
+
+    result = asyncio.run(service.get_video_info_async("ABC-006"))
+    assert missing.calls == 1
+    assert result.website == ["A"]
+
+
+def test_concurrent_scrapes_of_same_num_share_one_fetch(monkeypatch):
+    slow = _fake_spider("A", delay=0.1, **FULL)
+    service = _service(monkeypatch, [slow])
+
+    async def main():
+        return await asyncio.gather(*(service.get_video_info_async("abc-007") for _ in range(3)),
+                                    service.get_video_info_async("ABC-007", include_downloads=False))
+
+    results = asyncio.run(main())
+    assert [result.title for result in results] == ["Title"] * 4
+    # 选项不同的请求单独刮削
+    assert slow.calls == 2
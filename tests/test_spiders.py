@@ -21,6 +21,8 @@ from datetime import date
 from unittest.mock import patch, MagicMock, PropertyMock
 from lxml import etree
 
+pytestmark = pytest.mark.usefixtures("isolated_metadata_store")
+
 # ──────────────────────────────────────────────
 # Fixtures 和 Markers
 # ──────────────────────────────────────────────
@@ -462,6 +464,61 @@ class TestJavdbSearchParsing:
         assert exact[0].text == "ABC-123"
 
 
+class TestSearchMissClassification:
+    """只有正常返回的结果页里确实没有番号才算未收录，风控/登录/错误页按请求失败处理"""
+
+    @staticmethod
+    def _response(content, status_code=200, url="https://javdb.com/search?q=ABC-123&f=all"):
+        response = MagicMock()
+        response.status_code = status_code
+        response.url = url
+        response.content = content
+        response.text = content.decode()
+        return response
+
+    def test_javdb_empty_result_list_is_not_found(self, javdb_spider_no_network):
+        from app.utils.spider.spider_exception import SpiderNotFound
+
+        page = b'<html><body><div class="empty-message">No content</div></body></html>'
+        with patch.object(javdb_spider_no_network, "_get", return_value=self._response(page)):
+            with pytest.raises(SpiderNotFound):
+                javdb_spider_no_network.get_info("ABC-123")
+
+    @pytest.mark.parametrize("page, status_code, url", [
+        (b"<html><body>Just a moment...</body></html>", 200, "https://javdb.com/search?q=ABC-123&f=all"),
+        (b"<html><body>banned</body></html>", 403, "https://javdb.com/search?q=ABC-123&f=all"),
+        (b'<html><body><form action="/user_sessions"></form></body></html>', 200, "https://javdb.com/login"),
+        (b"<html><body><p>maintenance</p></body></html>", 200, "https://javdb.com/search?q=ABC-123&f=all"),
+    ])
+    def test_javdb_blocked_search_is_not_a_miss(self, javdb_spider_no_network, page, status_code, url):
+        from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
+
+        response = self._response(page, status_code, url)
+        with patch.object(javdb_spider_no_network, "_get", return_value=response):
+            with pytest.raises(SpiderException) as excinfo:
+                javdb_spider_no_network.get_info("ABC-123")
+        assert not isinstance(excinfo.value, SpiderNotFound)
+
+    @pytest.mark.parametrize("page, status_code, expected", [
+        (b'<html><body><div class="container"><small>DEF-456</small></div></body></html>', 200, "not_found"),
+        (b'<html><body><div class="container"></div></body></html>', 200, "not_found"),
+        (b"<html><body>Just a moment...</body></html>", 200, "error"),
+        (b"<html><body>Service Unavailable</body></html>", 503, "error"),
+    ])
+    def test_jav321_only_results_page_without_num_is_not_found(self, page, status_code, expected):
+        from app.utils.spider.jav321 import Jav321Spider
+        from app.utils.spider.spider_exception import SpiderException, SpiderNotFound
+
+        with patch.object(Jav321Spider, "__init__", lambda self: None):
+            spider = Jav321Spider.__new__(Jav321Spider)
+        spider.session = MagicMock()
+        spider.session.post.return_value = self._response(page, status_code)
+
+        with pytest.raises(SpiderException) as excinfo:
+            spider.get_info("ABC-123")
+        assert isinstance(excinfo.value, SpiderNotFound) == (expected == "not_found")
+
+
 # ──────────────────────────────────────────────
 # JavBus: Bug 修复验证
 # ──────────────────────────────────────────────
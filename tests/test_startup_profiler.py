@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+from app.utils.startup_profiler import StartupProfiler
+
+
+def test_phase_records_status_and_duration():
+    profiler = StartupProfiler(enabled=False)
+
+    with profiler.phase("db_init"):
+        pass
+    with pytest.raises(RuntimeError):
+        with profiler.phase("schema_check"):
+            raise RuntimeError("boom")
+    profiler.mark_ready()
+
+    report = profiler.report()
+    assert report["ready"] is True
+    assert report["phases"]["db_init"]["status"] == "success"
+    assert report["phases"]["schema_check"]["status"] == "failed"
+    assert "slowest_imports" not in report
+
+
+def test_import_timer_records_module_import(tmp_path, monkeypatch):
+    (tmp_path / "startup_profiler_probe.py").write_text("VALUE = 1\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    profiler = StartupProfiler(enabled=True)
+
+    profiler.install_import_timer()
+    try:
+        import startup_profiler_probe
+    finally:
+        profiler.mark_ready()
+        sys.modules.pop("startup_profiler_probe", None)
+
+    assert startup_profiler_probe.VALUE == 1
+    modules = [item["module"] for item in profiler.report()["slowest_imports"]]
+    assert "startup_profiler_probe" in modules
+    assert profiler.import_timer not in sys.meta_path
@@ -0,0 +1,104 @@
+import threading
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import app.utils.spider as spider_module
+from app.db.models import Subscribe
+from app.db.models.enums import SubscribeStatus
+from app.schema import VideoDetail
+from app.schema.video import VideoDownload
+from app.service import subscribe as subscribe_module
+from app.service.subscribe import SubscribeService
+from app.utils import cache
+from app.utils.host_limiter import HostRateLimiter
+
+pytestmark = pytest.mark.usefixtures("isolated_metadata_store")
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    monkeypatch.setattr(subscribe_module, "host_rate_limiter", HostRateLimiter(0, 0, 2))
+    monkeypatch.setattr(subscribe_module, "Setting", lambda: SimpleNamespace(app=SimpleNamespace(
+        host_request_interval=0, host_request_jitter=0, host_max_concurrency=2, max_concurrent_spiders=4)))
+    return SubscribeService(db=db_session)
+
+
+def _add_subscribe(db_session, num, **kwargs):
+    values = dict(num=num, is_hd=False, is_zh=False, is_uncensored=False, status=SubscribeStatus.PENDING)
+    values.update(kwargs)
+    subscribe = Subscribe(**values)
+    db_session.add(subscribe)
+    db_session.commit()
+    return subscribe
+
+
+def _video(num, *names):
+    return VideoDetail(num=num, downloads=[VideoDownload(name=name, magnet=f"magnet:{name}") for name in names])
+
+
+def test_subscriptions_share_one_scrape_per_num(db_session, service, monkeypatch):
+    plain = _add_subscribe(db_session, "ABC-001")
+    keyword = _add_subscribe(db_session, "ABC-001", include_keyword="(?i)uncut", exclude_keyword="[broken")
+    missing = _add_subscribe(db_session, "ABC-002")
+
+    fetched, threads = [], set()
+
+    def fake_get_video(num, rate_limiter=None, use_cache=False, use_stored=True):
+        # 订阅只复用最近一次的刮削结果，不沿用已保存的下载列表
+        assert use_stored is False
+        fetched.append(num)
+        threads.add(threading.current_thread().name)
+        return _video(num, f"{num} uncut") if num == "ABC-001" else None
+
+    downloaded = []
+    monkeypatch.setattr(subscribe_module.spider, "get_video", fake_get_video)
+    monkeypatch.setattr(SubscribeService, "download_video",
+                        lambda self, video, link, **kwargs: downloaded.append((video.num, link.name)))
+
+    service.do_subscribe()
+
+    assert sorted(fetched) == ["ABC-001", "ABC-002"]
+    assert all(name.startswith("subscribe") for name in threads)
+    assert downloaded == [("ABC-001", "ABC-001 uncut")] * 2
+    assert plain.status == keyword.status == SubscribeStatus.COMPLETED
+    assert missing.status == SubscribeStatus.PENDING
+
+
+def test_keyword_patterns_are_compiled_once():
+    SubscribeService._compile_keyword.cache_clear()
+    first = SubscribeService._compile_keyword("foo.*bar")
+    assert SubscribeService._compile_keyword("foo.*bar") is first
+    assert SubscribeService._compile_keyword.cache_info().hits == 1
+    assert SubscribeService._compile_keyword("[broken") is None
+
+
+def test_get_video_reuses_recent_scrape(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "cache_path", tmp_path)
+    calls = []
+
+    class FakeSpider:
+        name = "fake"
+        host = "https://fake.example/"
+        downloadable = True
+
+        def get_info(self, number, **kwargs):
+            calls.append(number)
+            detail = _video(number, "item")
+            detail.downloads[0].publish_date = date(2026, 1, 1)
+            return detail
+
+    monkeypatch.setattr(spider_module, "JavbusSpider", FakeSpider)
+    monkeypatch.setattr(spider_module, "JavdbSpider", FakeSpider)
+
+    first = spider_module.get_video("XYZ-001")
+    assert len(calls) == 2
+
+    reused = spider_module.get_video("XYZ-001", use_cache=True)
+    assert len(calls) == 2
+    assert reused.downloads[0].publish_date == date(2026, 1, 1)
+    assert [d.magnet for d in reused.downloads] == [d.magnet for d in first.downloads]
+
+    spider_module.get_video("XYZ-001")
+    assert len(calls) == 4
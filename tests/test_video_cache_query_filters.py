@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 
-from app.db.models.video_cache import VideoCache
+from app.db.models.video_cache import CachedVideo, VideoCache, VideoCacheActor, VideoCacheTag
 from app.service.video_cache import VideoCacheService
 
 
@@ -18,21 +18,26 @@ def _insert_video(
     actors=None,
     tags=None,
 ):
+    video = CachedVideo(
+        num=num,
+        title=f"Title {num}",
+        cover=f"https://example.com/{num}.jpg",
+        url=f"https://example.com/{num}",
+        rating=rating,
+        comments_count=comments_count,
+        release_date=release_date,
+        is_hd=is_hd,
+        is_zh=is_zh,
+        is_uncensored=is_uncensored,
+        actors=actors or [],
+        tags=tags or [],
+        magnets=[],
+        fetched_at=fetched_at or datetime.now(),
+    )
     db_session.add(
         VideoCache(
+            video=video,
             num=num,
-            title=f"Title {num}",
-            cover=f"https://example.com/{num}.jpg",
-            url=f"https://example.com/{num}",
-            rating=rating,
-            comments_count=comments_count,
-            release_date=release_date,
-            is_hd=is_hd,
-            is_zh=is_zh,
-            is_uncensored=is_uncensored,
-            actors=actors or [],
-            tags=tags or [],
-            magnets=[],
             source="JavDB",
             video_type="censored",
             cycle="daily",
@@ -40,6 +45,7 @@ def _insert_video(
             fetched_at=fetched_at or datetime.now(),
         )
     )
+    return video
 
 
 def test_query_videos_uses_release_date_first_and_fallback_to_fetched_at(db_session):
@@ -145,3 +151,124 @@ def test_query_videos_normalizes_actor_id_and_tag_values(db_session):
 
     nums = {item["num"] for item in results}
     assert nums == {"SECOND-MATCH"}
+
+
+def test_query_videos_paginates_tag_filters_in_sql(db_session):
+    for index in range(1, 1101):
+        _insert_video(db_session, f"FILLER-{index:04d}", rating=4.5, tags=["other"])
+    for index in range(1, 6):
+        _insert_video(db_session, f"DEEP-{index:02d}", rating=1.0 - index * 0.01, tags=["Rare", "Extra"])
+    db_session.commit()
+
+    service = VideoCacheService(db_session)
+    first_page = service.query_videos(days=0, required_tags=["rare", "extra"], limit=3, offset=0)
+    second_page = service.query_videos(days=0, required_tags=["rare", "extra"], limit=3, offset=3)
+
+    assert [item["num"] for item in first_page] == ["DEEP-01", "DEEP-02", "DEEP-03"]
+    assert [item["num"] for item in second_page] == ["DEEP-04", "DEEP-05"]
+
+
+def test_updating_tags_replaces_link_rows_and_cleanup_removes_them(db_session):
+    _insert_video(db_session, "RETAGGED", tags=["before"], actors=[{"id": "a1", "name": "A"}])
+    db_session.commit()
+    ranking = db_session.query(VideoCache).filter_by(num="RETAGGED").one()
+
+    ranking.video.tags = ["after"]
+    db_session.commit()
+
+    assert db_session.query(VideoCacheTag).count() == 1
+    service = VideoCacheService(db_session)
+    assert service.query_videos(days=0, required_tags=["before"]) == []
+    assert len(service.query_videos(days=0, required_tags=["after"])) == 1
+
+    ranking.fetched_at = datetime.now() - timedelta(days=30)
+    db_session.commit()
+    service.clean_old_cache(days=7)
+
+    assert db_session.query(CachedVideo).count() == 0
+    assert db_session.query(VideoCacheTag).count() == 0
+    assert db_session.query(VideoCacheActor).count() == 0
+
+
+class _FakeRankingSpider:
+    def __init__(self, videos):
+        self.videos = videos
+
+    def get_ranking_with_details(self, video_type, cycle, max_pages, apply_delay=True):
+        return self.videos
+
+
+def test_fetch_and_cache_single_ranking_bulk_upserts(db_session, monkeypatch):
+    service = VideoCacheService(db_session)
+    first = [
+        {"num": f"UP-{i:03d}", "title": f"T{i}", "rating": 4.0, "tags": ["a"], "actors": [{"id": "x"}]}
+        for i in range(1, 121)
+    ]
+    first.append({"num": "UP-001", "title": "duplicate in same ranking"})
+    monkeypatch.setattr(service, "_get_spider", lambda source: _FakeRankingSpider(first))
+
+    counts = service._fetch_and_cache_single_ranking("JavDB", "censored", "daily", 1, False)
+    assert counts == {"fetched": 121, "new": 120, "updated": 0}
+
+    second = [
+        {"num": "UP-002", "tags": ["b"]},
+        {"num": "NEW-001", "title": "new", "rating": 9.9},
+    ]
+    monkeypatch.setattr(service, "_get_spider", lambda source: _FakeRankingSpider(second))
+    counts = service._fetch_and_cache_single_ranking("JavDB", "censored", "daily", 1, False)
+    assert counts == {"fetched": 2, "new": 1, "updated": 1}
+
+    db_session.expire_all()
+    updated = db_session.query(CachedVideo).filter_by(num="UP-002").one()
+    assert updated.title == "T2"
+    assert updated.actors == [{"id": "x"}]
+    assert updated.tags == ["b"]
+    assert db_session.query(VideoCache).filter_by(num="UP-002").one().rank_position == 1
+    assert db_session.query(CachedVideo).filter_by(num="NEW-001").one().rating is None
+    assert db_session.query(VideoCache).count() == 121
+    assert {v["num"] for v in service.query_videos(days=0, required_tags=["b"])} == {"UP-002"}
+    assert len(service.query_videos(days=0, required_actor_id="x", limit=200)) == 120
+
+
+def test_fetch_and_cache_rankings_runs_all_combinations_and_reports_errors(db_session, monkeypatch):
+    from types import SimpleNamespace
+
+    from app.service import video_cache as video_cache_module
+
+    class _Spider:
+        host = "https://javdb.example"
+
+        def get_ranking_with_details(self, video_type, cycle, max_pages, apply_delay=True):
+            assert apply_delay is False
+            if (video_type, cycle) == ("uncensored", "monthly"):
+                raise RuntimeError("boom")
+            return [{"num": f"{video_type}-{cycle}", "title": cycle}]
+
+    app_setting = SimpleNamespace(
+        max_concurrent_spiders=3, host_request_interval=0.0, host_request_jitter=0.0, host_max_concurrency=2
+    )
+    monkeypatch.setattr(video_cache_module, "Setting", lambda: SimpleNamespace(app=app_setting))
+    service = VideoCacheService(db_session)
+    monkeypatch.setattr(service, "_get_spider", lambda source: _Spider())
+
+    stats = service.fetch_and_cache_rankings(max_pages=1)
+
+    assert stats["total_new"] == 5
+    assert len(stats["errors"]) == 1
+    assert db_session.query(VideoCache).count() == 5
+
+
+def test_same_num_across_rankings_is_stored_once(db_session, monkeypatch):
+    service = VideoCacheService(db_session)
+    videos = [{"num": "SHARED-001", "title": "shared", "rating": 4.5, "tags": ["t"]}]
+    monkeypatch.setattr(service, "_get_spider", lambda source: _FakeRankingSpider(videos))
+
+    for cycle in ("daily", "weekly", "monthly"):
+        service._fetch_and_cache_single_ranking("JavDB", "censored", cycle, 1, False)
+
+    assert db_session.query(CachedVideo).count() == 1
+    assert db_session.query(VideoCacheTag).count() == 1
+    assert db_session.query(VideoCache).count() == 3
+    assert db_session.query(CachedVideo).filter_by(num="SHARED-001").one().title == "shared"
+    assert {v["cycle"] for v in service.query_videos(days=0, required_tags=["t"])} == {"daily", "weekly", "monthly"}
+    assert [v["rank_position"] for v in service.get_ranking_videos(cycle="weekly")] == [1]